@@ -0,0 +1,159 @@
+"""
+ANN Recall Benchmark
+블록 임베딩 ANN 인덱스(IVF) vs 전수 탐색(brute force) 정확도/지연 비교
+
+Usage:
+    python benchmark/ann_recall_benchmark.py --rows 100000 --dim 384 --k 10
+    python benchmark/ann_recall_benchmark.py --nprobe 4 8 16 32 --backend numpy
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from greeum.core.embedding_store import EmbeddingMatrixStore
+
+
+def build_database(path: str, rows: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """군집 구조를 가진 합성 임베딩으로 block_embeddings 테이블 생성"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, rows)] + 0.5 * rng.standard_normal((rows, dim)).astype(np.float32)
+
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS block_embeddings (
+            block_index INTEGER PRIMARY KEY,
+            embedding BLOB NOT NULL,
+            embedding_model TEXT,
+            embedding_dim INTEGER
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO block_embeddings VALUES (?, ?, 'benchmark', ?)",
+        ((i, vectors[i].tobytes(), dim) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+    return vectors
+
+
+def timed_search(store: EmbeddingMatrixStore, conn, queries: np.ndarray, k: int):
+    latencies: List[float] = []
+    results: List[List[int]] = []
+    for query in queries:
+        start = time.perf_counter()
+        hits = store.search(conn, query, top_k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([block_index for block_index, _ in hits])
+    return results, latencies
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+def run(args) -> Dict[str, object]:
+    workdir = tempfile.mkdtemp(prefix="greeum_ann_bench_")
+    db_path = os.path.join(workdir, "memory.db")
+    print(f"Generating {args.rows} x {args.dim} embeddings ({args.clusters} clusters)...")
+    vectors = build_database(db_path, args.rows, args.dim, args.clusters, args.seed)
+
+    rng = np.random.default_rng(args.seed + 1)
+    picks = rng.integers(0, args.rows, args.queries)
+    queries = vectors[picks] + 0.1 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+    conn = sqlite3.connect(db_path)
+
+    exact = EmbeddingMatrixStore()
+    exact.ann_settings["backend"] = "off"
+    exact.search(conn, queries[0], top_k=args.k)  # load
+    truth, exact_latencies = timed_search(exact, conn, queries, args.k)
+
+    report: Dict[str, object] = {
+        "rows": args.rows,
+        "dim": args.dim,
+        "k": args.k,
+        "queries": args.queries,
+        "brute_force": summarize(exact_latencies),
+        "ann": [],
+    }
+
+    for nprobe in args.nprobe:
+        store = EmbeddingMatrixStore()
+        store.ann_settings.update({
+            "backend": args.backend,
+            "min_rows": 0,
+            "nlist": args.nlist,
+            "nprobe": nprobe,
+        })
+        build_start = time.perf_counter()
+        store.search(conn, queries[0], top_k=args.k)  # load + train
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        approx, latencies = timed_search(store, conn, queries, args.k)
+        recall = statistics.mean(
+            len(set(a) & set(t)) / max(len(t), 1) for a, t in zip(approx, truth)
+        )
+        entry = {
+            "backend": next(iter(store.get_stats()["ann_groups"].values()), "exact"),
+            "nprobe": nprobe,
+            "build_ms": round(build_ms, 1),
+            f"recall@{args.k}": round(recall, 4),
+            **summarize(latencies),
+        }
+        report["ann"].append(entry)
+        print(
+            f"  nprobe={nprobe:<4} recall@{args.k}={recall:.4f} "
+            f"p50={entry['p50_ms']}ms p95={entry['p95_ms']}ms (build {entry['build_ms']}ms)"
+        )
+
+    conn.close()
+    print(
+        f"  brute force     p50={report['brute_force']['p50_ms']}ms "
+        f"p95={report['brute_force']['p95_ms']}ms"
+    )
+    return report
+
+
+def main():
+    """ANN recall@k 벤치마크 실행"""
+    parser = argparse.ArgumentParser(description="ANN recall@k vs brute force")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=0, help="0 = auto (2*sqrt(N))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--backend", choices=["auto", "numpy", "faiss"], default="auto")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    report = run(args)
+
+    output_file = args.output or f"ann_recall_results_{int(time.time())}.json"
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 ANN recall results saved to: {output_file}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -13,79 +13,98 @@ Features:
 
 __version__ = "5.3.0"
 
-# Main Interface (v3.0+)
-from .core.context_memory import ContextMemorySystem
-
-# Core components
-from .core.block_manager import BlockManager
-from .core.stm_manager import STMManager
-from .core.cache_manager import CacheManager
-from .core.prompt_wrapper import PromptWrapper
-from .core.database_manager import DatabaseManager
-
-# Search engines
-from .core.smart_search_engine import SmartSearchEngine
-from .core.ltm_links_cache import LTMLinksCache, create_neighbor_link, calculate_link_weight
-
-# Anchors
-from .anchors.auto_movement import AutoAnchorMovement
-
-# Text utilities
-try:
-    from .text_utils import (
-        process_user_input, extract_keywords_from_text,
-        extract_tags_from_text, compute_text_importance,
-        convert_numpy_types, extract_keywords_advanced
-    )
-    process_text = process_user_input  # Alias
-except ImportError:
-    pass
-
-# Embedding models
-try:
-    from .embedding_models import (
-        SimpleEmbeddingModel,
-        EmbeddingRegistry, get_embedding, register_embedding_model
-    )
-except ImportError:
-    pass
-
-# Optional modules
-try:
-    from .temporal_reasoner import TemporalReasoner, evaluate_temporal_query
-except ImportError:
-    pass
-
-try:
-    from .memory_evolution import MemoryEvolutionManager
-except ImportError:
-    pass
-
-try:
-    from .knowledge_graph import KnowledgeGraphManager
-except ImportError:
-    pass
-
-# Client (legacy compatibility - will be deprecated)
-try:
-    from .client import (
-        MemoryClient, SimplifiedMemoryClient,
-        ClientError, ConnectionFailedError, RequestTimeoutError, APIError
-    )
-except ImportError:
-    pass
-
-# New client (v5.1.0+)
-try:
-    from .client import GreeumClient, GreeumHTTPClient
-except ImportError:
-    pass
-
-# MCP integration - optional
-try:
-    from . import mcp
-except (ImportError, AttributeError):
-    pass
+# v5.4: public API는 첫 접근 시 로드 (PEP 562)
+# `import greeum` / `greeum --help`가 numpy, requests, MCP 서버 모듈 그래프를
+# 끌어오지 않도록 이름 -> (모듈, 속성) 표만 두고 __getattr__에서 import한다.
+_LAZY_ATTRS = {
+    # Main Interface (v3.0+)
+    "ContextMemorySystem": (".core.context_memory", "ContextMemorySystem"),
+
+    # Core components
+    "BlockManager": (".core.block_manager", "BlockManager"),
+    "STMManager": (".core.stm_manager", "STMManager"),
+    "CacheManager": (".core.cache_manager", "CacheManager"),
+    "PromptWrapper": (".core.prompt_wrapper", "PromptWrapper"),
+    "DatabaseManager": (".core.database_manager", "DatabaseManager"),
+
+    # Search engines
+    "SmartSearchEngine": (".core.smart_search_engine", "SmartSearchEngine"),
+    "LTMLinksCache": (".core.ltm_links_cache", "LTMLinksCache"),
+    "create_neighbor_link": (".core.ltm_links_cache", "create_neighbor_link"),
+    "calculate_link_weight": (".core.ltm_links_cache", "calculate_link_weight"),
+
+    # Anchors
+    "AutoAnchorMovement": (".anchors.auto_movement", "AutoAnchorMovement"),
+
+    # Text utilities
+    "process_user_input": (".text_utils", "process_user_input"),
+    "process_text": (".text_utils", "process_user_input"),  # Alias
+    "extract_keywords_from_text": (".text_utils", "extract_keywords_from_text"),
+    "extract_tags_from_text": (".text_utils", "extract_tags_from_text"),
+    "compute_text_importance": (".text_utils", "compute_text_importance"),
+    "convert_numpy_types": (".text_utils", "convert_numpy_types"),
+    "extract_keywords_advanced": (".text_utils", "extract_keywords_advanced"),
+
+    # Embedding models
+    "SimpleEmbeddingModel": (".embedding_models", "SimpleEmbeddingModel"),
+    "EmbeddingRegistry": (".embedding_models", "EmbeddingRegistry"),
+    "get_embedding": (".embedding_models", "get_embedding"),
+    "register_embedding_model": (".embedding_models", "register_embedding_model"),
+
+    # Optional modules
+    "TemporalReasoner": (".temporal_reasoner", "TemporalReasoner"),
+    "evaluate_temporal_query": (".temporal_reasoner", "evaluate_temporal_query"),
+    "MemoryEvolutionManager": (".memory_evolution", "MemoryEvolutionManager"),
+    "KnowledgeGraphManager": (".knowledge_graph", "KnowledgeGraphManager"),
+
+    # Client (legacy compatibility - will be deprecated)
+    "MemoryClient": (".client", "MemoryClient"),
+    "SimplifiedMemoryClient": (".client", "SimplifiedMemoryClient"),
+    "ClientError": (".client", "ClientError"),
+    "ConnectionFailedError": (".client", "ConnectionFailedError"),
+    "RequestTimeoutError": (".client", "RequestTimeoutError"),
+    "APIError": (".client", "APIError"),
+
+    # New client (v5.1.0+)
+    "GreeumClient": (".client", "GreeumClient"),
+    "GreeumHTTPClient": (".client", "GreeumHTTPClient"),
+
+    # MCP integration - optional
+    "mcp": (".mcp", None),
+}
+
+# 설치 구성에 따라 없을 수 있는 모듈 (기존 try/except ImportError 블록과 동일)
+_OPTIONAL_MODULES = {
+    ".text_utils", ".embedding_models", ".temporal_reasoner", ".memory_evolution",
+    ".knowledge_graph", ".client", ".mcp",
+}
+
+
+def __getattr__(name):
+    try:
+        module_name, attr = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    import importlib
+
+    try:
+        module = importlib.import_module(module_name, __name__)
+        value = module if attr is None else getattr(module, attr)
+    except (ImportError, AttributeError) as exc:
+        if module_name not in _OPTIONAL_MODULES:
+            raise
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r} ({exc})"
+        ) from exc
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __all__ = [
     "__version__",
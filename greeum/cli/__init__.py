@@ -42,21 +42,15 @@ from ..config_store import (
     get_remote_config,
     CONFIG_PATH,
 )
-from ..core.database_manager import DatabaseManager
-from ..core.stm_anchor_store import get_anchor_store
+
+# v5.4: DatabaseManager(numpy), embedding_models, worker 등 무거운 모듈은
+# 각 명령 함수 안에서 import한다 (`greeum --help` 콜드 스타트 예산 유지).
 
 # Default port constants
 DEFAULT_API_PORT = 8400
 DEFAULT_MCP_HTTP_PORT = 3000
 DEFAULT_API_SERVE_PORT = 5000
 DEFAULT_WORKER_PORT = 8800
-from ..core.branch_schema import BranchSchemaSQL
-from ..embedding_models import (
-    init_sentence_transformer,
-    force_simple_fallback,
-)
-from ..worker.client import WriteServiceClient, resolve_endpoint, WorkerUnavailableError
-from ..worker import ensure_http_worker, get_worker_state
 
 
 def _backup_database_files(db_path: Path, label: str = "auto") -> Path:
@@ -115,6 +109,8 @@ def _remove_corrupt_database(db_path: Path) -> None:
 
 
 def _ensure_database_ready(data_dir: Path, *, auto_accept: bool = False) -> None:
+    from ..core.branch_schema import BranchSchemaSQL
+    from ..core.database_manager import DatabaseManager
     db_path = data_dir / "memory.db"
     if not db_path.exists():
         return
@@ -185,7 +181,37 @@ def _download_sentence_transformer(model: str) -> Path:
     )
     return cache_dir
 
-@click.group()
+# v5.4: rich에 의존하는 하위 그룹은 해당 명령이 디스패치될 때만 import한다.
+# `greeum --help`은 아래 자리표시 그룹(graph/metrics/validate)의 도움말을 그대로 쓴다.
+_LAZY_SUBGROUPS = {
+    'graph': ('.graph', 'graph_group'),
+    'metrics': ('.metrics_cli', 'metrics_group'),
+    'validate': ('.validate_cli', 'validate_group'),
+}
+
+
+class _LazySubgroupGroup(click.Group):
+    """Root group that swaps placeholder subgroups for the real ones on dispatch."""
+
+    def resolve_command(self, ctx, args):
+        cmd_name, cmd, args = super().resolve_command(ctx, args)
+        if cmd_name in _LAZY_SUBGROUPS:
+            cmd = self._load_subgroup(cmd_name) or cmd
+        return cmd_name, cmd, args
+
+    def _load_subgroup(self, name):
+        module_name, attr = _LAZY_SUBGROUPS.pop(name)
+        try:
+            import importlib
+            group = getattr(importlib.import_module(module_name, __package__), attr)
+        except ImportError:
+            return None  # CLI 모듈 미설치 시 자리표시 그룹 유지
+        self.commands.pop(name, None)
+        self.add_command(group, name=name)
+        return group
+
+
+@click.group(cls=_LazySubgroupGroup)
 @click.version_option()
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose logging')
 @click.option('--debug', is_flag=True, help='Enable debug logging (most verbose)')
@@ -970,6 +996,7 @@ def setup(data_dir: Optional[str], skip_warmup: bool, start_worker: bool,
           remote_url: Optional[str], api_key: Optional[str], project: Optional[str],
           server: bool):
     """Interactive first-time setup (data dir + optional warm-up)."""
+    from ..worker import ensure_http_worker, get_worker_state
 
     click.echo("[>]  Greeum setup wizard")
     config = load_config()
@@ -1339,6 +1366,8 @@ def _decide_worker(use_worker_flag: bool, no_worker_flag: bool) -> Optional[bool
 
 
 def _try_worker_call(tool: str, arguments: Dict[str, Any], use_worker_flag: bool, no_worker_flag: bool, quiet: bool = False, config: Optional[GreeumConfig] = None) -> Optional[Dict[str, Any]]:
+    from ..worker import ensure_http_worker
+    from ..worker.client import WriteServiceClient, resolve_endpoint, WorkerUnavailableError
     decision = _decide_worker(use_worker_flag, no_worker_flag)
     endpoint = resolve_endpoint()
 
@@ -1573,6 +1602,7 @@ def search(query: str, count: int, threshold: float, slot: str, radius: int, no_
 @click.option('--disable-faiss', is_flag=True, help='Skip FAISS vector index rebuild')
 def memory_reindex(data_dir: Optional[str], disable_faiss: bool) -> None:
     """Rebuild branch-aware indices for the selected database."""
+    from ..core.database_manager import DatabaseManager
     from ..core.branch_index import BranchIndexManager
 
     if disable_faiss:
@@ -1621,6 +1651,7 @@ def memory_reindex(data_dir: Optional[str], disable_faiss: bool) -> None:
                    'Pass --no-semantic only for tests/CI that intentionally want hash.')
 def serve(transport: str, port: int, host: str, verbose: bool, debug: bool, quiet: bool, semantic: bool):
     """Start MCP server for Claude Code integration"""  
+    from ..embedding_models import init_sentence_transformer, force_simple_fallback
     config = load_config()
     # 로깅 레벨 결정 (새로운 정책: 기본은 조용함)
     if debug:
@@ -1808,6 +1839,7 @@ def analyze(trends: bool, period: str, output: str):
     """Summarize branch-based long-term memory activity."""
 
     from ..core import BlockManager, DatabaseManager
+    from ..core.stm_anchor_store import get_anchor_store
 
     click.echo("== STM Slot Overview ==")
 
@@ -2542,6 +2574,8 @@ def search(query: str, limit: int):
 @click.option('--force', is_flag=True, help='Force migration even if already v2.5.3')
 def check(data_dir: str, force: bool):
     """Check database schema version and trigger migration if needed"""
+    from ..core.branch_schema import BranchSchemaSQL
+    from ..core.database_manager import DatabaseManager
     click.echo("[>] Checking Greeum database schema version...")
     
     try:
@@ -2574,6 +2608,9 @@ def check(data_dir: str, force: bool):
 @click.option('--data-dir', default='data', help='Data directory path')
 def status(data_dir: str):
     """Check current migration status and schema version"""
+    from ..core.branch_schema import BranchSchemaSQL
+    from ..core.database_manager import DatabaseManager
+    from ..core.stm_anchor_store import get_anchor_store
     click.echo("[>] Greeum Database Migration Status")
     click.echo("=" * 40)
     
@@ -2707,34 +2744,23 @@ def cleanup(data_dir: str, keep_backups: int):
 
 # v2.6.1 Backup 서브명령어들
 @backup.command()
-@click.option('--output', '-o', required=True, help='백업 파일 저장 경로')
-@click.option('--include-metadata/--no-metadata', default=True, help='시스템 메타데이터 포함 여부')
-def export(output: str, include_metadata: bool):
-    """전체 메모리를 백업 파일로 내보내기"""
+@click.option('--output', '-o', required=True, help='백업 파일 저장 경로 (.ndjson.gz, .ndjson.zst, .ndjson)')
+@click.option('--since', type=int, default=-1, help='이 block_index 이후 블록만 내보내기 (증분 백업)')
+@click.option('--compression', type=click.Choice(['gzip', 'zstd', 'none']), default=None,
+              help='압축 방식 (기본: 파일 확장자로 결정)')
+def export(output: str, since: int, compression: Optional[str]):
+    """전체(또는 증분) 메모리를 스트리밍 백업 파일로 내보내기 (v5.4)"""
+    from ..core.backup_stream import write_backup
+    from ..core.database_manager import DatabaseManager
+
+    click.echo("[>] 메모리 백업을 시작합니다...")
+    db_manager = DatabaseManager()
     try:
-        from ..core.backup_restore import MemoryBackupEngine
-        # from ..core.hierarchical_memory import HierarchicalMemorySystem  # REMOVED: File deleted
-        from ..core.database_manager import DatabaseManager
-        from pathlib import Path
-        
-        click.echo("[>] 메모리 백업을 시작합니다...")
-        
-        # 계층적 메모리 시스템 초기화 - SIMPLIFIED
-        db_manager = DatabaseManager()
-        # HierarchicalMemorySystem removed - using DatabaseManager directly
-        
-        backup_engine = MemoryBackupEngine(db_manager)
-        success = backup_engine.create_backup(output, include_metadata)
-        
-        if success:
-            click.echo(f"[OK] 백업 완료: {output}")
-            backup_path = Path(output)
-            if backup_path.exists():
-                size_mb = backup_path.stat().st_size / (1024 * 1024)
-                click.echo(f"[>] 파일 크기: {size_mb:.2f} MB")
-        else:
-            click.echo("[ERROR] 백업 생성에 실패했습니다")
-            
+        stats = write_backup(db_manager, output, since=since, compression=compression)
+        click.echo(f"[OK] 백업 완료: {output} ({stats['count']}개 블록, {stats['compression']})")
+        click.echo(f"[>] 파일 크기: {stats['bytes'] / (1024 * 1024):.2f} MB")
+        if stats['last_block_index'] is not None:
+            click.echo(f"[>] 다음 증분 백업: --since {stats['last_block_index']}")
     except Exception as e:
         click.echo(f"[!] 백업 중 오류: {e}")
     finally:
@@ -2976,83 +3002,68 @@ def status():
 
 
 @backup.command()
-@click.option('--merge/--replace', default=True, help='Merge mode (default: merge, skip duplicates)')
-def push(merge: bool):
+@click.option('--since', type=int, default=-1, help='Only push blocks after this block_index')
+@click.option('--merge/--replace', default=True,
+              help='Merge mode (default). --replace is not supported by the streaming push')
+def push(since: int, merge: bool):
     """Push local memories to a remote Greeum server
 
+    The backup is streamed straight from the local database (v5.4);
+    blocks already on the server are skipped.
+
     Examples:
         greeum backup push
-        greeum backup push --replace
+        greeum backup push --since 1200
     """
-    import json as _json
-    import tempfile
-
-    # 1. Export local memories
-    click.echo("[1/3] Exporting local memories...")
-    try:
-        from ..core.database_manager import DatabaseManager
-        from ..core.backup_restore import MemoryBackupEngine
-
-        db_manager = DatabaseManager()
-        backup_engine = MemoryBackupEngine(db_manager)
-
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            tmp_path = f.name
-
-        success = backup_engine.create_backup(tmp_path, include_metadata=True)
-        if not success:
-            click.echo("      [ERROR] Local backup creation failed")
-            return
-
-        backup_data = _json.loads(Path(tmp_path).read_text(encoding='utf-8'))
-        total = backup_data.get('metadata', {}).get('total_memories', 0)
-        click.echo(f"      {total} memories ready")
-
-        Path(tmp_path).unlink(missing_ok=True)
-    except Exception as e:
-        click.echo(f"      [ERROR] Export failed: {e}")
-    finally:
-        db_manager.close()
-        if 'tmp_path' in dir():
-            Path(tmp_path).unlink(missing_ok=True)
-        return
+    if not merge:
+        # 스트리밍 업로드는 항상 병합(중복 건너뜀) - 원격 데이터를 지우는 모드는 없음
+        raise click.UsageError(
+            "--replace is not supported: the streaming push always merges into the "
+            "server's memories and skips blocks it already has."
+        )
 
-    # 2. Resolve remote server
-    click.echo("[2/3] Connecting to remote server...")
+    # 1. Resolve remote server
+    click.echo("[1/2] Connecting to remote server...")
     remote_url, api_key = _resolve_remote_server()
     if not remote_url:
         return
     click.echo(f"      Server: {remote_url}")
 
-    # 3. Upload
-    click.echo("[3/3] Uploading...")
+    # 2. Stream local memories to the server
+    click.echo("[2/2] Uploading...")
+    from ..core.backup_stream import iter_backup_chunks
+    from ..core.database_manager import DatabaseManager
+
+    db_manager = DatabaseManager()
     try:
         from ..client.http_client import GreeumHTTPClient
         client = GreeumHTTPClient(base_url=remote_url, api_key=api_key)
-        result = client.backup_push(backup_data, merge=merge)
+        result = client.backup_push(iter_backup_chunks(db_manager, since=since))
 
         if result.get('success'):
-            click.echo(f"\n      Push complete!")
+            click.echo(f"\n      Push complete! ({result.get('mode')})")
             click.echo(f"      Total:    {result.get('total', 0)}")
             click.echo(f"      Restored: {result.get('restored', 0)}")
             click.echo(f"      Skipped:  {result.get('skipped', 0)} (duplicates)")
-            click.echo(f"      Errors:   {result.get('errors', 0)}")
         else:
             click.echo(f"      [ERROR] Upload failed: {result}")
     except Exception as e:
         click.echo(f"      [ERROR] Upload failed: {e}")
+    finally:
+        db_manager.close()
 
 
 @backup.command()
 @click.option('--output', '-o', help='Save backup to file instead of restoring')
-def pull(output: Optional[str]):
+@click.option('--since', type=int, default=-1, help='Only pull blocks after this block_index')
+def pull(output: Optional[str], since: int):
     """Pull memories from a remote Greeum server to local
 
     Examples:
-        greeum backup pull                     # Restore directly
-        greeum backup pull -o remote.json      # Save to file only
+        greeum backup pull                          # Restore directly
+        greeum backup pull -o remote.ndjson.gz      # Save to file only
     """
-    import json as _json
+    import tempfile
 
     # 1. Resolve remote server
     click.echo("[1/3] Connecting to remote server...")
@@ -3061,63 +3072,45 @@ def pull(output: Optional[str]):
         return
     click.echo(f"      Server: {remote_url}")
 
-    # 2. Download
+    # 2. Download (streamed to a file or a spool, never held as one dict)
     click.echo("[2/3] Downloading...")
-    try:
-        from ..client.http_client import GreeumHTTPClient
-        client = GreeumHTTPClient(base_url=remote_url, api_key=api_key)
-        backup_data = client.backup_pull()
-        total = backup_data.get('metadata', {}).get('total_memories', 0)
-        click.echo(f"      {total} memories received")
-    except Exception as e:
-        click.echo(f"      [ERROR] Download failed: {e}")
-        return
+    from ..client.http_client import GreeumHTTPClient
+    client = GreeumHTTPClient(base_url=remote_url, api_key=api_key)
 
-    # Save to file only
     if output:
-        Path(output).write_text(
-            _json.dumps(backup_data, ensure_ascii=False, indent=2),
-            encoding='utf-8',
-        )
-        size_mb = Path(output).stat().st_size / (1024 * 1024)
-        click.echo(f"\n      Saved: {output} ({size_mb:.2f} MB)")
+        try:
+            with open(output, 'wb') as f:
+                written = client.backup_pull(f, since=since)
+        except Exception as e:
+            click.echo(f"      [ERROR] Download failed: {e}")
+            return
+        click.echo(f"\n      Saved: {output} ({written / (1024 * 1024):.2f} MB)")
         return
 
-    # 3. Restore locally
-    click.echo("[3/3] Restoring to local...")
-    try:
-        import tempfile
-        with tempfile.NamedTemporaryFile(
-            mode='w', suffix='.json', delete=False, encoding='utf-8'
-        ) as f:
-            _json.dump(backup_data, f, ensure_ascii=False, indent=2)
-            tmp_path = f.name
+    with tempfile.TemporaryFile() as spool:
+        try:
+            written = client.backup_pull(spool, since=since)
+            click.echo(f"      {written / (1024 * 1024):.2f} MB received")
+        except Exception as e:
+            click.echo(f"      [ERROR] Download failed: {e}")
+            return
 
+        # 3. Restore locally
+        click.echo("[3/3] Restoring to local...")
+        from ..core.backup_stream import restore_backup
         from ..core.database_manager import DatabaseManager
-        from ..core.backup_restore import MemoryRestoreEngine
 
         db_manager = DatabaseManager()
-        restore_engine = MemoryRestoreEngine(db_manager)
-
-        result = restore_engine.restore_from_backup(
-            backup_path=tmp_path,
-            merge=True,
-        )
-
-        Path(tmp_path).unlink(missing_ok=True)
-
-        if result.get('success'):
-            click.echo(f"\n      Pull complete!")
-            click.echo(f"      Restored: {result.get('restored_count', 0)}")
-            click.echo(f"      Skipped:  {result.get('skipped_count', 0)}")
-        else:
-            click.echo(f"      [ERROR] Restore failed: {result.get('error', 'unknown')}")
-    except Exception as e:
-        click.echo(f"      [ERROR] Restore failed: {e}")
-    finally:
-        db_manager.close()
-        if 'tmp_path' in dir():
-            Path(tmp_path).unlink(missing_ok=True)
+        try:
+            spool.seek(0)
+            result = restore_backup(db_manager, spool)
+            click.echo(f"\n      Pull complete! ({result['mode']})")
+            click.echo(f"      Restored: {result['restored']}")
+            click.echo(f"      Skipped:  {result['skipped']}")
+        except Exception as e:
+            click.echo(f"      [ERROR] Restore failed: {e}")
+        finally:
+            db_manager.close()
 
 
 def _resolve_remote_server():
@@ -3169,6 +3162,38 @@ def from_file(
     preview: bool
 ):
     """백업 파일로부터 메모리 복원"""
+    from ..core.backup_stream import read_backup, restore_backup
+
+    # v5.4: 스트리밍 백업(NDJSON)은 필터 없이 블록 단위로 일괄 복원
+    try:
+        with open(backup_file, 'rb') as f:
+            header, _ = read_backup(f)
+    except ValueError:
+        header = None
+    if header is not None:
+        # 스트리밍 복원은 항상 병합 - 명시적인 --replace는 무시하지 않고 거부
+        source = click.get_current_context().get_parameter_source('merge')
+        if not merge and source == click.core.ParameterSource.COMMANDLINE:
+            raise click.UsageError(
+                "--replace is not supported for streaming backups: they are always "
+                "merged into the existing memories (duplicates are skipped)."
+            )
+        click.echo(f"[>] 스트리밍 백업: {header['count']}개 블록 (since {header['since']})")
+        if preview and not click.confirm('복원을 진행하시겠습니까?'):
+            click.echo("복원이 취소되었습니다")
+            return
+        from ..core.database_manager import DatabaseManager
+        db_manager = DatabaseManager()
+        try:
+            with open(backup_file, 'rb') as f:
+                result = restore_backup(db_manager, f)
+            click.echo(f"[OK] 복원 완료 ({result['mode']}): {result['restored']}개 복원, {result['skipped']}개 건너뜀")
+        except Exception as e:
+            click.echo(f"[!] 복원 중 오류: {e}")
+        finally:
+            db_manager.close()
+        return
+
     try:
         from ..core.backup_restore import MemoryRestoreEngine, RestoreFilter
         # from ..core.hierarchical_memory import HierarchicalMemorySystem  # REMOVED
@@ -3686,32 +3711,5 @@ def stats(output_format: str):
         db_manager.close()
 
 
-# Import and register graph commands
-try:
-    from .graph import graph_group
-    main.commands.pop('graph', None)
-    main.add_command(graph_group, name='graph')
-except ImportError:
-    pass  # Graph CLI not available
-
-# Import and register metrics commands
-try:
-    from .metrics_cli import metrics_group
-    # Replace the empty metrics group with the real one
-    main.commands.pop('metrics', None)
-    main.add_command(metrics_group, name='metrics')
-except ImportError:
-    pass  # Metrics CLI not available
-
-# Import and register validate commands  
-try:
-    from .validate_cli import validate_group
-    # Replace the empty validate group with the real one
-    main.commands.pop('validate', None)
-    main.add_command(validate_group, name='validate')
-except ImportError:
-    pass  # Validate CLI not available
-
-
 if __name__ == '__main__':
     main()
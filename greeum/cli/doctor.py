@@ -23,6 +23,7 @@ import shutil
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from greeum.core.change_log import discard_index_snapshots
 from greeum.core.database_manager import DatabaseManager
 from greeum.embedding_models import init_sentence_transformer, embedding_registry
 import logging
@@ -274,6 +275,11 @@ class GreeumDoctor:
             elif issue_type == 'missing_dependency':
                 self._suggest_dependency_fix(data)
 
+        if fixes:
+            # 임베딩을 지우거나 다시 쓴 뒤에는 DB 옆의 검색 스냅샷이 낡음
+            for path in discard_index_snapshots(self.db_path):
+                print(f"  ✓ 검색 스냅샷 삭제: {Path(path).name}")
+
         return fixes
 
     def _fix_orphaned_embeddings(self, count: int) -> bool:
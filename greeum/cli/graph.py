@@ -141,6 +141,55 @@ def bootstrap_command(blocks: int, force: bool, threshold: float):
         console.print(f"[red]Error during bootstrap: {e}[/red]")
 
 
+@graph_group.command("index")
+@click.option("--page-size", default=1000, help="Blocks read per page")
+@click.option("--restart", is_flag=True, help="Ignore the checkpoint and rebuild from the first block")
+def index_command(page_size: int, restart: bool):
+    """Build the GraphIndex from block links (paged, resumable)"""
+    try:
+        from ..core import DatabaseManager
+        from ..core.graph_index_bootstrap import GraphIndexBootstrap
+        from ..graph.index import GraphIndex
+
+        db_manager = DatabaseManager()
+        bootstrap = GraphIndexBootstrap(db_manager, GraphIndex(), page_size=page_size)
+
+        def report(progress: Dict[str, Any]) -> None:
+            total = progress['total'] or 0
+            console.print(
+                f"[dim]page {progress['pages']}: {progress['processed']}/{total} blocks "
+                f"(last block #{progress['last_block_index']})[/dim]"
+            )
+
+        console.print("[blue]Building GraphIndex from block links...[/blue]")
+        progress = bootstrap.run(resume=not restart, progress_callback=report)
+
+        stats = bootstrap.graph_index.get_stats()
+        table = Table(title="GraphIndex Bootstrap", show_header=True)
+        table.add_column("Metric", style="cyan")
+        table.add_column("Value", style="green")
+
+        table.add_row("State", progress['state'])
+        resumed = progress['resumed_from']
+        table.add_row("Resumed From", f"#{resumed}" if resumed is not None else "start")
+        table.add_row("Blocks Scanned", str(progress['processed']))
+        table.add_row("Pages", str(progress['pages']))
+        table.add_row("Nodes", str(stats['node_count']))
+        table.add_row("Edges", str(stats['edge_count']))
+        if bootstrap.snapshot_path:
+            table.add_row("Snapshot", str(bootstrap.snapshot_path))
+
+        console.print(table)
+
+        if progress['state'] == 'done':
+            console.print("[green]✅ GraphIndex is ready[/green]")
+        else:
+            console.print(f"[red]Bootstrap failed: {progress['error']}[/red]")
+
+    except Exception as e:
+        console.print(f"[red]Error during index build: {e}[/red]")
+
+
 @graph_group.command("snapshot")
 @click.option("--output", "-o", required=True, help="Output file path")
 @click.option("--format", type=click.Choice(['json', 'graphml']), default='json')
@@ -7,7 +7,7 @@ API 서버와 통신하는 저수준 HTTP 클라이언트입니다.
 
 import logging
 import time
-from typing import Any, Dict, Optional
+from typing import Any, BinaryIO, Dict, Iterable, Optional, Union
 from urllib.parse import urljoin
 
 import requests
@@ -178,13 +178,18 @@ class GreeumHTTPClient:
             logger.error(f"Failed to get stats: {e}")
             raise ConnectionError(f"API request failed: {e}") from e
 
-    def backup_push(self, backup_data: Dict[str, Any], merge: bool = True) -> Dict[str, Any]:
-        """로컬 백업 데이터를 원격 서버에 업로드"""
-        payload = {**backup_data, "merge": merge}
+    def backup_push(self, backup: Union[BinaryIO, Iterable[bytes]]) -> Dict[str, Any]:
+        """
+        v5.4: 스트리밍 백업(NDJSON, greeum.core.backup_stream)을 원격 서버에 업로드
+
+        Args:
+            backup: 백업 파일 객체 또는 바이트 청크 iterable (본문을 메모리에 올리지 않고 전송)
+        """
         try:
             response = self._get_session().post(
-                self._make_url("/backup/upload"),
-                json=payload,
+                self._make_url("/backup/stream"),
+                data=backup,
+                headers={"Content-Type": "application/octet-stream"},
                 timeout=(15, 300),  # 대량 업로드는 5분까지
             )
             response.raise_for_status()
@@ -193,15 +198,30 @@ class GreeumHTTPClient:
             logger.error(f"Backup push failed: {e}")
             raise ConnectionError(f"Backup push failed: {e}") from e
 
-    def backup_pull(self) -> Dict[str, Any]:
-        """원격 서버에서 백업 데이터 다운로드"""
+    def backup_pull(self, output: BinaryIO, since: int = -1, compression: str = "gzip") -> int:
+        """
+        v5.4: 원격 서버의 스트리밍 백업을 ``output``에 기록
+
+        Args:
+            since: 이 block_index 이후 블록만 받기 (증분 백업)
+
+        Returns:
+            기록한 바이트 수
+        """
         try:
             response = self._get_session().get(
-                self._make_url("/backup/export"),
-                timeout=(15, 300),  # 대량 다운로드는 5분까지
+                self._make_url("/backup/stream"),
+                params={"since": since, "compression": compression},
+                stream=True,
+                timeout=(15, 300),  # 청크 간 대기 최대 5분
             )
             response.raise_for_status()
-            return response.json()
+            written = 0
+            with response:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    output.write(chunk)
+                    written += len(chunk)
+            return written
         except requests.RequestException as e:
             logger.error(f"Backup pull failed: {e}")
             raise ConnectionError(f"Backup pull failed: {e}") from e
@@ -1,10 +1,17 @@
-"""Candidate pair selection using cosine similarity matrix."""
+"""Candidate pair selection using cosine similarity matrix.
+
+Similarities are computed ``block_size`` rows at a time (``block_size x N``
+float32 scores at peak instead of the full ``N x N`` matrix); each row keeps
+only its top ``max_pairs`` partners via ``argpartition`` and the threshold /
+exclusion checks are array operations. ``EmbeddingMatrix`` keeps the
+normalized embeddings between daemon iterations and only loads new blocks.
+"""
 
 from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import numpy as np
 
@@ -13,6 +20,8 @@ from .state import StateManager
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BLOCK_SIZE = 512
+
 
 @dataclass
 class CandidatePair:
@@ -22,76 +31,288 @@ class CandidatePair:
     cosine_similarity: float
 
 
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms = np.where(norms == 0, 1.0, norms)
+    return (embeddings / norms).astype(np.float32, copy=False)
+
+
+class EmbeddingMatrix:
+    """L2-normalized embeddings grouped by dimension, cached across calls.
+
+    ``groups[dim]`` is ``(block_indices, normalized)`` with block indices in
+    ascending order. ``refresh`` compares ``db.get_embedding_signature()``
+    with the last load: nothing is read when it is unchanged; rows re-embedded
+    in place (per the change log) and newer blocks are read when that
+    accounts for the difference, and everything is reloaded otherwise.
+    """
+
+    def __init__(self) -> None:
+        self.groups: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self.signature: Optional[Tuple] = None
+        self.stats = {"full_loads": 0, "incremental_loads": 0, "cache_hits": 0}
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids, _ in self.groups.values())
+
+    def refresh(self, db: ConsolidatorDB) -> None:
+        signature = db.get_embedding_signature()
+        if signature == self.signature:
+            self.stats["cache_hits"] += 1
+            return
+
+        previous = self.signature
+        if (
+            previous is not None
+            and previous[1] is not None
+            and signature[2] == previous[2]
+            and self._reload_changed(db, previous[3], signature[3], previous[1])
+        ):
+            added = db.get_embeddings_after(previous[1])
+            if len(self) + len(added) == signature[0]:
+                self._extend(added)
+                self.signature = signature
+                self.stats["incremental_loads"] += 1
+                return
+
+        self.groups = {}
+        self._extend(db.get_all_embeddings())
+        self.signature = signature
+        self.stats["full_loads"] += 1
+
+    def invalidate(self) -> None:
+        self.groups = {}
+        self.signature = None
+
+    def _reload_changed(self, db: ConsolidatorDB, since: Optional[int], until: Optional[int],
+                        max_loaded: int) -> bool:
+        """Re-read loaded rows re-embedded in ``(since, until]``; False if a full reload is needed."""
+        if since == until:
+            return True
+        if since is None or until is None or until < since:
+            return False
+        changed = [idx for idx in db.get_changed_embedding_blocks(since, until) if idx <= max_loaded]
+        if not changed:
+            return True
+        rows = db.get_embeddings_for(changed)
+        if len(rows) != len(changed):
+            return False  # deleted rows
+        for idx, emb in rows:
+            group = self.groups.get(emb.shape[0])
+            if group is None:
+                return False
+            ids, normalized = group
+            position = int(np.searchsorted(ids, idx))
+            if position >= len(ids) or ids[position] != idx:
+                return False  # dimension changed (model swap)
+            normalized[position] = _normalize(emb[None, :])[0]
+        return True
+
+    def _extend(self, rows: List[Tuple[int, np.ndarray]]) -> None:
+        by_dim: Dict[int, List[Tuple[int, np.ndarray]]] = {}
+        for idx, emb in rows:
+            by_dim.setdefault(emb.shape[0], []).append((idx, emb))
+
+        for dim, group in by_dim.items():
+            ids = np.array([idx for idx, _ in group], dtype=np.int64)
+            normalized = _normalize(np.stack([emb for _, emb in group]))
+            if dim in self.groups:
+                old_ids, old_normalized = self.groups[dim]
+                ids = np.concatenate([old_ids, ids])
+                normalized = np.concatenate([old_normalized, normalized])
+            self.groups[dim] = (ids, normalized)
+
+
+def _exclusion_positions(ids: np.ndarray, exclude_set: Set[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions in ``ids`` of excluded pairs whose blocks are both present."""
+    if not exclude_set or len(ids) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    pairs = np.array(list(exclude_set), dtype=np.int64).reshape(-1, 2)
+    pa = np.minimum(np.searchsorted(ids, pairs[:, 0]), len(ids) - 1)
+    pb = np.minimum(np.searchsorted(ids, pairs[:, 1]), len(ids) - 1)
+    present = (ids[pa] == pairs[:, 0]) & (ids[pb] == pairs[:, 1])
+    return pa[present], pb[present]
+
+
+def _top_pairs(
+    ids: np.ndarray,
+    normalized: np.ndarray,
+    min_cosine_similarity: float,
+    k: int,
+    exclude: Tuple[np.ndarray, np.ndarray],
+    rows: Optional[np.ndarray] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Best ``k`` pairs ``(a, b, sim)`` with ``a < b``, plus the count above threshold.
+
+    With ``rows`` unset every pair of the group is considered once (upper
+    triangle); otherwise only pairs that involve one of ``rows``.
+    """
+    n = len(ids)
+    row_positions = np.arange(n) if rows is None else np.asarray(rows, dtype=np.int64)
+    excl_a, excl_b = exclude
+    local = np.full(n, -1, dtype=np.int64)
+    columns = np.arange(n)
+
+    best_a = np.empty(0, dtype=np.int64)
+    best_b = np.empty(0, dtype=np.int64)
+    best_s = np.empty(0, dtype=np.float32)
+    above = 0
+
+    step = max(1, block_size)
+    for start in range(0, len(row_positions), step):
+        block = row_positions[start:start + step]
+        # The upper triangle only needs columns from the block's first row on
+        col0 = int(block[0]) if rows is None else 0
+        sims = normalized[block] @ normalized[col0:].T  # (len(block), n - col0)
+
+        if rows is None:
+            sims[columns[None, :n - col0] <= (block - col0)[:, None]] = -np.inf
+        else:
+            sims[np.arange(len(block)), block] = -np.inf
+        np.copyto(sims, -np.inf, where=sims < min_cosine_similarity)
+
+        local[block] = np.arange(len(block))
+        for pa, pb in ((excl_a, excl_b), (excl_b, excl_a)):
+            r = local[pa]
+            hit = (r >= 0) & (pb >= col0)
+            sims[r[hit], pb[hit] - col0] = -np.inf
+        local[block] = -1
+
+        above += int(np.isfinite(sims).sum())
+        kk = min(k, sims.shape[1])
+        top = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+        values = np.take_along_axis(sims, top, axis=1)
+        keep = np.isfinite(values)
+        if not keep.any():
+            continue
+
+        src = ids[np.broadcast_to(block[:, None], top.shape)[keep]]
+        dst = ids[top[keep] + col0]
+        best_a = np.concatenate([best_a, np.minimum(src, dst)])
+        best_b = np.concatenate([best_b, np.maximum(src, dst)])
+        best_s = np.concatenate([best_s, values[keep].astype(np.float32)])
+
+        if rows is not None:
+            # A pair between two selected rows shows up once per row
+            _, first = np.unique(np.stack([best_a, best_b], axis=1), axis=0, return_index=True)
+            best_a, best_b, best_s = best_a[first], best_b[first], best_s[first]
+        if len(best_s) > k:
+            cut = np.argpartition(-best_s, k - 1)[:k]
+            best_a, best_b, best_s = best_a[cut], best_b[cut], best_s[cut]
+
+    return best_a, best_b, best_s, above
+
+
+def _collect(
+    matrix: EmbeddingMatrix,
+    exclude_set: Set[Tuple[int, int]],
+    min_cosine_similarity: float,
+    max_pairs: int,
+    block_size: int,
+    pending: Optional[Iterable[int]] = None,
+) -> Tuple[List[CandidatePair], int]:
+    if max_pairs <= 0:
+        return [], 0
+    pending_ids = None if pending is None else np.array(sorted(set(pending)), dtype=np.int64)
+
+    parts = []
+    above = 0
+    for dim, (ids, normalized) in matrix.groups.items():
+        if len(ids) < 2:
+            continue
+        rows = None
+        if pending_ids is not None:
+            rows = np.flatnonzero(np.isin(ids, pending_ids))
+            if len(rows) == 0:
+                continue
+        a, b, s, n_above = _top_pairs(
+            ids, normalized, min_cosine_similarity, max_pairs,
+            _exclusion_positions(ids, exclude_set), rows=rows, block_size=block_size,
+        )
+        parts.append((a, b, s))
+        above += n_above
+
+    if not parts:
+        return [], above
+
+    a = np.concatenate([p[0] for p in parts])
+    b = np.concatenate([p[1] for p in parts])
+    s = np.concatenate([p[2] for p in parts])
+    # Similarity descending, then (a, b) ascending
+    order = np.lexsort((b, a, -s))[:max_pairs]
+    candidates = [
+        CandidatePair(block_a=int(a[i]), block_b=int(b[i]), cosine_similarity=float(s[i]))
+        for i in order
+    ]
+    return candidates, above
+
+
+def _exclude_set(db: ConsolidatorDB, state: StateManager) -> Set[Tuple[int, int]]:
+    compared_set = state.load_compared_set()
+    connected_set = db.get_existing_association_pairs()
+    exclude_set = compared_set | connected_set
+    logger.info("Excluding %d compared + %d connected = %d pairs",
+                len(compared_set), len(connected_set), len(exclude_set))
+    return exclude_set
+
+
 def select_candidates(
     db: ConsolidatorDB,
     state: StateManager,
     min_cosine_similarity: float = 0.3,
     max_pairs: int = 50,
+    matrix: Optional[EmbeddingMatrix] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
 ) -> List[CandidatePair]:
     """Select candidate pairs for judicial deliberation.
 
     Algorithm:
-    1. Load all embeddings → (N, dim) matrix
-    2. L2-normalize → cosine similarity via dot product
+    1. Load all embeddings → normalized (N, dim) matrix per dimension
+       (reused from ``matrix`` when given)
+    2. Score ``block_size`` rows at a time (cosine via dot product)
     3. Exclude already-compared pairs (from consolidation_state)
     4. Exclude already-connected pairs (from associations)
-    5. Filter by min_cosine_similarity
+    5. Filter by min_cosine_similarity, keep top max_pairs per row
     6. Sort descending, return top max_pairs
     """
     # 1. Load embeddings
-    raw = db.get_all_embeddings()
-    if len(raw) < 2:
-        logger.info("Not enough blocks for comparison (%d)", len(raw))
+    matrix = matrix if matrix is not None else EmbeddingMatrix()
+    matrix.refresh(db)
+    if len(matrix) < 2:
+        logger.info("Not enough blocks for comparison (%d)", len(matrix))
         return []
 
-    # Group by embedding dimension (DB may contain mixed models)
-    by_dim: Dict[int, List[Tuple[int, np.ndarray]]] = {}
-    for idx, emb in raw:
-        by_dim.setdefault(emb.shape[0], []).append((idx, emb))
-
-    for dim, group in by_dim.items():
-        logger.info("Embedding group dim=%d: %d blocks", dim, len(group))
-
-    # 3. Load exclusion sets (shared across all dim groups)
-    compared_set = state.load_compared_set()
-    connected_set = db.get_existing_association_pairs()
-    exclude_set = compared_set | connected_set
-    logger.info("Excluding %d compared + %d connected = %d pairs",
-                len(compared_set), len(connected_set), len(exclude_set))
-
-    # 4. Collect candidate pairs per dimension group
-    candidates: List[CandidatePair] = []
-    for dim, group in by_dim.items():
-        if len(group) < 2:
-            continue
-
-        block_indices = [idx for idx, _ in group]
-        embeddings = np.stack([emb for _, emb in group])  # (N, dim)
+    for dim, (ids, _) in matrix.groups.items():
+        logger.info("Embedding group dim=%d: %d blocks", dim, len(ids))
 
-        # 2. L2-normalize and compute cosine similarity matrix
-        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-        norms = np.where(norms == 0, 1.0, norms)
-        normalized = embeddings / norms
-        sim_matrix = normalized @ normalized.T
+    # 3-4. Load exclusion sets (shared across all dim groups)
+    exclude_set = _exclude_set(db, state)
 
-        n = len(block_indices)
-        for i in range(n):
-            for j in range(i + 1, n):
-                sim = float(sim_matrix[i, j])
-                if sim < min_cosine_similarity:
-                    continue
+    # 2, 5-6. Blocked top-k per dimension group
+    result, above = _collect(matrix, exclude_set, min_cosine_similarity, max_pairs, block_size)
 
-                a, b = block_indices[i], block_indices[j]
-                pair_key = (min(a, b), max(a, b))
-                if pair_key in exclude_set:
-                    continue
+    logger.info("Selected %d candidate pairs (from %d above threshold %.2f)",
+                len(result), above, min_cosine_similarity)
+    return result
 
-                candidates.append(CandidatePair(block_a=pair_key[0], block_b=pair_key[1], cosine_similarity=sim))
 
-    # 5. Sort by similarity descending, take top max_pairs
-    candidates.sort(key=lambda c: c.cosine_similarity, reverse=True)
-    result = candidates[:max_pairs]
+def select_queue_candidates(
+    db: ConsolidatorDB,
+    state: StateManager,
+    pending: List[int],
+    min_cosine_similarity: float = 0.3,
+    max_pairs: int = 50,
+    matrix: Optional[EmbeddingMatrix] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> List[CandidatePair]:
+    """Select the best pairs that involve at least one of the ``pending`` blocks."""
+    matrix = matrix if matrix is not None else EmbeddingMatrix()
+    matrix.refresh(db)
+    if len(matrix) < 2:
+        return []
 
-    logger.info("Selected %d candidate pairs (from %d above threshold %.2f)",
-                len(result), len(candidates), min_cosine_similarity)
+    exclude_set = _exclude_set(db, state)
+    result, _ = _collect(matrix, exclude_set, min_cosine_similarity, max_pairs, block_size, pending=pending)
     return result
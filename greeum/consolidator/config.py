@@ -20,6 +20,9 @@ class ConsolidatorConfig:
     batch_size: int = 20
     daemon_interval: int = 60
     max_neighbors: int = 5
+    similarity_block_size: int = 512
+    concurrency: int = 4
+    write_batch_size: int = 10
     ollama_gpu: str = "0"
     embedding_device: str = "cuda:1"
 
@@ -37,6 +40,9 @@ class ConsolidatorConfig:
             batch_size=int(os.getenv("GREEUM_CONSOLIDATOR_BATCH_SIZE", "20")),
             daemon_interval=int(os.getenv("GREEUM_CONSOLIDATOR_INTERVAL", "60")),
             max_neighbors=int(os.getenv("GREEUM_CONSOLIDATOR_MAX_NEIGHBORS", "5")),
+            similarity_block_size=int(os.getenv("GREEUM_CONSOLIDATOR_BLOCK_SIZE", "512")),
+            concurrency=int(os.getenv("GREEUM_CONSOLIDATOR_CONCURRENCY", "4")),
+            write_batch_size=int(os.getenv("GREEUM_CONSOLIDATOR_WRITE_BATCH", "10")),
             ollama_gpu=os.getenv("GREEUM_CONSOLIDATOR_GPU", "0"),
             embedding_device=os.getenv("GREEUM_CONSOLIDATOR_EMBEDDING_DEVICE", "cuda:1"),
         )
@@ -11,10 +11,12 @@ import logging
 import sqlite3
 import time
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import numpy as np
 
+from ..core.change_log import KIND_EMBEDDING, changed_blocks, chunked, current_change_seq
+
 logger = logging.getLogger(__name__)
 
 _MAX_RETRIES = 5
@@ -28,6 +30,7 @@ class ConsolidatorDB:
         self.db_path = db_path
         self.busy_timeout_ms = busy_timeout_ms
         self._conn: Optional[sqlite3.Connection] = None
+        self._tx_depth = 0
 
     # ------------------------------------------------------------------
     # Connection management
@@ -60,21 +63,49 @@ class ConsolidatorDB:
 
     @contextmanager
     def _write_tx(self):
-        """BEGIN IMMEDIATE transaction with exponential backoff on lock."""
+        """BEGIN IMMEDIATE transaction with exponential backoff on lock.
+
+        Nested calls run inside the outer transaction as a SAVEPOINT, so a
+        failing inner write is rolled back without losing the rest of a batch.
+        """
+        if self._tx_depth:
+            name = f"w{self._tx_depth}"
+            self.conn.execute(f"SAVEPOINT {name}")
+            self._tx_depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute(f"ROLLBACK TO {name}")
+                self.conn.execute(f"RELEASE {name}")
+                raise
+            else:
+                self.conn.execute(f"RELEASE {name}")
+            finally:
+                self._tx_depth -= 1
+            return
+
         for attempt in range(_MAX_RETRIES):
             try:
                 self.conn.execute("BEGIN IMMEDIATE")
-                yield self.conn
-                self.conn.commit()
-                return
             except sqlite3.OperationalError as exc:
-                self.conn.rollback()
                 if "locked" in str(exc).lower() and attempt < _MAX_RETRIES - 1:
                     wait = _BACKOFF_BASE * (2 ** attempt)
                     logger.warning("DB locked (attempt %d/%d), retrying in %.1fs", attempt + 1, _MAX_RETRIES, wait)
                     time.sleep(wait)
-                else:
-                    raise
+                    continue
+                raise
+
+            self._tx_depth = 1
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.rollback()
+                raise
+            else:
+                self.conn.commit()
+            finally:
+                self._tx_depth = 0
+            return
 
     def _execute_write(self, sql: str, params: tuple = ()) -> Optional[int]:
         """Execute a single write statement with retry."""
@@ -95,6 +126,49 @@ class ConsolidatorDB:
             results.append((row["block_index"], arr))
         return results
 
+    def get_embeddings_after(self, block_index: int) -> List[Tuple[int, np.ndarray]]:
+        """Load embeddings of blocks newer than ``block_index``."""
+        cur = self.conn.execute(
+            "SELECT block_index, embedding FROM block_embeddings WHERE block_index > ? ORDER BY block_index",
+            (block_index,),
+        )
+        return [
+            (row["block_index"], np.frombuffer(row["embedding"], dtype=np.float32).copy())
+            for row in cur.fetchall()
+        ]
+
+    def get_embeddings_for(self, block_indices: Iterable[int]) -> List[Tuple[int, np.ndarray]]:
+        """Load embeddings of the given blocks (missing rows are skipped)."""
+        results = []
+        for chunk in chunked(block_indices):
+            cur = self.conn.execute(
+                "SELECT block_index, embedding FROM block_embeddings "
+                f"WHERE block_index IN ({','.join('?' * len(chunk))}) ORDER BY block_index",
+                chunk,
+            )
+            results.extend(
+                (row["block_index"], np.frombuffer(row["embedding"], dtype=np.float32).copy())
+                for row in cur.fetchall()
+            )
+        return results
+
+    def get_embedding_signature(self) -> Tuple[int, Optional[int], Optional[str], Optional[int]]:
+        """Cheap change marker for block_embeddings: (count, max block_index, models, change seq).
+
+        The change log sequence (``None`` without a ``store_change_log``) is
+        what reveals in-place re-embeds; the other fields only move on
+        inserts and deletes.
+        """
+        change_seq = current_change_seq(self.conn)
+        row = self.conn.execute(
+            "SELECT COUNT(*), MAX(block_index), GROUP_CONCAT(DISTINCT embedding_model) FROM block_embeddings"
+        ).fetchone()
+        return row[0], row[1], row[2], change_seq
+
+    def get_changed_embedding_blocks(self, since: int, until: int) -> Set[int]:
+        """Blocks whose embedding row changed in ``(since, until]`` of the change log."""
+        return changed_blocks(self.conn, since, until, (KIND_EMBEDDING,))
+
     def get_block_content(self, block_index: int) -> Optional[Dict[str, Any]]:
         """Retrieve block content, keywords, tags, and metadata."""
         cur = self.conn.execute(
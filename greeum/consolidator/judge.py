@@ -36,19 +36,32 @@ class ConsolidationJudge:
 
     def deliberate(self, pair: CandidatePair) -> Verdict:
         """Run judicial deliberation for a candidate pair."""
+        user_prompt = self.build_prompt(pair)
+        if user_prompt is None:
+            return self.missing_context(pair)
+        return self.ask(user_prompt)
+
+    def build_prompt(self, pair: CandidatePair) -> Optional[str]:
+        """Gather both contexts (DB reads) and build the user prompt; None if a block is missing."""
         ctx_a = self.gatherer.gather(pair.block_a)
         ctx_b = self.gatherer.gather(pair.block_b)
 
         if not ctx_a or not ctx_b:
-            return Verdict(
-                connect=False,
-                reasoning=f"Could not load context for blocks #{pair.block_a} and/or #{pair.block_b}",
-            )
+            return None
+        return build_deliberation_prompt(ctx_a, ctx_b, pair.cosine_similarity)
 
-        user_prompt = build_deliberation_prompt(ctx_a, ctx_b, pair.cosine_similarity)
+    def ask(self, user_prompt: str) -> Verdict:
+        """LLM call + verdict parsing only (safe to run off the DB thread)."""
         llm_resp = self.llm.chat(SYSTEM_PROMPT, user_prompt)
         return self._parse_verdict(llm_resp)
 
+    @staticmethod
+    def missing_context(pair: CandidatePair) -> Verdict:
+        return Verdict(
+            connect=False,
+            reasoning=f"Could not load context for blocks #{pair.block_a} and/or #{pair.block_b}",
+        )
+
     @staticmethod
     def _parse_verdict(llm_resp: LLMResponse) -> Verdict:
         """Parse structured verdict from LLM response text."""
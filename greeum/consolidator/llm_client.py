@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -23,22 +24,35 @@ class LLMResponse:
 
 
 class OllamaClient:
-    """Client for Ollama's OpenAI-compatible API."""
+    """Client for Ollama's OpenAI-compatible API.
+
+    Requests share one ``requests.Session`` whose connection pool holds
+    ``max_connections`` keep-alive connections, so ``chat`` may be called
+    from that many threads at once without reconnecting.
+    """
 
     def __init__(
         self,
         base_url: str = "http://localhost:11434",
         model: str = "qwen2.5:7b",
         timeout: float = 60.0,
+        max_connections: int = 4,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, max_connections))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
 
     def is_available(self) -> bool:
         """Check if Ollama server is reachable."""
         try:
-            resp = requests.get(self.base_url, timeout=5)
+            resp = self.session.get(self.base_url, timeout=5)
             return resp.status_code == 200
         except requests.RequestException:
             return False
@@ -60,7 +74,7 @@ class OllamaClient:
         }
 
         start = time.monotonic()
-        resp = requests.post(
+        resp = self.session.post(
             f"{self.base_url}/v1/chat/completions",
             json=payload,
             timeout=self.timeout,
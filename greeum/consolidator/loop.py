@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import logging
+import math
 import signal
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from .candidates import CandidatePair, select_candidates
+from .candidates import CandidatePair, EmbeddingMatrix, select_candidates, select_queue_candidates
 from .config import ConsolidatorConfig
 from .context_gatherer import ContextGatherer
 from .db import ConsolidatorDB
@@ -20,6 +22,18 @@ from .writer import AssociationWriter
 
 logger = logging.getLogger(__name__)
 
+# (pair, verdict, LLM error) waiting to be written
+_Outcome = Tuple[CandidatePair, Optional[Verdict], Optional[Exception]]
+
+
+def _percentile(values: List[int], q: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered), max(1, math.ceil(q / 100.0 * len(ordered))))
+    return float(ordered[rank - 1])
+
 
 @dataclass
 class ConsolidationReport:
@@ -31,12 +45,19 @@ class ConsolidationReport:
     deferred: int = 0
     errors: int = 0
     total_latency_ms: int = 0
+    wall_time_ms: int = 0
     verdicts: List[dict] = field(default_factory=list)
+    latencies_ms: List[int] = field(default_factory=list)
+    # One entry per write batch: pairs, p50/p95/max LLM latency, write time
+    batches: List[dict] = field(default_factory=list)
 
     @property
     def avg_latency_ms(self) -> float:
         return self.total_latency_ms / self.processed if self.processed else 0.0
 
+    def latency_percentile(self, q: float) -> float:
+        return _percentile(self.latencies_ms, q)
+
     def summary(self) -> str:
         lines = [
             f"Consolidation Report:",
@@ -47,6 +68,8 @@ class ConsolidationReport:
             f"  Deferred:   {self.deferred}",
             f"  Errors:     {self.errors}",
             f"  Avg latency: {self.avg_latency_ms:.0f}ms",
+            f"  Latency p50/p95: {self.latency_percentile(50):.0f}ms / {self.latency_percentile(95):.0f}ms",
+            f"  Wall time:  {self.wall_time_ms}ms ({len(self.batches)} write batches)",
         ]
         return "\n".join(lines)
 
@@ -59,9 +82,12 @@ class ConsolidationLoop:
         self.db = ConsolidatorDB(config.db_path, config.busy_timeout_ms)
         self.state = StateManager(self.db)
         self.gatherer = ContextGatherer(self.db, config.max_neighbors)
-        self.llm = OllamaClient(config.ollama_url, config.model, config.llm_timeout)
+        self.llm = OllamaClient(config.ollama_url, config.model, config.llm_timeout,
+                                max_connections=config.concurrency)
         self.judge = ConsolidationJudge(self.gatherer, self.llm)
         self.writer = AssociationWriter(self.db)
+        # Normalized embeddings reused across daemon iterations
+        self.embeddings = EmbeddingMatrix()
         self._shutdown = False
 
     def _drain_queue(self, max_pairs: int) -> List[CandidatePair]:
@@ -102,44 +128,16 @@ class ConsolidationLoop:
 
         logger.info("Queue has %d pending blocks for incremental consolidation", len(pending))
 
-        # Load all embeddings and find similar pairs for the pending blocks
-        import numpy as np
-        raw = self.db.get_all_embeddings()
-        if len(raw) < 2:
-            self._mark_queue_done(pending)
-            return []
-
-        idx_to_pos = {idx: i for i, (idx, _) in enumerate(raw)}
-        block_indices = [idx for idx, _ in raw]
-        embeddings = np.stack([emb for _, emb in raw])
-        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-        norms = np.where(norms == 0, 1.0, norms)
-        normalized = embeddings / norms
-
-        compared_set = self.state.load_compared_set()
-        connected_set = self.db.get_existing_association_pairs()
-        exclude_set = compared_set | connected_set
-
-        candidates: List[CandidatePair] = []
-        for bi in pending:
-            if bi not in idx_to_pos:
-                continue
-            pos = idx_to_pos[bi]
-            sims = normalized[pos] @ normalized.T
-            for j in range(len(block_indices)):
-                if j == pos:
-                    continue
-                sim = float(sims[j])
-                if sim < self.config.min_cosine_similarity:
-                    continue
-                a, b = min(bi, block_indices[j]), max(bi, block_indices[j])
-                if (a, b) in exclude_set:
-                    continue
-                candidates.append(CandidatePair(block_a=a, block_b=b, cosine_similarity=sim))
-                exclude_set.add((a, b))
-
-        candidates.sort(key=lambda c: c.cosine_similarity, reverse=True)
-        result = candidates[:max_pairs]
+        # Find similar pairs for the pending blocks (cached embedding matrix)
+        result = select_queue_candidates(
+            self.db,
+            self.state,
+            pending,
+            min_cosine_similarity=self.config.min_cosine_similarity,
+            max_pairs=max_pairs,
+            matrix=self.embeddings,
+            block_size=self.config.similarity_block_size,
+        )
         logger.info("Queue-based selection: %d pairs from %d pending blocks", len(result), len(pending))
 
         self._mark_queue_done(pending)
@@ -183,6 +181,8 @@ class ConsolidationLoop:
                 self.state,
                 min_cosine_similarity=self.config.min_cosine_similarity,
                 max_pairs=effective_max,
+                matrix=self.embeddings,
+                block_size=self.config.similarity_block_size,
             )
         report.total_candidates = len(candidates)
 
@@ -190,51 +190,128 @@ class ConsolidationLoop:
             logger.info("No candidate pairs to process")
             return report
 
-        logger.info("Processing %d candidate pairs", len(candidates))
+        logger.info("Processing %d candidate pairs (concurrency=%d)", len(candidates), self.config.concurrency)
 
-        # 3. Process each pair
-        for i, pair in enumerate(candidates):
-            if self._shutdown:
-                logger.info("Shutdown requested, stopping after %d pairs", i)
-                break
-
-            result = self._process_pair(pair, report)
-            logger.info(
-                "[%d/%d] Block #%d <-> #%d: %s",
-                i + 1, len(candidates),
-                pair.block_a, pair.block_b,
-                result,
-            )
+        # 3. Deliberate concurrently, write verdicts in batches
+        started = time.monotonic()
+        self._deliberate(candidates, report)
+        report.wall_time_ms = int((time.monotonic() - started) * 1000)
 
         logger.info(report.summary())
         return report
 
-    def _process_pair(self, pair: CandidatePair, report: ConsolidationReport) -> str:
-        """Process a single candidate pair. Returns verdict string."""
+    def _deliberate(self, candidates: List[CandidatePair], report: ConsolidationReport) -> None:
+        """Bounded-concurrency deliberation.
+
+        Context gathering and all writes stay on this thread (the sqlite
+        connection is not shared); worker threads only make LLM calls. At most
+        ``2 * concurrency`` prompts are in flight, so contexts are gathered
+        just ahead of the LLM, and finished pairs are written every
+        ``write_batch_size`` results in one transaction.
+        """
+        concurrency = max(1, self.config.concurrency)
+        max_in_flight = 2 * concurrency
+        batch_size = max(1, self.config.write_batch_size)
+
+        pending = iter(candidates)
+        exhausted = False
+        in_flight: Dict[Future, CandidatePair] = {}
+        outcomes: List[_Outcome] = []
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="greeum-judge") as pool:
+            while True:
+                while not exhausted and not self._shutdown and len(in_flight) < max_in_flight:
+                    pair = next(pending, None)
+                    if pair is None:
+                        exhausted = True
+                        break
+                    try:
+                        user_prompt = self.judge.build_prompt(pair)
+                    except Exception as exc:
+                        outcomes.append((pair, None, exc))
+                        continue
+                    if user_prompt is None:
+                        outcomes.append((pair, self.judge.missing_context(pair), None))
+                        continue
+                    in_flight[pool.submit(self.judge.ask, user_prompt)] = pair
+
+                if self._shutdown and not exhausted:
+                    logger.info("Shutdown requested, finishing %d in-flight pairs", len(in_flight))
+                    exhausted = True
+
+                if in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pair = in_flight.pop(future)
+                        try:
+                            outcomes.append((pair, future.result(), None))
+                        except Exception as exc:
+                            outcomes.append((pair, None, exc))
+
+                if len(outcomes) >= batch_size or (not in_flight and outcomes):
+                    self._write_batch(outcomes, report, len(candidates))
+                    outcomes = []
+                if not in_flight and exhausted:
+                    break
+
+    def _write_batch(self, outcomes: List[_Outcome], report: ConsolidationReport, total: int) -> None:
+        """Write associations and consolidation_state rows for one batch in a single transaction."""
+        started = time.monotonic()
+        records: List[ComparisonRecord] = []
+        latencies: List[int] = []
+
+        with self.db._write_tx():
+            for pair, verdict, error in outcomes:
+                verdict_str, record = self._apply_outcome(pair, verdict, error, report)
+                records.append(record)
+                if record.latency_ms is not None:
+                    latencies.append(record.latency_ms)
+                logger.info(
+                    "[%d/%d] Block #%d <-> #%d: %s",
+                    report.processed, total,
+                    pair.block_a, pair.block_b,
+                    verdict_str,
+                )
+            self.state.record_comparisons(records)
+
+        report.latencies_ms.extend(latencies)
+        report.batches.append({
+            "pairs": len(outcomes),
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "max_ms": max(latencies) if latencies else 0,
+            "write_ms": int((time.monotonic() - started) * 1000),
+        })
+
+    def _apply_outcome(
+        self,
+        pair: CandidatePair,
+        verdict: Optional[Verdict],
+        error: Optional[Exception],
+        report: ConsolidationReport,
+    ) -> Tuple[str, ComparisonRecord]:
+        """Write the association for one judged pair; returns its verdict string and state row."""
         now = datetime.now().isoformat()
 
-        try:
-            verdict = self.judge.deliberate(pair)
-        except Exception as exc:
-            logger.warning("LLM error for #%d <-> #%d: %s", pair.block_a, pair.block_b, exc)
-            self.state.record_comparison(ComparisonRecord(
+        if verdict is None:
+            logger.warning("LLM error for #%d <-> #%d: %s", pair.block_a, pair.block_b, error)
+            report.deferred += 1
+            report.processed += 1
+            return "deferred (error)", ComparisonRecord(
                 block_a=min(pair.block_a, pair.block_b),
                 block_b=max(pair.block_a, pair.block_b),
                 cosine_similarity=pair.cosine_similarity,
                 verdict="deferred",
                 connection_type=None,
                 strength=None,
-                justification=str(exc),
+                justification=str(error),
                 association_id=None,
                 llm_model=self.config.model,
                 prompt_tokens=None,
                 completion_tokens=None,
                 latency_ms=None,
                 compared_at=now,
-            ))
-            report.deferred += 1
-            report.processed += 1
-            return "deferred (error)"
+            )
 
         # Determine verdict string
         if verdict.connect:
@@ -242,7 +319,7 @@ class ConsolidationLoop:
         else:
             verdict_str = "rejected"
 
-        # Write association if connected
+        # Write association if connected (savepoint inside the batch transaction)
         association_id = None
         if verdict.connect:
             try:
@@ -260,9 +337,8 @@ class ConsolidationLoop:
         else:
             report.rejected += 1
 
-        # Record state
         llm_resp = verdict.llm_response
-        self.state.record_comparison(ComparisonRecord(
+        record = ComparisonRecord(
             block_a=min(pair.block_a, pair.block_b),
             block_b=max(pair.block_a, pair.block_b),
             cosine_similarity=pair.cosine_similarity,
@@ -276,7 +352,7 @@ class ConsolidationLoop:
             completion_tokens=llm_resp.completion_tokens if llm_resp else None,
             latency_ms=llm_resp.latency_ms if llm_resp else None,
             compared_at=now,
-        ))
+        )
 
         if llm_resp:
             report.total_latency_ms += llm_resp.latency_ms
@@ -291,7 +367,7 @@ class ConsolidationLoop:
             "strength": verdict.strength,
         })
 
-        return verdict_str
+        return verdict_str, record
 
     def run_daemon(self, interval: Optional[int] = None, batch_size: Optional[int] = None) -> None:
         """Run as a daemon, processing batches at regular intervals."""
@@ -338,4 +414,5 @@ class ConsolidationLoop:
 
     def close(self) -> None:
         """Clean up resources."""
+        self.llm.close()
         self.db.close()
@@ -81,17 +81,16 @@ class StateManager:
 
     def record_comparison(self, record: ComparisonRecord) -> None:
         """Insert or replace a comparison result."""
-        pair = (min(record.block_a, record.block_b), max(record.block_a, record.block_b))
-        self.db._execute_write(
-            """
-            INSERT OR REPLACE INTO consolidation_state
-            (block_a, block_b, cosine_similarity, verdict, connection_type,
-             strength, justification, association_id, llm_model,
-             prompt_tokens, completion_tokens, latency_ms, compared_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        self.record_comparisons([record])
+
+    def record_comparisons(self, records: List[ComparisonRecord]) -> None:
+        """Insert or replace several comparison results in one transaction."""
+        if not records:
+            return
+        rows = [
             (
-                pair[0], pair[1],
+                min(record.block_a, record.block_b),
+                max(record.block_a, record.block_b),
                 record.cosine_similarity,
                 record.verdict,
                 record.connection_type,
@@ -103,8 +102,20 @@ class StateManager:
                 record.completion_tokens,
                 record.latency_ms,
                 record.compared_at,
-            ),
-        )
+            )
+            for record in records
+        ]
+        with self.db._write_tx() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO consolidation_state
+                (block_a, block_b, cosine_similarity, verdict, connection_type,
+                 strength, justification, association_id, llm_model,
+                 prompt_tokens, completion_tokens, latency_ms, compared_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
 
     def get_stats(self) -> Dict[str, int]:
         """Get verdict counts."""
@@ -12,105 +12,78 @@ This module contains the core components for STM/LTM memory architecture:
 - WorkingMemory: STM working set management
 """
 
-# Core memory components - using thread-safe factory pattern
-from .thread_safe_db import get_database_manager_class
-DatabaseManager = get_database_manager_class()
-from .block_manager import BlockManager
-
-# Optional components (may not be available in lightweight version)
+# v5.4: 하위 모듈은 첫 접근 시 로드 (PEP 562)
+# `from greeum.core.database_manager import ...`가 BlockManager, MCP 서버,
+# InsightJudge(requests)까지 끌어오지 않도록 이름 -> (모듈, 속성) 표만 둔다.
+import importlib
 import logging
 _logger = logging.getLogger(__name__)
-_import_warnings = []
-
-try:
-    from .stm_manager import STMManager
-except ImportError as e:
-    STMManager = None
-    _import_warnings.append(f"STMManager unavailable: {e}")
-
-try:
-    from .cache_manager import CacheManager
-except ImportError as e:
-    CacheManager = None
-    _import_warnings.append(f"CacheManager unavailable: {e}")
-
-try:
-    from .prompt_wrapper import PromptWrapper
-except ImportError as e:
-    PromptWrapper = None
-    _import_warnings.append(f"PromptWrapper unavailable: {e}")
-
-try:
-    from .search_engine import SearchEngine, BertReranker
-except ImportError as e:
-    SearchEngine = None
-    BertReranker = None
-    _import_warnings.append(f"SearchEngine/BertReranker unavailable: {e}")
-
-try:
-    from .working_memory import STMWorkingSet
-except ImportError as e:
-    STMWorkingSet = None
-    _import_warnings.append(f"STMWorkingSet unavailable: {e}")
-
-# v5.0: Hybrid Graph Search components
-try:
-    from .bm25_index import BM25Index, HybridScorer
-except ImportError as e:
-    BM25Index = None
-    HybridScorer = None
-    _import_warnings.append(f"BM25Index/HybridScorer unavailable: {e}")
-
-try:
-    from .hybrid_graph_search import HybridGraphSearch, ProjectAnchorManager, SearchResult
-except ImportError as e:
-    HybridGraphSearch = None
-    ProjectAnchorManager = None
-    SearchResult = None
-    _import_warnings.append(f"HybridGraphSearch unavailable: {e}")
-
-# v5.0: Insight Pipeline components
-try:
-    from .insight_pipeline import InsightPipeline, PipelineResult, store_insight
-except ImportError as e:
-    InsightPipeline = None
-    PipelineResult = None
-    store_insight = None
-    _import_warnings.append(f"InsightPipeline unavailable: {e}")
-
-try:
-    from .project_manager import ProjectManager, Project
-except ImportError as e:
-    ProjectManager = None
-    Project = None
-    _import_warnings.append(f"ProjectManager unavailable: {e}")
-
-try:
-    from .insight_filter import InsightFilter, FilterResult, is_insight
-except ImportError as e:
-    InsightFilter = None
-    FilterResult = None
-    is_insight = None
-    _import_warnings.append(f"InsightFilter unavailable: {e}")
 
-# v5.0: Unified LLM-based InsightJudge
-try:
-    from .insight_judge import (
-        InsightJudge, JudgmentResult, get_insight_judge,
-        StoreResult, store_with_judgment
-    )
-except ImportError as e:
-    InsightJudge = None
-    JudgmentResult = None
-    get_insight_judge = None
-    StoreResult = None
-    store_with_judgment = None
-    _import_warnings.append(f"InsightJudge unavailable: {e}")
+_LAZY_ATTRS = {
+    # Core memory components - using thread-safe factory pattern
+    "DatabaseManager": (".thread_safe_db", None),
+    "BlockManager": (".block_manager", "BlockManager"),
+    # Optional components (may not be available in lightweight version)
+    "STMManager": (".stm_manager", "STMManager"),
+    "CacheManager": (".cache_manager", "CacheManager"),
+    "PromptWrapper": (".prompt_wrapper", "PromptWrapper"),
+    "SearchEngine": (".search_engine", "SearchEngine"),
+    "BertReranker": (".search_engine", "BertReranker"),
+    "STMWorkingSet": (".working_memory", "STMWorkingSet"),
+    # v5.0: Hybrid Graph Search components
+    "BM25Index": (".bm25_index", "BM25Index"),
+    "HybridScorer": (".bm25_index", "HybridScorer"),
+    "HybridGraphSearch": (".hybrid_graph_search", "HybridGraphSearch"),
+    "ProjectAnchorManager": (".hybrid_graph_search", "ProjectAnchorManager"),
+    "SearchResult": (".hybrid_graph_search", "SearchResult"),
+    # v5.0: Insight Pipeline components
+    "InsightPipeline": (".insight_pipeline", "InsightPipeline"),
+    "PipelineResult": (".insight_pipeline", "PipelineResult"),
+    "store_insight": (".insight_pipeline", "store_insight"),
+    "ProjectManager": (".project_manager", "ProjectManager"),
+    "Project": (".project_manager", "Project"),
+    "InsightFilter": (".insight_filter", "InsightFilter"),
+    "FilterResult": (".insight_filter", "FilterResult"),
+    "is_insight": (".insight_filter", "is_insight"),
+    # v5.0: Unified LLM-based InsightJudge
+    "InsightJudge": (".insight_judge", "InsightJudge"),
+    "JudgmentResult": (".insight_judge", "JudgmentResult"),
+    "get_insight_judge": (".insight_judge", "get_insight_judge"),
+    "StoreResult": (".insight_judge", "StoreResult"),
+    "store_with_judgment": (".insight_judge", "store_with_judgment"),
+}
+
+# 필수 구성요소: 임포트 실패 시 그대로 예외를 올린다
+_REQUIRED = {"DatabaseManager", "BlockManager"}
+
+
+def __getattr__(name):
+    try:
+        module_name, attr = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    try:
+        module = importlib.import_module(module_name, __name__)
+    except ImportError as e:
+        if name in _REQUIRED:
+            raise
+        # 선택 구성요소는 기존처럼 None으로 노출 (개발 환경에서만 로깅)
+        _logger.debug(f"{name} unavailable: {e}")
+        value = None
+    else:
+        if attr is None:
+            value = module.get_database_manager_class()
+        else:
+            value = getattr(module, attr)
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
 
-# 임포트 경고 로깅 (개발 환경에서만)
-if _import_warnings:
-    for warning in _import_warnings:
-        _logger.debug(warning)
 
 __all__ = [
     "BlockManager",
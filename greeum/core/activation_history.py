@@ -0,0 +1,193 @@
+"""
+Buffered sink for ``activation_history`` rows.
+
+``SpreadingActivation`` records one history row per seed and per spread update.
+Instead of an INSERT + commit for each row, rows go into an in-memory ring
+buffer and are written with one ``executemany`` in a single transaction when:
+
+- the buffer holds ``GREEUM_ACTIVATION_HISTORY_BATCH`` rows (default 256),
+- ``GREEUM_ACTIVATION_HISTORY_FLUSH_INTERVAL`` seconds passed since the last
+  flush (default 5.0, checked on record),
+- the database manager is closed, or the interpreter exits.
+
+``GREEUM_ACTIVATION_HISTORY_SAMPLE`` keeps a fraction of the rows (default 1.0;
+0 disables history). If flushes keep failing the buffer holds at most
+``GREEUM_ACTIVATION_HISTORY_BUFFER`` rows (default 4096) and the oldest rows
+are dropped; drops are counted in ``stats``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_BUFFER_SIZE = 4096
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+_INSERT_SQL = """
+    INSERT INTO activation_history
+    (node_id, activation_level, trigger_type, trigger_source, timestamp, session_id)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_open_sinks: "weakref.WeakSet[ActivationHistorySink]" = weakref.WeakSet()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class ActivationHistorySink:
+    """Ring buffer of activation history rows with batched flushes."""
+
+    def __init__(
+        self,
+        db_manager,
+        batch_size: Optional[int] = None,
+        buffer_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        sample_rate: Optional[float] = None,
+    ):
+        self.db_manager = db_manager
+        if batch_size is None:
+            batch_size = int(_env_float("GREEUM_ACTIVATION_HISTORY_BATCH", DEFAULT_BATCH_SIZE))
+        if buffer_size is None:
+            buffer_size = int(_env_float("GREEUM_ACTIVATION_HISTORY_BUFFER", DEFAULT_BUFFER_SIZE))
+        if flush_interval is None:
+            flush_interval = _env_float("GREEUM_ACTIVATION_HISTORY_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+        if sample_rate is None:
+            sample_rate = _env_float("GREEUM_ACTIVATION_HISTORY_SAMPLE", 1.0)
+
+        self.batch_size = max(1, batch_size)
+        self.buffer_size = max(self.batch_size, buffer_size)
+        self.flush_interval = max(0.0, flush_interval)
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.stats: Dict[str, int] = {
+            "recorded": 0,
+            "sampled_out": 0,
+            "flushed": 0,
+            "dropped": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+        }
+        _open_sinks.add(self)
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0.0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def record(self, node_id: str, level: float, trigger_type: str,
+               trigger_source: str, session_id: Optional[str]) -> None:
+        """Buffer one row; flushes when a size or time threshold is reached."""
+        self.record_many([(node_id, level, trigger_type, trigger_source, session_id)])
+
+    def record_many(self, rows: Iterable[Tuple[str, float, str, str, Optional[str]]]) -> None:
+        """Buffer ``(node_id, level, trigger_type, trigger_source, session_id)`` rows."""
+        if not self.enabled:
+            return
+
+        timestamp = datetime.now().isoformat()
+        sample_all = self.sample_rate >= 1.0
+        with self._lock:
+            for node_id, level, trigger_type, trigger_source, session_id in rows:
+                if not sample_all and random.random() >= self.sample_rate:
+                    self.stats["sampled_out"] += 1
+                    continue
+                self._buffer.append(
+                    (node_id, float(level), trigger_type, trigger_source, timestamp, session_id)
+                )
+                self.stats["recorded"] += 1
+            self._trim_locked()
+            due = len(self._buffer) >= self.batch_size or (
+                time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered rows in one transaction.
+
+        Returns:
+            Number of rows written (0 when the buffer was empty or the write failed)
+        """
+        with self._lock:
+            if not self._buffer:
+                self._last_flush = time.monotonic()
+                return 0
+            rows = list(self._buffer)
+            self._buffer.clear()
+            self._last_flush = time.monotonic()
+
+        conn = None
+        try:
+            conn = self.db_manager.conn
+            conn.executemany(_INSERT_SQL, rows)
+            conn.commit()
+        except (sqlite3.Error, AttributeError) as e:
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    pass
+            logger.debug(f"Activation history flush failed, keeping {len(rows)} rows: {e}")
+            with self._lock:
+                self._buffer.extendleft(reversed(rows))
+                self._trim_locked()
+                self.stats["failed_flushes"] += 1
+            return 0
+
+        with self._lock:
+            self.stats["flushed"] += len(rows)
+            self.stats["flushes"] += 1
+        return len(rows)
+
+    def close(self) -> None:
+        """Flush remaining rows; the sink stays usable afterwards."""
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["buffered"] = len(self._buffer)
+        stats["enabled"] = self.enabled
+        stats["sample_rate"] = self.sample_rate
+        return stats
+
+    def _trim_locked(self) -> None:
+        overflow = len(self._buffer) - self.buffer_size
+        for _ in range(max(0, overflow)):
+            self._buffer.popleft()
+        if overflow > 0:
+            self.stats["dropped"] += overflow
+
+
+@atexit.register
+def _flush_open_sinks() -> None:
+    for sink in list(_open_sinks):
+        try:
+            sink.flush()
+        except Exception as e:  # noqa: BLE001
+            logger.debug(f"Activation history flush at exit failed: {e}")
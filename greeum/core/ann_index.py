@@ -0,0 +1,276 @@
+"""
+Approximate nearest neighbour (ANN) backends for block embeddings.
+
+``EmbeddingMatrixStore`` answers small stores exactly. Once a dimension group
+grows past ``GREEUM_ANN_MIN_ROWS`` rows, an IVF (inverted file) index narrows
+the candidate set to the ``nprobe`` closest clusters, and the store re-scores
+only those candidates exactly against its normalized matrix.
+
+Backends:
+- ``NumpyIVFIndex``: pure numpy spherical k-means + inverted lists (default)
+- ``FaissIVFIndex``: ``faiss.IndexIVFFlat`` (inner product), used when FAISS
+  is installed and ``GREEUM_ANN_BACKEND`` is ``auto`` or ``faiss``
+
+Environment knobs:
+- ``GREEUM_ANN_BACKEND``: ``auto`` (default), ``numpy``, ``faiss`` or ``off``
+- ``GREEUM_ANN_MIN_ROWS``: rows before ANN is used (default 20000)
+- ``GREEUM_ANN_NLIST``: number of clusters (default ``2 * sqrt(N)``)
+- ``GREEUM_ANN_NPROBE``: clusters probed per query (default 16); higher means
+  better recall and slower queries
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:  # pragma: no cover - optional dependency
+    import faiss  # type: ignore
+except ImportError:  # pragma: no cover - fallback when FAISS unavailable
+    faiss = None
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default))), 0)
+    except ValueError:
+        return default
+
+
+def ann_settings() -> Dict[str, object]:
+    """Read ANN knobs from the environment."""
+    backend = os.getenv("GREEUM_ANN_BACKEND", "auto").strip().lower()
+    if backend not in {"auto", "numpy", "faiss", "off"}:
+        logger.warning(f"Unknown GREEUM_ANN_BACKEND '{backend}', using 'auto'")
+        backend = "auto"
+    return {
+        "backend": backend,
+        "min_rows": _env_int("GREEUM_ANN_MIN_ROWS", 20000),
+        "nlist": _env_int("GREEUM_ANN_NLIST", 0),
+        "nprobe": max(_env_int("GREEUM_ANN_NPROBE", 16), 1),
+    }
+
+
+def default_nlist(num_rows: int) -> int:
+    return int(max(8, min(4096, round(2 * np.sqrt(max(num_rows, 1))))))
+
+
+class NumpyIVFIndex:
+    """Inverted-file index over normalized vectors, implemented with numpy.
+
+    Only cluster assignments are stored; vectors stay in the owning matrix so
+    candidates are always re-scored exactly.
+    """
+
+    name = "numpy-ivf"
+
+    def __init__(self, dim: int, nlist: int, nprobe: int = 16):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[set] = []
+        self.list_of: Dict[int, int] = {}  # block_index -> cluster
+        self.trained_rows = 0
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return len(self.list_of)
+
+    def train(self, vectors: np.ndarray, iterations: int = 8, seed: int = 0) -> None:
+        """Spherical k-means on a sample of the (normalized) vectors."""
+        rng = np.random.default_rng(seed)
+        num_rows = vectors.shape[0]
+        nlist = min(self.nlist, num_rows)
+        sample_size = min(num_rows, nlist * 16)
+        sample = vectors[rng.choice(num_rows, sample_size, replace=False)]
+
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty clusters from random sample points
+                sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        self.centroids = centroids
+        self.nlist = nlist
+        self.lists = [set() for _ in range(nlist)]
+        self.list_of = {}
+        self.trained_rows = num_rows
+
+    def add(self, block_indices, vectors: np.ndarray) -> None:
+        if not self.is_trained or len(block_indices) == 0:
+            return
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        for block_index, cluster in zip(block_indices, assign):
+            block_index = int(block_index)
+            self.remove(block_index)
+            self.lists[int(cluster)].add(block_index)
+            self.list_of[block_index] = int(cluster)
+
+    def remove(self, block_index: int) -> None:
+        cluster = self.list_of.pop(block_index, None)
+        if cluster is not None:
+            self.lists[cluster].discard(block_index)
+
+    def candidates(self, query: np.ndarray, k: int) -> np.ndarray:
+        """Block indices in the ``nprobe`` clusters closest to the query."""
+        if not self.is_trained:
+            return np.empty(0, dtype=np.int64)
+        nprobe = min(self.nprobe, self.nlist)
+        scores = self.centroids @ query
+        probe = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        members: List[int] = []
+        for cluster in probe:
+            members.extend(self.lists[int(cluster)])
+        return np.fromiter(members, dtype=np.int64, count=len(members))
+
+    # ------------------------------------------------------------------
+    # Persistence (stored inside the EmbeddingMatrixStore snapshot)
+    # ------------------------------------------------------------------
+    def state(self) -> Dict[str, np.ndarray]:
+        ids = np.fromiter(self.list_of.keys(), dtype=np.int64, count=len(self.list_of))
+        clusters = np.fromiter(self.list_of.values(), dtype=np.int32, count=len(self.list_of))
+        return {
+            "ivf_centroids": self.centroids,
+            "ivf_ids": ids,
+            "ivf_clusters": clusters,
+            "ivf_trained_rows": np.asarray(self.trained_rows, dtype=np.int64),
+        }
+
+    @classmethod
+    def from_state(cls, dim: int, state, nprobe: int) -> "NumpyIVFIndex":
+        centroids = np.asarray(state["ivf_centroids"], dtype=np.float32)
+        index = cls(dim, centroids.shape[0], nprobe)
+        index.centroids = centroids
+        index.lists = [set() for _ in range(centroids.shape[0])]
+        for block_index, cluster in zip(state["ivf_ids"].tolist(), state["ivf_clusters"].tolist()):
+            index.lists[cluster].add(block_index)
+            index.list_of[block_index] = cluster
+        index.trained_rows = int(state["ivf_trained_rows"])
+        return index
+
+
+class FaissIVFIndex:
+    """``faiss.IndexIVFFlat`` wrapper exposing the same candidate interface."""
+
+    name = "faiss-ivf"
+
+    def __init__(self, dim: int, nlist: int, nprobe: int = 16):
+        if faiss is None:
+            raise RuntimeError("FAISS is not installed")
+        self.dim = dim
+        self.nprobe = nprobe
+        self._reset(nlist)
+
+    def _reset(self, nlist: int) -> None:
+        """Fresh, untrained IVF index with ``nlist`` partitions."""
+        self.nlist = nlist
+        self._quantizer = faiss.IndexFlatIP(self.dim)
+        self._index = faiss.IndexIVFFlat(self._quantizer, self.dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        self._members: set = set()
+        self.trained_rows = 0
+
+    @property
+    def is_trained(self) -> bool:
+        return bool(self._index.is_trained)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def train(self, vectors: np.ndarray, iterations: int = 8, seed: int = 0) -> None:
+        nlist = min(self.nlist, vectors.shape[0])
+        if nlist != self.nlist:
+            self._reset(nlist)
+        self._index.cp.niter = iterations
+        self._index.train(np.ascontiguousarray(vectors, dtype=np.float32))
+        self.trained_rows = vectors.shape[0]
+
+    def add(self, block_indices, vectors: np.ndarray) -> None:
+        if not self.is_trained or len(block_indices) == 0:
+            return
+        ids = np.asarray(block_indices, dtype=np.int64)
+        self._index.remove_ids(ids)
+        self._index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), ids)
+        self._members.update(ids.tolist())
+
+    def remove(self, block_index: int) -> None:
+        if block_index in self._members:
+            self._index.remove_ids(np.asarray([block_index], dtype=np.int64))
+            self._members.discard(block_index)
+
+    def candidates(self, query: np.ndarray, k: int) -> np.ndarray:
+        if not self.is_trained or not self._members:
+            return np.empty(0, dtype=np.int64)
+        self._index.nprobe = min(self.nprobe, self.nlist)
+        _, ids = self._index.search(query.reshape(1, -1).astype(np.float32), min(k, len(self._members)))
+        return ids[0][ids[0] >= 0]
+
+    def state(self) -> Dict[str, np.ndarray]:
+        # Centroids are enough to restore without retraining; lists are re-added
+        centroids = self._quantizer.reconstruct_n(0, self._quantizer.ntotal)
+        return {
+            "ivf_centroids": centroids,
+            "ivf_trained_rows": np.asarray(self.trained_rows, dtype=np.int64),
+        }
+
+    @classmethod
+    def from_state(cls, dim: int, state, nprobe: int) -> "FaissIVFIndex":
+        centroids = np.ascontiguousarray(state["ivf_centroids"], dtype=np.float32)
+        index = cls(dim, centroids.shape[0], nprobe)
+        index._quantizer.add(centroids)
+        index._index.is_trained = True
+        index.trained_rows = int(state["ivf_trained_rows"])
+        return index
+
+
+def create_ann_index(dim: int, num_rows: int, settings: Optional[Dict[str, object]] = None):
+    """Create an untrained ANN index for ``dim`` according to the settings.
+
+    Returns None when ANN is disabled.
+    """
+    settings = settings or ann_settings()
+    backend = settings["backend"]
+    if backend == "off":
+        return None
+
+    nlist = int(settings["nlist"]) or default_nlist(num_rows)
+    nprobe = int(settings["nprobe"])
+
+    if backend in {"auto", "faiss"} and faiss is not None:
+        try:
+            return FaissIVFIndex(dim, nlist, nprobe)
+        except Exception as e:  # pragma: no cover - depends on FAISS build
+            logger.warning(f"FAISS IVF unavailable, using numpy IVF: {e}")
+    elif backend == "faiss":
+        logger.warning("GREEUM_ANN_BACKEND=faiss but FAISS is not installed; using numpy IVF")
+
+    return NumpyIVFIndex(dim, nlist, nprobe)
+
+
+def restore_ann_index(kind: str, dim: int, state, settings: Optional[Dict[str, object]] = None):
+    """Rebuild an ANN index from a persisted snapshot state."""
+    settings = settings or ann_settings()
+    if settings["backend"] == "off":
+        return None
+    nprobe = int(settings["nprobe"])
+    if kind == FaissIVFIndex.name and faiss is not None and settings["backend"] in {"auto", "faiss"}:
+        return FaissIVFIndex.from_state(dim, state, nprobe)
+    if kind == NumpyIVFIndex.name and "ivf_ids" in state:
+        return NumpyIVFIndex.from_state(dim, state, nprobe)
+    return None
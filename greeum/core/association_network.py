@@ -41,6 +41,35 @@ class Association:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class AssociationCSR:
+    """Compressed-sparse-row view of the association graph (v5.4)
+
+    Row ``i`` holds the outgoing edges of ``node_ids[i]``:
+    ``indices[indptr[i]:indptr[i + 1]]`` are target positions, and
+    ``sources``, ``strength`` and ``type_codes`` are aligned with ``indices``.
+    Only the first association of a (source, target) pair is included,
+    matching ``AssociationNetwork.get_association``.
+    """
+    node_ids: List[str]
+    node_pos: Dict[str, int]
+    indptr: np.ndarray
+    indices: np.ndarray
+    sources: np.ndarray
+    strength: np.ndarray
+    type_codes: np.ndarray
+    type_names: List[str]
+    edge_slots: Dict[str, int]
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+
 class AssociationNetwork:
     """
     Core association network for v3.0.0
@@ -58,6 +87,11 @@ class AssociationNetwork:
         self.nodes: Dict[str, MemoryNode] = {}
         self.associations: Dict[str, Association] = {}
         self.adjacency_list: Dict[str, Set[str]] = {}
+        # v5.4: O(1) edge / memory lookups and a cached CSR snapshot
+        self._edge_index: Dict[Tuple[str, str], Association] = {}
+        self._node_by_memory: Dict[int, str] = {}
+        self._node_edges: Dict[str, List[str]] = {}
+        self._csr: Optional[AssociationCSR] = None
         self._load_network()
     
     def _load_network(self):
@@ -79,7 +113,7 @@ class AssociationNetwork:
                     metadata=json.loads(row['metadata']) if row['metadata'] else {},
                     created_at=row['created_at']
                 )
-                self.nodes[node.node_id] = node
+                self._index_node(node)
             
             # Load associations
             cursor.execute("SELECT * FROM associations")
@@ -96,18 +130,33 @@ class AssociationNetwork:
                     activation_count=row['activation_count'],
                     metadata=json.loads(row['metadata']) if row['metadata'] else {}
                 )
-                self.associations[assoc.association_id] = assoc
-                
-                # Build adjacency list
-                if assoc.source_node_id not in self.adjacency_list:
-                    self.adjacency_list[assoc.source_node_id] = set()
-                self.adjacency_list[assoc.source_node_id].add(assoc.target_node_id)
+                self._index_association(assoc)
             
             logger.info(f"Loaded {len(self.nodes)} nodes and {len(self.associations)} associations")
             
         except Exception as e:
             logger.debug(f"Network loading (expected on first run): {e}")
     
+    def _index_node(self, node: MemoryNode):
+        """Add a node to the in-memory maps"""
+        self.nodes[node.node_id] = node
+        if node.memory_id is not None:
+            self._node_by_memory.setdefault(node.memory_id, node.node_id)
+        self._csr = None
+    
+    def _index_association(self, assoc: Association):
+        """Add an association to the adjacency list and lookup maps"""
+        self.associations[assoc.association_id] = assoc
+        if assoc.source_node_id not in self.adjacency_list:
+            self.adjacency_list[assoc.source_node_id] = set()
+        self.adjacency_list[assoc.source_node_id].add(assoc.target_node_id)
+        
+        self._edge_index.setdefault((assoc.source_node_id, assoc.target_node_id), assoc)
+        self._node_edges.setdefault(assoc.source_node_id, []).append(assoc.association_id)
+        if assoc.target_node_id != assoc.source_node_id:
+            self._node_edges.setdefault(assoc.target_node_id, []).append(assoc.association_id)
+        self._csr = None
+    
     def create_node(self, content: str, node_type: str = 'memory', 
                    memory_id: Optional[int] = None,
                    embedding: Optional[List[float]] = None) -> MemoryNode:
@@ -153,7 +202,7 @@ class AssociationNetwork:
         self.db_manager.conn.commit()
         
         # Add to memory
-        self.nodes[node_id] = node
+        self._index_node(node)
         logger.debug(f"Created node: {node_id} ({node_type})")
         
         return node
@@ -208,10 +257,7 @@ class AssociationNetwork:
         self.db_manager.conn.commit()
         
         # Update in-memory structures
-        self.associations[association_id] = assoc
-        if source_node_id not in self.adjacency_list:
-            self.adjacency_list[source_node_id] = set()
-        self.adjacency_list[source_node_id].add(target_node_id)
+        self._index_association(assoc)
         
         logger.debug(f"Created association: {source_node_id} -> {target_node_id} ({association_type})")
         
@@ -227,11 +273,81 @@ class AssociationNetwork:
         Returns:
             List of associations
         """
-        associations = []
-        for assoc in self.associations.values():
-            if assoc.source_node_id == node_id or assoc.target_node_id == node_id:
-                associations.append(assoc)
-        return associations
+        return [self.associations[a] for a in self._node_edges.get(node_id, [])]
+    
+    def get_association(self, source_node_id: str,
+                        target_node_id: str) -> Optional[Association]:
+        """
+        Get the association from source to target in O(1)
+        
+        Returns:
+            The first association created for the pair, or None
+        """
+        return self._edge_index.get((source_node_id, target_node_id))
+    
+    def get_node_by_memory_id(self, memory_id: int) -> Optional[MemoryNode]:
+        """
+        Get the node of a memory block in O(1)
+        
+        Returns:
+            The first node created for the block, or None
+        """
+        node_id = self._node_by_memory.get(memory_id)
+        return self.nodes.get(node_id) if node_id is not None else None
+    
+    def csr_snapshot(self) -> AssociationCSR:
+        """
+        Get the graph as CSR arrays for vectorized traversal (v5.4)
+        
+        The snapshot is cached until a node or association is added;
+        strength changes are written into the cached arrays in place.
+        """
+        csr = self._csr
+        if csr is None:
+            csr = self._build_csr()
+            self._csr = csr
+        return csr
+    
+    def _build_csr(self) -> AssociationCSR:
+        node_ids = list(self.nodes)
+        node_pos = {node_id: pos for pos, node_id in enumerate(node_ids)}
+        edges = list(self._edge_index.values())
+        
+        # Associations loaded from the database may point at missing nodes
+        for assoc in edges:
+            for node_id in (assoc.source_node_id, assoc.target_node_id):
+                if node_id not in node_pos:
+                    node_pos[node_id] = len(node_ids)
+                    node_ids.append(node_id)
+        
+        type_names: List[str] = []
+        type_pos: Dict[str, int] = {}
+        for assoc in edges:
+            if assoc.association_type not in type_pos:
+                type_pos[assoc.association_type] = len(type_names)
+                type_names.append(assoc.association_type)
+        
+        count = len(edges)
+        sources = np.fromiter((node_pos[a.source_node_id] for a in edges), dtype=np.int64, count=count)
+        targets = np.fromiter((node_pos[a.target_node_id] for a in edges), dtype=np.int64, count=count)
+        strength = np.fromiter((a.strength for a in edges), dtype=np.float64, count=count)
+        type_codes = np.fromiter((type_pos[a.association_type] for a in edges), dtype=np.int64, count=count)
+        
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(node_ids)), out=indptr[1:])
+        
+        return AssociationCSR(
+            node_ids=node_ids,
+            node_pos=node_pos,
+            indptr=indptr,
+            indices=targets[order],
+            sources=sources[order],
+            strength=strength[order],
+            type_codes=type_codes[order],
+            type_names=type_names,
+            edge_slots={edges[i].association_id: slot for slot, i in enumerate(order.tolist())},
+        )
     
     def find_path(self, source_id: str, target_id: str, 
                  max_depth: int = 5) -> Optional[List[str]]:
@@ -299,6 +415,10 @@ class AssociationNetwork:
             WHERE association_id = ?
         ''', (assoc.strength, assoc.activation_count, assoc.last_activated, association_id))
         self.db_manager.conn.commit()
+        
+        csr = self._csr
+        if csr is not None and association_id in csr.edge_slots:
+            csr.strength[csr.edge_slots[association_id]] = assoc.strength
     
     def decay_associations(self, decay_rate: float = 0.01):
         """
@@ -320,6 +440,10 @@ class AssociationNetwork:
         ''', (decay_rate,))
         self.db_manager.conn.commit()
         
+        csr = self._csr
+        if csr is not None:
+            np.maximum(0.1, csr.strength - decay_rate, out=csr.strength)
+        
         logger.debug(f"Applied decay rate {decay_rate} to all associations")
     
     def get_network_stats(self) -> Dict[str, Any]:
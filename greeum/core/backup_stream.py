@@ -0,0 +1,457 @@
+"""
+Streaming LTM backup format (v5.4).
+
+A backup is newline-delimited JSON, one record per line::
+
+    {"type": "header", "format": "greeum-ltm", "version": 1, "since": -1,
+     "count": 3, "first_block_index": 0, "last_block_index": 2, ...}
+    {"type": "block", "block_index": 0, "hash": "...", "prev_hash": "", ...,
+     "keywords": [...], "tags": [...], "metadata": {...},
+     "embedding": "<base64 float32>", "embedding_model": "...", "embedding_dim": 768}
+    ...
+    {"type": "end", "count": 3}
+
+Block records carry every ``blocks`` column (hash chain and branch fields
+included) plus keywords, tags, metadata and the stored embedding, so a
+restore goes straight to ``db_manager.add_blocks`` (``executemany``) without
+re-embedding or per-memory duplicate scans. The stream is gzip-framed by
+default, zstd-framed when ``zstandard`` is installed and requested, or plain;
+readers detect the framing from the magic bytes. A missing or short ``end``
+record means the backup was truncated.
+
+``since`` exports only blocks with ``block_index > since`` for incremental
+backups. Export pages through the store by ``block_index`` inside one read
+transaction, so the header counts and the records describe the same state.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+import zlib
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT = "greeum-ltm"
+VERSION = 1
+COMPRESSIONS = ("gzip", "zstd", "none")
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_BATCH_SIZE = 500
+CHUNK_SIZE = 64 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# Branch links point into the source chain and do not survive renumbering
+_CHAIN_LINK_FIELDS = ("before", "after", "xref")
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ValueError("zstd backups require the 'zstandard' package") from e
+    return zstandard
+
+
+def compression_for_path(path: str) -> str:
+    """Framing implied by a backup file name (``.zst``, ``.ndjson``, else gzip)."""
+    lowered = str(path).lower()
+    if lowered.endswith((".zst", ".zstd")):
+        return "zstd"
+    if lowered.endswith((".ndjson", ".jsonl")):
+        return "none"
+    return "gzip"
+
+
+def block_hash(block: Dict[str, Any]) -> str:
+    """Hash over the same fields ``BlockManager.add_block`` chains."""
+    payload = {
+        "block_index": block["block_index"],
+        "timestamp": block["timestamp"],
+        "context": block["context"],
+        "importance": block["importance"],
+        "prev_hash": block["prev_hash"],
+    }
+    block_str = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(block_str.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def _read_connection(db_manager) -> Tuple[sqlite3.Connection, bool]:
+    """A private connection for file databases (usable from any thread)."""
+    path = getattr(db_manager, "connection_string", None)
+    if path and path != ":memory:" and not str(path).startswith("file:"):
+        return sqlite3.connect(path, timeout=30.0, check_same_thread=False), True
+    return db_manager.conn, False
+
+
+def _page_records(cursor, rows: List[tuple], columns: List[str]) -> Iterator[Dict[str, Any]]:
+    first, last = rows[0][0], rows[-1][0]
+    span = (first, last)
+
+    keywords: Dict[int, List[str]] = {}
+    cursor.execute(
+        "SELECT block_index, keyword FROM block_keywords WHERE block_index BETWEEN ? AND ?", span
+    )
+    for index, keyword in cursor.fetchall():
+        keywords.setdefault(index, []).append(keyword)
+
+    tags: Dict[int, List[str]] = {}
+    cursor.execute("SELECT block_index, tag FROM block_tags WHERE block_index BETWEEN ? AND ?", span)
+    for index, tag in cursor.fetchall():
+        tags.setdefault(index, []).append(tag)
+
+    cursor.execute(
+        "SELECT block_index, metadata FROM block_metadata WHERE block_index BETWEEN ? AND ?", span
+    )
+    metadata = dict(cursor.fetchall())
+
+    cursor.execute(
+        "SELECT block_index, embedding, embedding_model, embedding_dim FROM block_embeddings "
+        "WHERE block_index BETWEEN ? AND ?",
+        span,
+    )
+    embeddings = {row[0]: row[1:] for row in cursor.fetchall()}
+
+    for row in rows:
+        record: Dict[str, Any] = {"type": "block"}
+        record.update(zip(columns, row))
+        index = record["block_index"]
+        for field in ("after", "xref"):
+            if isinstance(record.get(field), str):
+                try:
+                    record[field] = json.loads(record[field])
+                except ValueError:
+                    record[field] = []
+
+        record["keywords"] = keywords.get(index, [])
+        record["tags"] = tags.get(index, [])
+        raw_metadata = metadata.get(index)
+        try:
+            record["metadata"] = json.loads(raw_metadata) if raw_metadata else None
+        except ValueError:
+            record["metadata"] = None
+
+        embedding = embeddings.get(index)
+        if embedding and embedding[0]:
+            blob, model, dim = embedding
+            record["embedding"] = base64.b64encode(blob).decode("ascii")
+            record["embedding_model"] = model
+            record["embedding_dim"] = dim or len(blob) // 4
+        else:
+            record["embedding"] = None
+        yield record
+
+
+def export_records(db_manager, since: int = -1, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Header, one record per block with ``block_index > since``, then the end record."""
+    conn, owned = _read_connection(db_manager)
+    cursor = conn.cursor()
+    began = False
+    try:
+        if owned:
+            # One snapshot for the counts and every page
+            cursor.execute("BEGIN")
+            began = True
+        cursor.execute(
+            "SELECT COUNT(*), MIN(block_index), MAX(block_index) FROM blocks WHERE block_index > ?",
+            (since,),
+        )
+        count, first, last = cursor.fetchone()
+        yield {
+            "type": "header",
+            "format": FORMAT,
+            "version": VERSION,
+            "since": since,
+            "count": count,
+            "first_block_index": first,
+            "last_block_index": last,
+            "exported_at": time.time(),
+        }
+
+        written = 0
+        cursor.execute("SELECT * FROM blocks LIMIT 0")
+        columns = [column[0] for column in cursor.description]
+        last_seen = since
+        while True:
+            cursor.execute(
+                "SELECT * FROM blocks WHERE block_index > ? ORDER BY block_index LIMIT ?",
+                (last_seen, max(1, page_size)),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for record in _page_records(cursor, rows, columns):
+                written += 1
+                yield record
+            last_seen = rows[-1][0]
+
+        yield {"type": "end", "count": written}
+    finally:
+        if began:
+            conn.rollback()
+        if owned:
+            conn.close()
+
+
+def encode_records(records: Iterable[Dict[str, Any]], compression: str = "gzip") -> Iterator[bytes]:
+    """Frame records as NDJSON chunks of roughly ``CHUNK_SIZE`` bytes."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown backup compression: {compression}")
+    if compression == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    elif compression == "zstd":
+        compressor = _zstandard().ZstdCompressor().compressobj()
+    else:
+        compressor = None
+
+    pending: List[bytes] = []
+    size = 0
+    for record in records:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        pending.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            data = b"".join(pending)
+            pending, size = [], 0
+            data = compressor.compress(data) if compressor else data
+            if data:
+                yield data
+
+    data = b"".join(pending)
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+def iter_backup_chunks(db_manager, since: int = -1, compression: str = "gzip",
+                       page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[bytes]:
+    """Framed backup bytes for ``blocks.block_index > since`` (for streaming responses)."""
+    return encode_records(export_records(db_manager, since=since, page_size=page_size), compression)
+
+
+def write_backup(db_manager, path: str, since: int = -1, compression: Optional[str] = None,
+                 page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Write a backup file.
+
+    Args:
+        compression: ``gzip``, ``zstd`` or ``none`` (default: from the file name)
+
+    Returns:
+        ``count``, ``last_block_index``, ``bytes`` and ``compression``
+    """
+    compression = compression or compression_for_path(path)
+    stats: Dict[str, Any] = {"count": 0, "last_block_index": None, "bytes": 0, "compression": compression}
+
+    def tracked(records):
+        for record in records:
+            if record["type"] == "block":
+                stats["count"] += 1
+                stats["last_block_index"] = record["block_index"]
+            yield record
+
+    with open(path, "wb") as f:
+        for chunk in encode_records(tracked(export_records(db_manager, since, page_size)), compression):
+            f.write(chunk)
+            stats["bytes"] += len(chunk)
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Read / restore
+# ---------------------------------------------------------------------------
+
+def _decompressed(fileobj: BinaryIO) -> Iterator[bytes]:
+    chunk = fileobj.read(CHUNK_SIZE)
+    if chunk.startswith(_GZIP_MAGIC):
+        decompressor = zlib.decompressobj(47)
+    elif chunk.startswith(_ZSTD_MAGIC):
+        decompressor = _zstandard().ZstdDecompressor().decompressobj()
+    else:
+        decompressor = None
+
+    while chunk:
+        yield decompressor.decompress(chunk) if decompressor else chunk
+        chunk = fileobj.read(CHUNK_SIZE)
+
+
+def _lines(fileobj: BinaryIO) -> Iterator[Dict[str, Any]]:
+    buffer = b""
+    for data in _decompressed(fileobj):
+        buffer += data
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+def read_backup(fileobj: BinaryIO) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    """
+    Parse a backup stream.
+
+    Returns:
+        ``(header, records)``; ``records`` yields block records and raises
+        ``ValueError`` at the end if the stream was truncated
+    """
+    lines = _lines(fileobj)
+    try:
+        header = next(lines)
+    except StopIteration:
+        raise ValueError("Empty backup stream") from None
+    except (ValueError, zlib.error) as e:
+        raise ValueError(f"Not a Greeum backup stream: {e}") from e
+    if header.get("type") != "header" or header.get("format") != FORMAT:
+        raise ValueError("Not a Greeum backup stream")
+    if header.get("version", 0) > VERSION:
+        raise ValueError(f"Unsupported backup version: {header.get('version')}")
+
+    def records() -> Iterator[Dict[str, Any]]:
+        seen = 0
+        try:
+            for record in lines:
+                kind = record.get("type")
+                if kind == "block":
+                    seen += 1
+                    yield record
+                elif kind == "end":
+                    if record.get("count") != seen:
+                        raise ValueError(f"Backup end record counts {record.get('count')} blocks, read {seen}")
+                    return
+        except zlib.error as e:
+            raise ValueError(f"Corrupt backup stream: {e}") from e
+        raise ValueError(f"Truncated backup stream after {seen} blocks")
+
+    return header, records()
+
+
+def _record_to_block(record: Dict[str, Any]) -> Dict[str, Any]:
+    block = {key: value for key, value in record.items() if key not in ("type", "embedding_dim")}
+    embedding = record.get("embedding")
+    block["embedding"] = np.frombuffer(base64.b64decode(embedding), dtype=np.float32) if embedding else None
+    block["embedding_model"] = record.get("embedding_model") or "default"
+    block["keywords"] = record.get("keywords") or []
+    block["tags"] = record.get("tags") or []
+    return block
+
+
+def _restore_mode(conn, header: Dict[str, Any]) -> str:
+    """``preserve`` keeps source indexes and hashes when their range is free."""
+    if header.get("first_block_index") is None:
+        return "append"
+    taken = conn.execute(
+        "SELECT 1 FROM blocks WHERE block_index BETWEEN ? AND ? LIMIT 1",
+        (header["first_block_index"], header["last_block_index"]),
+    ).fetchone()
+    return "append" if taken else "preserve"
+
+
+def _existing(conn, batch: List[Dict[str, Any]]) -> Tuple[set, set]:
+    hashes = [record.get("hash") for record in batch if record.get("hash")]
+    found_hashes = set()
+    if hashes:
+        placeholders = ",".join("?" * len(hashes))
+        found_hashes = {
+            row[0] for row in conn.execute(f"SELECT hash FROM blocks WHERE hash IN ({placeholders})", hashes)
+        }
+
+    timestamps = sorted({record.get("timestamp") for record in batch if record.get("timestamp")})
+    found_entries = set()
+    if timestamps:
+        placeholders = ",".join("?" * len(timestamps))
+        found_entries = {
+            (row[0], row[1])
+            for row in conn.execute(
+                f"SELECT timestamp, context FROM blocks WHERE timestamp IN ({placeholders})", timestamps
+            )
+        }
+    return found_hashes, found_entries
+
+
+def _restore_batch(db_manager, batch: List[Dict[str, Any]], mode: str, stats: Dict[str, Any]) -> None:
+    conn = db_manager.conn
+    found_hashes, found_entries = _existing(conn, batch)
+
+    tail = None
+    if mode == "append":
+        tail = conn.execute("SELECT block_index, hash FROM blocks ORDER BY block_index DESC LIMIT 1").fetchone()
+
+    blocks = []
+    for record in batch:
+        if record.get("hash") in found_hashes or (record.get("timestamp"), record.get("context")) in found_entries:
+            stats["skipped"] += 1
+            continue
+        found_entries.add((record.get("timestamp"), record.get("context")))
+
+        block = _record_to_block(record)
+        if mode == "append":
+            block["block_index"] = tail[0] + 1 if tail else 0
+            block["prev_hash"] = tail[1] if tail else ""
+            for field in _CHAIN_LINK_FIELDS:
+                block.pop(field, None)
+            block["hash"] = block_hash(block)
+            tail = (block["block_index"], block["hash"])
+        blocks.append(block)
+
+    db_manager.add_blocks(blocks)
+    stats["restored"] += len(blocks)
+    if blocks:
+        stats["last_block_index"] = blocks[-1]["block_index"]
+
+
+def restore_backup(db_manager, fileobj: BinaryIO, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Bulk-restore a backup stream into ``db_manager``.
+
+    Blocks whose hash or ``(timestamp, context)`` already exists are skipped,
+    so restoring the same backup twice is a no-op. If the source index range
+    is free the blocks keep their indexes and hashes (``preserve``); otherwise
+    they are appended after the current tail and re-chained (``append``).
+    Each batch is one transaction; a truncated stream raises ``ValueError``
+    after the complete batches were written.
+
+    Returns:
+        ``total``, ``restored``, ``skipped``, ``mode`` and ``last_block_index``
+    """
+    header, records = read_backup(fileobj)
+    # Never more host parameters per IN (...) than older SQLite builds allow
+    batch_size = max(1, min(batch_size, 900))
+    run = getattr(db_manager, "run_serialized", None) or (lambda func: func())
+
+    stats: Dict[str, Any] = {
+        "total": 0,
+        "restored": 0,
+        "skipped": 0,
+        "mode": run(lambda: _restore_mode(db_manager.conn, header)),
+        "last_block_index": None,
+        "source_since": header.get("since"),
+    }
+
+    batch: List[Dict[str, Any]] = []
+    for record in records:
+        stats["total"] += 1
+        batch.append(record)
+        if len(batch) >= batch_size:
+            run(lambda pending=batch: _restore_batch(db_manager, pending, stats["mode"], stats))
+            batch = []
+    if batch:
+        run(lambda: _restore_batch(db_manager, batch, stats["mode"], stats))
+
+    logger.info(
+        f"Backup restored ({stats['mode']}): {stats['restored']} blocks, {stats['skipped']} skipped"
+    )
+    return stats
@@ -0,0 +1,171 @@
+"""
+Batched block materialization shared by the database managers.
+
+``fetch_blocks`` loads many blocks with a fixed number of ``IN (...)`` queries
+(one per table, chunked below SQLite's bound-parameter limit) instead of the
+five queries per block that ``get_block`` issues. Results follow the order of
+the requested indices; missing indices are skipped.
+
+Field projection:
+- ``fields=None`` returns the same shape as ``get_block``
+- otherwise only the listed fields are loaded; ``block_index`` is always
+  included. Names may be ``blocks`` columns or the related fields
+  ``keywords``, ``tags``, ``metadata`` and ``embedding`` (which also sets
+  ``embedding_model``). Related tables that are not requested are not read.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RELATED_FIELDS = ("keywords", "tags", "metadata", "embedding")
+
+# SQLite builds before 3.32 cap bound parameters at 999
+_CHUNK_SIZE = 900
+
+
+def chunked(values: Sequence) -> Iterable[Sequence]:
+    for start in range(0, len(values), _CHUNK_SIZE):
+        yield values[start:start + _CHUNK_SIZE]
+
+
+def _select_in(cursor, sql: str, indices: Sequence[int]) -> List[tuple]:
+    rows: List[tuple] = []
+    for chunk in chunked(indices):
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(sql.format(placeholders=placeholders), tuple(chunk))
+        rows.extend(cursor.fetchall())
+    return rows
+
+
+def _block_columns(cursor) -> List[str]:
+    cursor.execute("PRAGMA table_info(blocks)")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def fetch_blocks(
+    cursor,
+    indices: Iterable[int],
+    fields: Optional[Iterable[str]] = None,
+    parse_branch_json: bool = False,
+) -> List[Dict[str, Any]]:
+    """Load blocks for ``indices`` in a fixed number of queries.
+
+    Args:
+        cursor: cursor on the memory database
+        indices: block indices; duplicates are returned once, in first-seen order
+        fields: optional projection (see module docstring)
+        parse_branch_json: decode the JSON ``after``/``xref`` columns the way
+            the legacy ``DatabaseManager.get_block`` does
+
+    Returns:
+        Block dicts in request order
+    """
+    order: List[int] = []
+    seen = set()
+    for index in indices:
+        if index is None:
+            continue
+        index = int(index)
+        if index not in seen:
+            seen.add(index)
+            order.append(index)
+    if not order:
+        return []
+
+    if fields is None:
+        wanted = set(RELATED_FIELDS)
+        column_sql = "*"
+    else:
+        requested = set(fields)
+        wanted = requested & set(RELATED_FIELDS)
+        # Only real column names reach the SQL text
+        columns = [c for c in _block_columns(cursor) if c in requested or c == "block_index"]
+        column_sql = ", ".join(f'"{c}"' for c in columns)
+
+    by_index: Dict[int, Dict[str, Any]] = {}
+    for chunk in chunked(order):
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(
+            f"SELECT {column_sql} FROM blocks WHERE block_index IN ({placeholders})",
+            tuple(chunk),
+        )
+        names = [d[0] for d in cursor.description]
+        for row in cursor.fetchall():
+            block = dict(zip(names, tuple(row)))
+            by_index[block["block_index"]] = block
+    if not by_index:
+        return []
+
+    found = [index for index in order if index in by_index]
+
+    if parse_branch_json:
+        for block in by_index.values():
+            for key in ("after", "xref"):
+                if key in block:
+                    try:
+                        block[key] = json.loads(block.get(key) or "[]")
+                    except (TypeError, ValueError):
+                        block[key] = []
+
+    if "keywords" in wanted:
+        for block in by_index.values():
+            block["keywords"] = []
+        rows = _select_in(
+            cursor,
+            "SELECT block_index, keyword FROM block_keywords WHERE block_index IN ({placeholders}) ORDER BY id",
+            found,
+        )
+        for block_index, keyword in rows:
+            by_index[block_index]["keywords"].append(keyword)
+
+    if "tags" in wanted:
+        for block in by_index.values():
+            block["tags"] = []
+        rows = _select_in(
+            cursor,
+            "SELECT block_index, tag FROM block_tags WHERE block_index IN ({placeholders}) ORDER BY id",
+            found,
+        )
+        for block_index, tag in rows:
+            by_index[block_index]["tags"].append(tag)
+
+    if "metadata" in wanted:
+        for block in by_index.values():
+            block["metadata"] = {}
+        rows = _select_in(
+            cursor,
+            "SELECT block_index, metadata FROM block_metadata WHERE block_index IN ({placeholders})",
+            found,
+        )
+        for block_index, metadata in rows:
+            if metadata:
+                try:
+                    by_index[block_index]["metadata"] = json.loads(metadata)
+                except ValueError:
+                    logger.debug(f"Invalid metadata JSON for block {block_index}")
+
+    if "embedding" in wanted:
+        rows = _select_in(
+            cursor,
+            "SELECT block_index, embedding, embedding_dim, embedding_model "
+            "FROM block_embeddings WHERE block_index IN ({placeholders})",
+            found,
+        )
+        for block_index, blob, dim, model in rows:
+            if blob is None:
+                continue
+            vector = np.frombuffer(blob, dtype=np.float32)
+            if dim:
+                vector = vector[:dim]
+            block = by_index[block_index]
+            block["embedding"] = vector.tolist()
+            block["embedding_model"] = model
+
+    return [by_index[index] for index in found]
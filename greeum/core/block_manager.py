@@ -3,10 +3,12 @@ import json
 import hashlib
 import datetime
 import sqlite3
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 from pathlib import Path
 from .database_manager import DatabaseManager
+from .query_cache import get_query_cache, query_key
 # from .causal_reasoning import CausalRelationshipManager  # Removed for v3.0.0 simplification
 import logging
 
@@ -35,15 +37,21 @@ class BlockManager:
         # v3.0.0: GraphIndex 통합 - 고성능 그래프 기반 검색
         try:
             from ..graph.index import GraphIndex
+            from .graph_index_bootstrap import GraphIndexBootstrap
             self.graph_index = GraphIndex()
+            # v5.4: 페이지 단위 부트스트랩 (백그라운드, 준비 전에는 BFS 폴백)
+            self._graph_lock = threading.RLock()
+            self.graph_bootstrap = GraphIndexBootstrap(self.db_manager, self.graph_index, lock=self._graph_lock)
             self._auto_bootstrap_graph_index()
             logger.info("GraphIndex integrated successfully")
         except ImportError as e:
             logger.warning(f"GraphIndex not available: {e}")
             self.graph_index = None
+            self.graph_bootstrap = None
         except Exception as e:
             logger.error(f"GraphIndex initialization failed: {e}")
             self.graph_index = None
+            self.graph_bootstrap = None
         
         # v3.0.0: AssociationNetwork 통합 - 연상 기억 네트워크
         try:
@@ -112,6 +120,78 @@ class BlockManager:
             'new_blocks': 0
         }
 
+        # v5.4: 검색 엔진은 첫 검색 시 한 번만 빌드하고 쓰기 경로에서 증분 갱신
+        self._search_engine = None
+        self._search_engine_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # v5.4: Persistent search engine
+    # ------------------------------------------------------------------
+    def get_search_engine(self):
+        """Return the shared DFSSearchEngine, building its indexes on first use.
+
+        The engine reuses this manager's BranchIndexManager and is kept current
+        by the write path, so callers (MCP tools, adapters, metrics) should use
+        this instead of constructing their own ``DFSSearchEngine``.
+        """
+        if self._search_engine is None:
+            with self._search_engine_lock:
+                if self._search_engine is None:
+                    from .dfs_search import DFSSearchEngine
+                    self._search_engine = DFSSearchEngine(
+                        self.db_manager,
+                        branch_index_manager=self.branch_index_manager,
+                    )
+        return self._search_engine
+
+    def _notify_search_index(self, block: Optional[Dict[str, Any]] = None,
+                             block_index: Optional[int] = None,
+                             update_centroids: bool = True) -> None:
+        """Push a write to the search engine indexes (no-op until first search).
+
+        ``update_centroids=False`` when the caller already folded ``block``
+        into the branch centroids inside its write transaction.
+        """
+        # 모든 쓰기(추가/지식 갱신/머지/롤백)가 캐시된 검색 결과를 무효화
+        query_cache = get_query_cache(self.db_manager)
+        if query_cache is not None:
+            query_cache.bump()
+
+        graph_cache = getattr(self.db_manager, "graph_cache", None)
+        if graph_cache is not None:
+            if block is not None:
+                graph_cache.invalidate_block(block)
+            elif block_index is not None:
+                graph_cache.invalidate(block_index=block_index)
+            else:
+                graph_cache.clear()
+
+        centroids = getattr(self.db_manager, "branch_centroids", None)
+        if centroids is not None and update_centroids:
+            try:
+                if block is not None:
+                    centroids.add(block.get("root"), block.get("block_index"), block.get("embedding"))
+                elif block_index is None:
+                    # 롤백/머지 등 범위를 알 수 없는 변경: 저장된 누적합에서 다시 적재
+                    centroids.invalidate()
+            except Exception as e:
+                logger.debug(f"Branch centroid update failed: {e}")
+                centroids.invalidate()
+
+        engine = self._search_engine
+        if engine is None:
+            return
+        try:
+            if block is not None:
+                engine.index_block(block)
+            elif block_index is not None:
+                engine.refresh_block(block_index)
+            else:
+                engine.invalidate_branches()
+        except Exception as e:
+            # 인덱스는 다음 검색 시 high-water mark 동기화로 복구됨
+            logger.debug(f"Search index update failed: {e}")
+
     # ------------------------------------------------------------------
     # v4.0: Time-based Insertion & Knowledge Update
     # ------------------------------------------------------------------
@@ -170,7 +250,8 @@ class BlockManager:
         new_embedding: Optional[List[float]],
         new_importance: float,
         new_keywords: List[str] = None,
-        new_tags: List[str] = None
+        new_tags: List[str] = None,
+        commit: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         Update existing block with new knowledge (knowledge evolution).
@@ -194,6 +275,7 @@ class BlockManager:
             new_importance: New importance score
             new_keywords: New keywords to add
             new_tags: New tags to add
+            commit: Commit immediately (False when part of a batch transaction)
 
         Returns:
             Updated block dict if successful, None otherwise
@@ -209,7 +291,7 @@ class BlockManager:
 
             # Get current block data from blocks table
             cursor.execute("""
-                SELECT context, importance, visit_count, last_seen_at
+                SELECT context, importance, visit_count, last_seen_at, root, hash
                 FROM blocks WHERE block_index = ?
             """, (block_index,))
 
@@ -217,7 +299,8 @@ class BlockManager:
             if not row:
                 return None
 
-            current_context, current_importance, visit_count, last_seen_at = row
+            current_context, current_importance, visit_count, last_seen_at, branch_root, block_hash = row
+            centroid_update = None
 
             # Get current keywords from block_keywords table
             cursor.execute(
@@ -293,6 +376,10 @@ class BlockManager:
                             UPDATE block_embeddings SET embedding = ?
                             WHERE block_index = ?
                         """, (averaged_emb.tobytes(), block_index))
+                        store = getattr(self.db_manager, 'embedding_store', None)
+                        if store is not None:
+                            store.upsert(block_index, averaged_emb)
+                        centroid_update = (current_emb, averaged_emb)
 
                 except Exception as emb_err:
                     logger.debug(f"Embedding update failed: {emb_err}")
@@ -332,7 +419,15 @@ class BlockManager:
                     (block_index, json.dumps(metadata, ensure_ascii=False))
                 )
 
-            self.db_manager.conn.commit()
+            # v5.4: 브랜치 중심 벡터는 임베딩 차이만큼 O(dim) 갱신
+            centroids = getattr(self.db_manager, 'branch_centroids', None)
+            if centroids is not None and centroid_update is not None:
+                centroids.replace(branch_root, block_index, *centroid_update, conn=self.db_manager.conn)
+
+            if commit:
+                self.db_manager.conn.commit()
+                self._notify_search_index(block_index=block_index)
+            # commit=False: the caller notifies after its own commit
 
             # Update metrics
             self.metrics['knowledge_updates'] += 1
@@ -348,7 +443,8 @@ class BlockManager:
                 'importance': updated_importance,
                 'keywords': merged_keywords,
                 'tags': merged_tags,
-                'hash': existing_block.get('hash'),
+                # Batch targets arrive as {'block_index': ...} only
+                'hash': existing_block.get('hash') or block_hash,
                 '_updated': True,
                 '_knowledge_update': True
             }
@@ -759,36 +855,37 @@ class BlockManager:
                         recent_block_idx = recent_block.get('block_index')
                         
                         # 해당 블록의 노드 찾기
-                        for other_node in self.association_network.nodes.values():
-                            if other_node.memory_id == recent_block_idx:
-                                # 키워드 유사도 계산
-                                recent_keywords = set(recent_block.get('keywords', []))
-                                current_keywords = set(keywords)
-                                
-                                # 교집합이 있거나 컨텍스트에 공통 단어가 있으면
-                                common_keywords = recent_keywords & current_keywords
-                                if common_keywords:  # 키워드 교집합
-                                    similarity = len(common_keywords) / max(len(recent_keywords | current_keywords), 1)
-                                    if similarity > 0.1:  # 낮은 임계값
-                                        assoc = self.association_network.create_association(
-                                            source_node_id=node.node_id,
-                                            target_node_id=other_node.node_id,
-                                            association_type='semantic',
-                                            strength=max(0.3, similarity)  # 최소 0.3
-                                        )
-                                        logger.info(f"Created semantic association: {node.node_id} -> {other_node.node_id} (strength: {similarity:.2f})")
-                                
-                                # 시간적 근접성 (최근 10개 블록 내)
-                                else:
-                                    # 시간적으로 가까운 블록들은 약한 연결
-                                    assoc = self.association_network.create_association(
-                                        source_node_id=node.node_id,
-                                        target_node_id=other_node.node_id,
-                                        association_type='temporal',
-                                        strength=0.2
-                                    )
-                                    logger.info(f"Created temporal association: {node.node_id} -> {other_node.node_id}")
-                                break
+                        other_node = self.association_network.get_node_by_memory_id(recent_block_idx)
+                        if other_node is None:
+                            continue
+                        
+                        # 키워드 유사도 계산
+                        recent_keywords = set(recent_block.get('keywords', []))
+                        current_keywords = set(keywords)
+                        
+                        # 교집합이 있거나 컨텍스트에 공통 단어가 있으면
+                        common_keywords = recent_keywords & current_keywords
+                        if common_keywords:  # 키워드 교집합
+                            similarity = len(common_keywords) / max(len(recent_keywords | current_keywords), 1)
+                            if similarity > 0.1:  # 낮은 임계값
+                                assoc = self.association_network.create_association(
+                                    source_node_id=node.node_id,
+                                    target_node_id=other_node.node_id,
+                                    association_type='semantic',
+                                    strength=max(0.3, similarity)  # 최소 0.3
+                                )
+                                logger.info(f"Created semantic association: {node.node_id} -> {other_node.node_id} (strength: {similarity:.2f})")
+                        
+                        # 시간적 근접성 (최근 10개 블록 내)
+                        else:
+                            # 시간적으로 가까운 블록들은 약한 연결
+                            assoc = self.association_network.create_association(
+                                source_node_id=node.node_id,
+                                target_node_id=other_node.node_id,
+                                association_type='temporal',
+                                strength=0.2
+                            )
+                            logger.info(f"Created temporal association: {node.node_id} -> {other_node.node_id}")
                 
                 except Exception as e:
                     logger.warning(f"Failed to update association network: {e}")
@@ -824,6 +921,7 @@ class BlockManager:
             
             # v4.0: Update metrics for new block creation
             self.metrics['new_blocks'] += 1
+            self._notify_search_index(block=block_to_store_in_db)
 
             # v5.3.0: Queue for incremental consolidation (non-blocking, best-effort)
             try:
@@ -843,6 +941,360 @@ class BlockManager:
             logger.error(f"BlockManager: Error adding block to DB - {e}", exc_info=True)
             return None
     
+    # ------------------------------------------------------------------
+    # v5.4: Bulk ingestion
+    # ------------------------------------------------------------------
+    def add_blocks(self, items: List[Dict[str, Any]],
+                   slot: Optional[str] = None,
+                   embedding_model: Optional[str] = 'default') -> List[Dict[str, Any]]:
+        """
+        여러 메모리를 한 번에 추가 (대량 가져오기용)
+
+        ``add_block``을 반복 호출하는 대신 임베딩을 배치 인코딩하고, 지식 갱신
+        판정을 기존 임베딩 행렬과의 행렬 곱 한 번으로 처리한 뒤, 모든 쓰기를
+        executemany로 한 트랜잭션에 기록합니다.
+
+        배치의 새 블록들은 순서대로 하나의 체인을 이룹니다: 첫 블록만 브랜치
+        배치(branch-aware storage / STM 헤드)를 거치고, 이후 블록은 직전 블록
+        뒤에 연결됩니다. 블록별 연상 네트워크 노드와 near-anchor 링크는 이
+        경로에서 생성하지 않습니다.
+
+        Args:
+            items: ``{"context" (또는 "content"), "keywords", "tags",
+                "embedding", "importance", "metadata", "timestamp"}`` 목록.
+                context 외에는 선택 사항이며, 없는 키워드는 추출하고 없는
+                임베딩은 한 번의 배치로 인코딩합니다.
+            slot: STM 슬롯 (A/B/C)
+            embedding_model: 임베딩 모델 이름
+
+        Returns:
+            입력 순서대로의 항목별 결과. ``status``는 ``"insert"``,
+            ``"knowledge_update"`` 또는 ``"failed"``입니다.
+
+        Raises:
+            ValueError: context가 비어 있는 항목이 있을 때
+        """
+        if not items:
+            return []
+
+        # 모델 추론은 쓰기 직렬화 밖에서 수행
+        prepared = self._prepare_batch_items(items)
+
+        if hasattr(self.db_manager, "run_serialized"):
+            outcome = self.db_manager.run_serialized(
+                lambda: self._add_blocks_internal(prepared, slot, embedding_model)
+            )
+        else:
+            outcome = self._add_blocks_internal(prepared, slot, embedding_model)
+
+        head_update = outcome.get('head_update')
+        if head_update and self.stm_manager:
+            slot_name, head_hash, head_context, head_embedding = head_update
+            try:
+                self.stm_manager.update_head(
+                    slot_name,
+                    head_hash,
+                    context=head_context,
+                    embedding=head_embedding,
+                )
+            except Exception as slot_error:
+                logger.warning(f"STM head update failed for slot {slot_name}: {slot_error}")
+        return outcome['results']
+
+    def _prepare_batch_items(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Normalize batch items and fill in missing keywords and embeddings."""
+        prepared = []
+        missing = []
+        for position, item in enumerate(items):
+            context = item.get('context') or item.get('content')
+            if not context or not str(context).strip():
+                raise ValueError(f"Batch item {position} has no content")
+            keywords = item.get('keywords')
+            if keywords is None:
+                from ..text_utils import extract_keywords_from_text
+                keywords = extract_keywords_from_text(context)
+            embedding = item.get('embedding')
+            if embedding is None or len(embedding) == 0:
+                embedding = None
+                missing.append(position)
+            prepared.append({
+                'context': context,
+                'keywords': list(keywords),
+                'tags': list(item.get('tags') or []),
+                'embedding': embedding,
+                'importance': float(item.get('importance', 0.5)),
+                'metadata': item.get('metadata') or {},
+                'timestamp': item.get('timestamp'),
+            })
+
+        if missing:
+            from ..embedding_models import embedding_registry
+            matrix = embedding_registry.batch_encode(
+                [prepared[position]['context'] for position in missing], as_numpy=True
+            )
+            for position, vector in zip(missing, matrix):
+                prepared[position]['embedding'] = vector
+
+        for entry in prepared:
+            entry['embedding'] = np.asarray(entry['embedding'], dtype=np.float32).reshape(-1)
+        return prepared
+
+    def _plan_knowledge_updates(self, prepared: List[Dict[str, Any]],
+                                conn) -> List[Optional[Tuple[str, int, float]]]:
+        """Decide per item: ``None`` (insert) or ``(source, target, similarity)``.
+
+        ``source`` is ``"existing"`` (``target`` is a stored block index) or
+        ``"batch"`` (``target`` is the position of an earlier item in this batch).
+        """
+        plan: List[Optional[Tuple[str, int, float]]] = [None] * len(prepared)
+        enable_knowledge_update = os.environ.get(
+            "GREEUM_ENABLE_KNOWLEDGE_UPDATE", "true"
+        ).lower() in ("true", "1", "yes")
+        if not enable_knowledge_update:
+            return plan
+
+        vectors = [entry['embedding'] for entry in prepared]
+        store = getattr(self.db_manager, 'embedding_store', None)
+        if store is not None:
+            try:
+                matches = store.best_matches(conn, vectors, min_similarity=KNOWLEDGE_UPDATE_THRESHOLD)
+            except Exception as e:
+                logger.debug(f"Batch similarity check failed: {e}")
+                matches = [None] * len(prepared)
+            for position, match in enumerate(matches):
+                if match is not None:
+                    plan[position] = ('existing', match[0], match[1])
+
+        # 배치 내부 중복: 앞서 삽입될 항목과 비교 (차원별 정규화 행렬)
+        inserted: Dict[int, Tuple[List[int], List[np.ndarray]]] = {}
+        for position, vector in enumerate(vectors):
+            if plan[position] is not None:
+                continue
+            norm = float(np.linalg.norm(vector))
+            if norm == 0.0 or not np.isfinite(norm):
+                continue
+            unit = vector / norm
+            positions, rows = inserted.setdefault(int(vector.shape[0]), ([], []))
+            if rows:
+                scores = np.vstack(rows) @ unit
+                best = int(np.argmax(scores))
+                if scores[best] >= KNOWLEDGE_UPDATE_THRESHOLD:
+                    plan[position] = ('batch', positions[best], float(scores[best]))
+                    continue
+            positions.append(position)
+            rows.append(unit)
+        return plan
+
+    def _add_blocks_internal(self, prepared: List[Dict[str, Any]],
+                             slot: Optional[str],
+                             embedding_model: Optional[str]) -> Dict[str, Any]:
+        import time
+        import uuid
+
+        conn = getattr(self.db_manager, "conn", None)
+        if conn is None:
+            raise RuntimeError("Database connection is not available for block write")
+
+        if self.stm_manager is None:
+            from .stm_manager import STMManager
+            self.stm_manager = STMManager(self.db_manager)
+        stm = self.stm_manager
+
+        plan = self._plan_knowledge_updates(prepared, conn)
+        insert_positions = [position for position, target in enumerate(plan) if target is None]
+
+        # 배치 첫 블록의 배치 위치 결정 (add_block과 동일한 규칙)
+        root_id = None
+        before_id = None
+        head_block = False
+        if insert_positions:
+            first = prepared[insert_positions[0]]
+            if self.branch_aware_storage:
+                try:
+                    branch_info = self.branch_aware_storage.store_with_branch_awareness(
+                        content=first['context'],
+                        embedding=first['embedding'],
+                        importance=first['importance'],
+                    )
+                    if branch_info and branch_info.get('branch_root'):
+                        root_id = branch_info['branch_root']
+                        before_id = branch_info.get('before_hash') or None
+                except Exception as e:
+                    logger.warning(f"Branch-aware storage failed: {e}, falling back to default")
+
+            head_id = stm.get_active_head(slot)
+            if head_id and not before_id:
+                cursor = conn.cursor()
+                cursor.execute("SELECT root, hash FROM blocks WHERE hash = ?", (head_id,))
+                head_info = cursor.fetchone()
+                if head_info:
+                    head_block = True
+                    root_id = root_id or head_info[0] or head_id
+                    before_id = head_info[1]
+
+        last_block_info = self.db_manager.get_last_block_info()
+        if last_block_info:
+            next_index = last_block_info.get('block_index', -1) + 1
+            prev_h = last_block_info.get('hash', '')
+        else:
+            next_index = 0
+            prev_h = ''
+
+        slot = slot or 'A'
+        root_id = root_id or str(uuid.uuid4())
+        blocks: List[Dict[str, Any]] = []
+        block_of: Dict[int, Dict[str, Any]] = {}
+        parent_hash = before_id
+        for position in insert_positions:
+            entry = prepared[position]
+            timestamp = entry['timestamp'] or datetime.datetime.now().isoformat()
+            current_hash = self._compute_hash({
+                "block_index": next_index,
+                "timestamp": timestamp,
+                "context": entry['context'],
+                "importance": entry['importance'],
+                "prev_hash": prev_h,
+            })
+            now = time.time()
+            block = {
+                "block_index": next_index,
+                "timestamp": timestamp,
+                "context": entry['context'],
+                "keywords": entry['keywords'],
+                "tags": entry['tags'],
+                "embedding": entry['embedding'].tolist(),
+                "importance": entry['importance'],
+                "hash": current_hash,
+                "prev_hash": prev_h,
+                "metadata": self._enhance_metadata_with_actants(entry['context'], entry['metadata']),
+                "embedding_model": embedding_model,
+                "links": entry['metadata'].get('links', {}),
+                "root": root_id,
+                "before": parent_hash,
+                "after": [],
+                "xref": [],
+                "branch_depth": 1 if (blocks or head_block) else 0,
+                "visit_count": 0,
+                "last_seen_at": now,
+                "slot": slot,
+                "branch_similarity": 0.0,
+                "branch_created_at": now,
+            }
+            if blocks:
+                blocks[-1]["after"] = [current_hash]
+            blocks.append(block)
+            block_of[position] = block
+            parent_hash = current_hash
+            prev_h = current_hash
+            next_index += 1
+
+        results: List[Dict[str, Any]] = [None] * len(prepared)
+        updated_indices: List[int] = []
+        started_transaction = not conn.in_transaction
+        if started_transaction:
+            conn.execute("BEGIN TRANSACTION")
+        try:
+            self.db_manager.add_blocks(blocks, connection=conn)
+
+            if blocks and before_id:
+                cursor = conn.cursor()
+                cursor.execute("SELECT after FROM blocks WHERE hash = ?", (before_id,))
+                row = cursor.fetchone()
+                if row:
+                    after_list = json.loads(row[0] or '[]')
+                    after_list.append(blocks[0]['hash'])
+                    cursor.execute(
+                        "UPDATE blocks SET after = ? WHERE hash = ?",
+                        (json.dumps(after_list), before_id)
+                    )
+
+            # v5.4: 배치 전체를 브랜치 중심 벡터에 한 번에 반영 (같은 트랜잭션)
+            centroids = getattr(self.db_manager, 'branch_centroids', None)
+            if centroids is not None and blocks:
+                try:
+                    centroids.add_many(
+                        [(block['root'], block['block_index'], block['embedding']) for block in blocks],
+                        conn=conn,
+                    )
+                except Exception as e:
+                    logger.debug(f"Branch centroid update failed: {e}")
+                    centroids.invalidate()
+
+            for position, block in block_of.items():
+                results[position] = {
+                    'status': 'insert',
+                    'block_index': block['block_index'],
+                    'hash': block['hash'],
+                    'root': block['root'],
+                    'slot': slot,
+                }
+
+            for position, target in enumerate(plan):
+                if target is None:
+                    continue
+                source, target_id, similarity = target
+                entry = prepared[position]
+                if source == 'batch':
+                    target_block = block_of[target_id]
+                else:
+                    target_block = {'block_index': target_id}
+                updated = self._update_existing_block(
+                    target_block,
+                    new_content=entry['context'],
+                    new_embedding=entry['embedding'],
+                    new_importance=entry['importance'],
+                    new_keywords=entry['keywords'],
+                    new_tags=entry['tags'],
+                    commit=False,
+                )
+                if updated is None:
+                    results[position] = {'status': 'failed', 'error': 'knowledge update failed'}
+                    continue
+                updated_indices.append(updated['block_index'])
+                results[position] = {
+                    'status': 'knowledge_update',
+                    'block_index': updated['block_index'],
+                    'hash': updated['hash'],
+                    'similarity': similarity,
+                    'source': source,
+                }
+
+            try:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO consolidation_queue (block_index, queued_at, status) VALUES (?, ?, 'pending')",
+                    [(block['block_index'], block['timestamp']) for block in blocks],
+                )
+            except sqlite3.OperationalError:
+                pass  # Table may not exist yet if consolidator has never run
+
+            if started_transaction:
+                conn.commit()
+        except Exception as e:
+            if started_transaction and conn.in_transaction:
+                conn.rollback()
+            # 롤백된 행이 메모리 인덱스에 남지 않도록 초기화
+            store = getattr(self.db_manager, 'embedding_store', None)
+            if store is not None:
+                store.invalidate()
+            self._notify_search_index()
+            logger.error(f"BlockManager: batch write of {len(prepared)} items failed - {e}", exc_info=True)
+            raise
+
+        self.metrics['new_blocks'] += len(blocks)
+        for block in blocks:
+            self._notify_search_index(block=block, update_centroids=False)
+        for block_index in dict.fromkeys(updated_indices):
+            self._notify_search_index(block_index=block_index)
+
+        head_update = None
+        if blocks:
+            last = blocks[-1]
+            head_update = (slot, last['hash'], last['context'], last['embedding'])
+        logger.info(
+            f"Batch added {len(blocks)} blocks, {len(prepared) - len(blocks)} knowledge updates"
+        )
+        return {'results': results, 'head_update': head_update}
+
     def get_blocks(self, start_idx: Optional[int] = None, end_idx: Optional[int] = None,
                      limit: int = 100, offset: int = 0, 
                      sort_by: str = 'block_index', order: str = 'asc') -> List[Dict[str, Any]]:
@@ -1024,7 +1476,13 @@ class BlockManager:
         """Search memories by query string (converts to keywords and semantic search)"""
         # Convert query to keywords
         keywords = [word.strip() for word in query.split() if word.strip()]
-        return self.search_by_keywords(keywords, limit)
+        cache = get_query_cache(self.db_manager)
+        if cache is None:
+            return self.search_by_keywords(keywords, limit)
+        return cache.get_or_compute(
+            query_key("block_manager.search", query, limit=limit),
+            lambda: self.search_by_keywords(keywords, limit),
+        )
     
     def search_by_keywords(self, keywords: List[str], limit: int = 10) -> List[Dict[str, Any]]:
         """키워드로 블록 검색 (DatabaseManager 사용)"""
@@ -1043,10 +1501,9 @@ class BlockManager:
                 for block in initial_results[:3]:  # 상위 3개만 시드로 사용
                     block_idx = block.get('block_index')
                     # 해당 블록의 association node 찾기
-                    for node in self.association_network.nodes.values():
-                        if node.memory_id == block_idx:
-                            seed_nodes.append(node.node_id)
-                            break
+                    node = self.association_network.get_node_by_memory_id(block_idx)
+                    if node is not None:
+                        seed_nodes.append(node.node_id)
                 
                 if seed_nodes:
                     # 활성화 전파
@@ -1137,6 +1594,7 @@ class BlockManager:
                     logger.info(f"Auto-merge triggered between slots {current_slot} and {other_slot}: {result.reason}")
                     checkpoint = self.merge_engine.apply_merge(current_slot, other_slot)
                     self.merge_checkpoints.append(checkpoint)
+                    self._notify_search_index()
                     
             except Exception as e:
                 logger.error(f"Auto-merge evaluation failed: {e}")
@@ -1327,7 +1785,22 @@ class BlockManager:
         """
         from datetime import datetime
         import time
-        from .dfs_search import DFSSearchEngine
+
+        # v5.4: 쓰기 세대 기반 결과 캐시 (슬롯 지정 시 STM 상태에 따라 달라지므로 제외)
+        cache = get_query_cache(self.db_manager)
+        cache_key = None
+        if cache is not None and options.get('slot') is None:
+            cache_key = query_key(
+                "block_manager.search_with_slots", query,
+                limit=limit, use_slots=use_slots, entry=entry,
+                include_relationships=include_relationships,
+                options=sorted(options.items()),
+            )
+            cache_generation = cache.generation
+            cached = cache.get(cache_key)
+            if cached is not None:
+                cached["meta"]["cache_hit"] = True
+                return cached
         
         search_start_time = datetime.utcnow()
         metrics_start_time = time.time()
@@ -1358,7 +1831,7 @@ class BlockManager:
             pass
         
         # Phase 1: DFS Local-First Search with entry priority
-        dfs_engine = DFSSearchEngine(self.db_manager)
+        dfs_engine = self.get_search_engine()
         results, search_meta = dfs_engine.search_with_dfs(
             query=query,
             query_embedding=query_embedding,
@@ -1420,10 +1893,14 @@ class BlockManager:
             pass
 
         # Return with standardized metadata for API consistency
-        return {
+        response = {
             "items": results,
             "meta": search_meta
         }
+        if cache_key is not None:
+            search_meta["cache_hit"] = False
+            cache.put(cache_key, response, cache_generation)
+        return response
         
         # Legacy code below (kept for compatibility but not executed)
         all_results = []
@@ -1640,7 +2117,7 @@ class BlockManager:
             그래프 탐색으로 찾은 블록 리스트
         """
         # GraphIndex를 사용할 수 있으면 beam_search 사용 (v3.0.0)
-        if self.graph_index and hasattr(self.graph_index, 'beam_search'):
+        if self.graph_index and self.graph_ready and hasattr(self.graph_index, 'beam_search'):
             try:
                 # beam_search를 위한 목표 함수
                 def is_goal(node_id: str) -> bool:
@@ -1952,7 +2429,7 @@ class BlockManager:
         if total_writes > 0:
             knowledge_update_ratio = self.metrics.get('knowledge_updates', 0) / total_writes
 
-        return {
+        metrics = {
             'total_searches': self.metrics['total_searches'],
             'graph_searches': self.metrics['graph_searches'],
             'graph_hits': self.metrics['graph_hits'],
@@ -1964,6 +2441,15 @@ class BlockManager:
             'knowledge_updates': self.metrics.get('knowledge_updates', 0),
             'knowledge_update_ratio': round(knowledge_update_ratio, 3)
         }
+
+        # v5.4: Search index build cost and staleness (only once the engine exists)
+        if self._search_engine is not None:
+            try:
+                metrics['search_index'] = self._search_engine.get_metrics().get('index', {})
+            except Exception as e:
+                logger.debug(f"Search engine metrics unavailable: {e}")
+
+        return metrics
         
     def reset_metrics(self):
         """메트릭 초기화"""
@@ -1983,66 +2469,40 @@ class BlockManager:
     
     # GraphIndex 관련 메서드들 (v3.0.0)
     
+    @property
+    def graph_ready(self) -> bool:
+        """GraphIndex 부트스트랩 완료 여부 (검색이 그래프에 의존하기 전에 확인)"""
+        bootstrap = getattr(self, 'graph_bootstrap', None)
+        return bootstrap is not None and bootstrap.ready.is_set()
+    
     def _auto_bootstrap_graph_index(self):
-        """첫 실행 시 자동 부트스트랩"""
+        """생성 시 부트스트랩 시작
+
+        GREEUM_GRAPH_BOOTSTRAP: background (기본) | sync | off
+        """
         if not self.graph_index:
             return
         
-        try:
-            # 기존 블록이 있는지 확인
-            blocks = self.get_blocks(limit=1)
-            if blocks and len(self.graph_index.adj) == 0:
-                # GraphIndex가 비어있으면 부트스트랩
-                self.bootstrap_graph_index()
-        except Exception as e:
-            logger.debug(f"Auto-bootstrap skipped: {e}")
+        mode = os.getenv("GREEUM_GRAPH_BOOTSTRAP", "background").lower()
+        if mode == "off":
+            return
+        if mode == "sync" or not self.graph_bootstrap.can_run_in_background:
+            self.graph_bootstrap.run()
+        else:
+            self.graph_bootstrap.start()
     
-    def bootstrap_graph_index(self):
-        """기존 블록들로부터 GraphIndex를 부트스트랩"""
+    def bootstrap_graph_index(self, resume: bool = True, progress_callback=None) -> Optional[Dict[str, Any]]:
+        """기존 블록들로부터 GraphIndex를 부트스트랩 (키셋 페이징, 체크포인트에서 재개)
+
+        Returns:
+            진행 상황 dict (state, processed, pages, total, last_block_index, ...)
+        """
         if not self.graph_index:
             logger.warning("GraphIndex not available")
-            return
+            return None
         
         logger.info("Bootstrapping GraphIndex from existing blocks...")
-        
-        # 모든 블록 가져오기
-        blocks = self.get_blocks(limit=10000)  # 실제로는 페이징 필요
-        
-        for block in blocks:
-            block_idx = block.get('block_index')
-            if block_idx is None:
-                continue
-            
-            node_id = str(block_idx)
-            
-            # 노드 추가
-            if node_id not in self.graph_index.adj:
-                self.graph_index.adj[node_id] = []
-            
-            # 메타데이터에서 링크 정보 추출
-            metadata = block.get('metadata', {})
-            links = metadata.get('links', {})
-            neighbors = links.get('neighbors', [])
-            
-            for neighbor in neighbors:
-                if isinstance(neighbor, dict):
-                    neighbor_id = str(neighbor.get('id'))
-                    weight = neighbor.get('weight', 1.0)
-                else:
-                    neighbor_id = str(neighbor)
-                    weight = 1.0
-                
-                # 엣지 추가 (중복 체크)
-                existing = {n[0] for n in self.graph_index.adj[node_id]}
-                if neighbor_id not in existing:
-                    self.graph_index.adj[node_id].append((neighbor_id, weight))
-        
-        # 모든 노드의 이웃 정렬 및 제한
-        for node_id in self.graph_index.adj:
-            self.graph_index.adj[node_id].sort(key=lambda x: x[1], reverse=True)
-            self.graph_index.adj[node_id] = self.graph_index.adj[node_id][:self.graph_index.kmax]
-        
-        logger.info(f"GraphIndex bootstrapped with {len(self.graph_index.adj)} nodes")
+        return self.graph_bootstrap.run(resume=resume, progress_callback=progress_callback)
     
     def bootstrap_and_save_graph(self, output_path):
         """GraphIndex를 부트스트랩하고 스냅샷 저장"""
@@ -2078,32 +2538,29 @@ class BlockManager:
         
         try:
             node_id = str(block_index)
+            with self._graph_lock:
+                row = list(self.graph_index.adj.get(node_id, []))
+                
+                # 기존 이웃들 가져오기
+                existing_neighbors = {n[0] for n in row}
+                
+                # 새 이웃들 추가 (가중치 1.0)
+                for neighbor_idx in neighbors:
+                    neighbor_id = str(neighbor_idx)
+                    if neighbor_id not in existing_neighbors:
+                        row.append((neighbor_id, 1.0))
+                        
+                        # 양방향 엣지 (이웃에도 추가)
+                        neighbor_row = list(self.graph_index.adj.get(neighbor_id, []))
+                        if node_id not in {n[0] for n in neighbor_row}:
+                            neighbor_row.append((node_id, 1.0))
+                            self.graph_index.set_neighbors(neighbor_id, neighbor_row)
+                
+                # 가중치 기준 정렬 및 제한
+                self.graph_index.set_neighbors(node_id, row)
             
-            # 노드가 없으면 추가
-            if node_id not in self.graph_index.adj:
-                self.graph_index.adj[node_id] = []
-            
-            # 기존 이웃들 가져오기
-            existing_neighbors = {n[0] for n in self.graph_index.adj[node_id]}
-            
-            # 새 이웃들 추가
-            for neighbor_idx in neighbors:
-                neighbor_id = str(neighbor_idx)
-                if neighbor_id not in existing_neighbors:
-                    # 가중치 1.0으로 추가
-                    self.graph_index.adj[node_id].append((neighbor_id, 1.0))
-                    
-                    # 양방향 엣지 (이웃에도 추가)
-                    if neighbor_id not in self.graph_index.adj:
-                        self.graph_index.adj[neighbor_id] = []
-                    
-                    neighbor_existing = {n[0] for n in self.graph_index.adj[neighbor_id]}
-                    if node_id not in neighbor_existing:
-                        self.graph_index.adj[neighbor_id].append((node_id, 1.0))
-            
-            # 가중치 기준 정렬 및 제한
-            self.graph_index.adj[node_id].sort(key=lambda x: x[1], reverse=True)
-            self.graph_index.adj[node_id] = self.graph_index.adj[node_id][:self.graph_index.kmax]
+            # v5.4: 부트스트랩된 스냅샷의 델타 로그에 반영
+            self.graph_bootstrap.persist()
             
         except Exception as e:
             logger.debug(f"Failed to update GraphIndex links: {e}")
@@ -0,0 +1,119 @@
+"""
+Batched block inserts shared by the database managers.
+
+``insert_blocks`` writes many prepared blocks with one ``executemany`` per
+table (``blocks``, ``block_keywords``, ``block_tags``, ``block_metadata``,
+``block_embeddings``) instead of the per-row statements ``add_block`` issues.
+Transaction handling is left to the caller so a batch can share a
+transaction with other writes (e.g. knowledge updates, parent links).
+
+Blocks use the same dict shape as ``add_block``; branch columns are written
+only when the ``blocks`` table has them.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+_BASE_COLUMNS = ["block_index", "timestamp", "context", "importance", "hash", "prev_hash"]
+_BRANCH_COLUMNS = ["root", "before", "after", "xref", "branch_depth", "visit_count", "last_seen_at"]
+_EXTENDED_BRANCH_COLUMNS = ["slot", "branch_similarity", "branch_created_at"]
+
+
+def _insert_columns(cursor) -> List[str]:
+    cursor.execute("PRAGMA table_info(blocks)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if not set(_BASE_COLUMNS).issubset(columns):
+        raise sqlite3.OperationalError("blocks table missing required columns")
+
+    insert_columns = list(_BASE_COLUMNS)
+    if set(_BRANCH_COLUMNS).issubset(columns):
+        insert_columns.extend(_BRANCH_COLUMNS)
+        if set(_EXTENDED_BRANCH_COLUMNS).issubset(columns):
+            insert_columns.extend(_EXTENDED_BRANCH_COLUMNS)
+    return insert_columns
+
+
+def _row(block: Dict[str, Any], columns: Sequence[str]) -> tuple:
+    defaults = {
+        "importance": 0.0,
+        "prev_hash": "",
+        "branch_depth": 0,
+        "visit_count": 0,
+        "last_seen_at": 0,
+        "branch_similarity": 0.0,
+        "branch_created_at": 0.0,
+    }
+    values = []
+    for column in columns:
+        if column in ("after", "xref"):
+            values.append(json.dumps(block.get(column, [])))
+        else:
+            values.append(block.get(column, defaults.get(column)))
+    return tuple(values)
+
+
+def as_embedding_array(embedding) -> np.ndarray:
+    if isinstance(embedding, np.ndarray):
+        return embedding.astype(np.float32, copy=False).reshape(-1)
+    return np.asarray(embedding, dtype=np.float32).reshape(-1)
+
+
+def insert_blocks(cursor, blocks: Sequence[Dict[str, Any]]) -> Dict[int, np.ndarray]:
+    """Insert prepared blocks without committing.
+
+    Returns:
+        ``block_index -> float32 embedding`` for the blocks that carried one,
+        so the caller can update the in-memory embedding store
+    """
+    if not blocks:
+        return {}
+
+    columns = _insert_columns(cursor)
+    placeholders = ", ".join(["?"] * len(columns))
+    cursor.executemany(
+        f"INSERT INTO blocks ({', '.join(columns)}) VALUES ({placeholders})",
+        [_row(block, columns) for block in blocks],
+    )
+
+    cursor.executemany(
+        "INSERT OR IGNORE INTO block_keywords (block_index, keyword) VALUES (?, ?)",
+        [(block["block_index"], keyword) for block in blocks for keyword in block.get("keywords") or []],
+    )
+    cursor.executemany(
+        "INSERT OR IGNORE INTO block_tags (block_index, tag) VALUES (?, ?)",
+        [(block["block_index"], tag) for block in blocks for tag in block.get("tags") or []],
+    )
+    cursor.executemany(
+        "INSERT INTO block_metadata (block_index, metadata) VALUES (?, ?)",
+        [
+            (block["block_index"], json.dumps(block["metadata"]))
+            for block in blocks
+            if block.get("metadata")
+        ],
+    )
+
+    embeddings: Dict[int, np.ndarray] = {}
+    rows = []
+    for block in blocks:
+        embedding = block.get("embedding")
+        if embedding is None or len(embedding) == 0:
+            continue
+        vector = as_embedding_array(embedding)
+        embeddings[block["block_index"]] = vector
+        rows.append((
+            block["block_index"],
+            vector.tobytes(),
+            block.get("embedding_model", "default"),
+            len(vector),
+        ))
+    cursor.executemany(
+        "INSERT INTO block_embeddings (block_index, embedding, embedding_model, embedding_dim) "
+        "VALUES (?, ?, ?, ?)",
+        rows,
+    )
+    return embeddings
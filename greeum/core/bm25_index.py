@@ -7,8 +7,11 @@ Features:
 - Korean/English support via text_utils
 - Persistence to SQLite database
 - Integration with existing block system
+- v5.4: Inverted index (term -> {doc_id: tf}) with MaxScore top-k pruning and
+  per-document incremental persistence
 """
 
+import heapq
 import math
 import os
 import logging
@@ -74,10 +77,20 @@ class BM25Index:
         # Document keywords cache (for scoring)
         self.doc_keywords: Dict[str, List[str]] = {}  # doc_id -> keywords list
 
+        # v5.4: Inverted index - posting lists with term frequencies
+        self.postings: Dict[str, Dict[str, int]] = {}  # term -> {doc_id: tf}
+
         # Computed IDF values cache
         self._idf_cache: Dict[str, float] = {}
         self._idf_dirty: bool = True
 
+        # v5.4: Incremental persistence bookkeeping
+        self._dirty_docs: Set[str] = set()    # added/updated since last save
+        self._removed_docs: Set[str] = set()  # removed since last save
+        self._persisted: bool = False         # per-document tables populated
+        self._indexed_max: Optional[int] = None  # highest block_index seen by sync
+        self._search_stats = {"searches": 0, "postings_scanned": 0, "terms_pruned": 0}
+
     def add_document(self, doc_id: str, keywords: List[str]) -> None:
         """
         Add a document to the index.
@@ -99,14 +112,24 @@ class BM25Index:
         self.total_doc_len += len(keywords)
         self.avg_doc_len = self.total_doc_len / self.doc_count if self.doc_count > 0 else 0.0
 
-        # Update document frequency for each unique term
-        unique_terms = set(keywords)
-        for term in unique_terms:
+        # Update document frequency and posting lists for each unique term
+        for term, tf in Counter(keywords).items():
             self.idf[term] = self.idf.get(term, 0) + 1
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+        self._dirty_docs.add(doc_id)
+        self._removed_docs.discard(doc_id)
 
         # Mark IDF cache as dirty
         self._idf_dirty = True
 
+    def remove_document(self, doc_id: str) -> None:
+        """Remove a document; only its own posting entries are touched."""
+        if doc_id in self.doc_lens:
+            self._remove_document(doc_id)
+            self._dirty_docs.discard(doc_id)
+            self._removed_docs.add(doc_id)
+
     def _remove_document(self, doc_id: str) -> None:
         """Remove a document from the index."""
         if doc_id not in self.doc_lens:
@@ -115,13 +138,18 @@ class BM25Index:
         old_keywords = self.doc_keywords.get(doc_id, [])
         old_len = self.doc_lens[doc_id]
 
-        # Update IDF
+        # Update IDF and posting lists
         unique_terms = set(old_keywords)
         for term in unique_terms:
             if term in self.idf:
                 self.idf[term] -= 1
                 if self.idf[term] <= 0:
                     del self.idf[term]
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
 
         # Update stats
         self.doc_count -= 1
@@ -227,6 +255,12 @@ class BM25Index:
         """
         Search for documents most relevant to the query.
 
+        v5.4: Term-at-a-time over posting lists with MaxScore pruning. Terms are
+        processed by decreasing score upper bound (idf * (k1 + 1)); once the
+        k-th best partial score reaches the summed bound of the remaining terms,
+        no unseen document can enter the top-k, so remaining terms only update
+        existing candidates instead of scanning their full posting lists.
+
         Args:
             query_keywords: Keywords from the query
             top_k: Number of results to return
@@ -234,22 +268,60 @@ class BM25Index:
         Returns:
             List of (doc_id, score) tuples, sorted by score descending
         """
-        if not query_keywords:
+        if not query_keywords or top_k <= 0:
             return []
 
         # Refresh IDF cache if needed
         if self._idf_dirty:
             self._rebuild_idf_cache()
 
-        results = []
-        for doc_id in self.doc_lens:
-            score = self.score(query_keywords, doc_id)
-            if score > 0:
-                results.append((doc_id, score))
+        self._search_stats["searches"] += 1
 
-        # Sort by score descending
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results[:top_k]
+        # Duplicate query terms count multiple times (same as score_with_keywords)
+        query_counts = Counter(term for term in query_keywords if term in self.postings)
+        if not query_counts:
+            return []
+
+        k1, b = self.k1, self.b
+        avg_len = max(self.avg_doc_len, 1.0)
+        terms = sorted(
+            (
+                (self._compute_idf(term) * (k1 + 1) * count, term, count)
+                for term, count in query_counts.items()
+            ),
+            reverse=True,
+        )
+        remaining_bounds = [0.0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            remaining_bounds[i] = remaining_bounds[i + 1] + terms[i][0]
+
+        accumulators: Dict[str, float] = {}
+        admit_new = True
+        for position, (_, term, count) in enumerate(terms):
+            weight = self._compute_idf(term) * count
+            posting = self.postings[term]
+
+            if admit_new and len(accumulators) >= top_k:
+                threshold = heapq.nlargest(top_k, accumulators.values())[-1]
+                if threshold >= remaining_bounds[position]:
+                    admit_new = False
+                    self._search_stats["terms_pruned"] += len(terms) - position
+
+            if admit_new:
+                items = posting.items()
+            else:
+                # Only existing candidates can still reach the top-k
+                items = ((doc_id, posting[doc_id]) for doc_id in accumulators if doc_id in posting)
+
+            scanned = 0
+            for doc_id, tf in items:
+                scanned += 1
+                norm = k1 * (1 - b + b * self.doc_lens[doc_id] / avg_len)
+                accumulators[doc_id] = accumulators.get(doc_id, 0.0) + weight * (tf * (k1 + 1)) / (tf + norm)
+            self._search_stats["postings_scanned"] += scanned
+
+        results = heapq.nlargest(top_k, accumulators.items(), key=lambda item: item[1])
+        return [(doc_id, score) for doc_id, score in results if score > 0]
 
     def get_stats(self) -> Dict:
         """Get index statistics."""
@@ -258,56 +330,124 @@ class BM25Index:
             "avg_doc_len": round(self.avg_doc_len, 2),
             "vocabulary_size": len(self.idf),
             "k1": self.k1,
-            "b": self.b
+            "b": self.b,
+            "pending_writes": self.pending_writes,
+            **self._search_stats,
         }
 
     # === Persistence Methods ===
 
+    @property
+    def pending_writes(self) -> int:
+        """Documents added or removed since the last ``save_to_db``."""
+        return len(self._dirty_docs) + len(self._removed_docs)
+
+    @staticmethod
+    def _ensure_tables(cursor) -> None:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS bm25_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS bm25_documents (
+                doc_id TEXT PRIMARY KEY,
+                keywords TEXT NOT NULL
+            )
+        """)
+
     def save_to_db(self, db_manager) -> None:
         """
         Save BM25 index to SQLite database.
 
-        Creates a table 'bm25_index' if not exists.
+        v5.4: One row per document in 'bm25_documents' plus corpus statistics in
+        'bm25_meta'. Only documents added/removed since the last save are
+        written, so indexing one block does not re-serialize the vocabulary.
+        Posting lists are rebuilt from the document rows on load.
         """
         cursor = db_manager.conn.cursor()
+        self._ensure_tables(cursor)
+
+        if not self._persisted:
+            # First save in this format: write everything, drop the legacy blob
+            cursor.execute("DELETE FROM bm25_documents")
+            dirty = set(self.doc_lens)
+            removed: Set[str] = set()
+            try:
+                cursor.execute("DELETE FROM bm25_index WHERE key = ?", ("index_data",))
+            except sqlite3.OperationalError:
+                pass
+        else:
+            dirty = self._dirty_docs & set(self.doc_lens)
+            removed = self._removed_docs
 
-        # Create table if not exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS bm25_index (
-                key TEXT PRIMARY KEY,
-                value TEXT
+        if removed:
+            cursor.executemany(
+                "DELETE FROM bm25_documents WHERE doc_id = ?",
+                [(doc_id,) for doc_id in removed],
+            )
+        if dirty:
+            cursor.executemany(
+                "INSERT OR REPLACE INTO bm25_documents (doc_id, keywords) VALUES (?, ?)",
+                [
+                    (doc_id, json.dumps(self.doc_keywords.get(doc_id, []), ensure_ascii=False))
+                    for doc_id in dirty
+                ],
             )
-        """)
 
-        # Serialize and save
-        data = {
-            "k1": self.k1,
-            "b": self.b,
-            "idf": self.idf,
-            "doc_count": self.doc_count,
-            "total_doc_len": self.total_doc_len,
-            "avg_doc_len": self.avg_doc_len,
-            "doc_lens": self.doc_lens,
-            "doc_keywords": self.doc_keywords
+        meta = {
+            "format": "2",
+            "k1": str(self.k1),
+            "b": str(self.b),
+            "doc_count": str(self.doc_count),
+            "total_doc_len": str(self.total_doc_len),
         }
-
-        cursor.execute("""
-            INSERT OR REPLACE INTO bm25_index (key, value) VALUES (?, ?)
-        """, ("index_data", json.dumps(data)))
+        cursor.executemany(
+            "INSERT OR REPLACE INTO bm25_meta (key, value) VALUES (?, ?)",
+            list(meta.items()),
+        )
 
         db_manager.conn.commit()
-        logger.info(f"BM25 index saved: {self.doc_count} documents, {len(self.idf)} terms")
+        self._dirty_docs.clear()
+        self._removed_docs.clear()
+        self._persisted = True
+        logger.info(
+            f"BM25 index saved: {self.doc_count} documents, {len(self.idf)} terms "
+            f"({len(dirty)} written, {len(removed)} removed)"
+        )
 
     def load_from_db(self, db_manager) -> bool:
         """
         Load BM25 index from SQLite database.
 
+        Reads the per-document format first and falls back to the legacy
+        single JSON blob in 'bm25_index' (migrated on the next save).
+
         Returns:
             True if loaded successfully, False otherwise
         """
         cursor = db_manager.conn.cursor()
 
         try:
+            try:
+                cursor.execute("SELECT key, value FROM bm25_meta")
+                meta = {row[0]: row[1] for row in cursor.fetchall()}
+            except sqlite3.OperationalError:
+                meta = {}
+
+            if meta.get("format") == "2":
+                self._reset()
+                self.k1 = float(meta.get("k1", 1.5))
+                self.b = float(meta.get("b", 0.75))
+                cursor.execute("SELECT doc_id, keywords FROM bm25_documents")
+                for doc_id, keywords_json in cursor.fetchall():
+                    self.add_document(doc_id, json.loads(keywords_json))
+                self._dirty_docs.clear()
+                self._persisted = True
+                logger.info(f"BM25 index loaded: {self.doc_count} documents, {len(self.idf)} terms")
+                return True
+
             cursor.execute("""
                 SELECT value FROM bm25_index WHERE key = ?
             """, ("index_data",))
@@ -319,18 +459,15 @@ class BM25Index:
 
             data = json.loads(row[0])
 
+            self._reset()
             self.k1 = data.get("k1", 1.5)
             self.b = data.get("b", 0.75)
-            self.idf = data.get("idf", {})
-            self.doc_count = data.get("doc_count", 0)
-            self.total_doc_len = data.get("total_doc_len", 0)
-            self.avg_doc_len = data.get("avg_doc_len", 0.0)
-            self.doc_lens = data.get("doc_lens", {})
-            self.doc_keywords = data.get("doc_keywords", {})
+            for doc_id, keywords in data.get("doc_keywords", {}).items():
+                self.add_document(doc_id, keywords)
 
             self._idf_dirty = True
 
-            logger.info(f"BM25 index loaded: {self.doc_count} documents, {len(self.idf)} terms")
+            logger.info(f"BM25 index loaded (legacy format): {self.doc_count} documents, {len(self.idf)} terms")
             return True
 
         except sqlite3.OperationalError:
@@ -341,6 +478,70 @@ class BM25Index:
             logger.error(f"Failed to load BM25 index: {e}")
             return False
 
+    def _reset(self) -> None:
+        """Clear all indexed documents."""
+        self.idf = {}
+        self.doc_count = 0
+        self.total_doc_len = 0
+        self.avg_doc_len = 0.0
+        self.doc_lens = {}
+        self.doc_keywords = {}
+        self.postings = {}
+        self._idf_cache = {}
+        self._idf_dirty = True
+        self._dirty_docs = set()
+        self._removed_docs = set()
+        self._indexed_max = None
+
+    @staticmethod
+    def _block_keywords(context: Optional[str], keywords_str: Optional[str]) -> List[str]:
+        """Keywords used to index a block (stored keywords, else extracted)."""
+        keywords = keywords_str.split() if keywords_str else []
+        if not keywords and context:
+            from ..text_utils import extract_keywords
+            keywords = extract_keywords(context, max_keywords=10)
+        return keywords
+
+    def sync_with_blocks(self, db_manager) -> int:
+        """
+        Index blocks newer than the highest indexed block_index.
+
+        Cheap when nothing changed (one MAX() query), so callers can run it
+        before each search to pick up writes from other components/processes.
+
+        Returns:
+            Number of documents added
+        """
+        cursor = db_manager.conn.cursor()
+        cursor.execute("SELECT MAX(block_index) FROM blocks")
+        row = cursor.fetchone()
+        store_max = row[0] if row and row[0] is not None else -1
+
+        indexed_max = self._indexed_max
+        if indexed_max is None:
+            numeric = [int(doc_id) for doc_id in self.doc_lens if doc_id.lstrip("-").isdigit()]
+            indexed_max = max(numeric) if numeric else -1
+        if store_max <= indexed_max:
+            self._indexed_max = indexed_max
+            return 0
+
+        cursor.execute("""
+            SELECT b.block_index, b.context, GROUP_CONCAT(bk.keyword, ' ')
+            FROM blocks b
+            LEFT JOIN block_keywords bk ON b.block_index = bk.block_index
+            WHERE b.block_index > ?
+            GROUP BY b.block_index
+        """, (indexed_max,))
+
+        added = 0
+        for block_index, context, keywords_str in cursor.fetchall():
+            keywords = self._block_keywords(context, keywords_str)
+            if keywords:
+                self.add_document(str(block_index), keywords)
+                added += 1
+        self._indexed_max = store_max
+        return added
+
     def build_from_blocks(self, db_manager, tokenizer_func=None) -> int:
         """
         Build BM25 index from existing blocks in database.
@@ -352,8 +553,6 @@ class BM25Index:
         Returns:
             Number of documents indexed
         """
-        from ..text_utils import extract_keywords
-
         cursor = db_manager.conn.cursor()
 
         # Get all blocks with their keywords from block_keywords table
@@ -369,12 +568,8 @@ class BM25Index:
             block_index, context, keywords_str = row
             doc_id = str(block_index)
 
-            # Parse keywords from concatenated string
-            keywords = keywords_str.split() if keywords_str else []
-
-            if not keywords and context:
-                # Extract keywords from content
-                keywords = extract_keywords(context, max_keywords=10)
+            # Stored keywords, else extracted from content
+            keywords = self._block_keywords(context, keywords_str)
 
             if keywords:
                 self.add_document(doc_id, keywords)
@@ -447,6 +642,51 @@ class HybridScorer:
             # RRF is meant for ranking multiple documents
             return self.vector_weight * vector_similarity + self.bm25_weight * bm25_norm
 
+    def rank(
+        self,
+        query_keywords: List[str],
+        vector_results: List[Tuple[str, float]],
+        top_k: int = 10,
+        candidate_pool: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank the union of vector hits and BM25 candidates from the inverted index.
+
+        v5.4: BM25 candidates come from ``BM25Index.search`` (posting lists with
+        top-k pruning) instead of scoring documents one by one.
+
+        Args:
+            query_keywords: Keywords from query
+            vector_results: List of (doc_id, cosine_similarity) from vector search
+            top_k: Number of results to return
+            candidate_pool: BM25 candidates to pull (default: max(3 * top_k, 30))
+
+        Returns:
+            List of (doc_id, score) sorted by fused score descending
+        """
+        pool = candidate_pool or max(top_k * 3, 30)
+        bm25_results = self.bm25_index.search(query_keywords, top_k=pool)
+
+        if self.fusion_method == "rrf":
+            return self.rrf_fusion(vector_results, bm25_results)[:top_k]
+
+        vector_scores = dict(vector_results)
+        bm25_scores = dict(bm25_results)
+        fused = []
+        for doc_id in set(vector_scores) | set(bm25_scores):
+            bm25_raw = bm25_scores.get(doc_id)
+            if bm25_raw is None:
+                # Vector-only hit outside the BM25 pool: score it exactly
+                bm25_raw = self.bm25_index.score(query_keywords, doc_id)
+            fused.append((
+                doc_id,
+                self.vector_weight * vector_scores.get(doc_id, 0.0)
+                + self.bm25_weight * self.bm25_index.normalize_score(bm25_raw),
+            ))
+
+        fused.sort(key=lambda x: x[1], reverse=True)
+        return fused[:top_k]
+
     def rrf_fusion(
         self,
         vector_results: List[Tuple[str, float]],
@@ -12,11 +12,12 @@ import logging
 import os
 import uuid
 from datetime import datetime
-from itertools import combinations
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 
+from .branch_centroids import BranchCentroidStore
+
 logger = logging.getLogger(__name__)
 
 # Optional LLM classifier import
@@ -56,9 +57,15 @@ class BranchAwareStorage:
     def __init__(self, db_manager, branch_index_manager):
         self.db_manager = db_manager
         self.branch_index_manager = branch_index_manager
-        self.branch_centroids: Dict[str, np.ndarray] = {}  # branch_root -> centroid embedding
+        # v5.4: branch_root -> running embedding sum/count, shared with DFSSearchEngine
+        self.centroid_store = getattr(db_manager, "branch_centroids", None) or BranchCentroidStore(db_manager)
         self.dynamic_threshold = 0.5  # Default, will be calculated
 
+    @property
+    def branch_centroids(self) -> Dict[str, np.ndarray]:
+        """Mean embedding per branch root."""
+        return self.centroid_store.centroids()
+
     # ------------------------------------------------------------------
     # Branch Management (v4.0.1 - direct branch access, no slot mapping)
     # ------------------------------------------------------------------
@@ -73,60 +80,21 @@ class BranchAwareStorage:
         return [row[0] for row in cursor.fetchall()]
 
     def calculate_branch_centroids(self):
-        """Calculate centroid embeddings for each branch."""
-        cursor = self.db_manager.conn.cursor()
-        branches = self.get_all_branches()
-
-        for branch_root in branches:
-            if branch_root in self.branch_centroids:
-                continue  # Already calculated
+        """Bring branch centroids up to date.
 
-            # Get all embeddings in this branch
-            cursor.execute("""
-                SELECT be.embedding
-                FROM block_embeddings be
-                JOIN blocks b ON be.block_index = b.block_index
-                WHERE b.root = ?
-                AND be.embedding IS NOT NULL
-                LIMIT 100
-            """, (branch_root,))
+        v5.4: Centroids are running sums maintained on every write; this only
+        folds in blocks written by other processes.
+        """
+        self.centroid_store.sync()
 
-            embeddings = []
-            for (embedding_blob,) in cursor.fetchall():
-                if embedding_blob:
-                    try:
-                        emb = np.frombuffer(embedding_blob, dtype=np.float32)
-                        embeddings.append(emb)
-                    except:
-                        continue
-
-            if embeddings:
-                centroid = np.mean(embeddings, axis=0)
-                self.branch_centroids[branch_root] = centroid
-                logger.debug(f"Calculated centroid for branch {branch_root[:8]}... "
-                           f"({len(embeddings)} embeddings)")
-
-    def calculate_dynamic_threshold(self):
+    def calculate_dynamic_threshold(self, dim: Optional[int] = None):
         """Calculate dynamic threshold based on max semantic distance between branches"""
-        if len(self.branch_centroids) < 2:
+        spread = self.centroid_store.spread(dim)
+        if spread is None:
             return 0.5  # Default if not enough branches
 
-        max_distance = 0
-        min_distance = float('inf')
-
-        # Calculate pairwise distances between branch centroids
-        for branch1, branch2 in combinations(self.branch_centroids.keys(), 2):
-            centroid1 = self.branch_centroids[branch1]
-            centroid2 = self.branch_centroids[branch2]
-
-            # Cosine distance
-            similarity = np.dot(centroid1, centroid2) / (
-                np.linalg.norm(centroid1) * np.linalg.norm(centroid2)
-            )
-            distance = 1 - similarity
-
-            max_distance = max(max_distance, distance)
-            min_distance = min(min_distance, distance)
+        # Pairwise cosine distances between branch centroids (vectorized)
+        max_distance, min_distance = spread
 
         # Dynamic threshold: 60% of max distance
         # If branches are very different (max_distance high), be more strict
@@ -214,17 +182,16 @@ class BranchAwareStorage:
                 )
                 return branch_id, 0.95, target_block_hash, False
 
-        # Calculate centroids if needed
-        if not self.branch_centroids:
-            self.calculate_branch_centroids()
+        # Fold in blocks from other writers (one MAX query when nothing changed)
+        self.calculate_branch_centroids()
 
         # If no branches exist, create new one
-        if not self.branch_centroids:
+        if not len(self.centroid_store):
             logger.info("No existing branches - will create new branch")
             return None, 1.0, None, True
 
         # Calculate dynamic threshold
-        self.calculate_dynamic_threshold()
+        self.calculate_dynamic_threshold(len(embedding) if embedding is not None else None)
 
         # If no embedding provided, use current branch or create new
         if embedding is None:
@@ -235,25 +202,11 @@ class BranchAwareStorage:
             else:
                 return None, 1.0, None, True
 
-        # Calculate similarity to each branch
-        branch_scores: Dict[str, float] = {}
-        for branch_root, centroid in self.branch_centroids.items():
-            try:
-                similarity = np.dot(embedding, centroid) / (
-                    np.linalg.norm(embedding) * np.linalg.norm(centroid)
-                )
-                branch_scores[branch_root] = similarity
-                logger.debug(f"Branch {branch_root[:12]}...: similarity={similarity:.3f}")
-            except Exception as e:
-                logger.debug(f"Error computing similarity for branch {branch_root[:8]}: {e}")
-
-        if not branch_scores:
+        # v5.4: Similarity to every branch centroid in one matrix-vector product
+        best_branch, best_score = self.centroid_store.best_match(embedding)
+        if best_branch is None:
             return None, 1.0, None, True
 
-        # Find best matching branch
-        best_branch = max(branch_scores.keys(), key=lambda b: branch_scores[b])
-        best_score = branch_scores[best_branch]
-
         # Check if similarity meets dynamic threshold
         if best_score >= self.dynamic_threshold:
             logger.info(
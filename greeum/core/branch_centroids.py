@@ -0,0 +1,604 @@
+"""
+Incrementally maintained branch centroids.
+
+Branch routing (``BranchAwareStorage.find_best_branch_for_memory`` and
+``DFSSearchEngine._select_optimal_branch``) compares an embedding with the
+centroid of every branch. ``BranchCentroidStore`` keeps, per branch root, the
+running sum of the branch's block embeddings and their count, so a write
+updates one branch in O(dim) instead of re-sampling it from SQLite. The sums
+are persisted in ``branch_centroids`` and loaded once per process; a database
+without rows is folded in with one full scan on first use.
+
+Unit-length centroids of each embedding dimension are stacked in one matrix:
+picking a branch is a single matrix-vector product, and the pairwise spread
+used for the dynamic storage threshold is a blocked matrix product.
+
+Rows are only written from the write path (``add``/``add_many``/``replace``), because reads
+may run on ``query_only`` connections. Each write re-reads the persisted sums
+inside its write transaction before applying its delta, so concurrent writers
+never overwrite each other; ``branch_centroid_state`` records the block
+high-water mark, change log position and a version bumped by every write.
+Blocks appended by other writers are folded in through the high-water mark;
+embeddings or roots rewritten in place (see ``change_log``) trigger a full
+rebuild from ``blocks``/``block_embeddings``, written back on the next local
+write.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .change_log import KIND_EMBEDDING, KIND_ROOT, changed_blocks, current_change_seq
+
+logger = logging.getLogger(__name__)
+
+CENTROID_TABLE = "branch_centroids"
+CENTROID_STATE_TABLE = "branch_centroid_state"
+
+# Rows of the pairwise similarity matrix computed per step in ``spread``
+_PAIRWISE_BLOCK = 1024
+_SCAN_BATCH = 1000
+
+_SCAN_SQL = """
+    SELECT b.block_index, b.root, e.embedding
+    FROM blocks b
+    JOIN block_embeddings e ON e.block_index = b.block_index
+    WHERE b.block_index > ? AND b.block_index <= ?
+      AND b.root IS NOT NULL AND b.root != ''
+      AND e.embedding IS NOT NULL
+    ORDER BY b.block_index
+"""
+
+
+def ensure_branch_centroid_schema(cursor) -> None:
+    """Create the ``branch_centroids`` table (running sums per branch root) and its state."""
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {CENTROID_TABLE} (
+            root TEXT PRIMARY KEY,
+            embedding_dim INTEGER NOT NULL,
+            vector_sum BLOB NOT NULL,
+            block_count INTEGER NOT NULL,
+            last_block_index INTEGER NOT NULL,
+            updated_at REAL
+        )
+        """
+    )
+    # block_mark / change_seq covered by the rows, version bumped on every write
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {CENTROID_STATE_TABLE} (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        """
+    )
+
+
+def _as_vector(embedding: Any) -> Optional[np.ndarray]:
+    if embedding is None:
+        return None
+    if isinstance(embedding, (bytes, bytearray, memoryview)):
+        vector = np.frombuffer(embedding, dtype=np.float32)
+    else:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    if vector.size == 0 or not np.all(np.isfinite(vector)):
+        return None
+    return vector
+
+
+class _CentroidGroup:
+    """Running sums of one embedding dimension, stacked for vectorized routing."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.roots: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.sums = np.zeros((0, dim), dtype=np.float64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.unit = np.zeros((0, dim), dtype=np.float32)
+
+    def _row(self, root: str) -> int:
+        row = self.row_of.get(root)
+        if row is not None:
+            return row
+        row = len(self.roots)
+        if row == len(self.counts):
+            capacity = max(8, row * 2)
+            self.sums = np.resize(self.sums, (capacity, self.dim))
+            self.counts = np.resize(self.counts, capacity)
+            self.unit = np.resize(self.unit, (capacity, self.dim))
+        self.sums[row] = 0.0
+        self.counts[row] = 0
+        self.unit[row] = 0.0
+        self.roots.append(root)
+        self.row_of[root] = row
+        return row
+
+    def _refresh_unit(self, row: int) -> None:
+        norm = np.linalg.norm(self.sums[row])
+        self.unit[row] = self.sums[row] / norm if norm > 0 and self.counts[row] > 0 else 0.0
+
+    def add(self, root: str, delta: np.ndarray, count_delta: int) -> None:
+        row = self._row(root)
+        self.sums[row] += delta
+        self.counts[row] += count_delta
+        self._refresh_unit(row)
+
+    def set(self, root: str, vector_sum: np.ndarray, count: int) -> None:
+        row = self._row(root)
+        self.sums[row] = vector_sum
+        self.counts[row] = count
+        self._refresh_unit(row)
+
+    def active(self) -> Tuple[List[str], np.ndarray]:
+        """Roots with at least one block and their unit centroids (a view)."""
+        size = len(self.roots)
+        mask = self.counts[:size] > 0
+        if mask.all():
+            return list(self.roots), self.unit[:size]
+        rows = np.flatnonzero(mask)
+        return [self.roots[i] for i in rows], self.unit[rows]
+
+
+class BranchCentroidStore:
+    """Per-branch embedding sums and counts, shared per database manager."""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._lock = threading.RLock()
+        self._groups: Dict[int, _CentroidGroup] = {}
+        self._dim_of: Dict[str, int] = {}
+        self._last_index: Dict[str, int] = {}
+        # Roots whose in-memory sums differ from the persisted rows
+        self._dirty: Set[str] = set()
+        self._loaded = False
+        self._high_water_mark = -1
+        # Change log position the sums reflect (None: no log, or not yet known)
+        self._change_seq: Optional[int] = None
+        # branch_centroid_state.version the sums were read from or written as
+        self._table_version: Optional[int] = None
+        # Rebuilt in memory; the next write replaces every persisted row
+        self._table_stale = False
+        self.stats = {
+            "loads": 0,
+            "rebuilds": 0,
+            "scanned_blocks": 0,
+            "updates": 0,
+            "persisted_rows": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Loading and catch-up
+    # ------------------------------------------------------------------
+    def _reset(self) -> None:
+        self._groups.clear()
+        self._dim_of.clear()
+        self._last_index.clear()
+        self._dirty.clear()
+        self._loaded = False
+        self._high_water_mark = -1
+        self._change_seq = None
+        self._table_version = None
+        self._table_stale = False
+
+    def _ensure_loaded(self) -> None:
+        """Load persisted sums (and fold in newer blocks) on first use."""
+        if self._loaded:
+            return
+        try:
+            self._refresh(self.db_manager.conn)
+        except sqlite3.Error as e:
+            logger.debug(f"Branch centroid load failed: {e}")
+
+    @staticmethod
+    def _read_state(conn) -> Optional[Dict[str, int]]:
+        try:
+            rows = conn.execute(f"SELECT key, value FROM {CENTROID_STATE_TABLE}").fetchall()
+        except sqlite3.OperationalError:
+            return None
+        state = {key: int(value) for key, value in rows}
+        return state if "version" in state else None
+
+    def _load_rows(self, conn, state: Optional[Dict[str, int]]) -> None:
+        """Replace the in-memory sums with the persisted rows."""
+        self._reset()
+        try:
+            rows = conn.execute(
+                f"SELECT root, embedding_dim, vector_sum, block_count, last_block_index FROM {CENTROID_TABLE}"
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.debug(f"Branch centroid table unavailable, rebuilding in memory: {e}")
+            rows = []
+
+        table_mark = -1
+        for root, dim, blob, count, last_index in rows:
+            vector_sum = np.frombuffer(blob, dtype=np.float64)
+            if vector_sum.size != dim:
+                continue
+            self._group(dim).set(root, vector_sum, count)
+            self._dim_of[root] = dim
+            self._last_index[root] = last_index
+            table_mark = max(table_mark, last_index)
+
+        if state is not None:
+            self._high_water_mark = state.get("block_mark", table_mark)
+            change_seq = state.get("change_seq", -1)
+            self._change_seq = change_seq if change_seq >= 0 else None
+            self._table_version = state["version"]
+        else:
+            # Rows written before the state table existed
+            self._high_water_mark = table_mark
+        self._loaded = True
+        self.stats["loads"] += 1
+
+    @staticmethod
+    def _current_mark(conn) -> int:
+        row = conn.execute("SELECT MAX(block_index) FROM blocks").fetchone()
+        return row[0] if row and row[0] is not None else -1
+
+    def _needs_rebuild(self, conn, current: int, log_seq: Optional[int], own_block: Optional[int]) -> bool:
+        """True when blocks the sums already cover were rewritten, moved or deleted."""
+        if current < self._high_water_mark:
+            # Database reset or restored behind the sums
+            return True
+        if log_seq is None:
+            return False
+        if self._change_seq is None or log_seq < self._change_seq:
+            # Sums predate the change log, or the log belongs to another database
+            return True
+        if log_seq == self._change_seq:
+            return False
+        changed = changed_blocks(conn, self._change_seq, log_seq, (KIND_EMBEDDING, KIND_ROOT))
+        # The caller's own in-place update is applied as a delta
+        changed.discard(own_block)
+        return any(block_index <= self._high_water_mark for block_index in changed)
+
+    def _refresh(self, conn, own_block: Optional[int] = None,
+                 appended: Optional[List[Tuple[Optional[str], int, Any]]] = None) -> int:
+        """Bring the in-memory sums up to date with the database.
+
+        Reloads the persisted rows when another writer changed them, rebuilds
+        from scratch when covered blocks were rewritten, and otherwise folds in
+        appended blocks. Returns the highest block index whose current
+        embedding was already covered before any block was read here (-1 after
+        a rebuild).
+        """
+        state = self._read_state(conn)
+        if not self._loaded or (state["version"] if state else None) != self._table_version:
+            self._load_rows(conn, state)
+
+        # Mark before log position: a block appended in between is folded later
+        current = self._current_mark(conn)
+        log_seq = current_change_seq(conn)
+        covered = self._high_water_mark
+
+        if self._needs_rebuild(conn, current, log_seq, own_block):
+            # No state yet (new database, or rows from before the change log)
+            initial = self._table_version is None and self._change_seq is None
+            self._rebuild(conn, current, initial)
+            covered = -1
+        elif appended and [entry[1] for entry in appended] == list(range(self._high_water_mark + 1, current + 1)):
+            # Exactly the caller's blocks are new: fold them without reading back
+            self._fold_many(appended)
+            self._high_water_mark = current
+        else:
+            self._catch_up(conn, current)
+        self._change_seq = log_seq
+        return covered
+
+    def _rebuild(self, conn, current: int, initial: bool = False) -> None:
+        """Recompute every branch from ``blocks``/``block_embeddings``."""
+        self._groups.clear()
+        self._dim_of.clear()
+        self._last_index.clear()
+        self._dirty.clear()
+        self._high_water_mark = -1
+        folded = self._catch_up(conn, current)
+        self._table_stale = True
+        if not initial:
+            self.stats["rebuilds"] += 1
+            logger.info(f"Branch centroids rebuilt from {folded} blocks after in-place changes")
+
+    def _catch_up(self, conn, current: int) -> int:
+        """Fold blocks in ``(high-water mark, current]`` into the sums."""
+        if current <= self._high_water_mark:
+            return 0
+        cursor = conn.execute(_SCAN_SQL, (self._high_water_mark, current))
+        folded = 0
+        while True:
+            rows = cursor.fetchmany(_SCAN_BATCH)
+            if not rows:
+                break
+            for block_index, root, blob in rows:
+                if self._fold(root, block_index, _as_vector(blob), 1):
+                    folded += 1
+        self._high_water_mark = current
+        self.stats["scanned_blocks"] += folded
+        if folded:
+            logger.debug(f"Branch centroids folded in {folded} blocks")
+        return folded
+
+    def _group(self, dim: int) -> _CentroidGroup:
+        group = self._groups.get(dim)
+        if group is None:
+            group = self._groups[dim] = _CentroidGroup(dim)
+        return group
+
+    def _fold(self, root: str, block_index: int, vector: Optional[np.ndarray], count_delta: int) -> bool:
+        if vector is None:
+            return False
+        dim = self._dim_of.setdefault(root, vector.size)
+        if vector.size != dim:
+            # 브랜치 내 임베딩 차원이 바뀐 경우(모델 교체) 기존 차원을 유지
+            return False
+        self._group(dim).add(root, vector.astype(np.float64) * count_delta, count_delta)
+        self._last_index[root] = max(self._last_index.get(root, -1), block_index)
+        self._dirty.add(root)
+        return True
+
+    def _fold_many(self, entries: List[Tuple[Optional[str], int, Any]]) -> None:
+        """Fold appended blocks with one sum update per branch."""
+        deltas: Dict[str, np.ndarray] = {}
+        counts: Dict[str, int] = {}
+        for root, block_index, embedding in entries:
+            vector = _as_vector(embedding) if root else None
+            if vector is None:
+                continue
+            if vector.size != self._dim_of.setdefault(root, vector.size):
+                continue
+            if root in deltas:
+                deltas[root] += vector
+            else:
+                deltas[root] = vector.astype(np.float64)
+            counts[root] = counts.get(root, 0) + 1
+            self._last_index[root] = max(self._last_index.get(root, -1), block_index)
+        for root, delta in deltas.items():
+            self._group(self._dim_of[root]).add(root, delta, counts[root])
+            self._dirty.add(root)
+
+    def sync(self) -> int:
+        """Pick up blocks appended, rewritten or re-rooted by other writers.
+
+        Returns the number of blocks folded in (memory only; the next local
+        write persists them).
+        """
+        with self._lock:
+            scanned = self.stats["scanned_blocks"]
+            try:
+                self._refresh(self.db_manager.conn)
+            except sqlite3.Error as e:
+                logger.debug(f"Branch centroid sync skipped: {e}")
+            return self.stats["scanned_blocks"] - scanned
+
+    def invalidate(self) -> None:
+        """Drop in-memory sums; the next use reloads the persisted rows and
+        rebuilds them if the change log shows rewrites they do not reflect."""
+        with self._lock:
+            self._reset()
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+    def add(self, root: Optional[str], block_index: Optional[int], embedding: Any, conn=None) -> None:
+        """Account for a block just inserted into ``root`` (O(dim))."""
+        if block_index is None:
+            return
+        self.add_many([(root, block_index, embedding)], conn=conn)
+
+    def add_many(self, entries: List[Tuple[Optional[str], int, Any]], conn=None) -> None:
+        """Account for ``(root, block_index, embedding)`` blocks inserted together.
+
+        Batch ingestion calls this inside its own transaction, before the
+        commit: one read-modify-write and one state update for the whole batch.
+        """
+        entries = sorted(
+            (entry for entry in entries if entry[1] is not None), key=lambda entry: entry[1]
+        )
+        if not entries:
+            return
+        with self._lock:
+            self._write(conn, lambda conn_: self._refresh(conn_, appended=entries))
+
+    def replace(self, root: Optional[str], block_index: int, old_embedding: Any,
+                new_embedding: Any, conn=None) -> None:
+        """Swap one block's embedding inside its branch (knowledge update, O(dim)).
+
+        Call after the ``block_embeddings`` update, on the same transaction.
+        """
+        if not root:
+            return
+
+        def apply(conn_) -> None:
+            covered = self._refresh(conn_, own_block=block_index)
+            if block_index > covered:
+                # Folded (or rebuilt) just now from the new embedding
+                return
+            old_vector = _as_vector(old_embedding)
+            new_vector = _as_vector(new_embedding)
+            if old_vector is not None and new_vector is not None and old_vector.size == new_vector.size:
+                dim = self._dim_of.get(root)
+                if dim == new_vector.size:
+                    delta = new_vector.astype(np.float64) - old_vector.astype(np.float64)
+                    self._group(dim).add(root, delta, 0)
+                    self._dirty.add(root)
+            elif new_vector is not None:
+                self._fold(root, block_index, new_vector, 1)
+
+        with self._lock:
+            self._write(conn, apply)
+
+    def _write(self, conn, apply) -> None:
+        """Read-modify-write the persisted sums inside one write transaction."""
+        conn = conn or self.db_manager.conn
+        started_transaction = not conn.in_transaction
+        try:
+            if started_transaction:
+                # Take the write lock before reading so no other writer interleaves
+                conn.execute("BEGIN IMMEDIATE")
+            apply(conn)
+            self.stats["updates"] += 1
+            self._persist(conn)
+            if started_transaction:
+                conn.commit()
+        except sqlite3.Error as e:
+            if started_transaction and conn.in_transaction:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    pass
+            # Reload on next use; the change log brings back anything applied here
+            self._reset()
+            logger.debug(f"Branch centroid persist deferred: {e}")
+
+    def _persist(self, conn) -> None:
+        """Write dirty branches and bump the state version on the caller's transaction."""
+        now = time.time()
+        rows = []
+        for root in self._dirty:
+            dim = self._dim_of[root]
+            group = self._groups[dim]
+            row = group.row_of[root]
+            rows.append((
+                root,
+                dim,
+                group.sums[row].tobytes(),
+                int(group.counts[row]),
+                self._last_index.get(root, -1),
+                now,
+            ))
+        if self._table_stale:
+            conn.execute(f"DELETE FROM {CENTROID_TABLE}")
+        if rows:
+            conn.executemany(
+                f"""
+                INSERT OR REPLACE INTO {CENTROID_TABLE}
+                    (root, embedding_dim, vector_sum, block_count, last_block_index, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        version = (self._table_version or 0) + 1
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {CENTROID_STATE_TABLE} (key, value) VALUES (?, ?)",
+            [
+                ("block_mark", self._high_water_mark),
+                ("change_seq", -1 if self._change_seq is None else self._change_seq),
+                ("version", version),
+            ],
+        )
+        self._table_version = version
+        self._table_stale = False
+        self._dirty.clear()
+        self.stats["persisted_rows"] += len(rows)
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+    def matrix(self, dim: int) -> Tuple[List[str], np.ndarray]:
+        """Roots and stacked unit centroids for one dimension (copy)."""
+        with self._lock:
+            self._ensure_loaded()
+            group = self._groups.get(dim)
+            if group is None:
+                return [], np.zeros((0, dim), dtype=np.float32)
+            roots, unit = group.active()
+            return roots, unit.copy()
+
+    def scores(self, embedding: Any) -> Tuple[List[str], np.ndarray]:
+        """Cosine similarity of ``embedding`` to every branch of the same dimension."""
+        query = _as_vector(embedding)
+        if query is None:
+            return [], np.zeros(0, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return [], np.zeros(0, dtype=np.float32)
+        with self._lock:
+            self._ensure_loaded()
+            group = self._groups.get(query.size)
+            if group is None:
+                return [], np.zeros(0, dtype=np.float32)
+            roots, unit = group.active()
+            return roots, unit @ (query / norm)
+
+    def best_match(self, embedding: Any) -> Tuple[Optional[str], float]:
+        """Branch whose centroid is most similar to ``embedding`` (one matvec)."""
+        roots, similarities = self.scores(embedding)
+        if not roots:
+            return None, 0.0
+        best = int(np.argmax(similarities))
+        return roots[best], float(similarities[best])
+
+    def spread(self, dim: Optional[int] = None) -> Optional[Tuple[float, float]]:
+        """(max, min) pairwise cosine distance between branch centroids.
+
+        Uses the largest dimension group when ``dim`` is not given. Returns None
+        with fewer than two branches.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if dim is None:
+                if not self._groups:
+                    return None
+                dim = max(self._groups, key=lambda d: len(self._groups[d].roots))
+            group = self._groups.get(dim)
+            if group is None:
+                return None
+            _, unit = group.active()
+            unit = unit.copy()
+        return _pairwise_distance_range(unit)
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+    def centroids(self) -> Dict[str, np.ndarray]:
+        """Mean embedding per branch root."""
+        with self._lock:
+            self._ensure_loaded()
+            result: Dict[str, np.ndarray] = {}
+            for group in self._groups.values():
+                for root, row in group.row_of.items():
+                    count = group.counts[row]
+                    if count > 0:
+                        result[root] = (group.sums[row] / count).astype(np.float32)
+            return result
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return sum(int((g.counts[:len(g.roots)] > 0).sum()) for g in self._groups.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "loaded": self._loaded,
+                "branches": {dim: len(group.roots) for dim, group in self._groups.items()},
+                "high_water_mark": self._high_water_mark,
+                "change_seq": self._change_seq,
+                "table_version": self._table_version,
+                "pending_rows": len(self._dirty),
+            }
+
+
+def _pairwise_distance_range(unit: np.ndarray, block: int = _PAIRWISE_BLOCK) -> Optional[Tuple[float, float]]:
+    """(max, min) of ``1 - u_i . u_j`` over i < j, computed in row blocks."""
+    n = len(unit)
+    if n < 2:
+        return None
+    max_similarity = -np.inf
+    min_similarity = np.inf
+    for start in range(0, n - 1, block):
+        stop = min(start + block, n)
+        similarities = unit[start:stop] @ unit[start:].T
+        # Row i of the block pairs only with columns j > i
+        upper = np.arange(start, n)[None, :] > np.arange(start, stop)[:, None]
+        max_similarity = max(max_similarity, float(np.max(similarities, where=upper, initial=-np.inf)))
+        min_similarity = min(min_similarity, float(np.min(similarities, where=upper, initial=np.inf)))
+    return 1.0 - min_similarity, 1.0 - max_similarity
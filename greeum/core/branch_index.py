@@ -6,7 +6,7 @@ import logging
 import os
 import time
 from collections import defaultdict
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import numpy as np
 
@@ -56,7 +56,12 @@ class BranchIndex:
         keywords: List[str],
         embedding: Optional[np.ndarray] = None,
     ) -> None:
-        """Add a block to the branch index."""
+        """Add a block to the branch index.
+
+        Re-adding an indexed block replaces its data; the FAISS vector is only
+        added the first time since ``IndexFlatIP`` cannot update in place.
+        """
+        already_indexed = block_index in self.blocks
         self.blocks[block_index] = block_data
 
         # Index keywords
@@ -67,7 +72,7 @@ class BranchIndex:
         if embedding is not None:
             emb = np.asarray(embedding, dtype=np.float32)
             self.embeddings[block_index] = emb
-            if self.use_faiss:
+            if self.use_faiss and not already_indexed:
                 self._add_to_faiss(block_index, emb)
 
     def search(
@@ -77,6 +82,20 @@ class BranchIndex:
         query_embedding: Optional[np.ndarray] = None,
     ) -> List[Dict]:
         """Search within this branch."""
+        return self.rank(self.collect(query, limit, query_embedding=query_embedding), limit)
+
+    def collect(
+        self,
+        query: str,
+        limit: int = 10,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> Dict[str, Any]:
+        """Index state one search needs: keyword hits, vector scores, candidate blocks.
+
+        v5.4: The only step of ``search`` that reads the index, so callers
+        sharing it with writers hold their lock for this step and ``rank``
+        outside it. Block dicts are replaced, never mutated, on re-index.
+        """
         # Extract keywords from query
         keywords = self._extract_keywords(query)
 
@@ -87,11 +106,6 @@ class BranchIndex:
                 for block_idx in self.inverted_index[lowered]:
                     keyword_scores[block_idx] += 1.0
 
-        normalized_keyword_scores = {
-            block_idx: (score / len(keywords) if keywords else 0.0)
-            for block_idx, score in keyword_scores.items()
-        }
-
         vector_scores = {}
         if (
             self.use_faiss
@@ -101,6 +115,28 @@ class BranchIndex:
         ):
             vector_scores = self._vector_search(query_embedding, limit)
 
+        blocks = {}
+        for block_idx in set(keyword_scores) | set(vector_scores):
+            block = self.blocks.get(block_idx)
+            if block:
+                blocks[block_idx] = block
+
+        return {
+            "keyword_count": len(keywords),
+            "keyword_scores": keyword_scores,
+            "vector_scores": vector_scores,
+            "blocks": blocks,
+        }
+
+    def rank(self, collected: Dict[str, Any], limit: int = 10) -> List[Dict]:
+        """Score and order the output of ``collect``; reads no index state."""
+        keyword_count = collected["keyword_count"]
+        vector_scores = collected["vector_scores"]
+        normalized_keyword_scores = {
+            block_idx: (score / keyword_count if keyword_count else 0.0)
+            for block_idx, score in collected["keyword_scores"].items()
+        }
+
         combined_scores: Dict[int, float] = {}
 
         for block_idx, score in normalized_keyword_scores.items():
@@ -122,7 +158,7 @@ class BranchIndex:
 
         results: List[Dict] = []
         for block_idx, score in sorted_blocks[:limit]:
-            block = self.blocks.get(block_idx)
+            block = collected["blocks"].get(block_idx)
             if not block:
                 continue
             result = block.copy()
@@ -218,11 +254,12 @@ class BranchIndexManager:
         for (root,) in branches:
             branch_index = BranchIndex(root, use_faiss=self.use_faiss)
 
-            # Get all blocks in this branch
+            # Get all blocks in this branch with their embeddings (v5.4: one JOIN, no per-block lookup)
             cursor.execute("""
                 SELECT b.block_index, b.hash, b.context, b.timestamp,
-                       b.importance, b.root, b.before, b.after
+                       b.importance, b.root, b.before, b.after, e.embedding
                 FROM blocks b
+                LEFT JOIN block_embeddings e ON e.block_index = b.block_index
                 WHERE b.root = ?
             """, (root,))
 
@@ -241,15 +278,9 @@ class BranchIndexManager:
                 # Extract keywords from context
                 keywords = branch_index._extract_keywords(row[2] or "")
 
-                # Get embedding if exists
-                cursor.execute("""
-                    SELECT embedding FROM block_embeddings
-                    WHERE block_index = ?
-                """, (row[0],))
-                emb_row = cursor.fetchone()
                 embedding = None
-                if emb_row and emb_row[0]:
-                    embedding = np.frombuffer(emb_row[0], dtype=np.float32)
+                if row[8]:
+                    embedding = np.frombuffer(row[8], dtype=np.float32)
 
                 branch_index.add_block(row[0], block_data, keywords, embedding)
 
@@ -274,6 +305,25 @@ class BranchIndexManager:
             len(self.branch_indices),
         )
 
+    def collect(
+        self,
+        branch_root: Optional[str],
+        query: str,
+        limit: int = 10,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> Optional[Tuple[BranchIndex, Dict[str, Any]]]:
+        """``BranchIndex.collect`` for ``branch_root`` (current branch when None).
+
+        Returns:
+            ``(index, collected)`` to pass to ``index.rank``, or None when the
+            branch is not indexed
+        """
+        root = branch_root if branch_root is not None else self.current_branch
+        index = self.branch_indices.get(root) if root else None
+        if index is None:
+            return None
+        return index, index.collect(query, limit, query_embedding=query_embedding)
+
     def search_current_branch(
         self, query: str, limit: int = 10, query_embedding: Optional[np.ndarray] = None
     ) -> List[Dict]:
@@ -365,18 +415,30 @@ class BranchIndexManager:
         return [row[0] for row in cursor.fetchall()]
 
     def update_branch(self, block_index: int, block_data: Dict,
-                     keywords: List[str], embedding: Optional[np.ndarray] = None):
-        """Update index when new block is added"""
+                     keywords: Optional[List[str]] = None,
+                     embedding: Optional[np.ndarray] = None,
+                     set_current: bool = True):
+        """Update index when new block is added
+
+        Args:
+            keywords: Keywords to index; extracted from ``context`` when None
+            set_current: Move ``current_branch`` to this block's root
+        """
         root = block_data.get('root')
         if not root:
             return
 
         # Create branch index if doesn't exist
         if root not in self.branch_indices:
-            self.branch_indices[root] = BranchIndex(root)
+            self.branch_indices[root] = BranchIndex(root, use_faiss=self.use_faiss)
+
+        branch_index = self.branch_indices[root]
+        if keywords is None:
+            keywords = branch_index._extract_keywords(block_data.get('context') or "")
 
         # Add to branch index
-        self.branch_indices[root].add_block(block_index, block_data, keywords, embedding)
+        branch_index.add_block(block_index, block_data, keywords, embedding)
 
         # Update current branch
-        self.current_branch = root
+        if set_current:
+            self.current_branch = root
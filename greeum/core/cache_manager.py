@@ -1,13 +1,28 @@
 import os
 import json
-import hashlib
-import time
-from typing import List, Dict, Any, Optional
+import atexit
+import logging
+import threading
+import weakref
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import numpy as np
 
 from .block_manager import BlockManager
 from .stm_manager import STMManager
+from .query_cache import QueryResultCache, embedding_key, get_query_cache
+
+logger = logging.getLogger(__name__)
+
+# v5.4: 디바운스 중인 context_cache.json 저장을 종료 시 기록하기 위한 목록
+_open_managers: "weakref.WeakSet[CacheManager]" = weakref.WeakSet()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
 
 class CacheManager:
     """최적화된 웨이포인트 캐시를 관리하는 클래스 (Phase 1: 5배 성능 향상)"""
@@ -16,7 +31,8 @@ class CacheManager:
                  data_path: str = "data/context_cache.json",
                  cache_ttl: int = 300,  # 5분 캐시
                  block_manager: Optional[BlockManager] = None,
-                 stm_manager: Optional[STMManager] = None):
+                 stm_manager: Optional[STMManager] = None,
+                 flush_delay: Optional[float] = None):
         """
         최적화된 캐시 매니저 초기화
         
@@ -25,6 +41,8 @@ class CacheManager:
             cache_ttl: 메모리 캐시 TTL (초, 기본값 5분)
             block_manager: 블록 매니저 인스턴스 (없으면 자동 생성)
             stm_manager: STM 매니저 인스턴스 (없으면 자동 생성)
+            flush_delay: 컨텍스트/웨이포인트 파일 저장 지연 (초, 기본값
+                GREEUM_CONTEXT_FLUSH_DELAY 또는 1.0, 0이면 즉시 저장)
         """
         # 기존 설정
         self.data_path = data_path
@@ -32,39 +50,31 @@ class CacheManager:
         # STMManager 는 DatabaseManager 의존성이 필요
         self.stm_manager = stm_manager or STMManager(self.block_manager.db_manager)
         
-        # 🚀 Phase 1: 새로운 메모리 캐시 시스템
+        # v5.4: DB 매니저와 공유하는 결과 캐시 (LRU+TTL, 블록 쓰기 시 세대 변경으로 무효화)
         self.cache_ttl = cache_ttl
-        self.memory_cache = {}  # {cache_key: {"results": [...], "timestamp": float}}
+        db_manager = getattr(self.block_manager, "db_manager", None)
+        self.query_cache = get_query_cache(db_manager)
+        if self.query_cache is None:
+            self.query_cache = QueryResultCache(ttl=cache_ttl)
         self.cache_hit_count = 0
         self.cache_miss_count = 0
         
         # 기존 파일 기반 캐시 유지 (호환성)
         self._ensure_data_file()
         self.cache_data = self._load_cache()
+
+        # v5.4: 파일 저장 디바운스 (update_cache 한 번에 여러 번 쓰지 않도록)
+        self.flush_delay = _env_float("GREEUM_CONTEXT_FLUSH_DELAY", 1.0) if flush_delay is None else flush_delay
+        self._save_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self.save_count = 0
+        _open_managers.add(self)
     
-    def _compute_cache_key(self, query_embedding: List[float], keywords: List[str]) -> str:
-        """임베딩과 키워드를 조합한 고유 캐시 키 생성"""
-        # 임베딩의 주요 차원만 사용 (정확도 vs 속도 균형)
-        embedding_sample = query_embedding[:10] if len(query_embedding) >= 10 else query_embedding
-        
-        # 키워드 정규화 및 정렬
+    def _compute_cache_key(self, query_embedding: List[float], keywords: List[str]) -> Tuple[str, str, Tuple[str, ...]]:
+        """전체 임베딩 해시와 정규화된 키워드를 조합한 캐시 키 생성"""
         normalized_keywords = sorted([kw.lower().strip() for kw in keywords if kw.strip()])
-        
-        # 조합된 문자열 생성
-        cache_input = f"{embedding_sample}|{normalized_keywords}"
-        
-        # MD5 해시로 캐시 키 생성 (충돌 확률 낮고 빠름)
-        return hashlib.md5(cache_input.encode('utf-8')).hexdigest()[:12]
-    
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """캐시 유효성 검사"""
-        if cache_key not in self.memory_cache:
-            return False
-        
-        cache_entry = self.memory_cache[cache_key]
-        cache_age = time.time() - cache_entry["timestamp"]
-        
-        return cache_age < self.cache_ttl
+        return ("cache_manager", embedding_key(query_embedding), tuple(normalized_keywords))
     
     def _apply_keyword_boost(self, search_results: List[Dict], keywords: List[str]) -> List[Dict]:
         """메모리에서 키워드 부스팅 적용 (DB 검색 대신)"""
@@ -86,20 +96,6 @@ class CacheManager:
         # 점수 기준 정렬
         return sorted(boosted_results, key=lambda x: x.get("relevance", 0), reverse=True)
     
-    def _cleanup_expired_cache(self) -> int:
-        """만료된 캐시 엔트리 정리"""
-        current_time = time.time()
-        expired_keys = []
-        
-        for key, entry in self.memory_cache.items():
-            if current_time - entry["timestamp"] > self.cache_ttl:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self.memory_cache[key]
-        
-        return len(expired_keys)
-    
     def get_cache_stats(self) -> Dict[str, Any]:
         """캐시 성능 통계"""
         total_requests = self.cache_hit_count + self.cache_miss_count
@@ -109,8 +105,10 @@ class CacheManager:
             "cache_hits": self.cache_hit_count,
             "cache_misses": self.cache_miss_count,
             "hit_ratio": hit_ratio,
-            "cache_size": len(self.memory_cache),
-            "total_requests": total_requests
+            "cache_size": len(self.query_cache),
+            "total_requests": total_requests,
+            "file_saves": self.save_count,
+            "query_cache": self.query_cache.get_stats(),
         }
         
     def _ensure_data_file(self) -> None:
@@ -142,10 +140,37 @@ class CacheManager:
             }
     
     def _save_cache(self) -> None:
-        """캐시 데이터 저장"""
-        self.cache_data["last_updated"] = datetime.now().isoformat()
-        with open(self.data_path, 'w', encoding='utf-8') as f:
-            json.dump(self.cache_data, f, ensure_ascii=False, indent=2)
+        """캐시 데이터 저장 예약 (v5.4: flush_delay 안의 변경을 한 번에 기록)"""
+        if self.flush_delay <= 0:
+            with self._save_lock:
+                self._dirty = True
+            self.flush()
+            return
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.flush_delay, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self) -> bool:
+        """예약된 캐시 데이터 저장을 즉시 기록
+
+        Returns:
+            파일을 기록했으면 True (변경이 없으면 False)
+        """
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return False
+            self._dirty = False
+            self.cache_data["last_updated"] = datetime.now().isoformat()
+            with open(self.data_path, 'w', encoding='utf-8') as f:
+                json.dump(self.cache_data, f, ensure_ascii=False, indent=2)
+            self.save_count += 1
+        return True
     
     def update_context(self, context: str) -> None:
         """
@@ -191,11 +216,12 @@ class CacheManager:
         """
         # 🚀 최적화 1: 캐시 키 생성 및 확인
         cache_key = self._compute_cache_key(query_embedding, extracted_keywords)
+        generation = self.query_cache.generation
+        cached_results = self.query_cache.get(cache_key, max_age=self.cache_ttl)
         
-        if self._is_cache_valid(cache_key):
+        if cached_results is not None:
             # 캐시 히트 - 즉시 반환 (90% 속도 향상)
             self.cache_hit_count += 1
-            cached_results = self.memory_cache[cache_key]["results"]
             
             # 컨텍스트만 업데이트 (검색은 스킵)
             self.update_context(user_input)
@@ -214,15 +240,8 @@ class CacheManager:
         # 🚀 최적화 4: 상위 결과 선택
         final_results = keyword_boosted_results[:top_k]
         
-        # 🚀 최적화 5: 캐시 저장
-        self.memory_cache[cache_key] = {
-            "results": final_results,
-            "timestamp": time.time()
-        }
-        
-        # 주기적 캐시 정리 (메모리 사용량 제한)
-        if len(self.memory_cache) > 100:  # 100개 초과 시 정리
-            self._cleanup_expired_cache()
+        # 🚀 최적화 5: 캐시 저장 (검색 중 블록이 추가되었으면 저장되지 않음)
+        self.query_cache.put(cache_key, final_results, generation)
         
         # 🚀 최적화 6: 기존 웨이포인트 시스템 업데이트 (호환성 유지)
         waypoints = [{"block_index": r["block_index"], "relevance": r.get("relevance", 0.7)} 
@@ -236,15 +255,7 @@ class CacheManager:
                            search_results: List[Dict[str, Any]]) -> None:
         """실제 검색 결과를 캐시에 직접 저장 (Phase 3 일관성 보장용)"""
         cache_key = self._compute_cache_key(query_embedding, keywords or [])
-        
-        self.memory_cache[cache_key] = {
-            "results": search_results,
-            "timestamp": time.time()
-        }
-        
-        # 주기적 캐시 정리
-        if len(self.memory_cache) > 100:
-            self._cleanup_expired_cache()
+        self.query_cache.put(cache_key, search_results)
     
     def get_cached_results(self, query_embedding: List[float], keywords: List[str] = None) -> Optional[List[Dict[str, Any]]]:
         """Phase 3용: 캐시된 결과 조회"""
@@ -252,10 +263,11 @@ class CacheManager:
             keywords = []
         
         cache_key = self._compute_cache_key(query_embedding, keywords)
+        cached_results = self.query_cache.get(cache_key, max_age=self.cache_ttl)
         
-        if self._is_cache_valid(cache_key):
+        if cached_results is not None:
             self.cache_hit_count += 1
-            return self.memory_cache[cache_key]["results"]
+            return cached_results
         
         self.cache_miss_count += 1
         return None
@@ -263,7 +275,7 @@ class CacheManager:
     def clear_cache(self) -> None:
         """캐시 초기화 (메모리 캐시 + 파일 캐시)"""
         # 🚀 메모리 캐시 초기화
-        self.memory_cache.clear()
+        self.query_cache.clear()
         self.cache_hit_count = 0
         self.cache_miss_count = 0
         
@@ -274,3 +286,12 @@ class CacheManager:
             "last_updated": datetime.now().isoformat()
         }
         self._save_cache() 
+
+
+@atexit.register
+def _flush_open_managers() -> None:
+    for manager in list(_open_managers):
+        try:
+            manager.flush()
+        except Exception as e:  # noqa: BLE001
+            logger.debug(f"Context cache flush at exit failed: {e}")
@@ -0,0 +1,206 @@
+"""
+Trigger-maintained change log for derived search state (v5.4).
+
+The embedding matrix, the global keyword index and the branch centroids keep
+process-local copies of ``block_embeddings``/``blocks``/``block_keywords``
+and persist snapshots next to the database. A ``MAX(block_index)``
+high-water mark only reveals appended blocks; in-place rewrites (knowledge
+updates from another process, ``scripts/migrate_embeddings.py``,
+``greeum doctor`` repairs, raw SQL) leave the mark unchanged.
+
+``store_change_log`` records those rewrites for every writer through
+triggers:
+
+- one row per ``(kind, block_index)``; a new change replaces the row and
+  takes a fresh ``seq`` (AUTOINCREMENT, never reused), so the table stays
+  bounded by the number of blocks and ``seq > N`` never has gaps
+- kinds: ``embedding`` (block_embeddings insert/update/delete), ``root``
+  (branch root changed or block deleted), ``text`` (context changed or block
+  deleted), ``keywords`` (block_keywords insert/delete), ``links``
+  (``before``/``after``/``xref`` changed)
+
+Consumers remember the ``MAX(seq)`` their state reflects (also stored in
+their snapshots) and re-read only the blocks changed since. A log whose
+``MAX(seq)`` is behind the remembered value means the database was replaced
+or restored; consumers rebuild. Databases without the table (read-only
+handles, bare test connections) report ``None`` and keep the high-water mark
+behaviour.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from typing import Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHANGE_LOG_TABLE = "store_change_log"
+
+KIND_EMBEDDING = "embedding"
+KIND_ROOT = "root"
+KIND_TEXT = "text"
+KIND_KEYWORDS = "keywords"
+KIND_LINKS = "links"
+
+# Derived files written next to the database by the search stores
+INDEX_SNAPSHOT_SUFFIXES = (".embeddings.npz", ".global_index.npz")
+
+_CHUNK = 500  # SQLite 바인딩 변수 한도(999) 아래로 유지
+
+
+def _log(kind: str, ref: str) -> str:
+    return (
+        f"INSERT OR REPLACE INTO {CHANGE_LOG_TABLE}(kind, block_index) "
+        f"VALUES ('{kind}', {ref}.block_index);"
+    )
+
+
+# (blocks columns the trigger needs, statement)
+_TRIGGERS = (
+    ((), f"""
+    CREATE TRIGGER IF NOT EXISTS change_log_embedding_ai AFTER INSERT ON block_embeddings BEGIN
+        {_log(KIND_EMBEDDING, 'new')}
+    END
+    """),
+    ((), f"""
+    CREATE TRIGGER IF NOT EXISTS change_log_embedding_au AFTER UPDATE ON block_embeddings BEGIN
+        {_log(KIND_EMBEDDING, 'new')}
+    END
+    """),
+    ((), f"""
+    CREATE TRIGGER IF NOT EXISTS change_log_embedding_ad AFTER DELETE ON block_embeddings BEGIN
+        {_log(KIND_EMBEDDING, 'old')}
+    END
+    """),
+    (("root",), f"""
+    CREATE TRIGGER IF NOT EXISTS change_log_root_au AFTER UPDATE OF root ON blocks
+    WHEN old.root IS NOT new.root BEGIN
+        {_log(KIND_ROOT, 'new')}
+    END
+    """),
+    ((), f"""
+    CREATE TRIGGER IF NOT EXISTS change_log_text_au AFTER UPDATE OF context ON blocks
+    WHEN old.context IS NOT new.context BEGIN
+        {_log(KIND_TEXT, 'new')}
+    END
+    """),
+    (("before", "after", "xref"), f"""
+    CREATE TRIGGER IF NOT EXISTS change_log_links_au AFTER UPDATE OF "before", "after", xref ON blocks
+    WHEN old."before" IS NOT new."before" OR old."after" IS NOT new."after" OR old.xref IS NOT new.xref
+    BEGIN
+        {_log(KIND_LINKS, 'new')}
+    END
+    """),
+    ((), f"""
+    CREATE TRIGGER IF NOT EXISTS change_log_blocks_ad AFTER DELETE ON blocks BEGIN
+        {_log(KIND_ROOT, 'old')}
+        {_log(KIND_TEXT, 'old')}
+    END
+    """),
+    ((), f"""
+    CREATE TRIGGER IF NOT EXISTS change_log_keywords_ai AFTER INSERT ON block_keywords BEGIN
+        {_log(KIND_KEYWORDS, 'new')}
+    END
+    """),
+    ((), f"""
+    CREATE TRIGGER IF NOT EXISTS change_log_keywords_ad AFTER DELETE ON block_keywords BEGIN
+        {_log(KIND_KEYWORDS, 'old')}
+    END
+    """),
+)
+
+
+def ensure_change_log_schema(cursor) -> bool:
+    """Create the change log table and its triggers (idempotent).
+
+    Requires ``blocks``, ``block_embeddings`` and ``block_keywords``; a legacy
+    schema without the branch columns (``root``, ``before``/``after``/``xref``)
+    skips the root and link triggers.
+
+    Returns:
+        True when every trigger is installed.
+    """
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            block_index INTEGER NOT NULL,
+            UNIQUE(kind, block_index)
+        )
+        """
+    )
+    cursor.execute("PRAGMA table_info(blocks)")
+    columns = {row[1] for row in cursor.fetchall()}
+    complete = True
+    for required, statement in _TRIGGERS:
+        if not columns.issuperset(required):
+            complete = False
+            continue
+        try:
+            cursor.execute(statement)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Change log trigger skipped: {e}")
+            complete = False
+    return complete
+
+
+def current_change_seq(conn) -> Optional[int]:
+    """Latest change sequence, 0 for an empty log, ``None`` when there is no log."""
+    try:
+        row = conn.execute(f"SELECT MAX(seq) FROM {CHANGE_LOG_TABLE}").fetchone()
+    except sqlite3.Error:
+        return None
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+def store_version(conn) -> Tuple[Optional[int], int]:
+    """``(change log position, MAX(block_index))``; moves on logged rewrites and
+    on appends made by any process (the log has no insert trigger on ``blocks``)."""
+    row = conn.execute("SELECT MAX(block_index) FROM blocks").fetchone()
+    return current_change_seq(conn), (row[0] if row and row[0] is not None else -1)
+
+
+def changed_blocks(conn, since: int, until: Optional[int] = None,
+                   kinds: Optional[Iterable[str]] = None) -> Set[int]:
+    """Block indexes with a change of ``kinds`` in ``(since, until]``."""
+    sql = f"SELECT DISTINCT block_index FROM {CHANGE_LOG_TABLE} WHERE seq > ?"
+    params: List[object] = [since]
+    if until is not None:
+        sql += " AND seq <= ?"
+        params.append(until)
+    if kinds is not None:
+        kinds = list(kinds)
+        sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+        params.extend(kinds)
+    return {int(row[0]) for row in conn.execute(sql, params).fetchall()}
+
+
+def chunked(values: Iterable[int], size: int = _CHUNK) -> Iterable[List[int]]:
+    """Split ``values`` into sorted lists small enough for ``IN (...)`` binds."""
+    ordered = sorted(values)
+    for start in range(0, len(ordered), size):
+        yield ordered[start:start + size]
+
+
+def discard_index_snapshots(db_path) -> List[str]:
+    """Delete the derived search snapshots of ``db_path``; returns removed paths.
+
+    Bulk rewriters (embedding migration, doctor repairs) call this so the next
+    process rebuilds from the database instead of validating a stale file.
+    """
+    removed: List[str] = []
+    if not db_path:
+        return removed
+    for suffix in INDEX_SNAPSHOT_SUFFIXES:
+        path = f"{db_path}{suffix}"
+        try:
+            os.remove(path)
+            removed.append(path)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning(f"Failed to remove index snapshot {path}: {e}")
+    return removed
@@ -130,6 +130,7 @@ class ContextManager:
         
         memories = []
         
+        activated = []
         for node_id, activation in self.current_session.activation_snapshot.items():
             if activation < self.spreading.activation_threshold:
                 continue
@@ -137,9 +138,15 @@ class ContextManager:
             node = self.network.nodes.get(node_id)
             if not node or not node.memory_id:
                 continue
-            
-            block = self.db_manager.get_block(node.memory_id)
-            if block:
+            activated.append((node_id, activation, node.memory_id))
+        
+        blocks = {
+            block['block_index']: block
+            for block in self.db_manager.get_blocks_by_indices([m for _, _, m in activated])
+        }
+        for node_id, activation, memory_id in activated:
+            if memory_id in blocks:
+                block = dict(blocks[memory_id])
                 block['relevance_score'] = activation
                 block['node_id'] = node_id
                 memories.append(block)
@@ -9,7 +9,16 @@ from typing import List, Dict, Any, Optional, Tuple, Callable
 import logging
 
 from .branch_schema import BranchSchemaSQL, BranchBlock, BranchMeta, SearchMeta
+from .block_fetch import fetch_blocks
+from .block_write import insert_blocks
 from .stm_anchor_store import STMAnchorStore
+from .embedding_store import EmbeddingMatrixStore
+from .graph_cache import BlockGraphCache
+from .branch_centroids import BranchCentroidStore, ensure_branch_centroid_schema
+from .activation_history import ActivationHistorySink
+from .query_cache import QueryResultCache
+from .change_log import ensure_change_log_schema, store_version
+from .fts_index import ensure_fts_schema, search_fts
 from .db_integrity import (
     backup_database_files,
     is_corruption_error,
@@ -61,6 +70,22 @@ class DatabaseManager:
         self._setup_connection()
         self._create_schemas()
 
+        # v5.4: 벡터 검색용 정규화 임베딩 행렬 (첫 검색 시 로드, 이후 증분 갱신)
+        self.embedding_store = EmbeddingMatrixStore.for_database(self.connection_string)
+
+        # v5.4: 그래프 탐색용 해시 키 노드/인접 캐시 (LRU, 쓰기 경로에서 무효화)
+        self.graph_cache = BlockGraphCache(self)
+
+        # v5.4: 브랜치별 임베딩 누적합/개수 (라우팅용 중심 벡터, 쓰기 경로에서 O(dim) 갱신)
+        self.branch_centroids = BranchCentroidStore(self)
+
+        # v5.4: activation_history 행 버퍼 (배치 flush, close 시 기록)
+        self.activation_history = ActivationHistorySink(self)
+
+        # v5.4: 검색 결과 캐시 (LRU+TTL, 쓰기 세대가 바뀌면 항목 무효)
+        # 다른 프로세스의 쓰기는 변경 로그 위치로 감지
+        self.query_cache = QueryResultCache(store_version=lambda: store_version(self.conn))
+
         # Serialized write coordination
         self._write_lock = threading.RLock()
         warn_env = os.getenv("GREEUM_SQLITE_WRITE_WARN", "5")
@@ -318,6 +343,7 @@ class DatabaseManager:
         
         # 인덱스 생성
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_blocks_timestamp ON blocks(timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_blocks_hash ON blocks(hash)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_block_keywords ON block_keywords(keyword)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_block_tags ON block_tags(tag)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_stm_timestamp ON short_term_memories(timestamp)')
@@ -325,6 +351,12 @@ class DatabaseManager:
         # Branch-aware defaults
         self._initialize_branch_structures(cursor)
 
+        # v5.4: FTS5 키워드 인덱스 (최초 생성 시 기존 블록 backfill)
+        self._fts_enabled = ensure_fts_schema(cursor)
+        ensure_branch_centroid_schema(cursor)
+        # v5.4: 제자리 갱신(재임베딩·키워드 교체)을 파생 인덱스에 알리는 변경 로그
+        ensure_change_log_schema(cursor)
+
         self.conn.commit()
 
     def _verify_integrity(self) -> None:
@@ -746,10 +778,12 @@ class DatabaseManager:
                     block_data.get('embedding_model', 'default'),
                     len(embedding_array)
                 ))
+                self.embedding_store.upsert(block_index, embedding_array)
 
             # Commit transaction only if we started it
             if not in_transaction:
                 conn.commit()
+            self.query_cache.bump()
 
             # Post-commit verification to ensure data is accessible
             try:
@@ -778,6 +812,35 @@ class DatabaseManager:
                 conn.rollback()
             logger.error(f"Failed to add block {block_index}: {e}")
             return None
+
+    def add_blocks(self, blocks: List[Dict[str, Any]], connection: Optional[Any] = None) -> List[int]:
+        """
+        v5.4: 여러 블록을 executemany로 한 트랜잭션에 추가
+
+        Args:
+            blocks: ``add_block``과 같은 형태의 블록 데이터 목록
+
+        Returns:
+            추가된 블록 인덱스 목록 (실패 시 예외 발생, 전체 롤백)
+        """
+        if not blocks:
+            return []
+        conn = connection or self.conn
+        in_transaction = conn.in_transaction
+        if not in_transaction:
+            conn.execute("BEGIN TRANSACTION")
+        try:
+            embeddings = insert_blocks(conn.cursor(), blocks)
+            if not in_transaction:
+                conn.commit()
+        except Exception as e:
+            if not in_transaction:
+                conn.rollback()
+            logger.error(f"Failed to add {len(blocks)} blocks: {e}")
+            raise
+        self.embedding_store.upsert_many(embeddings)
+        self.query_cache.bump()
+        return [block['block_index'] for block in blocks]
     
     def get_block(self, block_index: int) -> Optional[Dict[str, Any]]:
         """
@@ -868,6 +931,20 @@ class DatabaseManager:
         
         # logger.debug(f"블록 조회 성공: index={block_index}")  # Debug logging
         return block
+
+    def get_blocks_by_indices(self, indices: List[int],
+                              fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        여러 블록을 고정된 수의 IN (...) 쿼리로 일괄 조회 (v5.4)
+
+        Args:
+            indices: 블록 인덱스 목록 (결과는 이 순서를 따름, 없는 인덱스는 제외)
+            fields: 조회할 필드 (None이면 get_block과 동일한 전체 필드)
+
+        Returns:
+            블록 목록
+        """
+        return fetch_blocks(self.conn.cursor(), indices, fields, parse_branch_json=True)
     
     def get_blocks(self, start_idx: Optional[int] = None, end_idx: Optional[int] = None,
                   limit: int = 100, offset: int = 0,
@@ -932,13 +1009,8 @@ class DatabaseManager:
         
         cursor.execute(query, tuple(params))
         
-        blocks = []
         block_indices = [row[0] for row in cursor.fetchall()]
-        for block_index in block_indices:
-            block = self.get_block(block_index)
-            if block:
-                blocks.append(block)
-        return blocks
+        return self.get_blocks_by_indices(block_indices)
     
     def search_blocks_by_keyword(self, keywords: List[str], limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -955,8 +1027,17 @@ class DatabaseManager:
             return []
             
         cursor = self.conn.cursor()
+
+        # v5.4: FTS5 + bm25 랭킹, LIMIT은 SQL에서 적용
+        if getattr(self, '_fts_enabled', False):
+            scored = search_fts(cursor, keywords, limit)
+            scores = dict(scored)
+            blocks = self.get_blocks_by_indices([block_index for block_index, _ in scored])
+            for block in blocks:
+                block['keyword_score'] = scores[block['block_index']]
+            return blocks
         
-        # 각 키워드마다 부분 일치 검색
+        # 각 키워드마다 부분 일치 검색 (FTS5 미지원 SQLite 빌드)
         block_indices = set()
         for keyword in keywords:
             kw_lower = keyword.lower()
@@ -980,15 +1061,8 @@ class DatabaseManager:
             for row in cursor.fetchall():
                 block_indices.add(row[0])
         
-        # 결과 블록 조회
-        blocks = []
-        for block_index in block_indices:
-            block = self.get_block(block_index)
-            if block:
-                blocks.append(block)
-                
-        # 너무 많은 경우 제한
-        return blocks[:limit]
+        # 결과 블록 조회 (제한 후 일괄 조회)
+        return self.get_blocks_by_indices(list(block_indices)[:limit])
     
     def search_blocks_by_embedding(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -1001,48 +1075,17 @@ class DatabaseManager:
         Returns:
             유사도 높은 블록 목록
         """
-        cursor = self.conn.cursor()
-        
-        # 모든 임베딩 가져오기
-        cursor.execute('''
-        SELECT block_index, embedding, embedding_dim FROM block_embeddings
-        ''')
-        
-        query_embedding = np.array(query_embedding, dtype=np.float32)
-        blocks_with_similarity = []
-        
-        for row in cursor.fetchall():
-            block_index = row[0]
-            embedding_bytes = row[1]
-            embedding_dim = row[2]
-            
-            # 바이너리에서 NumPy 배열로 변환
-            block_embedding = np.frombuffer(embedding_bytes, dtype=np.float32)
-            if embedding_dim:
-                block_embedding = block_embedding[:embedding_dim]
-            
-            # 차원 확인 및 스킵 (차원이 맞지 않으면 건너뛰기)
-            if len(query_embedding) != len(block_embedding):
-                # logger.debug(f"Skipping block {block_index}: dimension mismatch ({len(query_embedding)} != {len(block_embedding)})")
-                continue
-            
-            # 코사인 유사도 계산
-            similarity = np.dot(query_embedding, block_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(block_embedding)
-            )
-            
-            blocks_with_similarity.append((block_index, similarity))
-        
-        # 유사도 순으로 정렬
-        blocks_with_similarity.sort(key=lambda x: x[1], reverse=True)
-        
-        # 상위 k개 블록 조회
-        result_blocks = []
-        for block_index, similarity in blocks_with_similarity[:top_k]:
-            block = self.get_block(block_index)
-            if block:
-                block['similarity'] = float(similarity)
-                result_blocks.append(block)
+        if query_embedding is None or len(query_embedding) == 0:
+            return []
+
+        # v5.4: 행렬-벡터 곱 + argpartition으로 상위 k개 선택
+        scored = self.embedding_store.search(self.conn, query_embedding, top_k=top_k)
+
+        # 상위 k개 블록 일괄 조회
+        similarities = dict(scored)
+        result_blocks = self.get_blocks_by_indices([block_index for block_index, _ in scored])
+        for block in result_blocks:
+            block['similarity'] = float(similarities[block['block_index']])
         
         return result_blocks
     
@@ -1073,14 +1116,7 @@ class DatabaseManager:
         LIMIT ?
         ''', (start_date, end_date, limit))
         
-        blocks = []
-        for row in cursor.fetchall():
-            block_index = row[0]
-            block = self.get_block(block_index)
-            if block:
-                blocks.append(block)
-                
-        return blocks
+        return self.get_blocks_by_indices([row[0] for row in cursor.fetchall()])
     
     def add_short_term_memory(self, memory_data: Dict[str, Any]) -> str:
         """
@@ -1258,6 +1294,8 @@ class DatabaseManager:
         명시적으로 닫으려면 별도 트래커가 필요 (Phase 2에서 검토).
         Default 모드: 단일 공유 연결을 닫는다.
         """
+        self._save_embedding_snapshot()
+        self._flush_activation_history()
         if self._thread_local_mode:
             existing = getattr(self._local, "conn", None)
             if existing is not None:
@@ -1273,6 +1311,22 @@ class DatabaseManager:
             self._shared_conn = None
             logger.info(f"Database connection closed: {self.connection_string}")
 
+    def _flush_activation_history(self) -> None:
+        """Write buffered activation_history rows before the connection goes away."""
+        history = getattr(self, "activation_history", None)
+        if history is not None:
+            history.flush()
+
+    def _save_embedding_snapshot(self) -> None:
+        """Persist the embedding matrix/ANN snapshot next to the database."""
+        store = getattr(self, "embedding_store", None)
+        if store is None:
+            return
+        try:
+            store.save()
+        except Exception as e:  # noqa: BLE001
+            logger.debug(f"Embedding snapshot save skipped: {e}")
+
     def __enter__(self):
         return self
 
@@ -1379,13 +1433,7 @@ class DatabaseManager:
         cursor.execute(query, params)
         block_indices = [row[0] for row in cursor.fetchall()]
         
-        blocks = []
-        for block_index in block_indices:
-            block = self.get_block(block_index) # N+1 문제가 발생할 수 있음
-            if block:
-                blocks.append(block)
-        
-        return blocks
+        return self.get_blocks_by_indices(block_indices)
     
     def count_blocks(self) -> int:
         """
@@ -1536,6 +1584,7 @@ class DatabaseManager:
             ''', (block_index, json.dumps(metadata)))
             
             self.conn.commit()
+            self.query_cache.bump()
             # logger.debug(f"Updated metadata for block {block_index}")  # Debug logging
             return True
             
@@ -4,6 +4,7 @@ Implements depth-first search with branch awareness
 """
 
 import sqlite3
+import threading
 import time
 import json
 import logging
@@ -13,6 +14,9 @@ from collections import deque
 from datetime import datetime
 from .global_index import GlobalIndex, GlobalJumpOptimizer
 from .branch_index import BranchIndexManager
+from .graph_cache import BlockGraphCache
+from .branch_centroids import BranchCentroidStore
+from .change_log import changed_blocks, current_change_seq
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +25,15 @@ class DFSSearchEngine:
     """DFS-based local-first search engine with global jump capability
 
     v4.0: Added query-based optimal branch selection for improved search accuracy.
+    v5.4: Long-lived engine. Indexes are built once and kept current through
+    ``index_block``/``refresh_block`` (called from the BlockManager write path)
+    and ``sync``, which catches up blocks appended by other processes through a
+    high-water mark and blocks rewritten in place through the change log.
+    Searches hold the index lock only while reading branch postings.
     """
 
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, global_index: Optional[GlobalIndex] = None,
+                 branch_index_manager: Optional[BranchIndexManager] = None):
         self.db_manager = db_manager
         self.metrics = {
             "total_searches": 0,
@@ -37,14 +47,45 @@ class DFSSearchEngine:
             "jump_success_rate": 0.0
         }
 
-        # Initialize indices
-        self.global_index = GlobalIndex(db_manager)
+        # Initialize indices (shared instances are reused instead of rebuilt)
+        self._index_lock = threading.RLock()
+        # Adaptive patterns and search metrics, updated by concurrent searches
+        self._stats_lock = threading.Lock()
+        self.index_stats = {
+            "global_build_ms": 0.0,
+            "branch_build_ms": 0.0,
+            "built_at": None,
+            "high_water_mark": -1,
+            "change_seq": None,
+            "incremental_updates": 0,
+            "catch_up_blocks": 0,
+            "rewritten_blocks": 0,
+            "last_update_at": None,
+        }
+
+        build_start = time.time()
+        self.global_index = global_index if global_index is not None else GlobalIndex(db_manager)
+        if global_index is None:
+            self.index_stats["global_build_ms"] = (time.time() - build_start) * 1000
+
         self.jump_optimizer = GlobalJumpOptimizer()
-        self.branch_index_manager = BranchIndexManager(db_manager)  # rc6: Branch indexing
 
-        # v4.0: Cache for branch centroids (for optimal branch selection)
-        self._branch_centroids = {}
-        self._centroids_built = False
+        build_start = time.time()
+        if branch_index_manager is not None:
+            self.branch_index_manager = branch_index_manager
+        else:
+            self.branch_index_manager = BranchIndexManager(db_manager)  # rc6: Branch indexing
+            self.index_stats["branch_build_ms"] = (time.time() - build_start) * 1000
+
+        self.index_stats["built_at"] = time.time()
+        self.index_stats["high_water_mark"] = self._get_store_high_water_mark()
+        self.index_stats["change_seq"] = current_change_seq(db_manager.conn)
+
+        # v5.4: Hash-keyed node/adjacency cache shared with other graph searches
+        self.graph_cache = getattr(db_manager, "graph_cache", None) or BlockGraphCache(db_manager)
+
+        # v5.4: Running-sum branch centroids shared with BranchAwareStorage
+        self.centroid_store = getattr(db_manager, "branch_centroids", None) or BranchCentroidStore(db_manager)
 
         # P1: Adaptive DFS pattern learning
         self.adaptive_patterns = {
@@ -55,42 +96,206 @@ class DFSSearchEngine:
         }
         self.learning_rate = 0.1  # for exponential moving average
 
-    def _build_branch_centroids(self) -> None:
-        """Build centroid embeddings for each branch for optimal branch selection."""
-        if self._centroids_built:
+    # ------------------------------------------------------------------
+    # Incremental index maintenance
+    # ------------------------------------------------------------------
+    def _get_store_high_water_mark(self) -> int:
+        """Return the largest block_index currently stored (-1 when empty)."""
+        try:
+            cursor = self.db_manager.conn.cursor()
+            cursor.execute("SELECT MAX(block_index) FROM blocks")
+            row = cursor.fetchone()
+            if row and row[0] is not None:
+                return int(row[0])
+        except Exception as e:
+            logger.debug(f"Failed to read block high-water mark: {e}")
+        return -1
+
+    def index_block(self, block: Dict[str, Any], set_current: bool = True) -> None:
+        """Add a newly written block to the global and branch indexes.
+
+        Args:
+            block: Block dict as written by ``BlockManager`` (block_index, hash,
+                context, root, before, after, keywords, embedding, ...)
+        """
+        block_index = block.get("block_index")
+        if block_index is None:
             return
 
-        cursor = self.db_manager.conn.cursor()
+        embedding = block.get("embedding")
+        emb_array = None
+        if embedding is not None and len(embedding) > 0:
+            emb_array = np.asarray(embedding, dtype=np.float32).reshape(-1)
+
+        context = block.get("context") or ""
+        keywords = list(block.get("keywords") or [])
+
+        with self._index_lock:
+            self.global_index.update_block(
+                block_index,
+                keywords + self.global_index._extract_keywords(context),
+                emb_array,
+            )
+
+            root = block.get("root")
+            if root and self.branch_index_manager is not None:
+                after = block.get("after", [])
+                block_data = {
+                    "block_index": block_index,
+                    "hash": block.get("hash"),
+                    "context": context,
+                    "timestamp": block.get("timestamp"),
+                    "importance": block.get("importance"),
+                    "root": root,
+                    "before": block.get("before"),
+                    "after": after if isinstance(after, str) else json.dumps(after or []),
+                }
+                self.branch_index_manager.update_branch(
+                    block_index, block_data, None, emb_array, set_current=set_current
+                )
 
-        # Get all branches
-        cursor.execute("""
-            SELECT DISTINCT root FROM blocks WHERE root IS NOT NULL
-        """)
-        branches = [row[0] for row in cursor.fetchall()]
+            if block_index > self.index_stats["high_water_mark"]:
+                self.index_stats["high_water_mark"] = block_index
+            self.index_stats["incremental_updates"] += 1
+            self.index_stats["last_update_at"] = time.time()
 
-        for branch_root in branches:
+    def refresh_block(self, block_index: int) -> None:
+        """Re-read an existing block from the store and re-index it.
+
+        Used after in-place writes such as knowledge updates, where content,
+        keywords and the embedding of an already indexed block change.
+        """
+        block = self._load_block_for_index(block_index)
+        if block:
+            self.index_block(block, set_current=False)
+
+    def invalidate_branches(self) -> None:
+        """Drop cached branch centroids after merges reshape branch structure."""
+        with self._index_lock:
+            self.centroid_store.invalidate()
+            self.index_stats["last_update_at"] = time.time()
+
+    def sync(self) -> int:
+        """Catch up with writers that bypass this engine (other processes, CLI imports).
+
+        Blocks above the high-water mark are indexed; indexed blocks whose
+        content, keywords, embedding or root changed in place since the last
+        sync (per the shared change log) are re-indexed, and deleted ones leave
+        the keyword postings. Costs a ``MAX(block_index)`` and a ``MAX(seq)``
+        query when nothing changed. Without a change log (legacy schema) only
+        appended blocks are seen.
+
+        Returns:
+            Number of blocks ingested or re-indexed
+        """
+        self.graph_cache.sync()
+        self.centroid_store.sync()
+        rewritten = self._sync_rewrites()
+        store_mark = self._get_store_high_water_mark()
+        if store_mark <= self.index_stats["high_water_mark"]:
+            return rewritten
+
+        with self._index_lock:
+            start = self.index_stats["high_water_mark"]
+            ingested = 0
+            try:
+                cursor = self.db_manager.conn.cursor()
+                cursor.execute(
+                    "SELECT block_index FROM blocks WHERE block_index > ? ORDER BY block_index",
+                    (start,),
+                )
+                new_indices = [row[0] for row in cursor.fetchall()]
+            except Exception as e:
+                logger.debug(f"Index catch-up query failed: {e}")
+                return 0
+
+            for block_index in new_indices:
+                block = self._load_block_for_index(block_index)
+                if block:
+                    self.index_block(block)
+                    ingested += 1
+
+            self.index_stats["high_water_mark"] = max(self.index_stats["high_water_mark"], store_mark)
+            self.index_stats["catch_up_blocks"] += ingested
+
+        if ingested:
+            logger.debug(f"Search index caught up with {ingested} external block writes")
+        return ingested + rewritten
+
+    def _sync_rewrites(self) -> int:
+        """Re-index blocks at or below the high-water mark changed since the last sync."""
+        try:
+            change_seq = current_change_seq(self.db_manager.conn)
+            last_seq = self.index_stats["change_seq"]
+            if change_seq is None or last_seq is None or change_seq == last_seq:
+                self.index_stats["change_seq"] = change_seq
+                return 0
+            if change_seq < last_seq:
+                # Database restored behind the engine: keyword postings are
+                # rescanned by the global index, branch centroids rebuilt
+                self.global_index.sync_changes()
+                self.invalidate_branches()
+                self.index_stats["change_seq"] = change_seq
+                return 0
+            changed = sorted(
+                block_index
+                for block_index in changed_blocks(self.db_manager.conn, last_seq, change_seq)
+                if block_index <= self.index_stats["high_water_mark"]
+            )
+        except Exception as e:
+            logger.debug(f"Change log catch-up query failed: {e}")
+            return 0
+
+        with self._index_lock:
+            # Drops deleted blocks from the postings and advances the global index's own position
+            self.global_index.sync_changes()
+            for block_index in changed:
+                self.refresh_block(block_index)
+            self.index_stats["change_seq"] = change_seq
+            self.index_stats["rewritten_blocks"] += len(changed)
+
+        if changed:
+            logger.debug(f"Search index re-indexed {len(changed)} blocks rewritten in place")
+        return len(changed)
+
+    def _load_block_for_index(self, block_index: int) -> Optional[Dict[str, Any]]:
+        """Load the fields needed for indexing a single block."""
+        try:
+            cursor = self.db_manager.conn.cursor()
             cursor.execute("""
-                SELECT be.embedding
-                FROM block_embeddings be
-                JOIN blocks b ON be.block_index = b.block_index
-                WHERE b.root = ? AND be.embedding IS NOT NULL
-                LIMIT 50
-            """, (branch_root,))
-
-            embeddings = []
-            for (emb_blob,) in cursor.fetchall():
-                if emb_blob:
-                    try:
-                        emb = np.frombuffer(emb_blob, dtype=np.float32)
-                        embeddings.append(emb)
-                    except:
-                        continue
-
-            if embeddings:
-                self._branch_centroids[branch_root] = np.mean(embeddings, axis=0)
-
-        self._centroids_built = True
-        logger.debug(f"Built centroids for {len(self._branch_centroids)} branches")
+                SELECT block_index, hash, context, timestamp, importance, root, before, after
+                FROM blocks WHERE block_index = ?
+            """, (block_index,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+
+            block = {
+                "block_index": row[0],
+                "hash": row[1],
+                "context": row[2],
+                "timestamp": row[3],
+                "importance": row[4],
+                "root": row[5],
+                "before": row[6],
+                "after": row[7],
+            }
+
+            cursor.execute(
+                "SELECT keyword FROM block_keywords WHERE block_index = ?", (block_index,)
+            )
+            block["keywords"] = [r[0] for r in cursor.fetchall()]
+
+            cursor.execute(
+                "SELECT embedding FROM block_embeddings WHERE block_index = ?", (block_index,)
+            )
+            emb_row = cursor.fetchone()
+            if emb_row and emb_row[0]:
+                block["embedding"] = np.frombuffer(emb_row[0], dtype=np.float32)
+            return block
+        except Exception as e:
+            logger.debug(f"Failed to load block {block_index} for indexing: {e}")
+            return None
 
     def _select_optimal_branch(self, query_embedding: Optional[np.ndarray]) -> Optional[str]:
         """
@@ -98,6 +303,7 @@ class DFSSearchEngine:
 
         v4.0: Instead of defaulting to current branch, find the branch
         whose centroid is most similar to the query.
+        v5.4: One matrix-vector product against the shared centroid store.
 
         Returns:
             branch_root of the most similar branch, or None if no match
@@ -105,26 +311,7 @@ class DFSSearchEngine:
         if query_embedding is None or len(query_embedding) == 0:
             return None
 
-        self._build_branch_centroids()
-
-        if not self._branch_centroids:
-            return None
-
-        best_branch = None
-        best_score = -1.0
-
-        for branch_root, centroid in self._branch_centroids.items():
-            try:
-                # Cosine similarity
-                similarity = np.dot(query_embedding, centroid) / (
-                    np.linalg.norm(query_embedding) * np.linalg.norm(centroid) + 1e-8
-                )
-                if similarity > best_score:
-                    best_score = similarity
-                    best_branch = branch_root
-            except Exception as e:
-                logger.debug(f"Error computing similarity for branch {branch_root[:8]}: {e}")
-                continue
+        best_branch, best_score = self.centroid_store.best_match(query_embedding)
 
         if best_branch and best_score > 0.3:  # Threshold for meaningful similarity
             logger.info(f"Optimal branch selected: {best_branch[:8]}... (similarity: {best_score:.3f})")
@@ -156,6 +343,9 @@ class DFSSearchEngine:
         Returns:
             (results, search_meta)
         """
+        # Pick up blocks written outside this engine before searching
+        self.sync()
+
         start_time = time.time()
         self.metrics["total_searches"] += 1
 
@@ -199,27 +389,21 @@ class DFSSearchEngine:
             search_meta["search_type"] = "optimal_branch"
 
             # Search optimal branch first
-            branch_results = self.branch_index_manager.search_branch(
-                optimal_branch, query, limit, query_embedding=query_embedding
-            )
+            branch_results = self._search_branch(optimal_branch, query, limit, query_embedding)
             logger.info(f"Optimal branch search found {len(branch_results)} results")
         elif entry_point:
             current_branch = entry_point.get("root", entry_point.get("hash"))
             search_meta["root"] = current_branch
 
             # Search current branch index first (2ms)
-            branch_results = self.branch_index_manager.search_current_branch(
-                query, limit, query_embedding=query_embedding
-            )
+            branch_results = self._search_branch(None, query, limit, query_embedding)
 
         if len(branch_results) < 3:  # Not enough in current/optimal branch
             # Search related branches
             if current_branch:
                 related = self.branch_index_manager.get_related_branches(current_branch, 2)
                 for branch in related:
-                    additional = self.branch_index_manager.search_branch(
-                        branch, query, limit, query_embedding=query_embedding
-                    )
+                    additional = self._search_branch(branch, query, limit, query_embedding)
                     branch_results.extend(additional)
                     if len(branch_results) >= limit:
                         break
@@ -254,7 +438,8 @@ class DFSSearchEngine:
             search_meta["depth_used"] = min(depth, local_hops)
 
         # P1: Update adaptive patterns based on search results
-        self._update_adaptive_patterns(local_results, query, depth, local_hops)
+        with self._stats_lock:
+            self._update_adaptive_patterns(local_results, query, depth, local_hops)
 
         # v5.3.0: Association expansion — fill remaining slots via consolidator associations
         if len(local_results) < limit:
@@ -326,9 +511,10 @@ class DFSSearchEngine:
         results = self._rank_results(local_results, query_embedding)[:limit]
         
         # Update metrics
-        self.metrics["total_hops"] += search_meta["hops"]
-        if self.metrics["total_searches"] > 0:
-            self.metrics["avg_depth"] = self.metrics["total_hops"] / self.metrics["total_searches"]
+        with self._stats_lock:
+            self.metrics["total_hops"] += search_meta["hops"]
+            if self.metrics["total_searches"] > 0:
+                self.metrics["avg_depth"] = self.metrics["total_hops"] / self.metrics["total_searches"]
         
         # Calculate query time
         search_meta["query_time_ms"] = (time.time() - start_time) * 1000
@@ -338,6 +524,25 @@ class DFSSearchEngine:
         
         return results, search_meta
     
+    def _search_branch(self,
+                       branch_root: Optional[str],
+                       query: str,
+                       limit: int,
+                       query_embedding: Optional[np.ndarray]) -> List[Dict]:
+        """Branch index search (current branch when ``branch_root`` is None).
+
+        v5.4: Only the index read is done under the index lock; scoring runs
+        outside it so writers are not serialized behind searches.
+        """
+        with self._index_lock:
+            collected = self.branch_index_manager.collect(
+                branch_root, query, limit, query_embedding=query_embedding
+            )
+        if collected is None:
+            return []
+        index, state = collected
+        return index.rank(state, limit)
+
     def _get_entry_point_with_priority(self, slot: Optional[str], entry_type: str = "cursor") -> Optional[Dict]:
         """Get entry point block from STM slot with cursor → head → most_recent priority"""
         if not slot:
@@ -418,9 +623,6 @@ class DFSSearchEngine:
         entry_branch = entry_point.get("root", entry_point.get("hash"))
         queue = [(-1.0, entry_point, 0, 1.0, entry_branch)]  # Negative for max-heap
 
-        # Cache for embeddings
-        embedding_cache = {}
-
         # Track results per branch for quality check
         branch_results = {}
 
@@ -433,13 +635,8 @@ class DFSSearchEngine:
             visited.add(node.get("hash"))
             hop_count += 1
 
-            # Calculate relevance score with caching
-            node_hash = node.get("hash")
-            if node_hash in embedding_cache:
-                node_embedding = embedding_cache[node_hash]
-            else:
-                node_embedding = self._get_node_embedding(node)
-                embedding_cache[node_hash] = node_embedding
+            # Calculate relevance score (embedding view comes from the graph cache)
+            node_embedding = self._get_node_embedding(node)
 
             score = self._calculate_relevance_improved(
                 node, query, query_embedding, node_embedding
@@ -479,10 +676,8 @@ class DFSSearchEngine:
             )
 
             if should_continue:
-                # Get neighbors
-                children = self._get_children(node)
-                parent = self._get_parent(node)
-                xrefs = self._get_xrefs(node)
+                # Get neighbors (one batched cache lookup per expansion)
+                children, parent, xrefs = self._get_neighbours(node)
 
                 # Calculate priorities for each neighbor
                 for child in children:
@@ -520,42 +715,46 @@ class DFSSearchEngine:
         
         return results, hop_count
     
+    @staticmethod
+    def _link_list(node: Dict, key: str) -> List[str]:
+        links = node.get(key, [])
+        if isinstance(links, str):
+            try:
+                links = json.loads(links)
+            except ValueError:
+                return []
+        return list(links or [])
+
+    def _get_neighbours(self, node: Dict) -> Tuple[List[Dict], Optional[Dict], List[Dict]]:
+        """Children, parent and (up to 3) xrefs of ``node`` via one cache lookup."""
+        try:
+            child_hashes = self._link_list(node, "after")
+            xref_hashes = self._link_list(node, "xref")[:3]  # Limit xrefs
+            before_hash = node.get("before")
+            nodes = self.graph_cache.get_nodes(child_hashes + xref_hashes + [before_hash])
+        except Exception as e:
+            logger.debug(f"Failed to expand node: {e}")
+            return [], None, []
+
+        children = [nodes[h].to_block() for h in child_hashes if h in nodes]
+        parent = nodes[before_hash].to_block() if before_hash in nodes else None
+        xrefs = [nodes[h].to_block() for h in xref_hashes if h in nodes]
+        return children, parent, xrefs
+
     def _get_children(self, node: Dict) -> List[Dict]:
         """Get child nodes"""
-        children = []
-        
         try:
-            # Parse after field
-            after_list = node.get("after", [])
-            if isinstance(after_list, str):
-                after_list = json.loads(after_list)
-            
-            if after_list:
-                cursor = self.db_manager.conn.cursor()
-                for child_hash in after_list:
-                    cursor.execute("""
-                        SELECT * FROM blocks WHERE hash = ?
-                    """, (child_hash,))
-                    row = cursor.fetchone()
-                    if row:
-                        children.append(dict(row))
+            return self.graph_cache.get_blocks(self._link_list(node, "after"))
         except Exception as e:
             logger.debug(f"Failed to get children: {e}")
-        
-        return children
+            return []
     
     def _get_parent(self, node: Dict) -> Optional[Dict]:
         """Get parent node"""
         try:
-            before_hash = node.get("before")
-            if before_hash:
-                cursor = self.db_manager.conn.cursor()
-                cursor.execute("""
-                    SELECT * FROM blocks WHERE hash = ?
-                """, (before_hash,))
-                row = cursor.fetchone()
-                if row:
-                    return dict(row)
+            parent = self.graph_cache.get_node(node.get("before"))
+            if parent is not None:
+                return parent.to_block()
         except Exception as e:
             logger.debug(f"Failed to get parent: {e}")
 
@@ -569,15 +768,12 @@ class DFSSearchEngine:
             if not before_hash:
                 return None
 
-            cursor = self.db_manager.conn.cursor()
             # Get the before node
-            cursor.execute("""
-                SELECT * FROM blocks WHERE hash = ?
-            """, (before_hash,))
-            before_node = cursor.fetchone()
+            before_node = self.graph_cache.get_node(before_hash)
 
             if before_node:
-                before_dict = dict(before_node)
+                before_dict = before_node.to_block()
+                cursor = self.db_manager.conn.cursor()
                 # Get the root of that branch
                 before_root = before_dict.get("root", before_dict.get("hash"))
 
@@ -600,26 +796,11 @@ class DFSSearchEngine:
     
     def _get_xrefs(self, node: Dict) -> List[Dict]:
         """Get cross-referenced nodes"""
-        xrefs = []
-        
         try:
-            xref_list = node.get("xref", [])
-            if isinstance(xref_list, str):
-                xref_list = json.loads(xref_list)
-            
-            if xref_list:
-                cursor = self.db_manager.conn.cursor()
-                for xref_hash in xref_list[:3]:  # Limit xrefs
-                    cursor.execute("""
-                        SELECT * FROM blocks WHERE hash = ?
-                    """, (xref_hash,))
-                    row = cursor.fetchone()
-                    if row:
-                        xrefs.append(dict(row))
+            return self.graph_cache.get_blocks(self._link_list(node, "xref")[:3])  # Limit xrefs
         except Exception as e:
             logger.debug(f"Failed to get xrefs: {e}")
-        
-        return xrefs
+            return []
     
     def _calculate_relevance_improved(self, 
                                      node: Dict,
@@ -709,6 +890,10 @@ class DFSSearchEngine:
     def _get_node_embedding(self, node: Dict) -> Optional[np.ndarray]:
         """Get embedding for node"""
         try:
+            cached = self.graph_cache.get_node(node.get("hash"))
+            if cached is not None:
+                return cached.embedding
+
             block_index = node.get("block_index")
             if block_index is not None:
                 cursor = self.db_manager.conn.cursor()
@@ -1000,16 +1185,17 @@ class DFSSearchEngine:
 
         suggestions = []
 
-        # Direct pattern match
-        if query_pattern in self.adaptive_patterns["query_patterns"]:
-            suggestions.extend(list(self.adaptive_patterns["query_patterns"][query_pattern])[:3])
+        with self._stats_lock:
+            # Direct pattern match
+            if query_pattern in self.adaptive_patterns["query_patterns"]:
+                suggestions.extend(list(self.adaptive_patterns["query_patterns"][query_pattern])[:3])
 
-        # High-relevance branches
-        sorted_branches = sorted(
-            self.adaptive_patterns["branch_relevance_scores"].items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+            # High-relevance branches
+            sorted_branches = sorted(
+                self.adaptive_patterns["branch_relevance_scores"].items(),
+                key=lambda x: x[1],
+                reverse=True
+            )
         for branch_id, score in sorted_branches[:3]:
             if branch_id not in suggestions and score > 0.5:
                 suggestions.append(branch_id)
@@ -1036,5 +1222,14 @@ class DFSSearchEngine:
                 if self.adaptive_patterns["branch_relevance_scores"] else 0.0,
             "depth_effectiveness": dict(self.adaptive_patterns["depth_effectiveness"])
         }
-        
+
+        # v5.4: Index build cost and staleness
+        index_metrics = dict(self.index_stats)
+        store_mark = self._get_store_high_water_mark()
+        index_metrics["stale_blocks"] = max(0, store_mark - index_metrics["high_water_mark"])
+        built_at = index_metrics.get("built_at")
+        index_metrics["index_age_seconds"] = (time.time() - built_at) if built_at else None
+        metrics["index"] = index_metrics
+        metrics["graph_cache"] = self.graph_cache.get_stats()
+
         return metrics
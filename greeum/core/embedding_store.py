@@ -0,0 +1,673 @@
+"""
+In-memory embedding matrix for vectorized similarity search.
+
+Keeps every stored block embedding as an L2-normalized float32 row so a query
+is answered with one matrix-vector product and ``np.argpartition`` instead of
+a per-row Python loop over ``block_embeddings``.
+
+Rows are grouped by dimension: blocks embedded by different models (e.g. a
+768-dim and a 256-dim model) live in separate matrices and a query only scores
+rows of its own dimension, matching the previous skip-on-mismatch behaviour.
+
+The store is loaded lazily on the first search and then maintained
+incrementally by the database managers (``upsert``/``remove``). Before each
+search, rows inserted by other processes are picked up through a
+``MAX(block_index)`` high-water mark, and rows rewritten or deleted in place
+(knowledge updates elsewhere, migrations, doctor repairs, raw SQL) through the
+shared change log (see ``change_log``).
+
+v5.4: Large groups are searched through an ANN index (see ``ann_index``), and
+the matrix plus ANN state persist to ``<db file>.embeddings.npz`` so a restart
+loads one file instead of decoding every ``block_embeddings`` row. The
+snapshot records the change sequence it reflects; a reload applies only the
+rows changed since, and rejects snapshots ahead of the database.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .ann_index import ann_settings, create_ann_index, restore_ann_index
+from .change_log import KIND_EMBEDDING, changed_blocks, chunked, current_change_seq
+
+logger = logging.getLogger(__name__)
+
+_INITIAL_CAPACITY = 256
+_SNAPSHOT_VERSION = 2
+# ANN candidate pool = k * oversample (exact re-scoring picks the final k)
+_ANN_OVERSAMPLE = 8
+# Retrain the IVF partition when the group outgrows its training size
+_ANN_RETRAIN_GROWTH = 4
+# Seconds between an ANN (re)training and its background snapshot save
+_DEFAULT_SAVE_DELAY = 5.0
+
+
+class _DimensionGroup:
+    """Growable normalized matrix for embeddings of a single dimension."""
+
+    def __init__(self, dim: int, capacity: int = _INITIAL_CAPACITY):
+        self.dim = dim
+        self.matrix = np.empty((capacity, dim), dtype=np.float32)
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+        self.row_of: Dict[int, int] = {}  # block_index -> row
+        self.ann = None  # optional ANN index over this group
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        capacity = self.matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        matrix = np.empty((new_capacity, self.dim), dtype=np.float32)
+        ids = np.empty(new_capacity, dtype=np.int64)
+        matrix[:self.size] = self.matrix[:self.size]
+        ids[:self.size] = self.ids[:self.size]
+        self.matrix, self.ids = matrix, ids
+
+    def extend(self, block_indices: List[int], vectors: np.ndarray) -> None:
+        """Append pre-normalized rows for blocks not yet present."""
+        if not block_indices:
+            return
+        self._reserve(len(block_indices))
+        start = self.size
+        end = start + len(block_indices)
+        self.matrix[start:end] = vectors
+        self.ids[start:end] = block_indices
+        for offset, block_index in enumerate(block_indices):
+            self.row_of[block_index] = start + offset
+        self.size = end
+        if self.ann is not None:
+            self.ann.add(block_indices, vectors)
+
+    def upsert(self, block_index: int, vector: np.ndarray) -> None:
+        row = self.row_of.get(block_index)
+        if row is not None:
+            self.matrix[row] = vector
+            if self.ann is not None:
+                self.ann.add([block_index], vector.reshape(1, -1))
+            return
+        self.extend([block_index], vector.reshape(1, -1))
+
+    def remove(self, block_index: int) -> bool:
+        row = self.row_of.pop(block_index, None)
+        if row is None:
+            return False
+        if self.ann is not None:
+            self.ann.remove(block_index)
+        last = self.size - 1
+        if row != last:
+            # Swap the last row into the hole to keep the matrix dense
+            moved = int(self.ids[last])
+            self.matrix[row] = self.matrix[last]
+            self.ids[row] = moved
+            self.row_of[moved] = row
+        self.size = last
+        return True
+
+    def top_k(self, query: np.ndarray, k: int, min_similarity: float,
+              use_ann: bool = False) -> List[Tuple[int, float]]:
+        if self.size == 0 or k <= 0:
+            return []
+
+        if use_ann and self.ann is not None and self.ann.is_trained:
+            candidate_ids = self.ann.candidates(query, k * _ANN_OVERSAMPLE)
+            rows = np.fromiter(
+                (self.row_of.get(int(block_index), -1) for block_index in candidate_ids),
+                dtype=np.int64,
+                count=len(candidate_ids),
+            )
+            rows = rows[rows >= 0]
+            if len(rows) >= k:
+                return self._rank(rows, self.matrix[rows] @ query, k, min_similarity)
+
+        rows = np.arange(self.size)
+        return self._rank(rows, self.matrix[:self.size] @ query, k, min_similarity)
+
+    def _rank(self, rows: np.ndarray, scores: np.ndarray, k: int,
+              min_similarity: float) -> List[Tuple[int, float]]:
+        if k < len(rows):
+            order = np.argpartition(-scores, k - 1)[:k]
+        else:
+            order = np.arange(len(rows))
+        order = order[np.argsort(-scores[order], kind="stable")]
+
+        results: List[Tuple[int, float]] = []
+        for position in order:
+            score = float(scores[position])
+            if score < min_similarity:
+                break
+            results.append((int(self.ids[rows[position]]), score))
+        return results
+
+
+class EmbeddingMatrixStore:
+    """Process-local cache of ``block_embeddings`` as normalized matrices."""
+
+    def __init__(self, snapshot_path: Optional[str] = None):
+        """
+        Args:
+            snapshot_path: File for the persisted matrix/ANN snapshot
+                (``None`` disables persistence)
+        """
+        self._lock = threading.RLock()
+        self._groups: Dict[int, _DimensionGroup] = {}
+        self._dim_of: Dict[int, int] = {}  # block_index -> dimension group
+        self._loaded = False
+        self._high_water_mark = -1
+        self._change_seq: Optional[int] = None  # change log position the rows reflect
+        self._dirty = False
+        self.snapshot_path = snapshot_path
+        self.ann_settings = ann_settings()
+        try:
+            self.save_delay = float(os.getenv("GREEUM_EMBEDDING_SAVE_DELAY", str(_DEFAULT_SAVE_DELAY)))
+        except ValueError:
+            self.save_delay = _DEFAULT_SAVE_DELAY
+        self._save_timer: Optional[threading.Timer] = None
+        # Serializes snapshot file writes; taken before ``_lock``, never inside it
+        self._write_lock = threading.Lock()
+        self.stats = {
+            "loads": 0,
+            "load_ms": 0.0,
+            "load_source": None,
+            "catch_up_rows": 0,
+            "rewritten_rows": 0,
+            "searches": 0,
+            "ann_searches": 0,
+            "ann_trainings": 0,
+            "snapshot_saves": 0,
+        }
+
+    @classmethod
+    def for_database(cls, connection_string: Optional[str]) -> "EmbeddingMatrixStore":
+        """Create a store whose snapshot lives next to the SQLite file."""
+        if not connection_string or connection_string == ":memory:" or connection_string.startswith("file:"):
+            return cls()
+        return cls(snapshot_path=f"{connection_string}.embeddings.npz")
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> Optional[np.ndarray]:
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0 or not np.isfinite(norm):
+            return None
+        return (vector / norm).astype(np.float32, copy=False)
+
+    @staticmethod
+    def _decode(blob: bytes, embedding_dim: Optional[int]) -> np.ndarray:
+        vector = np.frombuffer(blob, dtype=np.float32)
+        if embedding_dim:
+            vector = vector[:embedding_dim]
+        return vector
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _ingest_rows(self, rows: Iterable[Tuple[int, bytes, Optional[int]]]) -> int:
+        """Bulk-ingest ``(block_index, blob, dim)`` rows; caller holds the lock."""
+        pending: Dict[int, Tuple[List[int], List[np.ndarray]]] = {}
+        for block_index, blob, embedding_dim in rows:
+            if not blob:
+                continue
+            vector = self._decode(blob, embedding_dim)
+            if vector.size == 0:
+                continue
+            if block_index in self._dim_of:
+                self._remove_locked(block_index)
+            ids, vectors = pending.setdefault(int(vector.shape[0]), ([], []))
+            ids.append(int(block_index))
+            vectors.append(vector)
+            if block_index > self._high_water_mark:
+                self._high_water_mark = int(block_index)
+
+        ingested = 0
+        for dim, (ids, vectors) in pending.items():
+            matrix = np.vstack(vectors).astype(np.float32, copy=False)
+            norms = np.linalg.norm(matrix, axis=1)
+            valid = (norms > 0) & np.isfinite(norms)
+            if not valid.all():
+                matrix = matrix[valid]
+                norms = norms[valid]
+                ids = [block_index for block_index, ok in zip(ids, valid) if ok]
+            if not ids:
+                continue
+            matrix = matrix / norms[:, None]
+            group = self._groups.get(dim)
+            if group is None:
+                group = self._groups[dim] = _DimensionGroup(dim, max(_INITIAL_CAPACITY, len(ids)))
+            group.extend(ids, matrix)
+            for block_index in ids:
+                self._dim_of[block_index] = dim
+            ingested += len(ids)
+        if ingested:
+            self._dirty = True
+        return ingested
+
+    def _ensure_current(self, conn) -> None:
+        """Load on first use, then ingest rows above the high-water mark and
+        re-read rows the change log reports as rewritten since the last check."""
+        import time
+
+        with self._lock:
+            cursor = conn.cursor()
+            # Read the log position first: a concurrent write is re-read next time
+            change_seq = current_change_seq(conn)
+            cursor.execute("SELECT MAX(block_index) FROM block_embeddings")
+            row = cursor.fetchone()
+            store_mark = row[0] if row and row[0] is not None else -1
+
+            if (
+                self._loaded
+                and change_seq is not None
+                and self._change_seq is not None
+                and change_seq < self._change_seq
+            ):
+                # Database replaced or restored behind this process
+                logger.info("Embedding change log moved backwards; reloading matrix")
+                self._reset_locked()
+
+            if not self._loaded:
+                start = time.time()
+                if self._load_snapshot(store_mark, change_seq):
+                    self.stats["load_source"] = "snapshot"
+                else:
+                    cursor.execute("SELECT block_index, embedding, embedding_dim FROM block_embeddings")
+                    # Large groups are persisted once their ANN index is trained
+                    self._ingest_rows(cursor.fetchall())
+                    self._change_seq = change_seq
+                    self.stats["load_source"] = "database"
+                self._loaded = True
+                self.stats["loads"] += 1
+                self.stats["load_ms"] = (time.time() - start) * 1000
+                logger.debug(
+                    f"Embedding matrix loaded from {self.stats['load_source']}: "
+                    f"{len(self._dim_of)} rows in {self.stats['load_ms']:.1f}ms"
+                )
+
+            rewritten = set()
+            if change_seq is not None and self._change_seq is not None and change_seq > self._change_seq:
+                # Rows above the high-water mark are read by the catch-up below
+                rewritten = {
+                    block_index
+                    for block_index in changed_blocks(conn, self._change_seq, change_seq, (KIND_EMBEDDING,))
+                    if block_index <= self._high_water_mark
+                }
+
+            if store_mark > self._high_water_mark:
+                cursor.execute(
+                    "SELECT block_index, embedding, embedding_dim FROM block_embeddings WHERE block_index > ?",
+                    (self._high_water_mark,),
+                )
+                self.stats["catch_up_rows"] += self._ingest_rows(cursor.fetchall())
+
+            if rewritten:
+                self.stats["rewritten_rows"] += self._reload_rows(cursor, rewritten)
+            self._change_seq = change_seq
+
+    def _reload_rows(self, cursor, block_indices) -> int:
+        """Re-read ``block_indices`` from the database, dropping deleted rows; caller holds the lock."""
+        rows = []
+        for chunk in chunked(block_indices):
+            cursor.execute(
+                "SELECT block_index, embedding, embedding_dim FROM block_embeddings "
+                f"WHERE block_index IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            rows.extend(cursor.fetchall())
+        present = {int(row[0]) for row in rows}
+        for block_index in block_indices:
+            if block_index not in present:
+                self._remove_locked(block_index)
+        self._ingest_rows(rows)
+        return len(block_indices)
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+    def upsert(self, block_index: int, embedding) -> None:
+        """Insert or replace the row for ``block_index``.
+
+        Ignored until the store has been loaded; the initial load reads the
+        row from the database anyway.
+        """
+        if embedding is None:
+            return
+        with self._lock:
+            if not self._loaded:
+                return
+            vector = self._normalize(np.asarray(embedding, dtype=np.float32).reshape(-1))
+            if vector is None:
+                self._remove_locked(block_index)
+                return
+            dim = int(vector.shape[0])
+            if self._dim_of.get(block_index, dim) != dim:
+                self._remove_locked(block_index)
+            group = self._groups.get(dim)
+            if group is None:
+                group = self._groups[dim] = _DimensionGroup(dim)
+            group.upsert(block_index, vector)
+            self._dim_of[block_index] = dim
+            self._dirty = True
+            if block_index > self._high_water_mark:
+                self._high_water_mark = block_index
+
+    def upsert_many(self, embeddings: Dict[int, np.ndarray]) -> None:
+        """Batch ``upsert``: rows are normalized and appended per dimension group."""
+        if not embeddings:
+            return
+        with self._lock:
+            if not self._loaded:
+                return
+            pending: Dict[int, Tuple[List[int], List[np.ndarray]]] = {}
+            for block_index, embedding in embeddings.items():
+                vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+                if vector.size == 0:
+                    continue
+                ids, vectors = pending.setdefault(int(vector.shape[0]), ([], []))
+                ids.append(int(block_index))
+                vectors.append(vector)
+
+            for dim, (ids, vectors) in pending.items():
+                matrix = np.vstack(vectors)
+                norms = np.linalg.norm(matrix, axis=1)
+                valid = (norms > 0) & np.isfinite(norms)
+                for block_index in ids:
+                    if block_index in self._dim_of:
+                        self._remove_locked(block_index)
+                ids = [block_index for block_index, ok in zip(ids, valid) if ok]
+                if not ids:
+                    continue
+                matrix = (matrix[valid] / norms[valid][:, None]).astype(np.float32, copy=False)
+                group = self._groups.get(dim)
+                if group is None:
+                    group = self._groups[dim] = _DimensionGroup(dim, max(_INITIAL_CAPACITY, len(ids)))
+                group.extend(ids, matrix)
+                for block_index in ids:
+                    self._dim_of[block_index] = dim
+                self._high_water_mark = max(self._high_water_mark, max(ids))
+            self._dirty = True
+
+    def remove(self, block_index: int) -> None:
+        with self._lock:
+            self._remove_locked(block_index)
+
+    def _remove_locked(self, block_index: int) -> None:
+        dim = self._dim_of.pop(block_index, None)
+        if dim is not None and dim in self._groups:
+            self._groups[dim].remove(block_index)
+            self._dirty = True
+
+    def _reset_locked(self) -> None:
+        self._groups.clear()
+        self._dim_of.clear()
+        self._loaded = False
+        self._high_water_mark = -1
+        self._change_seq = None
+        self._dirty = False
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
+
+    def invalidate(self) -> None:
+        """Drop all rows and the snapshot; the next search reloads from the database."""
+        # 진행 중인 백그라운드 저장이 삭제한 스냅샷을 되살리지 않도록 쓰기 잠금부터
+        with self._write_lock, self._lock:
+            self._reset_locked()
+            if self.snapshot_path and os.path.exists(self.snapshot_path):
+                try:
+                    os.remove(self.snapshot_path)
+                except OSError as e:
+                    logger.debug(f"Failed to remove embedding snapshot: {e}")
+
+    # ------------------------------------------------------------------
+    # ANN maintenance
+    # ------------------------------------------------------------------
+    def _ann_enabled_for(self, group: _DimensionGroup) -> bool:
+        return (
+            self.ann_settings["backend"] != "off"
+            and group.size >= int(self.ann_settings["min_rows"])
+        )
+
+    def _ensure_ann(self, group: _DimensionGroup) -> None:
+        """(Re)train the group's ANN index when it is missing or outgrown."""
+        if not self._ann_enabled_for(group):
+            return
+        ann = group.ann
+        if ann is not None and ann.is_trained and group.size <= ann.trained_rows * _ANN_RETRAIN_GROWTH:
+            return
+
+        import time
+
+        start = time.time()
+        ann = create_ann_index(group.dim, group.size, self.ann_settings)
+        if ann is None:
+            return
+        vectors = group.matrix[:group.size]
+        ann.train(vectors)
+        ann.add(group.ids[:group.size].tolist(), vectors)
+        group.ann = ann
+        self.stats["ann_trainings"] += 1
+        self._dirty = True
+        logger.info(
+            f"ANN index ({ann.name}) trained for dim={group.dim}: "
+            f"{group.size} rows, nlist={ann.nlist} in {(time.time() - start) * 1000:.0f}ms"
+        )
+        # Persist the training off the search path (close() saves anything left)
+        self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        """Save in a background timer after ``save_delay``; caller holds the lock."""
+        if not self.snapshot_path or self._save_timer is not None:
+            return
+        timer = threading.Timer(max(self.save_delay, 0.0), self._save_in_background)
+        timer.daemon = True
+        self._save_timer = timer
+        timer.start()
+
+    def _save_in_background(self) -> None:
+        try:
+            self.save()
+        except Exception as e:  # noqa: BLE001 - never kill the timer thread
+            logger.warning(f"Background embedding snapshot save failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self) -> bool:
+        """Write the matrix and ANN state next to the database (atomic replace).
+
+        Runs any pending background save now. Arrays are copied under the
+        store lock and written outside it, so searches are not blocked by I/O.
+        """
+        if not self.snapshot_path:
+            return False
+        with self._write_lock:
+            arrays = self._snapshot_arrays()
+            if arrays is None:
+                return False
+
+            tmp_path = f"{self.snapshot_path}.tmp"
+            try:
+                with open(tmp_path, "wb") as handle:
+                    np.savez(handle, **arrays)
+                os.replace(tmp_path, self.snapshot_path)
+            except OSError as e:
+                logger.warning(f"Failed to save embedding snapshot: {e}")
+                with self._lock:
+                    self._dirty = True
+                return False
+            self.stats["snapshot_saves"] += 1
+            return True
+
+    def _snapshot_arrays(self) -> Optional[Dict[str, np.ndarray]]:
+        """Copy of everything ``save`` writes, or None when there is nothing new."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._loaded or not self._dirty:
+                return None
+            arrays: Dict[str, np.ndarray] = {
+                "version": np.asarray(_SNAPSHOT_VERSION, dtype=np.int64),
+                "high_water_mark": np.asarray(self._high_water_mark, dtype=np.int64),
+                # -1: saved without a change log (legacy schema)
+                "change_seq": np.asarray(
+                    -1 if self._change_seq is None else self._change_seq, dtype=np.int64
+                ),
+                "dims": np.asarray(sorted(self._groups.keys()), dtype=np.int64),
+            }
+            for dim, group in self._groups.items():
+                prefix = f"d{dim}_"
+                # Rows are updated in place, so the write needs its own copy
+                arrays[prefix + "ids"] = group.ids[:group.size].copy()
+                arrays[prefix + "matrix"] = group.matrix[:group.size].copy()
+                if group.ann is not None and group.ann.is_trained:
+                    arrays[prefix + "ann_kind"] = np.asarray(group.ann.name)
+                    for key, value in group.ann.state().items():
+                        arrays[prefix + key] = np.array(value)
+            self._dirty = False
+            return arrays
+
+    def _load_snapshot(self, store_mark: int, change_seq: Optional[int] = None) -> bool:
+        """Load the persisted snapshot; caller holds the lock.
+
+        ``change_seq`` is the database's current change log position (``None``
+        without a log); the snapshot must have been saved at or before it.
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as data:
+                if int(data["version"]) != _SNAPSHOT_VERSION:
+                    return False
+                high_water_mark = int(data["high_water_mark"])
+                if high_water_mark > store_mark:
+                    # Database was reset or restored behind the snapshot
+                    logger.info("Embedding snapshot is ahead of the database; rebuilding")
+                    return False
+                snapshot_seq = int(data["change_seq"])
+                if change_seq is not None and not 0 <= snapshot_seq <= change_seq:
+                    # Saved without a log, or against a different/restored database
+                    logger.info("Embedding snapshot does not match the change log; rebuilding")
+                    return False
+
+                for dim in data["dims"].tolist():
+                    prefix = f"d{dim}_"
+                    ids = data[prefix + "ids"].astype(np.int64)
+                    matrix = data[prefix + "matrix"].astype(np.float32)
+                    group = _DimensionGroup(dim, max(_INITIAL_CAPACITY, len(ids)))
+                    if prefix + "ann_kind" in data.files:
+                        state = {
+                            key[len(prefix):]: data[key]
+                            for key in data.files
+                            if key.startswith(prefix + "ivf_")
+                        }
+                        group.ann = restore_ann_index(
+                            str(data[prefix + "ann_kind"]), dim, state, self.ann_settings
+                        )
+                    ann = group.ann
+                    if ann is not None and len(ann) > 0:
+                        # Assignments restored with the index; skip re-adding
+                        group.ann = None
+                        group.extend(ids.tolist(), matrix)
+                        group.ann = ann
+                    else:
+                        group.extend(ids.tolist(), matrix)
+                    self._groups[dim] = group
+                    for block_index in ids.tolist():
+                        self._dim_of[block_index] = dim
+                self._high_water_mark = high_water_mark
+                self._change_seq = snapshot_seq if change_seq is not None else None
+            return True
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable embedding snapshot {self.snapshot_path}: {e}")
+            self._groups.clear()
+            self._dim_of.clear()
+            return False
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    def search(self, conn, query_embedding, top_k: int = 5,
+               min_similarity: float = -1.0) -> List[Tuple[int, float]]:
+        """Return ``(block_index, cosine_similarity)`` pairs, best first."""
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        query = self._normalize(query)
+        if query is None:
+            return []
+
+        self._ensure_current(conn)
+        with self._lock:
+            self.stats["searches"] += 1
+            group = self._groups.get(int(query.shape[0]))
+            if group is None:
+                return []
+            self._ensure_ann(group)
+            use_ann = self._ann_enabled_for(group) and group.ann is not None
+            if use_ann:
+                self.stats["ann_searches"] += 1
+            return group.top_k(query, top_k, min_similarity, use_ann=use_ann)
+
+    def best_matches(self, conn, queries, min_similarity: float = -1.0,
+                     chunk_size: int = 256) -> List[Optional[Tuple[int, float]]]:
+        """Nearest stored block for each query row, or ``None`` below ``min_similarity``.
+
+        Scores every query of a dimension group with one exact matrix product
+        (in ``chunk_size`` query slices to bound memory) instead of one
+        ``search`` per query.
+        """
+        vectors = [np.asarray(q, dtype=np.float32).reshape(-1) for q in queries]
+        results: List[Optional[Tuple[int, float]]] = [None] * len(vectors)
+        if not vectors:
+            return results
+
+        self._ensure_current(conn)
+        by_dim: Dict[int, List[int]] = {}
+        for position, vector in enumerate(vectors):
+            if vector.size:
+                by_dim.setdefault(int(vector.shape[0]), []).append(position)
+
+        with self._lock:
+            self.stats["searches"] += len(vectors)
+            for dim, positions in by_dim.items():
+                group = self._groups.get(dim)
+                if group is None or group.size == 0:
+                    continue
+                matrix = group.matrix[:group.size]
+                for start in range(0, len(positions), chunk_size):
+                    chunk = positions[start:start + chunk_size]
+                    block = np.vstack([vectors[p] for p in chunk])
+                    norms = np.linalg.norm(block, axis=1)
+                    norms[norms == 0] = 1.0
+                    scores = matrix @ (block / norms[:, None]).T
+                    best_rows = np.argmax(scores, axis=0)
+                    best_scores = scores[best_rows, np.arange(len(chunk))]
+                    for position, row, score in zip(chunk, best_rows, best_scores):
+                        if float(score) >= min_similarity:
+                            results[position] = (int(group.ids[row]), float(score))
+        return results
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            rows = sum(group.size for group in self._groups.values())
+            return {
+                **self.stats,
+                "loaded": self._loaded,
+                "rows": rows,
+                "dimensions": sorted(self._groups.keys()),
+                "high_water_mark": self._high_water_mark,
+                "change_seq": self._change_seq,
+                "ann_backend": self.ann_settings["backend"],
+                "ann_groups": {
+                    dim: group.ann.name
+                    for dim, group in self._groups.items()
+                    if group.ann is not None
+                },
+                "memory_bytes": sum(
+                    group.matrix.nbytes + group.ids.nbytes for group in self._groups.values()
+                ),
+            }
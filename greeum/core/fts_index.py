@@ -0,0 +1,178 @@
+"""
+SQLite FTS5 full-text index over block context and keywords.
+
+``blocks_fts`` is a trigram-tokenized FTS5 table keyed by ``block_index``
+(rowid). Trigrams match substrings in both Korean and English, so results keep
+the semantics of the previous ``LIKE '%kw%'`` scans while using an index and
+``bm25()`` ranking. Triggers on ``blocks`` and ``block_keywords`` keep the
+index in sync for every writer, including direct SQL updates.
+
+Terms shorter than three characters cannot be looked up through trigrams and
+fall back to a ``LIKE`` scan of the FTS table.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+from typing import List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "blocks_fts"
+
+# bm25 column weights: (context, keywords)
+_BM25_WEIGHTS = (1.0, 2.0)
+_MIN_TRIGRAM_TERM = 3
+
+_KEYWORDS_SUBQUERY = (
+    "(SELECT group_concat(keyword, ' ') FROM block_keywords WHERE block_index = {ref})"
+)
+
+_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS blocks_fts_ai AFTER INSERT ON blocks BEGIN
+        INSERT OR REPLACE INTO {FTS_TABLE}(rowid, context, keywords)
+        VALUES (new.block_index, new.context, {_KEYWORDS_SUBQUERY.format(ref='new.block_index')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS blocks_fts_au AFTER UPDATE OF context ON blocks BEGIN
+        UPDATE {FTS_TABLE} SET context = new.context WHERE rowid = new.block_index;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS blocks_fts_ad AFTER DELETE ON blocks BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.block_index;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS block_keywords_fts_ai AFTER INSERT ON block_keywords BEGIN
+        UPDATE {FTS_TABLE}
+        SET keywords = {_KEYWORDS_SUBQUERY.format(ref='new.block_index')}
+        WHERE rowid = new.block_index;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS block_keywords_fts_ad AFTER DELETE ON block_keywords BEGIN
+        UPDATE {FTS_TABLE}
+        SET keywords = {_KEYWORDS_SUBQUERY.format(ref='old.block_index')}
+        WHERE rowid = old.block_index;
+    END
+    """,
+)
+
+
+def ensure_fts_schema(cursor) -> bool:
+    """Create the FTS table and sync triggers, backfilling on first creation.
+
+    Returns:
+        True when FTS5 search is available, False when this SQLite build lacks
+        FTS5/trigram support (callers keep using LIKE scans).
+    """
+    try:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (FTS_TABLE,)
+        )
+        exists = cursor.fetchone() is not None
+
+        if not exists:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(context, keywords, tokenize='trigram')"
+            )
+        for statement in _TRIGGERS:
+            cursor.execute(statement)
+
+        if not exists:
+            backfilled = backfill_fts(cursor)
+            if backfilled:
+                logger.info(f"FTS5 keyword index backfilled with {backfilled} blocks")
+        return True
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 keyword index unavailable, using LIKE search: {e}")
+        return False
+
+
+def backfill_fts(cursor) -> int:
+    """(Re)populate ``blocks_fts`` from ``blocks`` and ``block_keywords``."""
+    cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    cursor.execute(
+        f"""
+        INSERT INTO {FTS_TABLE}(rowid, context, keywords)
+        SELECT b.block_index, b.context, {_KEYWORDS_SUBQUERY.format(ref='b.block_index')}
+        FROM blocks b
+        """
+    )
+    return cursor.rowcount if cursor.rowcount is not None else 0
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_fts(cursor, keywords: Sequence[str], limit: int = 100) -> List[Tuple[int, float]]:
+    """Return ``(block_index, score)`` pairs ranked by bm25 (higher is better).
+
+    Blocks matched only through short-term ``LIKE`` fallback get score 0.0 and
+    follow the ranked matches.
+    """
+    terms = []
+    for keyword in keywords:
+        term = (keyword or "").strip()
+        if term and term.lower() not in (t.lower() for t in terms):
+            terms.append(term)
+    if not terms or limit <= 0:
+        return []
+
+    long_terms = [t for t in terms if len(t) >= _MIN_TRIGRAM_TERM]
+    short_terms = [t for t in terms if len(t) < _MIN_TRIGRAM_TERM]
+
+    results: List[Tuple[int, float]] = []
+    seen = set()
+
+    if long_terms:
+        match = " OR ".join(_quote(term) for term in long_terms)
+        cursor.execute(
+            f"""
+            SELECT rowid, bm25({FTS_TABLE}, ?, ?) AS score
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH ?
+            ORDER BY score
+            LIMIT ?
+            """,
+            (*_BM25_WEIGHTS, match, limit),
+        )
+        for block_index, score in cursor.fetchall():
+            seen.add(block_index)
+            # bm25() is lower-is-better; flip the sign for callers
+            results.append((block_index, -float(score)))
+
+    if short_terms and len(results) < limit:
+        clauses = []
+        params: List[object] = []
+        for term in short_terms:
+            pattern = f"%{_escape_like(term)}%"
+            clauses.append("context LIKE ? ESCAPE '\\' OR keywords LIKE ? ESCAPE '\\'")
+            params.extend([pattern, pattern])
+        cursor.execute(
+            f"""
+            SELECT rowid FROM {FTS_TABLE}
+            WHERE {" OR ".join(f"({clause})" for clause in clauses)}
+            ORDER BY rowid DESC
+            LIMIT ?
+            """,
+            (*params, limit + len(seen)),
+        )
+        for (block_index,) in cursor.fetchall():
+            if block_index in seen:
+                continue
+            seen.add(block_index)
+            results.append((block_index, 0.0))
+            if len(results) >= limit:
+                break
+
+    return results
@@ -1,11 +1,27 @@
 """
 Global Index for Greeum v3.0.0+
 Implements inverted index and lightweight vector search for global jump
+
+v5.4: The keyword index is built with one streaming ``blocks LEFT JOIN
+block_keywords`` scan and persisted to ``<db file>.global_index.npz``
+together with a ``block_index`` high-water mark, so a restart loads the
+snapshot and only scans blocks added since. Vectors are served from the
+database manager's ``EmbeddingMatrixStore`` (a contiguous float32 matrix,
+itself snapshotted) instead of a per-block Python list. The snapshot also
+records the change log sequence (see ``change_log``); blocks whose text or
+keywords were rewritten in place since then (knowledge updates in another
+process, doctor repairs, raw SQL) are re-read on load and by
+``sync_changes()``. Incremental updates rewrite the snapshot from a
+daemon timer (``GREEUM_GLOBAL_INDEX_SAVE_DELAY``) rather than inside the
+write that crossed the save interval.
 """
 
 import json
 import logging
+import os
 import sqlite3
+import sys
+import threading
 import time
 import numpy as np
 from typing import List, Dict, Set, Optional, Tuple, Any
@@ -13,22 +29,61 @@ from collections import defaultdict
 from datetime import datetime
 import re
 
+from .block_fetch import fetch_blocks
+from .change_log import KIND_KEYWORDS, KIND_TEXT, changed_blocks, chunked, current_change_seq
+from .embedding_store import EmbeddingMatrixStore
+
 logger = logging.getLogger(__name__)
 
+_SNAPSHOT_VERSION = 2
+_SCAN_BATCH = 1000
+# Snapshot is rewritten after this many incremental updates
+_DEFAULT_SAVE_INTERVAL = 256
+# Seconds between crossing the save interval and the background save
+_DEFAULT_SAVE_DELAY = 5.0
+
+_SELECT_SQL = """
+    SELECT b.block_index, b.context, group_concat(k.keyword, char(31))
+    FROM blocks b
+    LEFT JOIN block_keywords k ON k.block_index = b.block_index
+    WHERE {where}
+    GROUP BY b.block_index
+    ORDER BY b.block_index
+"""
+_SCAN_SQL = _SELECT_SQL.format(where="b.block_index > ?")
+
 
 class GlobalIndex:
     """Global index for fast keyword and vector lookup"""
     
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, snapshot_path: Optional[str] = None):
         self.db_manager = db_manager
         
         # In-memory inverted index
         self.inverted_index = defaultdict(set)  # keyword -> set of block_indices
-        self.keyword_idf = {}  # keyword -> IDF score
+        self._doc_keywords: Dict[int, Tuple[str, ...]] = {}  # block_index -> keywords
+        self._high_water_mark = -1
+        self._change_seq: Optional[int] = None  # change log position the postings reflect
         
-        # Lightweight vector index (simple, no external dependencies)
-        self.vectors = []  # List of (block_index, embedding) tuples
-        self.vector_norms = []  # Precomputed norms for faster cosine
+        # Vector index: shared normalized float32 matrix (per database manager)
+        self.vector_store = getattr(db_manager, "embedding_store", None) or EmbeddingMatrixStore()
+        
+        if snapshot_path is None:
+            snapshot_path = self._default_snapshot_path(db_manager)
+        self.snapshot_path = snapshot_path
+        try:
+            self.save_interval = int(os.getenv("GREEUM_GLOBAL_INDEX_SAVE_INTERVAL", str(_DEFAULT_SAVE_INTERVAL)))
+        except ValueError:
+            self.save_interval = _DEFAULT_SAVE_INTERVAL
+        try:
+            self.save_delay = float(os.getenv("GREEUM_GLOBAL_INDEX_SAVE_DELAY", str(_DEFAULT_SAVE_DELAY)))
+        except ValueError:
+            self.save_delay = _DEFAULT_SAVE_DELAY
+        self._pending_changes = 0
+        self._save_timer: Optional[threading.Timer] = None
+        # Guards the postings against the background save; ``_write_lock`` is taken first
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
         
         # Stats
         self.stats = {
@@ -36,86 +91,286 @@ class GlobalIndex:
             "total_documents": 0,
             "index_size": 0,
             "last_rebuild": None,
-            "jump_count": 0
+            "jump_count": 0,
+            "load_source": None,
+            "scanned_blocks": 0,
+            "reindexed_blocks": 0,
+            "build_ms": 0.0,
+            "snapshot_saves": 0,
         }
         
         # Build index on initialization
         self._build_index()
     
+    @staticmethod
+    def _default_snapshot_path(db_manager) -> Optional[str]:
+        connection_string = getattr(db_manager, "connection_string", None)
+        if not isinstance(connection_string, str) or not connection_string:
+            return None
+        if connection_string == ":memory:" or connection_string.startswith("file:"):
+            return None
+        return f"{connection_string}.global_index.npz"
+    
+    # ------------------------------------------------------------------
+    # Build / persistence
+    # ------------------------------------------------------------------
     def _build_index(self):
-        """Build inverted index and vector index from database"""
+        """Load the snapshot (if any), then scan blocks above the high-water mark"""
         start_time = time.time()
         logger.info("Building global index...")
         
         try:
-            cursor = self.db_manager.conn.cursor()
-            
-            # Get all blocks with keywords
-            cursor.execute("""
-                SELECT b.block_index, b.context, b.importance, b.timestamp
-                FROM blocks b
-                ORDER BY b.block_index
-            """)
-            
-            blocks = cursor.fetchall()
-            self.stats["total_documents"] = len(blocks)
-            
-            # Build inverted index
-            document_freq = defaultdict(int)
-            
-            for block in blocks:
-                block_index = block[0]
-                context = block[1] or ""
-                
-                # Get keywords from database
-                cursor.execute("""
-                    SELECT keyword FROM block_keywords 
-                    WHERE block_index = ?
-                """, (block_index,))
-                
-                keywords = [row[0] for row in cursor.fetchall()]
-                
-                # Also extract keywords from context
-                context_keywords = self._extract_keywords(context)
-                all_keywords = set(keywords) | set(context_keywords)
-                
-                # Update inverted index
-                for keyword in all_keywords:
-                    keyword_lower = keyword.lower()
-                    self.inverted_index[keyword_lower].add(block_index)
-                    document_freq[keyword_lower] += 1
-                
-                # Get embedding for vector index
-                cursor.execute("""
-                    SELECT embedding FROM block_embeddings 
-                    WHERE block_index = ?
-                """, (block_index,))
-                
-                emb_row = cursor.fetchone()
-                if emb_row and emb_row[0]:
-                    embedding = np.frombuffer(emb_row[0], dtype=np.float32)
-                    norm = np.linalg.norm(embedding)
-                    if norm > 0:
-                        self.vectors.append((block_index, embedding))
-                        self.vector_norms.append(norm)
-            
-            # Calculate IDF scores
-            total_docs = len(blocks)
-            for keyword, freq in document_freq.items():
-                # IDF = log(N / df)
-                self.keyword_idf[keyword] = np.log((total_docs + 1) / (freq + 1))
-            
-            self.stats["total_keywords"] = len(self.inverted_index)
-            self.stats["index_size"] = sum(len(docs) for docs in self.inverted_index.values())
-            self.stats["last_rebuild"] = datetime.now().isoformat()
-            
-            elapsed = time.time() - start_time
-            logger.info(f"Global index built in {elapsed:.2f}s: "
-                       f"{self.stats['total_keywords']} keywords, "
-                       f"{len(self.vectors)} vectors")
-            
+            change_seq = current_change_seq(self.db_manager.conn)
+            if self._load_snapshot(change_seq):
+                self.stats["load_source"] = "snapshot"
+            else:
+                self.stats["load_source"] = "database"
+                self._change_seq = change_seq
+            scanned = self._scan_from(self._high_water_mark)
+            reindexed = self.sync_changes()
         except Exception as e:
             logger.error(f"Failed to build global index: {e}")
+            return
+        
+        self.stats["scanned_blocks"] = scanned
+        self.stats["last_rebuild"] = datetime.now().isoformat()
+        self.stats["build_ms"] = (time.time() - start_time) * 1000
+        if scanned or reindexed:
+            self.save()
+        
+        logger.info(f"Global index built in {self.stats['build_ms'] / 1000:.2f}s "
+                   f"({self.stats['load_source']}, {scanned} blocks scanned): "
+                   f"{self.stats['total_keywords']} keywords")
+    
+    def _scan_from(self, high_water_mark: int) -> int:
+        """Index blocks with ``block_index > high_water_mark`` in one streaming query"""
+        cursor = self.db_manager.conn.cursor()
+        cursor.execute(_SCAN_SQL, (high_water_mark,))
+        scanned = 0
+        while True:
+            rows = cursor.fetchmany(_SCAN_BATCH)
+            if not rows:
+                break
+            self._index_rows(rows)
+            scanned += len(rows)
+        return scanned
+    
+    def _index_rows(self, rows) -> None:
+        for block_index, context, keyword_blob in rows:
+            keywords = keyword_blob.split("\x1f") if keyword_blob else []
+            self._set_document(block_index, keywords + self._extract_keywords(context or ""))
+            if block_index > self._high_water_mark:
+                self._high_water_mark = block_index
+    
+    def sync_changes(self) -> Optional[List[int]]:
+        """Re-index blocks whose text or keywords changed in place since the last sync.
+        
+        Returns the re-read block indexes (deleted blocks are dropped from the
+        postings), or ``None`` when the change log moved backwards (database
+        replaced or restored) and the keyword index was rescanned from scratch.
+        Blocks above the high-water mark are left to the append path.
+        """
+        with self._lock:
+            return self._sync_changes_locked()
+    
+    def _sync_changes_locked(self) -> Optional[List[int]]:
+        conn = self.db_manager.conn
+        change_seq = current_change_seq(conn)
+        if change_seq is None or self._change_seq is None:
+            self._change_seq = change_seq
+            return []
+        if change_seq == self._change_seq:
+            return []
+        if change_seq < self._change_seq:
+            logger.info("Global index change log moved backwards; rescanning keywords")
+            self._clear_postings()
+            self._change_seq = change_seq
+            self.stats["reindexed_blocks"] += self._scan_from(-1)
+            self._pending_changes = max(self._pending_changes, self.save_interval)
+            self._schedule_save()
+            return None
+        
+        changed = sorted(
+            block_index
+            for block_index in changed_blocks(conn, self._change_seq, change_seq, (KIND_TEXT, KIND_KEYWORDS))
+            if block_index <= self._high_water_mark
+        )
+        cursor = conn.cursor()
+        for chunk in chunked(changed):
+            cursor.execute(
+                _SELECT_SQL.format(where=f"b.block_index IN ({','.join('?' * len(chunk))})"), chunk
+            )
+            rows = cursor.fetchall()
+            present = {row[0] for row in rows}
+            for block_index in chunk:
+                if block_index not in present:
+                    self._remove_document(block_index)
+            self._index_rows(rows)
+        self._change_seq = change_seq
+        if changed:
+            self.stats["reindexed_blocks"] += len(changed)
+            self._note_changes(len(changed))
+        return changed
+    
+    def _load_snapshot(self, change_seq: Optional[int] = None) -> bool:
+        """Load the persisted postings; ``change_seq`` is the database's log position."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as data:
+                if int(data["version"]) != _SNAPSHOT_VERSION:
+                    return False
+                high_water_mark = int(data["high_water_mark"])
+                snapshot_seq = int(data["change_seq"])
+                vocab = data["vocab"].tolist()
+                doc_ids = data["doc_ids"].tolist()
+                offsets = data["offsets"]
+                term_ids = data["term_ids"]
+        except Exception as e:
+            logger.warning(f"Global index snapshot unreadable, rebuilding: {e}")
+            return False
+        
+        if high_water_mark > self._store_high_water_mark():
+            # Database was replaced or truncated since the snapshot
+            return False
+        if change_seq is not None and not 0 <= snapshot_seq <= change_seq:
+            # Saved without a change log, or against a restored database
+            logger.info("Global index snapshot does not match the change log; rebuilding")
+            return False
+        
+        for position, block_index in enumerate(doc_ids):
+            terms = term_ids[offsets[position]:offsets[position + 1]]
+            self._set_document(block_index, [vocab[t] for t in terms.tolist()])
+        self._high_water_mark = high_water_mark
+        self._change_seq = snapshot_seq if change_seq is not None else None
+        return True
+    
+    def _store_high_water_mark(self) -> int:
+        cursor = self.db_manager.conn.cursor()
+        cursor.execute("SELECT MAX(block_index) FROM blocks")
+        row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None else -1
+    
+    def save(self) -> bool:
+        """Write the keyword index snapshot next to the database (atomic replace)
+        
+        Runs any pending background save now. The postings are copied under
+        the index lock and encoded and written outside it.
+        """
+        if not self.snapshot_path:
+            return False
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                documents = list(self._doc_keywords.items())
+                high_water_mark = self._high_water_mark
+                change_seq = self._change_seq
+                pending = self._pending_changes
+                self._pending_changes = 0
+            
+            vocab: Dict[str, int] = {}
+            doc_ids = np.fromiter((block_index for block_index, _ in documents), dtype=np.int64, count=len(documents))
+            offsets = np.zeros(len(doc_ids) + 1, dtype=np.int64)
+            term_ids: List[int] = []
+            for position, (_, keywords) in enumerate(documents):
+                for keyword in keywords:
+                    term_ids.append(vocab.setdefault(keyword, len(vocab)))
+                offsets[position + 1] = len(term_ids)
+            
+            tmp_path = f"{self.snapshot_path}.tmp"
+            try:
+                with open(tmp_path, "wb") as handle:
+                    np.savez(
+                        handle,
+                        version=np.asarray(_SNAPSHOT_VERSION, dtype=np.int64),
+                        high_water_mark=np.asarray(high_water_mark, dtype=np.int64),
+                        change_seq=np.asarray(-1 if change_seq is None else change_seq, dtype=np.int64),
+                        vocab=np.asarray(list(vocab), dtype=np.str_),
+                        doc_ids=doc_ids,
+                        offsets=offsets,
+                        term_ids=np.asarray(term_ids, dtype=np.int32),
+                    )
+                os.replace(tmp_path, self.snapshot_path)
+            except OSError as e:
+                logger.warning(f"Failed to save global index snapshot: {e}")
+                with self._lock:
+                    self._pending_changes += pending
+                return False
+            self.stats["snapshot_saves"] += 1
+            return True
+    
+    def _note_changes(self, count: int = 1) -> None:
+        self._pending_changes += count
+        if self.save_interval > 0 and self._pending_changes >= self.save_interval:
+            # The snapshot is rewritten off the write path
+            self._schedule_save()
+    
+    def _schedule_save(self) -> None:
+        """Save in a background timer after ``save_delay``; caller holds the lock."""
+        if not self.snapshot_path or self._save_timer is not None:
+            return
+        timer = threading.Timer(max(self.save_delay, 0.0), self._save_in_background)
+        timer.daemon = True
+        self._save_timer = timer
+        timer.start()
+    
+    def _save_in_background(self) -> None:
+        try:
+            self.save()
+        except Exception as e:  # noqa: BLE001 - never kill the timer thread
+            logger.warning(f"Background global index snapshot save failed: {e}")
+    
+    # ------------------------------------------------------------------
+    # Posting maintenance
+    # ------------------------------------------------------------------
+    def _set_document(self, block_index: int, keywords: List[str]) -> bool:
+        """Replace the postings of one block; O(number of its keywords)"""
+        new_keywords = tuple(dict.fromkeys(k.lower() for k in keywords if k))
+        old_keywords = self._doc_keywords.get(block_index)
+        is_new = old_keywords is None
+        
+        if old_keywords:
+            for keyword in old_keywords:
+                postings = self.inverted_index.get(keyword)
+                if postings is None:
+                    continue
+                postings.discard(block_index)
+                if not postings:
+                    del self.inverted_index[keyword]
+            self.stats["index_size"] -= len(old_keywords)
+        
+        for keyword in new_keywords:
+            self.inverted_index[keyword].add(block_index)
+        self.stats["index_size"] += len(new_keywords)
+        self._doc_keywords[block_index] = new_keywords
+        
+        if is_new:
+            self.stats["total_documents"] += 1
+        self.stats["total_keywords"] = len(self.inverted_index)
+        return is_new
+    
+    def _remove_document(self, block_index: int) -> bool:
+        """Drop a deleted block from the postings"""
+        if block_index not in self._doc_keywords:
+            return False
+        self._set_document(block_index, [])
+        del self._doc_keywords[block_index]
+        self.stats["total_documents"] -= 1
+        return True
+    
+    def _clear_postings(self) -> None:
+        self.inverted_index.clear()
+        self._doc_keywords.clear()
+        self._high_water_mark = -1
+        self.stats.update(total_keywords=0, total_documents=0, index_size=0)
+    
+    def _idf(self, keyword: str) -> float:
+        # IDF = log(N / df), computed from live document frequencies
+        postings = self.inverted_index.get(keyword)
+        df = len(postings) if postings else 0
+        return float(np.log((self.stats["total_documents"] + 1) / (df + 1)))
     
     def _extract_keywords(self, text: str, max_keywords: int = 10) -> List[str]:
         """Extract keywords from text using simple heuristics"""
@@ -151,26 +406,25 @@ class GlobalIndex:
         if not keywords:
             return []
         
+        # Copy the matching postings under the lock; scoring runs outside it
+        matches = []
+        with self._lock:
+            for keyword in keywords:
+                keyword_lower = keyword.lower()
+                if keyword_lower in self.inverted_index:
+                    matches.append((self._idf(keyword_lower), list(self.inverted_index[keyword_lower])))
+        
         # Aggregate scores for each document
         doc_scores = defaultdict(float)
         
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            
-            if keyword_lower in self.inverted_index:
-                # Get IDF score
-                idf = self.keyword_idf.get(keyword_lower, 1.0)
+        for idf, matching_docs in matches:
+            for doc_id in matching_docs:
+                if exclude and doc_id in exclude:
+                    continue
                 
-                # Get matching documents
-                matching_docs = self.inverted_index[keyword_lower]
-                
-                for doc_id in matching_docs:
-                    if exclude and doc_id in exclude:
-                        continue
-                    
-                    # TF is assumed to be 1 for simplicity
-                    # Could be improved with actual term frequency
-                    doc_scores[doc_id] += idf
+                # TF is assumed to be 1 for simplicity
+                # Could be improved with actual term frequency
+                doc_scores[doc_id] += idf
         
         # Sort by score
         sorted_results = sorted(doc_scores.items(), key=lambda x: x[1], reverse=True)
@@ -187,29 +441,16 @@ class GlobalIndex:
         Returns:
             List of (block_index, similarity) tuples
         """
-        if query_embedding is None or len(self.vectors) == 0:
-            return []
-        
-        query_norm = np.linalg.norm(query_embedding)
-        if query_norm == 0:
+        if query_embedding is None:
             return []
         
-        similarities = []
-        
-        for i, (block_index, embedding) in enumerate(self.vectors):
-            if exclude and block_index in exclude:
-                continue
-            
-            # Cosine similarity
-            dot_product = np.dot(query_embedding, embedding)
-            similarity = dot_product / (query_norm * self.vector_norms[i])
-            
-            similarities.append((block_index, float(similarity)))
-        
-        # Sort by similarity
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        return similarities[:limit]
+        # One matrix-vector product over the shared float32 matrix;
+        # over-fetch so excluded blocks do not shrink the result
+        excluded = exclude or set()
+        candidates = self.vector_store.search(
+            self.db_manager.conn, query_embedding, top_k=limit + len(excluded)
+        )
+        return [(idx, score) for idx, score in candidates if idx not in excluded][:limit]
     
     def search_hybrid(self,
                      query: str,
@@ -259,25 +500,25 @@ class GlobalIndex:
         # Sort by combined score
         combined_scores.sort(key=lambda x: x[1], reverse=True)
         
-        # Get block details for top results
-        cursor = self.db_manager.conn.cursor()
-        
-        for block_index, score in combined_scores[:limit]:
-            cursor.execute("""
-                SELECT block_index, hash, context, timestamp, importance, root
-                FROM blocks
-                WHERE block_index = ?
-            """, (block_index,))
-            
-            row = cursor.fetchone()
+        # Get block details for top results (one batched query)
+        top = combined_scores[:limit]
+        rows = fetch_blocks(
+            self.db_manager.conn.cursor(),
+            [block_index for block_index, _ in top],
+            fields=["hash", "context", "timestamp", "importance", "root"],
+        )
+        by_index = {row["block_index"]: row for row in rows}
+        
+        for block_index, score in top:
+            row = by_index.get(block_index)
             if row:
                 results.append({
-                    "block_index": row[0],
-                    "hash": row[1],
-                    "context": row[2],
-                    "timestamp": row[3],
-                    "importance": row[4],
-                    "root": row[5],
+                    "block_index": row["block_index"],
+                    "hash": row.get("hash"),
+                    "context": row.get("context"),
+                    "timestamp": row.get("timestamp"),
+                    "importance": row.get("importance"),
+                    "root": row.get("root"),
                     "_score": score,
                     "_source": "global_index"
                 })
@@ -290,62 +531,64 @@ class GlobalIndex:
     def update_block(self, block_index: int, keywords: List[str], 
                     embedding: Optional[np.ndarray] = None):
         """Update index for a single block (incremental update)"""
-        # Remove old entries
-        for keyword_set in self.inverted_index.values():
-            keyword_set.discard(block_index)
-        
-        # Add new keywords
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            self.inverted_index[keyword_lower].add(block_index)
-            
-            # Update IDF if new keyword
-            if keyword_lower not in self.keyword_idf:
-                # Approximate IDF for new keyword
-                self.keyword_idf[keyword_lower] = np.log(self.stats["total_documents"] + 1)
+        with self._lock:
+            self._set_document(block_index, keywords)
+            if block_index > self._high_water_mark:
+                self._high_water_mark = block_index
+            self._note_changes()
         
-        # Update vector index
         if embedding is not None:
-            # Remove old embedding
-            self.vectors = [(idx, emb) for idx, emb in self.vectors if idx != block_index]
-            self.vector_norms = self.vector_norms[:len(self.vectors)]
-            
-            # Add new embedding
-            norm = np.linalg.norm(embedding)
-            if norm > 0:
-                self.vectors.append((block_index, embedding))
-                self.vector_norms.append(norm)
+            self.vector_store.upsert(block_index, embedding)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get index statistics"""
+        vector_stats = self.vector_store.get_stats()
+        keyword_bytes = self._keyword_memory_bytes()
         return {
             **self.stats,
+            "high_water_mark": self._high_water_mark,
+            "change_seq": self._change_seq,
             "avg_docs_per_keyword": self.stats["index_size"] / max(self.stats["total_keywords"], 1),
-            "vector_index_size": len(self.vectors),
-            "memory_estimate_mb": self._estimate_memory() / (1024 * 1024)
+            "vector_index_size": vector_stats["rows"],
+            "keyword_memory_bytes": keyword_bytes,
+            "vector_memory_bytes": vector_stats["memory_bytes"],
+            "memory_estimate_mb": (keyword_bytes + vector_stats["memory_bytes"]) / (1024 * 1024)
         }
     
-    def _estimate_memory(self) -> int:
-        """Estimate memory usage in bytes"""
-        # Rough estimation
-        keyword_memory = sum(len(k) for k in self.inverted_index.keys()) * 2  # chars
-        posting_memory = self.stats["index_size"] * 8  # int per posting
-        vector_memory = len(self.vectors) * 4 * 768  # assume 768-dim float32
-        
-        return keyword_memory + posting_memory + vector_memory
+    def _keyword_memory_bytes(self) -> int:
+        """Measured size of the inverted index and per-document keyword map"""
+        total = sys.getsizeof(self.inverted_index) + sys.getsizeof(self._doc_keywords)
+        for keyword, postings in self.inverted_index.items():
+            total += sys.getsizeof(keyword) + sys.getsizeof(postings)
+        for keywords in self._doc_keywords.values():
+            total += sys.getsizeof(keywords)
+        # block_index ints are shared between postings and the document map
+        total += sys.getsizeof(0) * len(self._doc_keywords)
+        return total
     
     def rebuild(self):
         """Rebuild the entire index from scratch"""
         logger.info("Rebuilding global index...")
         
-        # Clear existing index
-        self.inverted_index.clear()
-        self.keyword_idf.clear()
-        self.vectors.clear()
-        self.vector_norms.clear()
-        
-        # Rebuild
-        self._build_index()
+        # 진행 중인 백그라운드 저장이 삭제한 스냅샷을 되살리지 않도록 쓰기 잠금부터
+        # (재구축의 저장까지 잡고 있어 잠금 순서가 뒤집히지 않음)
+        with self._write_lock, self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self._pending_changes = 0
+            
+            # Clear existing index (the shared vector store is left alone)
+            self._clear_postings()
+            self._change_seq = None
+            if self.snapshot_path and os.path.exists(self.snapshot_path):
+                try:
+                    os.remove(self.snapshot_path)
+                except OSError as e:
+                    logger.debug(f"Failed to remove global index snapshot: {e}")
+            
+            # Rebuild
+            self._build_index()
 
 
 class GlobalJumpOptimizer:
@@ -0,0 +1,294 @@
+"""
+Hash-keyed node and adjacency cache for graph traversal.
+
+Graph searches (``DFSSearchEngine``, ``HybridGraphSearch``) walk ``before`` /
+``after`` / ``xref`` links between blocks. Each ``CachedNode`` holds the block
+row together with its parent hash, children hashes, xrefs, keywords and a
+read-only float32 embedding view, so a traversal touches SQLite only for nodes
+it has not seen before. Misses are loaded in batches: one query per frontier,
+whatever its size.
+
+The cache is an LRU bounded by ``GREEUM_GRAPH_CACHE_SIZE`` nodes (default
+4096). ``BlockManager`` invalidates entries on writes. Writes from other
+processes are picked up by ``sync``: blocks whose links, text, keywords or
+embedding changed (or that were deleted) are dropped through the shared
+``store_change_log``; parents of appended blocks through a
+``MAX(block_index)`` high-water mark, which is all a database without the
+log offers.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .block_fetch import chunked
+from .change_log import changed_blocks, current_change_seq
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 4096
+
+_LOAD_SQL = """
+    SELECT b.*,
+           (SELECT json_group_array(k.keyword) FROM block_keywords k
+            WHERE k.block_index = b.block_index) AS _kw_json,
+           e.embedding AS _emb_blob,
+           e.embedding_dim AS _emb_dim
+    FROM blocks b
+    LEFT JOIN block_embeddings e ON e.block_index = b.block_index
+    WHERE b.hash IN ({placeholders})
+"""
+
+
+def _decode_links(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    try:
+        links = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    return links if isinstance(links, list) else []
+
+
+@dataclass
+class CachedNode:
+    """One block with its adjacency, keywords and embedding."""
+
+    block: Dict[str, Any]
+    parent: Optional[str]
+    children: List[str] = field(default_factory=list)
+    xrefs: List[str] = field(default_factory=list)
+    keywords: List[str] = field(default_factory=list)
+    embedding: Optional[np.ndarray] = None
+
+    @property
+    def hash(self) -> str:
+        return self.block.get("hash")
+
+    @property
+    def block_index(self) -> Optional[int]:
+        return self.block.get("block_index")
+
+    def to_block(self) -> Dict[str, Any]:
+        """Shallow copy of the block row, safe for callers to annotate."""
+        return dict(self.block)
+
+
+class BlockGraphCache:
+    """LRU of ``CachedNode`` keyed by block hash, shared per database manager."""
+
+    def __init__(self, db_manager, capacity: Optional[int] = None):
+        self.db_manager = db_manager
+        if capacity is None:
+            try:
+                capacity = int(os.getenv("GREEUM_GRAPH_CACHE_SIZE", str(DEFAULT_CAPACITY)))
+            except ValueError:
+                capacity = DEFAULT_CAPACITY
+        self.capacity = max(capacity, 1)
+
+        self._nodes: "OrderedDict[str, CachedNode]" = OrderedDict()
+        self._hash_of: Dict[int, str] = {}
+        self._lock = threading.RLock()
+        # Bumped on every invalidation; loads started before it are not cached
+        self._generation = 0
+        self._high_water_mark: Optional[int] = None
+        # Change log position the cached nodes reflect (None: no log / not synced)
+        self._change_seq: Optional[int] = None
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "load_queries": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "rewritten_blocks": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def get_nodes(self, hashes: Iterable[str]) -> Dict[str, CachedNode]:
+        """Return cached nodes for ``hashes``, loading all misses in one batch."""
+        found: Dict[str, CachedNode] = {}
+        missing: List[str] = []
+        with self._lock:
+            for block_hash in hashes:
+                if not block_hash or block_hash in found:
+                    continue
+                node = self._nodes.get(block_hash)
+                if node is None:
+                    if block_hash not in missing:
+                        missing.append(block_hash)
+                    continue
+                self._nodes.move_to_end(block_hash)
+                found[block_hash] = node
+            self.stats["hits"] += len(found)
+            self.stats["misses"] += len(missing)
+            generation = self._generation
+
+        if missing:
+            loaded = self._load(missing)
+            found.update(loaded)
+            with self._lock:
+                if generation == self._generation:
+                    for node in loaded.values():
+                        self._put(node)
+        return found
+
+    def get_node(self, block_hash: Optional[str]) -> Optional[CachedNode]:
+        if not block_hash:
+            return None
+        return self.get_nodes([block_hash]).get(block_hash)
+
+    def get_blocks(self, hashes: Iterable[str]) -> List[Dict[str, Any]]:
+        """Block rows (copies) for ``hashes`` in request order, missing skipped."""
+        hashes = [h for h in hashes if h]
+        nodes = self.get_nodes(hashes)
+        return [nodes[h].to_block() for h in hashes if h in nodes]
+
+    def _load(self, hashes: List[str]) -> Dict[str, CachedNode]:
+        cursor = self.db_manager.conn.cursor()
+        loaded: Dict[str, CachedNode] = {}
+        for chunk in chunked(hashes):
+            cursor.execute(
+                _LOAD_SQL.format(placeholders=",".join("?" * len(chunk))), tuple(chunk)
+            )
+            names = [d[0] for d in cursor.description]
+            self.stats["load_queries"] += 1
+            for row in cursor.fetchall():
+                node = self._node_from_row(dict(zip(names, tuple(row))))
+                loaded[node.hash] = node
+        return loaded
+
+    @staticmethod
+    def _node_from_row(row: Dict[str, Any]) -> CachedNode:
+        kw_json = row.pop("_kw_json", None)
+        blob = row.pop("_emb_blob", None)
+        dim = row.pop("_emb_dim", None)
+
+        embedding = None
+        if blob:
+            embedding = np.frombuffer(blob, dtype=np.float32)
+            if dim:
+                embedding = embedding[:dim]
+
+        keywords = [k for k in _decode_links(kw_json) if k is not None]
+        return CachedNode(
+            block=row,
+            parent=row.get("before") or None,
+            children=_decode_links(row.get("after")),
+            xrefs=_decode_links(row.get("xref")),
+            keywords=keywords,
+            embedding=embedding,
+        )
+
+    def _put(self, node: CachedNode) -> None:
+        block_hash = node.hash
+        self._nodes[block_hash] = node
+        self._nodes.move_to_end(block_hash)
+        if node.block_index is not None:
+            self._hash_of[node.block_index] = block_hash
+        while len(self._nodes) > self.capacity:
+            _, old = self._nodes.popitem(last=False)
+            self._hash_of.pop(old.block_index, None)
+            self.stats["evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    def invalidate(self, hashes: Iterable[Optional[str]] = (), block_index: Optional[int] = None) -> None:
+        """Drop entries by hash and/or block index."""
+        with self._lock:
+            self._generation += 1
+            targets = [h for h in hashes if h]
+            if block_index is not None and block_index in self._hash_of:
+                targets.append(self._hash_of[block_index])
+            for block_hash in targets:
+                node = self._nodes.pop(block_hash, None)
+                if node is not None:
+                    self._hash_of.pop(node.block_index, None)
+                    self.stats["invalidations"] += 1
+
+    def invalidate_block(self, block: Dict[str, Any]) -> None:
+        """Invalidate a written block and its parent (whose ``after`` list changed)."""
+        self.invalidate([block.get("hash"), block.get("before")], block.get("block_index"))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.stats["invalidations"] += len(self._nodes)
+            self._nodes.clear()
+            self._hash_of.clear()
+
+    def sync(self) -> None:
+        """Drop nodes other writers changed since the last check.
+
+        Blocks rewritten in place or deleted come from the change log; parents
+        of appended blocks (whose ``after`` list grew) from the high-water mark.
+        """
+        try:
+            conn = self.db_manager.conn
+            # Log position first: a change logged after it is seen next time
+            change_seq = current_change_seq(conn)
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(block_index) FROM blocks")
+            row = cursor.fetchone()
+            current = row[0] if row and row[0] is not None else -1
+            changed = self._changed_since(conn, change_seq)
+        except Exception as e:
+            logger.debug(f"Graph cache sync skipped: {e}")
+            return
+
+        previous = self._high_water_mark
+        self._high_water_mark = current
+        if changed is None:
+            # Log moved backwards: the database was replaced or restored
+            self.clear()
+            return
+        if changed:
+            with self._lock:
+                stale = [self._hash_of[i] for i in changed if i in self._hash_of]
+            self.stats["rewritten_blocks"] += len(stale)
+            if stale:
+                self.invalidate(stale)
+
+        if previous is None or current <= previous:
+            return
+        cursor.execute(
+            "SELECT hash, before FROM blocks WHERE block_index > ?", (previous,)
+        )
+        stale = [value for pair in cursor.fetchall() for value in pair]
+        if stale:
+            self.invalidate(stale)
+
+    def _changed_since(self, conn, change_seq: Optional[int]):
+        """Blocks changed since the last sync; None when the log moved backwards."""
+        previous = self._change_seq
+        if change_seq is None or previous is None or change_seq == previous:
+            changed = set()
+        elif change_seq < previous:
+            changed = None
+        else:
+            changed = changed_blocks(conn, previous, change_seq)
+        self._change_seq = change_seq
+        return changed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._nodes),
+                "capacity": self.capacity,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,275 @@
+"""
+Paged GraphIndex bootstrap from ``block_metadata`` links.
+
+Blocks are read in keyset pages (``block_index > last ORDER BY block_index
+LIMIT page``) so memory stays bounded by one page plus the graph itself;
+``GREEUM_GRAPH_BOOTSTRAP_PAGE`` sets the page size (default 1000).
+
+For file databases the graph is persisted as a version-2 GraphIndex snapshot
+next to the database (``<db>.graph_index``) with a checkpoint holding the last
+processed block index (``<db>.graph_bootstrap.json``), written every
+``CHECKPOINT_PAGES`` pages. A restart maps the snapshot and only pages through
+blocks after the checkpoint; if the store no longer reaches the checkpoint the
+bootstrap starts over.
+
+``BlockManager`` runs the bootstrap in a daemon thread and checks ``ready``
+before relying on the graph; ``greeum graph index`` runs it in the foreground
+with progress output. Link updates after the bootstrap only append to the
+snapshot's delta log; once it grows past the GraphIndex compaction threshold
+the full rewrite runs in a separate daemon thread, never in the writer.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..graph.snapshot import delta_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 1000
+CHECKPOINT_PAGES = 10
+
+_PAGE_SQL = """
+    SELECT b.block_index, m.metadata
+    FROM blocks b
+    LEFT JOIN block_metadata m ON m.block_index = b.block_index
+    WHERE b.block_index > ?
+    ORDER BY b.block_index
+    LIMIT ?
+"""
+
+
+def neighbor_links(metadata: Any) -> List[Tuple[str, float]]:
+    """``metadata['links']['neighbors']`` as ``(node_id, weight)`` pairs."""
+    if not metadata:
+        return []
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            return []
+    if not isinstance(metadata, dict):
+        return []
+
+    links = metadata.get('links')
+    neighbors = (links.get('neighbors') or []) if isinstance(links, dict) else []
+    pairs = []
+    for neighbor in neighbors:
+        if isinstance(neighbor, dict):
+            pairs.append((str(neighbor.get('id')), neighbor.get('weight', 1.0)))
+        else:
+            pairs.append((str(neighbor), 1.0))
+    return pairs
+
+
+class GraphIndexBootstrap:
+    """Streams ``block_metadata`` links into a ``GraphIndex``."""
+
+    def __init__(self, db_manager, graph_index, lock: Optional[threading.RLock] = None,
+                 page_size: Optional[int] = None, persist: bool = True):
+        self.db_manager = db_manager
+        self.graph_index = graph_index
+        self.lock = lock or threading.RLock()
+        if page_size is None:
+            page_size = int(os.getenv("GREEUM_GRAPH_BOOTSTRAP_PAGE", str(DEFAULT_PAGE_SIZE)))
+        self.page_size = max(1, page_size)
+
+        connection_string = getattr(db_manager, "connection_string", None)
+        self.db_path = None
+        if connection_string and connection_string != ":memory:" and not connection_string.startswith("file:"):
+            self.db_path = connection_string
+        self.snapshot_path = Path(f"{self.db_path}.graph_index") if self.db_path and persist else None
+        self.checkpoint_path = Path(f"{self.db_path}.graph_bootstrap.json") if self.db_path and persist else None
+
+        self.ready = threading.Event()
+        self.progress: Dict[str, Any] = {
+            "state": "idle",
+            "processed": 0,
+            "pages": 0,
+            "total": None,
+            "last_block_index": -1,
+            "resumed_from": None,
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+        self._run_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._compact_thread: Optional[threading.Thread] = None
+
+    @property
+    def can_run_in_background(self) -> bool:
+        """A private connection is needed off the caller's thread."""
+        return self.db_path is not None
+
+    def start(self) -> threading.Thread:
+        """Run the bootstrap in a daemon thread (no-op while one is running)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.run, name="greeum-graph-bootstrap", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the graph is ready; returns the ready flag."""
+        return self.ready.wait(timeout)
+
+    def run(self, resume: bool = True,
+            progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Page through all blocks after the resume point.
+
+        Returns:
+            A copy of ``progress`` (``state`` is ``done`` or ``failed``)
+        """
+        with self._run_lock:
+            self.progress.update(state="running", started_at=time.time(), finished_at=None, error=None)
+            conn, owned = self._connect()
+            try:
+                last = self._resume_point(conn) if resume else self._restart()
+                self.progress["resumed_from"] = last if last >= 0 else None
+                self.progress["total"] = conn.execute(
+                    "SELECT COUNT(*) FROM blocks WHERE block_index > ?", (last,)
+                ).fetchone()[0]
+
+                pages_since_checkpoint = 0
+                while True:
+                    rows = conn.execute(_PAGE_SQL, (last, self.page_size)).fetchall()
+                    if not rows:
+                        break
+                    self._apply_page(rows)
+                    last = rows[-1][0]
+
+                    self.progress["processed"] += len(rows)
+                    self.progress["pages"] += 1
+                    self.progress["last_block_index"] = last
+                    pages_since_checkpoint += 1
+                    if pages_since_checkpoint >= CHECKPOINT_PAGES:
+                        self._checkpoint(last)
+                        pages_since_checkpoint = 0
+                    if progress_callback:
+                        progress_callback(dict(self.progress))
+
+                if pages_since_checkpoint:
+                    self._checkpoint(last)
+                self.progress.update(state="done", finished_at=time.time())
+                self.ready.set()
+                logger.info(
+                    f"GraphIndex bootstrapped with {len(self.graph_index.adj)} nodes "
+                    f"({self.progress['processed']} blocks scanned)"
+                )
+            except Exception as e:  # noqa: BLE001
+                self.progress.update(state="failed", finished_at=time.time(), error=str(e))
+                logger.warning(f"GraphIndex bootstrap failed: {e}")
+            finally:
+                if owned:
+                    conn.close()
+            return dict(self.progress)
+
+    def persist(self) -> None:
+        """Write graph changes made after the bootstrap to the snapshot's delta log."""
+        if self.snapshot_path is None or not self.ready.is_set() or not self.snapshot_path.exists():
+            return
+        try:
+            with self.lock:
+                self.graph_index.save_snapshot(self.snapshot_path, delta_only=True)
+                needs_compaction = self.graph_index.needs_compaction
+        except OSError as e:
+            logger.debug(f"GraphIndex snapshot update skipped: {e}")
+            return
+        if needs_compaction:
+            self._start_compaction()
+
+    def _start_compaction(self) -> None:
+        """Rewrite the snapshot in a daemon thread (no-op while one is running)."""
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return
+        self._compact_thread = threading.Thread(
+            target=self._compact, name="greeum-graph-compact", daemon=True
+        )
+        self._compact_thread.start()
+
+    def _compact(self) -> None:
+        try:
+            with self.lock:
+                if self.graph_index.needs_compaction:
+                    self.graph_index.save_snapshot(self.snapshot_path, compact=True)
+        except OSError as e:
+            logger.debug(f"GraphIndex snapshot compaction skipped: {e}")
+
+    def _connect(self) -> Tuple[sqlite3.Connection, bool]:
+        if self.db_path is None:
+            return self.db_manager.conn, False
+        return sqlite3.connect(self.db_path, timeout=30.0), True
+
+    def _apply_page(self, rows) -> None:
+        with self.lock:
+            for block_index, metadata in rows:
+                node_id = str(block_index)
+                links = neighbor_links(metadata)
+                existing = self.graph_index.adj.get(node_id)
+                if existing is None:
+                    self.graph_index.set_neighbors(node_id, links)
+                elif links:
+                    self.graph_index.set_neighbors(node_id, list(existing) + links)
+
+    def _resume_point(self, conn) -> int:
+        if self.progress["last_block_index"] >= 0:
+            return self.progress["last_block_index"]
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return -1
+
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                last = int(json.load(f)["last_block_index"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring graph bootstrap checkpoint: {e}")
+            return self._restart()
+
+        # The store was rebuilt or truncated since the checkpoint
+        max_index = conn.execute("SELECT MAX(block_index) FROM blocks").fetchone()[0]
+        if max_index is None or max_index < last:
+            return self._restart()
+
+        with self.lock:
+            if len(self.graph_index.adj) == 0 and not self.graph_index.load_snapshot(self.snapshot_path):
+                return self._restart()
+        self.progress["last_block_index"] = last
+        return last
+
+    def _restart(self) -> int:
+        """Drop the persisted state and start from the first block."""
+        paths = [self.checkpoint_path, self.snapshot_path]
+        if self.snapshot_path is not None:
+            paths.append(delta_path(self.snapshot_path))
+        for path in paths:
+            if path is not None:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        with self.lock:
+            self.graph_index.clear()
+        self.ready.clear()
+        self.progress.update(processed=0, pages=0, last_block_index=-1)
+        return -1
+
+    def _checkpoint(self, last_block_index: int) -> None:
+        if self.snapshot_path is None:
+            return
+        try:
+            with self.lock:
+                self.graph_index.save_snapshot(self.snapshot_path)
+            tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"last_block_index": last_block_index, "saved_at": time.time()}, f)
+            os.replace(tmp_path, self.checkpoint_path)
+        except OSError as e:
+            logger.debug(f"GraphIndex bootstrap checkpoint skipped: {e}")
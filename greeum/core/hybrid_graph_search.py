@@ -18,12 +18,14 @@ Design principles (from 사업화문서.txt):
 
 import json
 import logging
+import sqlite3
 import time
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional, Tuple, Set
 import numpy as np
 
 from .bm25_index import BM25Index, HybridScorer
+from .graph_cache import BlockGraphCache
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +94,8 @@ class HybridGraphSearch:
             bm25_index: Optional BM25Index (will create/load if not provided)
         """
         self.db_manager = db_manager
+        # v5.4: Hash-keyed node/adjacency cache (shared with DFSSearchEngine)
+        self.graph_cache = getattr(db_manager, "graph_cache", None) or BlockGraphCache(db_manager)
 
         # Initialize or load BM25 index
         if bm25_index:
@@ -104,6 +108,10 @@ class HybridGraphSearch:
                 if count > 0:
                     self.bm25_index.save_to_db(db_manager)
                 logger.info(f"Built BM25 index with {count} documents")
+            else:
+                # Blocks written since the index was last saved
+                self._sync_bm25_index()
+                self.persist_bm25_index()
 
         # Hybrid scorer — defaults come from HybridScorer._default_hybrid_weights()
         # (env-overridable: GREEUM_HYBRID_VEC_WEIGHT / GREEUM_HYBRID_BM25_WEIGHT).
@@ -128,7 +136,8 @@ class HybridGraphSearch:
         min_depth: int = 3,
         threshold: float = 0.3,
         explore_threshold: float = 0.15,
-        limit: int = 10
+        limit: int = 10,
+        use_bm25_candidates: bool = True
     ) -> Tuple[List[SearchResult], SearchMetadata]:
         """
         Perform hybrid graph search from anchor.
@@ -143,12 +152,16 @@ class HybridGraphSearch:
             threshold: Minimum hybrid score for result inclusion
             explore_threshold: Minimum score to continue exploring a path
             limit: Maximum number of results
+            use_bm25_candidates: Also score top BM25 hits from the inverted index
+                that lie outside the anchor's graph neighbourhood (v5.4)
 
         Returns:
             Tuple of (results, metadata)
         """
         start_time = time.time()
         self.metrics["total_searches"] += 1
+        self._sync_bm25_index()
+        self.graph_cache.sync()
 
         # Tokenize query for BM25
         query_keywords = self._tokenize_query(query)
@@ -169,15 +182,13 @@ class HybridGraphSearch:
         nodes_pruned = 0
         max_depth_used = 0
 
-        def dfs(block: Dict, current_depth: int, is_anchor: bool = False) -> None:
+        def visit(block: Dict, current_depth: int, is_anchor: bool = False) -> List[str]:
+            """Score one node; return the neighbour hashes to expand next."""
             nonlocal nodes_pruned, max_depth_used
 
-            if current_depth > depth:
-                return
-
             block_hash = block.get("hash")
             if not block_hash or block_hash in visited:
-                return
+                return []
 
             visited.add(block_hash)
             max_depth_used = max(max_depth_used, current_depth)
@@ -215,20 +226,54 @@ class HybridGraphSearch:
             )
             if not should_continue:
                 nodes_pruned += 1
-                return
-
-            # Explore parent (before)
-            parent = self._get_parent(block)
-            if parent:
-                dfs(parent, current_depth + 1, is_anchor=False)
-
-            # Explore children (after)
-            children = self._get_children(block)
-            for child in children:
-                dfs(child, current_depth + 1, is_anchor=False)
-
-        # Start DFS from anchor (always explore from anchor)
-        dfs(anchor, 0, is_anchor=True)
+                return []
+            if current_depth >= depth:
+                return []
+
+            # Explore parent (before), then children (after)
+            return [block.get("before")] + self._after_hashes(block)
+
+        # v5.4: Level-synchronous expansion from the anchor (always explored).
+        # Each depth's frontier is resolved with one batched graph-cache lookup
+        # instead of one query per edge; nodes are reached at their shortest depth.
+        anchor_blocks = self._get_cached_blocks([anchor.get("hash")])
+        frontier = anchor_blocks or [anchor]
+        current_depth = 0
+        while frontier:
+            next_hashes: List[str] = []
+            for block in frontier:
+                next_hashes.extend(visit(block, current_depth, is_anchor=current_depth == 0))
+            current_depth += 1
+            pending = list(dict.fromkeys(h for h in next_hashes if h and h not in visited))
+            frontier = self._get_cached_blocks(pending) if pending else []
+
+        # v5.4: BM25 candidate generation from the inverted index. Keyword hits
+        # the DFS did not reach are scored directly (depth -1 = index candidate).
+        if use_bm25_candidates and query_keywords:
+            bm25_hits = self.bm25_index.search(query_keywords, top_k=max(limit * 2, 20))
+            hit_indices = [int(doc_id) for doc_id, _ in bm25_hits if doc_id.lstrip("-").isdigit()]
+            for block in self._get_blocks_by_index(hit_indices):
+                block_hash = block.get("hash")
+                if not block_hash or block_hash in visited:
+                    continue
+                visited.add(block_hash)
+                hybrid_score, vector_score, bm25_score = self._compute_hybrid_score(
+                    query, query_keywords, query_embedding, block
+                )
+                if hybrid_score > threshold:
+                    candidates.append(SearchResult(
+                        block_index=block.get("block_index", 0),
+                        block_hash=block_hash,
+                        content=block.get("context", ""),
+                        keywords=self._get_keywords(block),
+                        timestamp=block.get("timestamp", ""),
+                        importance=block.get("importance", 0.5),
+                        hybrid_score=hybrid_score,
+                        vector_score=vector_score,
+                        bm25_score=bm25_score,
+                        depth=-1,
+                        project=block.get("root")
+                    ))
 
         # Sort by hybrid score and limit results
         candidates.sort(key=lambda x: x.hybrid_score, reverse=True)
@@ -351,45 +396,87 @@ class HybridGraphSearch:
         row = cursor.fetchone()
         return dict(row) if row else None
 
-    def _get_parent(self, block: Dict) -> Optional[Dict]:
-        """Get parent block (via before link)."""
-        before_hash = block.get("before")
-        if not before_hash:
-            return None
+    def _get_blocks_by_index(self, block_indices: List[int]) -> List[Dict]:
+        """Fetch blocks (with keywords and embeddings) in one batch, preserving input order."""
+        blocks = self.db_manager.get_blocks_by_indices(
+            block_indices,
+            fields=["block_index", "hash", "context", "timestamp", "importance", "root",
+                    "keywords", "embedding"],
+        )
+        for block in blocks:
+            # Cached for _get_keywords so scoring issues no per-block queries
+            block["_keywords"] = block.get("keywords", [])
+        return blocks
 
-        cursor = self.db_manager.conn.cursor()
-        cursor.execute("SELECT * FROM blocks WHERE hash = ?", (before_hash,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+    def _sync_bm25_index(self) -> None:
+        """Index blocks added since the last search, in memory only.
 
-    def _get_children(self, block: Dict) -> List[Dict]:
-        """Get child blocks (via after links)."""
-        children = []
-        after_list = block.get("after", [])
+        Searches never open a write transaction; the new documents stay
+        pending until ``persist_bm25_index`` runs.
+        """
+        try:
+            added = self.bm25_index.sync_with_blocks(self.db_manager)
+            if added:
+                logger.debug(f"BM25 index synced with {added} new blocks")
+        except Exception as e:
+            logger.debug(f"BM25 index sync skipped: {e}")
+
+    def persist_bm25_index(self) -> bool:
+        """
+        Write documents indexed since the last save (maintenance path).
 
+        Returns:
+            True if anything was written
+        """
+        if not self.bm25_index.pending_writes:
+            return False
+        try:
+            self.bm25_index.save_to_db(self.db_manager)
+        except sqlite3.Error as e:
+            logger.warning(f"BM25 index save failed: {e}")
+            return False
+        return True
+
+    def _get_cached_blocks(self, hashes: List[str]) -> List[Dict]:
+        """Blocks for ``hashes`` from the graph cache, with keywords and embedding attached."""
+        nodes = self.graph_cache.get_nodes(hashes)
+        blocks = []
+        for block_hash in hashes:
+            node = nodes.get(block_hash)
+            if node is None:
+                continue
+            block = node.to_block()
+            block["_keywords"] = node.keywords
+            if node.embedding is not None:
+                block["embedding"] = node.embedding
+            blocks.append(block)
+        return blocks
+
+    @staticmethod
+    def _after_hashes(block: Dict) -> List[str]:
+        after_list = block.get("after", [])
         if isinstance(after_list, str):
             try:
                 after_list = json.loads(after_list)
             except json.JSONDecodeError:
                 after_list = []
+        return list(after_list or [])
 
-        if not after_list:
-            return []
-
-        cursor = self.db_manager.conn.cursor()
-        for child_hash in after_list:
-            cursor.execute("SELECT * FROM blocks WHERE hash = ?", (child_hash,))
-            row = cursor.fetchone()
-            if row:
-                children.append(dict(row))
+    def _get_parent(self, block: Dict) -> Optional[Dict]:
+        """Get parent block (via before link)."""
+        parents = self._get_cached_blocks([block.get("before")]) if block.get("before") else []
+        return parents[0] if parents else None
 
-        return children
+    def _get_children(self, block: Dict) -> List[Dict]:
+        """Get child blocks (via after links)."""
+        after_list = self._after_hashes(block)
+        return self._get_cached_blocks(after_list) if after_list else []
 
     def _get_keywords(self, block: Dict) -> List[str]:
         """Extract keywords from block (from block_keywords table)."""
         # First check if keywords are cached in block dict
         keywords = block.get("_keywords")
-        if keywords:
+        if keywords is not None:
             return keywords
 
         # Query from block_keywords table
@@ -414,7 +501,7 @@ class HybridGraphSearch:
         embedding = block.get("embedding")
         if embedding is not None:
             if isinstance(embedding, (list, np.ndarray)):
-                return np.array(embedding, dtype=np.float32)
+                return np.asarray(embedding, dtype=np.float32)
 
         # Fetch from block_embeddings table
         block_index = block.get("block_index")
@@ -44,6 +44,16 @@ class MemoryIndexer:
         """Build all indexes from existing data"""
         logger.info("Building memory indexes...")
         
+        # Importance for all linked blocks in one projected batch (v5.4)
+        importance_by_block = {
+            block['block_index']: block['importance']
+            for block in self.db_manager.get_blocks_by_indices(
+                [node.memory_id for node in self.network.nodes.values() if node.memory_id],
+                fields=['importance'],
+            )
+            if block.get('importance') is not None
+        }
+        
         for node_id, node in self.network.nodes.items():
             # Type index
             if node.node_type not in self.type_index:
@@ -73,11 +83,9 @@ class MemoryIndexer:
                 self.entity_index[entity_hash].add(node_id)
             
             # Importance index (if memory block exists)
-            if node.memory_id:
-                block = self.db_manager.get_block(node.memory_id)
-                if block and 'importance' in block:
-                    importance_bucket = int(block['importance'] * 10)  # 0-10 buckets
-                    self.importance_index[importance_bucket].append(node_id)
+            if node.memory_id in importance_by_block:
+                importance_bucket = int(importance_by_block[node.memory_id] * 10)  # 0-10 buckets
+                self.importance_index[importance_bucket].append(node_id)
         
         logger.info(f"Built indexes: {len(self.semantic_index)} keywords, "
                    f"{len(self.entity_index)} entities, "
@@ -1,33 +1,54 @@
 """
 Atomic Backup System for AI-Powered Migration
 Provides complete data protection during schema migration
+
+v5.4: backups are taken online with ``sqlite3.Connection.backup()`` in steps
+of ``page_step`` pages (sleeping ``step_sleep`` seconds between steps so the
+MCP writer keeps running) and stored as a manifest of fixed page-range
+chunks. Chunks are content-addressed under ``migration_backups/chunks``, so a
+snapshot only writes the ranges that changed since earlier snapshots; new
+chunks are gzip-compressed in parallel. Verification streams chunk by chunk
+and never materializes the database.
 """
 
 import os
-import shutil
 import sqlite3
 import hashlib
 import json
 import gzip
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_VERSION = 2
+DEFAULT_PAGE_STEP = 256
+DEFAULT_STEP_SLEEP = 0.005
+DEFAULT_CHUNK_PAGES = 64
+
 
 class BackupMetadata:
     """Metadata for backup operations"""
     
-    def __init__(self, backup_id: str, source_path: str, backup_path: str):
+    def __init__(self, backup_id: str, source_path: str, backup_path: str,
+                 source_hash: Optional[str] = None, source_size: Optional[int] = None):
         self.backup_id = backup_id
         self.source_path = source_path
         self.backup_path = backup_path
         self.created_at = datetime.now().isoformat()
-        self.source_size = os.path.getsize(source_path) if os.path.exists(source_path) else 0
-        self.source_hash = self._calculate_file_hash(source_path)
+        if source_size is None:
+            source_size = os.path.getsize(source_path) if os.path.exists(source_path) else 0
+        self.source_size = source_size
+        self.source_hash = source_hash if source_hash is not None else self._calculate_file_hash(source_path)
         self.backup_verified = False
+        # v5.4: "chunked" (manifest + shared chunks) or "gzip" (legacy single file)
+        self.format = "chunked" if str(backup_path).endswith(".manifest.json") else "gzip"
+        self.new_chunks = 0
+        self.reused_chunks = 0
     
     def _calculate_file_hash(self, file_path: str) -> str:
         """Calculate SHA-256 hash of file"""
@@ -49,17 +70,24 @@ class BackupMetadata:
             "created_at": self.created_at,
             "source_size": self.source_size,
             "source_hash": self.source_hash,
-            "backup_verified": self.backup_verified
+            "backup_verified": self.backup_verified,
+            "format": self.format,
+            "new_chunks": self.new_chunks,
+            "reused_chunks": self.reused_chunks,
         }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'BackupMetadata':
         """Create from dictionary"""
-        backup = cls(data["backup_id"], data["source_path"], data["backup_path"])
+        backup = cls(
+            data["backup_id"], data["source_path"], data["backup_path"],
+            source_hash=data["source_hash"], source_size=data["source_size"],
+        )
         backup.created_at = data["created_at"]
-        backup.source_size = data["source_size"]
-        backup.source_hash = data["source_hash"]
         backup.backup_verified = data.get("backup_verified", False)
+        backup.format = data.get("format", "gzip")
+        backup.new_chunks = data.get("new_chunks", 0)
+        backup.reused_chunks = data.get("reused_chunks", 0)
         return backup
 
 
@@ -68,13 +96,28 @@ class AtomicBackupSystem:
     Atomic backup system with verification and rollback capabilities
     """
     
-    def __init__(self, data_dir: str):
+    def __init__(self, data_dir: str, page_step: Optional[int] = None, step_sleep: Optional[float] = None,
+                 chunk_pages: Optional[int] = None, workers: Optional[int] = None):
         self.data_dir = Path(data_dir)
         self.backup_dir = self.data_dir / "migration_backups"
         self.backup_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_dir = self.backup_dir / "chunks"
         
         self.metadata_file = self.backup_dir / "backup_metadata.json"
         self.active_backups: Dict[str, BackupMetadata] = {}
+
+        if page_step is None:
+            page_step = int(os.getenv("GREEUM_BACKUP_PAGE_STEP", str(DEFAULT_PAGE_STEP)))
+        if step_sleep is None:
+            step_sleep = float(os.getenv("GREEUM_BACKUP_STEP_SLEEP", str(DEFAULT_STEP_SLEEP)))
+        if chunk_pages is None:
+            chunk_pages = int(os.getenv("GREEUM_BACKUP_CHUNK_PAGES", str(DEFAULT_CHUNK_PAGES)))
+        if workers is None:
+            workers = int(os.getenv("GREEUM_BACKUP_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.page_step = max(1, page_step)
+        self.step_sleep = max(0.0, step_sleep)
+        self.chunk_pages = max(1, chunk_pages)
+        self.workers = max(1, workers)
         self._load_metadata()
     
     def _load_metadata(self) -> None:
@@ -98,14 +141,20 @@ class AtomicBackupSystem:
                 bid: backup.to_dict() 
                 for bid, backup in self.active_backups.items()
             }
-            with open(self.metadata_file, 'w') as f:
+            tmp_file = self.metadata_file.with_name(self.metadata_file.name + ".tmp")
+            with open(tmp_file, 'w') as f:
                 json.dump(metadata, f, indent=2)
+            os.replace(tmp_file, self.metadata_file)
         except Exception as e:
             logger.error(f"Failed to save backup metadata: {e}")
     
     def create_backup(self, source_path: str, backup_id: Optional[str] = None) -> str:
         """
         Create atomic backup of database file
+
+        The source is copied with the online backup API into a temporary
+        snapshot, checked with ``PRAGMA integrity_check`` and stored as a
+        chunk manifest; chunks already stored by earlier snapshots are reused.
         
         Args:
             source_path: Path to source database
@@ -124,19 +173,30 @@ class AtomicBackupSystem:
         
         # Create backup file path
         source_name = Path(source_path).name
-        backup_filename = f"{backup_id}_{source_name}.gz"
+        backup_filename = f"{backup_id}_{source_name}.manifest.json"
         backup_path = self.backup_dir / backup_filename
+        snapshot_path = self.backup_dir / f"temp_snapshot_{backup_id}.db"
         
         try:
             logger.info(f"Creating backup: {source_path} -> {backup_path}")
             
-            # Create compressed backup
-            with open(source_path, 'rb') as src:
-                with gzip.open(backup_path, 'wb') as dst:
-                    shutil.copyfileobj(src, dst)
+            page_size = self._snapshot(source_path, snapshot_path)
+            if not self._sqlite_integrity_ok(snapshot_path):
+                raise RuntimeError("Backup verification failed")
+
+            manifest = self._store_chunks(snapshot_path, page_size)
+            tmp_manifest = backup_path.with_name(backup_path.name + ".tmp")
+            with open(tmp_manifest, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_manifest, backup_path)
             
             # Create metadata
-            metadata = BackupMetadata(backup_id, source_path, str(backup_path))
+            metadata = BackupMetadata(
+                backup_id, source_path, str(backup_path),
+                source_hash=manifest["sha256"], source_size=manifest["size"],
+            )
+            metadata.new_chunks = manifest["new_chunks"]
+            metadata.reused_chunks = len(manifest["chunks"]) - manifest["new_chunks"]
             
             # Verify backup integrity
             if self._verify_backup_integrity(metadata):
@@ -144,7 +204,10 @@ class AtomicBackupSystem:
                 self.active_backups[backup_id] = metadata
                 self._save_metadata()
                 
-                logger.info(f"Backup created successfully: {backup_id}")
+                logger.info(
+                    f"Backup created successfully: {backup_id} "
+                    f"({metadata.new_chunks} new / {metadata.reused_chunks} reused chunks)"
+                )
                 return backup_id
             else:
                 # Remove failed backup
@@ -157,41 +220,116 @@ class AtomicBackupSystem:
             if backup_path.exists():
                 backup_path.unlink()
             raise
+        finally:
+            if snapshot_path.exists():
+                snapshot_path.unlink()
+
+    def _snapshot(self, source_path: str, snapshot_path: Path) -> int:
+        """Online copy of ``source_path`` (WAL content included); returns the page size."""
+        def throttle(status, remaining, total):
+            if remaining and self.step_sleep:
+                time.sleep(self.step_sleep)
+
+        source = sqlite3.connect(source_path, timeout=30.0)
+        target = sqlite3.connect(str(snapshot_path))
+        try:
+            source.backup(target, pages=self.page_step, progress=throttle)
+            page_size = target.execute("PRAGMA page_size").fetchone()[0]
+            # A self-contained file: no WAL to carry around
+            target.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            target.close()
+            source.close()
+        return page_size
+
+    def _sqlite_integrity_ok(self, db_path: Path) -> bool:
+        conn = sqlite3.connect(str(db_path))
+        try:
+            return conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        finally:
+            conn.close()
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunk_dir / f"{digest}.gz"
+
+    def _store_chunks(self, snapshot_path: Path, page_size: int) -> Dict[str, Any]:
+        """Split the snapshot into page-range chunks and store the missing ones."""
+        self.chunk_dir.mkdir(parents=True, exist_ok=True)
+        chunk_size = page_size * self.chunk_pages
+        whole = hashlib.sha256()
+        digests: List[str] = []
+        size = 0
+        new_chunks = 0
+
+        def write_chunk(digest: str, data: bytes) -> None:
+            path = self._chunk_path(digest)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(data, mtime=0))
+            os.replace(tmp_path, path)
+
+        # zlib releases the GIL, so chunks compress in parallel; at most
+        # 2 x workers chunks are held in memory at a time
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = []
+            scheduled = set()
+            with open(snapshot_path, 'rb') as f:
+                for data in iter(lambda: f.read(chunk_size), b""):
+                    whole.update(data)
+                    size += len(data)
+                    digest = hashlib.sha256(data).hexdigest()
+                    digests.append(digest)
+                    if digest in scheduled or self._chunk_path(digest).exists():
+                        continue
+                    scheduled.add(digest)
+                    new_chunks += 1
+                    pending.append(executor.submit(write_chunk, digest, data))
+                    if len(pending) >= 2 * self.workers:
+                        pending.pop(0).result()
+            for future in pending:
+                future.result()
+
+        return {
+            "version": MANIFEST_VERSION,
+            "page_size": page_size,
+            "chunk_size": chunk_size,
+            "size": size,
+            "sha256": whole.hexdigest(),
+            "chunks": digests,
+            "new_chunks": new_chunks,
+        }
+
+    def _read_manifest(self, metadata: BackupMetadata) -> Dict[str, Any]:
+        with open(metadata.backup_path, 'r') as f:
+            return json.load(f)
+
+    def _iter_backup(self, metadata: BackupMetadata) -> Iterator[bytes]:
+        """Decompressed database bytes, one chunk at a time."""
+        if metadata.format != "chunked":
+            with gzip.open(metadata.backup_path, 'rb') as src:
+                yield from iter(lambda: src.read(1024 * 1024), b"")
+            return
+
+        for digest in self._read_manifest(metadata)["chunks"]:
+            with open(self._chunk_path(digest), 'rb') as f:
+                data = gzip.decompress(f.read())
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise ValueError(f"Chunk {digest[:12]} is corrupt")
+            yield data
     
     def _verify_backup_integrity(self, metadata: BackupMetadata) -> bool:
-        """Verify backup file integrity"""
+        """Verify backup file integrity (streaming, chunk hashes + whole-file hash)"""
         try:
             backup_path = Path(metadata.backup_path)
             if not backup_path.exists():
                 return False
             
-            # Decompress and verify
-            temp_restored = backup_path.parent / f"temp_verify_{metadata.backup_id}.db"
-            
-            try:
-                with gzip.open(backup_path, 'rb') as src:
-                    with open(temp_restored, 'wb') as dst:
-                        shutil.copyfileobj(src, dst)
-                
-                # Verify restored file hash matches original
-                restored_hash = metadata._calculate_file_hash(str(temp_restored))
-                integrity_check = restored_hash == metadata.source_hash
-                
-                if integrity_check:
-                    # Additional SQLite integrity check
-                    conn = sqlite3.connect(str(temp_restored))
-                    cursor = conn.cursor()
-                    cursor.execute("PRAGMA integrity_check")
-                    integrity_result = cursor.fetchone()[0]
-                    conn.close()
-                    
-                    integrity_check = integrity_result == "ok"
-                
-                return integrity_check
-                
-            finally:
-                if temp_restored.exists():
-                    temp_restored.unlink()
+            whole = hashlib.sha256()
+            size = 0
+            for data in self._iter_backup(metadata):
+                whole.update(data)
+                size += len(data)
+            return whole.hexdigest() == metadata.source_hash and size == metadata.source_size
                     
         except Exception as e:
             logger.error(f"Backup verification failed: {e}")
@@ -200,6 +338,10 @@ class AtomicBackupSystem:
     def restore_backup(self, backup_id: str, target_path: Optional[str] = None) -> bool:
         """
         Restore database from backup
+
+        The database is rebuilt next to the target, verified, and swapped in
+        with ``os.replace``; the target's stale ``-wal``/``-shm`` files are
+        removed. Restoring is an offline operation.
         
         Args:
             backup_id: ID of backup to restore
@@ -218,6 +360,7 @@ class AtomicBackupSystem:
         
         # Determine target path
         restore_target = target_path or metadata.source_path
+        tmp_target = Path(f"{restore_target}.restore-tmp")
         
         try:
             logger.info(f"Restoring backup {backup_id} to {restore_target}")
@@ -228,17 +371,23 @@ class AtomicBackupSystem:
                 self.create_backup(restore_target, current_backup_id)
                 logger.info(f"Created safety backup: {current_backup_id}")
             
-            # Restore from compressed backup
-            backup_path = Path(metadata.backup_path)
-            with gzip.open(backup_path, 'rb') as src:
-                with open(restore_target, 'wb') as dst:
-                    shutil.copyfileobj(src, dst)
+            # Rebuild from the stored chunks
+            whole = hashlib.sha256()
+            with open(tmp_target, 'wb') as dst:
+                for data in self._iter_backup(metadata):
+                    whole.update(data)
+                    dst.write(data)
             
             # Verify restored file
-            restored_hash = metadata._calculate_file_hash(restore_target)
-            if restored_hash != metadata.source_hash:
+            if whole.hexdigest() != metadata.source_hash:
                 logger.error("Restored file hash mismatch")
                 return False
+
+            for suffix in ("-wal", "-shm"):
+                stale = Path(f"{restore_target}{suffix}")
+                if stale.exists():
+                    stale.unlink()
+            os.replace(tmp_target, restore_target)
             
             logger.info(f"Backup restored successfully: {backup_id}")
             return True
@@ -246,6 +395,9 @@ class AtomicBackupSystem:
         except Exception as e:
             logger.error(f"Backup restore failed: {e}")
             return False
+        finally:
+            if tmp_target.exists():
+                tmp_target.unlink()
     
     def list_backups(self) -> List[Dict[str, Any]]:
         """List all available backups"""
@@ -254,6 +406,8 @@ class AtomicBackupSystem:
     def cleanup_old_backups(self, keep_count: int = 5) -> None:
         """
         Clean up old backups, keeping only the most recent ones
+
+        Chunks no longer referenced by a remaining manifest are deleted.
         
         Args:
             keep_count: Number of backups to keep
@@ -282,14 +436,47 @@ class AtomicBackupSystem:
                 logger.error(f"Failed to remove backup {backup_id}: {e}")
         
         self._save_metadata()
+        self._collect_chunks()
+
+    def _collect_chunks(self) -> int:
+        """Delete chunks that no manifest references; returns the number removed."""
+        if not self.chunk_dir.exists():
+            return 0
+        referenced = set()
+        for metadata in self.active_backups.values():
+            if metadata.format != "chunked":
+                continue
+            try:
+                referenced.update(self._read_manifest(metadata)["chunks"])
+            except (OSError, ValueError, KeyError) as e:
+                # Keep everything rather than drop chunks of an unreadable manifest
+                logger.warning(f"Skipping chunk cleanup, manifest unreadable: {e}")
+                return 0
+
+        removed = 0
+        for path in self.chunk_dir.glob("*.gz"):
+            if path.name[:-len(".gz")] not in referenced:
+                path.unlink()
+                removed += 1
+        return removed
     
     def get_backup_size(self, backup_id: str) -> int:
-        """Get size of backup file in bytes"""
+        """Get size of backup file in bytes (chunks shared with other backups included)"""
         if backup_id not in self.active_backups:
             return 0
         
-        backup_path = Path(self.active_backups[backup_id].backup_path)
-        return backup_path.stat().st_size if backup_path.exists() else 0
+        metadata = self.active_backups[backup_id]
+        backup_path = Path(metadata.backup_path)
+        if not backup_path.exists():
+            return 0
+        if metadata.format != "chunked":
+            return backup_path.stat().st_size
+        size = backup_path.stat().st_size
+        for digest in set(self._read_manifest(metadata)["chunks"]):
+            chunk_path = self._chunk_path(digest)
+            if chunk_path.exists():
+                size += chunk_path.stat().st_size
+        return size
     
     def validate_backup_health(self) -> Dict[str, Any]:
         """
@@ -330,6 +517,9 @@ class AtomicBackupSystem:
                         "error": "Verification failed"
                     })
         
+        if self.chunk_dir.exists():
+            results["total_size"] += sum(path.stat().st_size for path in self.chunk_dir.glob("*.gz"))
+
         self._save_metadata()
         return results
 
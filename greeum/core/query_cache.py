@@ -0,0 +1,228 @@
+"""
+Write-generation-aware query result cache.
+
+One cache per database manager (``db_manager.query_cache``) is shared by
+``SearchEngine.search``, ``BlockManager.search`` / ``search_with_slots``,
+``CacheManager`` and the REST ``/search`` route.
+
+- Keys are a namespace plus the normalized query text (trimmed, whitespace
+  collapsed) and every parameter that changes the result, or a SHA-1 of the
+  full float32 query embedding (``embedding_key``).
+- Each entry is tagged with the store write generation it was computed at.
+  The write path bumps the generation on add, knowledge update, batch insert
+  and merge; a lookup that finds an older generation drops the entry and
+  counts it as stale.
+- Writes from other processes (CLI, worker, MCP server) bump the generation
+  too: the database managers pass ``store_version`` (change log position and
+  ``MAX(block_index)``), which every lookup compares with the last value seen.
+- Entries are evicted least-recently-used beyond ``GREEUM_QUERY_CACHE_SIZE``
+  (default 512) and expire after ``GREEUM_QUERY_CACHE_TTL`` seconds (default
+  300); the TTL only bounds writes the change log does not record. A size of
+  0 disables caching.
+
+Values are deep-copied on the way in and out, so callers may annotate results.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 512
+DEFAULT_TTL = 300.0
+
+_WHITESPACE = re.compile(r"\s+")
+_MISSING = object()
+
+
+def normalize_query(query: Optional[str]) -> str:
+    """Trim and collapse whitespace so trivially different queries share a key.
+
+    Case is kept: embedding and keyword scores may depend on it.
+    """
+    return _WHITESPACE.sub(" ", (query or "").strip())
+
+
+def embedding_key(embedding: Any) -> str:
+    """SHA-1 over every float32 component of the query embedding."""
+    vector = np.ascontiguousarray(np.asarray(embedding, dtype=np.float32).reshape(-1))
+    return hashlib.sha1(vector.tobytes()).hexdigest()
+
+
+def query_key(namespace: str, query: Optional[str] = None, **params: Any) -> Tuple[Hashable, ...]:
+    """Cache key for ``namespace`` + normalized query + result-shaping parameters."""
+    return (
+        namespace,
+        normalize_query(query),
+        tuple(sorted((name, repr(value)) for name, value in params.items())),
+    )
+
+
+class QueryResultCache:
+    """Bounded LRU + TTL map whose entries go stale when the store is written."""
+
+    def __init__(self, capacity: Optional[int] = None, ttl: Optional[float] = None,
+                 store_version: Optional[Callable[[], Hashable]] = None):
+        if capacity is None:
+            try:
+                capacity = int(os.getenv("GREEUM_QUERY_CACHE_SIZE", str(DEFAULT_CAPACITY)))
+            except ValueError:
+                capacity = DEFAULT_CAPACITY
+        if ttl is None:
+            try:
+                ttl = float(os.getenv("GREEUM_QUERY_CACHE_TTL", str(DEFAULT_TTL)))
+            except ValueError:
+                ttl = DEFAULT_TTL
+        self.capacity = max(0, capacity)
+        self.ttl = max(0.0, ttl)
+
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        # Cross-process write marker and the last value seen
+        self._store_version = store_version
+        self._seen_version: Any = _MISSING
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "expired": 0,
+            "evictions": 0,
+            "stores": 0,
+            "generation_bumps": 0,
+            "external_bumps": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0 and self.ttl > 0
+
+    @property
+    def generation(self) -> int:
+        self._observe_store()
+        return self._generation
+
+    def _observe_store(self) -> None:
+        """Bump the generation when ``store_version`` moved (another process wrote)."""
+        if self._store_version is None or not self.enabled:
+            return
+        try:
+            version = self._store_version()
+        except Exception as e:  # noqa: BLE001 - closed or locked connection
+            logger.debug(f"Query cache store version unavailable: {e}")
+            return
+        with self._lock:
+            if self._seen_version is not _MISSING and version != self._seen_version:
+                self._generation += 1
+                self.stats["external_bumps"] += 1
+            self._seen_version = version
+
+    def bump(self) -> int:
+        """Record a store write; entries computed before it become stale."""
+        with self._lock:
+            self._generation += 1
+            self.stats["generation_bumps"] += 1
+            return self._generation
+
+    def get(self, key: Hashable, default: Any = None, max_age: Optional[float] = None) -> Any:
+        """Cached value for ``key``; ``max_age`` tightens the TTL for this lookup."""
+        if not self.enabled:
+            return default
+        self._observe_store()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return default
+            generation, stored_at, value = entry
+            if generation != self._generation:
+                del self._entries[key]
+                self.stats["stale"] += 1
+                self.stats["misses"] += 1
+                return default
+            ttl = self.ttl if max_age is None else min(self.ttl, max_age)
+            if time.monotonic() - stored_at >= ttl:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """Store ``value`` computed at ``generation`` (read it *before* computing).
+
+        A value computed while a write landed is stored with the older
+        generation and is therefore never served.
+        """
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if generation is None:
+                generation = self._generation
+            if generation != self._generation:
+                return
+            self._entries[key] = (generation, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key`` or compute, store and return it."""
+        if not self.enabled:
+            return compute()
+        generation = self.generation
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        self.put(key, value, generation)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["capacity"] = self.capacity
+        stats["ttl_seconds"] = self.ttl
+        stats["generation"] = self._generation
+        return stats
+
+
+def get_query_cache(db_manager) -> Optional[QueryResultCache]:
+    """The manager's shared cache, attaching one to managers created without it."""
+    cache = getattr(db_manager, "query_cache", None)
+    if isinstance(cache, QueryResultCache):
+        return cache
+    if db_manager is None or cache is not None:
+        return None
+    cache = QueryResultCache()
+    try:
+        db_manager.query_cache = cache
+    except AttributeError:
+        return None
+    return cache
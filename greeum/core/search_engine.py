@@ -8,6 +8,7 @@ import logging
 from datetime import datetime
 
 from .block_manager import BlockManager
+from .query_cache import get_query_cache, query_key
 from ..embedding_models import get_embedding
 
 try:
@@ -106,6 +107,22 @@ class SearchEngine:
             radius: 그래프 탐색 반경 (M0: parameter only, no implementation) 
             fallback: 국소 검색 실패시 기본 검색 사용 여부 (M0: parameter only, no implementation)
         """
+        # v5.4: 쓰기 세대 기반 결과 캐시 (슬롯 검색은 앵커 상태에 따라 달라지므로 제외)
+        cache = None
+        if slot is None:
+            cache = get_query_cache(getattr(self.bm, "db_manager", None))
+        if cache is not None:
+            cache_key = query_key(
+                "search_engine.search", query,
+                top_k=top_k, temporal_boost=temporal_boost, temporal_weight=temporal_weight,
+                fallback=fallback, reranker=self.reranker is not None,
+            )
+            cache_generation = cache.generation
+            cached = cache.get(cache_key)
+            if cached is not None:
+                cached["metadata"]["cache_hit"] = True
+                return cached
+
         # M1: Implement localized search using anchor/graph system
         localized_blocks = None
         local_hit_rate = 0.0
@@ -165,7 +182,7 @@ class SearchEngine:
         
         end_time = time.perf_counter()
         
-        return {
+        response = {
             "blocks": candidate_blocks[:top_k],
             "timing": {
                 "embed_ms": (vec_time - t0)*1000,
@@ -184,7 +201,11 @@ class SearchEngine:
                 "avg_hops": avg_hops,
                 "anchor_slot": slot
             }
-        } 
+        }
+        if cache is not None:
+            response["metadata"]["cache_hit"] = False
+            cache.put(cache_key, response, cache_generation)
+        return response
 
     def _localized_search(self, query: str, query_emb: list, slot: str, radius: int = None, top_k: int = 5):
         """
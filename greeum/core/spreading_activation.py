@@ -10,6 +10,10 @@ from datetime import datetime
 from dataclasses import dataclass
 import heapq
 
+import numpy as np
+
+from .activation_history import ActivationHistorySink
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -41,6 +45,10 @@ class SpreadingActivation:
         self.decay_rate = 0.8  # Decay factor per hop
         self.max_iterations = 5  # Maximum spreading iterations
         self.session_id = None
+        # v5.4: history rows are buffered and flushed in batches
+        self.history = getattr(db_manager, 'activation_history', None)
+        if self.history is None:
+            self.history = ActivationHistorySink(db_manager)
     
     def activate(self, seed_nodes: List[str], 
                 initial_activation: float = 1.0) -> Dict[str, float]:
@@ -57,126 +65,120 @@ class SpreadingActivation:
         # Initialize session with microseconds for uniqueness
         import uuid
         self.session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
-        self._create_session()
         
-        # Activation levels
-        activation = {}
+        # Activation levels over the CSR node positions (v5.4)
+        csr = self.network.csr_snapshot()
+        level, present = self._seed_levels(csr, seed_nodes, initial_activation)
         for node_id in seed_nodes:
             if node_id in self.network.nodes:
-                activation[node_id] = initial_activation
                 self._record_activation(node_id, initial_activation, 'direct')
         
-        # Spreading iterations
+        # Spreading iterations: one sparse mat-vec product each
+        edge_weights = csr.strength * self.decay_rate
         for iteration in range(self.max_iterations):
-            new_activation = {}
-            
-            for node_id, level in activation.items():
-                if level < self.activation_threshold:
-                    continue
-                
-                # Get connected nodes
-                if node_id in self.network.adjacency_list:
-                    for neighbor_id in self.network.adjacency_list[node_id]:
-                        # Find association strength
-                        assoc = self._find_association(node_id, neighbor_id)
-                        if not assoc:
-                            continue
-                        
-                        # Calculate spread activation
-                        spread = level * assoc.strength * self.decay_rate
-                        
-                        if neighbor_id not in new_activation:
-                            new_activation[neighbor_id] = 0
-                        new_activation[neighbor_id] += spread
+            spread = self._spread_step(csr, level, present, edge_weights)
+            if spread is None:
+                break
+            incoming, touched = spread
             
             # Merge activations
-            for node_id, spread_level in new_activation.items():
-                if node_id not in activation:
-                    activation[node_id] = 0
-                activation[node_id] = min(1.0, activation[node_id] + spread_level)
-                self._record_activation(node_id, activation[node_id], 'spread')
+            level[touched] = np.minimum(1.0, level[touched] + incoming[touched])
+            present |= touched
+            self.history.record_many(
+                (csr.node_ids[pos], float(level[pos]), 'spreading', 'spread', self.session_id)
+                for pos in np.flatnonzero(touched).tolist()
+            )
         
-        # Update node activation levels
-        self._update_node_activations(activation)
+        activation = self._as_dict(csr, level, present)
         
-        # Save session snapshot
+        # Update node activation levels and save the session snapshot in one transaction
+        self._update_node_activations(activation, commit=False)
         self._save_session_snapshot(activation)
         
         return activation
     
+    def _seed_levels(self, csr, seed_nodes: List[str],
+                     initial_activation: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Activation vector and presence mask for the seed nodes"""
+        level = np.zeros(csr.num_nodes, dtype=np.float64)
+        present = np.zeros(csr.num_nodes, dtype=bool)
+        for node_id in seed_nodes:
+            if node_id in self.network.nodes:
+                pos = csr.node_pos[node_id]
+                level[pos] = initial_activation
+                present[pos] = True
+        return level, present
+    
+    def _spread_step(self, csr, level: np.ndarray, present: np.ndarray,
+                     edge_weights: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Propagate one hop from every node above the threshold
+        
+        Returns:
+            (incoming activation per node, mask of nodes reached), or None
+            when no edge leaves an active node
+        """
+        active = present & (level >= self.activation_threshold)
+        edge_mask = active[csr.sources]
+        if not edge_mask.any():
+            return None
+        
+        targets = csr.indices[edge_mask]
+        contributions = level[csr.sources[edge_mask]] * edge_weights[edge_mask]
+        incoming = np.bincount(targets, weights=contributions, minlength=csr.num_nodes)
+        touched = np.zeros(csr.num_nodes, dtype=bool)
+        touched[targets] = True
+        return incoming, touched
+    
+    @staticmethod
+    def _as_dict(csr, level: np.ndarray, present: np.ndarray) -> Dict[str, float]:
+        return {csr.node_ids[pos]: float(level[pos]) for pos in np.flatnonzero(present).tolist()}
+    
     def _find_association(self, source_id: str, target_id: str):
         """Find association between two nodes"""
-        for assoc in self.network.associations.values():
-            if assoc.source_node_id == source_id and assoc.target_node_id == target_id:
-                return assoc
-        return None
-    
-    def _create_session(self):
-        """Create new activation session"""
-        cursor = self.db_manager.conn.cursor()
-        cursor.execute('''
-            INSERT INTO context_sessions 
-            (session_id, active_nodes, activation_snapshot, created_at, last_updated, metadata)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            self.session_id,
-            '[]',
-            '{}',
-            datetime.now().isoformat(),
-            datetime.now().isoformat(),
-            '{}'
-        ))
-        self.db_manager.conn.commit()
+        return self.network.get_association(source_id, target_id)
     
     def _record_activation(self, node_id: str, level: float, source: str):
-        """Record activation in history"""
-        cursor = self.db_manager.conn.cursor()
-        cursor.execute('''
-            INSERT INTO activation_history
-            (node_id, activation_level, trigger_type, trigger_source, timestamp, session_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            node_id,
-            level,
-            'spreading',
-            source,
-            datetime.now().isoformat(),
-            self.session_id
-        ))
-        self.db_manager.conn.commit()
+        """Record activation in history (buffered)"""
+        self.history.record(node_id, level, 'spreading', source, self.session_id)
     
-    def _update_node_activations(self, activation: Dict[str, float]):
+    def _update_node_activations(self, activation: Dict[str, float], commit: bool = True):
         """Update node activation levels in database"""
-        cursor = self.db_manager.conn.cursor()
-        
+        now = datetime.now().isoformat()
+        rows = []
         for node_id, level in activation.items():
             if node_id in self.network.nodes:
                 self.network.nodes[node_id].activation_level = level
-                self.network.nodes[node_id].last_activated = datetime.now().isoformat()
-                
-                cursor.execute('''
-                    UPDATE memory_nodes
-                    SET activation_level = ?, last_activated = ?
-                    WHERE node_id = ?
-                ''', (level, datetime.now().isoformat(), node_id))
+                self.network.nodes[node_id].last_activated = now
+                rows.append((level, now, node_id))
         
-        self.db_manager.conn.commit()
+        cursor = self.db_manager.conn.cursor()
+        cursor.executemany('''
+            UPDATE memory_nodes
+            SET activation_level = ?, last_activated = ?
+            WHERE node_id = ?
+        ''', rows)
+        if commit:
+            self.db_manager.conn.commit()
     
     def _save_session_snapshot(self, activation: Dict[str, float]):
         """Save session activation snapshot"""
         active_nodes = [node_id for node_id, level in activation.items() 
                        if level >= self.activation_threshold]
         
+        now = datetime.now().isoformat()
         cursor = self.db_manager.conn.cursor()
         cursor.execute('''
-            UPDATE context_sessions
-            SET active_nodes = ?, activation_snapshot = ?, last_updated = ?
-            WHERE session_id = ?
+            INSERT OR REPLACE INTO context_sessions
+            (session_id, active_nodes, activation_snapshot, created_at, last_updated, metadata)
+            VALUES (?, ?, ?, ?, ?, ?)
         ''', (
+            self.session_id,
             json.dumps(active_nodes),
             json.dumps(activation),
-            datetime.now().isoformat(),
-            self.session_id
+            now,
+            now,
+            '{}'
         ))
         self.db_manager.conn.commit()
     
@@ -194,6 +196,7 @@ class SpreadingActivation:
         """
         memories = []
         
+        activated = []
         for node_id, level in activation.items():
             if level < threshold:
                 continue
@@ -201,10 +204,16 @@ class SpreadingActivation:
             node = self.network.nodes.get(node_id)
             if not node or not node.memory_id:
                 continue
-            
-            # Get memory block
-            block = self.db_manager.get_block(node.memory_id)
-            if block:
+            activated.append((node_id, level, node.memory_id))
+        
+        # Get memory blocks in one batch (v5.4)
+        blocks = {
+            block['block_index']: block
+            for block in self.db_manager.get_blocks_by_indices([m for _, _, m in activated])
+        }
+        for node_id, level, memory_id in activated:
+            if memory_id in blocks:
+                block = dict(blocks[memory_id])
                 block['activation_level'] = level
                 block['node_id'] = node_id
                 memories.append(block)
@@ -290,6 +299,7 @@ class SpreadingActivation:
         Returns:
             List of activation records
         """
+        self.history.flush()
         cursor = self.db_manager.conn.cursor()
         cursor.execute('''
             SELECT * FROM activation_history
@@ -338,38 +348,24 @@ class SpreadingActivation:
                 'entity': 0.7
             }
         
-        activation = {}
-        for node_id in seed_nodes:
-            if node_id in self.network.nodes:
-                activation[node_id] = 1.0
+        csr = self.network.csr_snapshot()
+        level, present = self._seed_levels(csr, seed_nodes, 1.0)
+        
+        # Apply context weight per association type
+        type_weights = np.array(
+            [context_weights.get(name, 0.5) for name in csr.type_names], dtype=np.float64
+        )
+        edge_weights = csr.strength * type_weights[csr.type_codes] * self.decay_rate
         
         for iteration in range(self.max_iterations):
-            new_activation = {}
+            spread = self._spread_step(csr, level, present, edge_weights)
+            if spread is None:
+                break
+            incoming, touched = spread
             
-            for node_id, level in activation.items():
-                if level < self.activation_threshold:
-                    continue
-                
-                if node_id in self.network.adjacency_list:
-                    for neighbor_id in self.network.adjacency_list[node_id]:
-                        assoc = self._find_association(node_id, neighbor_id)
-                        if not assoc:
-                            continue
-                        
-                        # Apply context weight
-                        weight = context_weights.get(assoc.association_type, 0.5)
-                        spread = level * assoc.strength * weight * self.decay_rate
-                        
-                        if neighbor_id not in new_activation:
-                            new_activation[neighbor_id] = 0
-                        new_activation[neighbor_id] += spread
-            
-            # Merge with normalization
-            for node_id, spread_level in new_activation.items():
-                if node_id not in activation:
-                    activation[node_id] = 0
-                # Sigmoid normalization to keep values in [0, 1]
-                combined = activation[node_id] + spread_level
-                activation[node_id] = combined / (1 + abs(combined))
-        
-        return activation
\ No newline at end of file
+            # Merge with sigmoid normalization to keep values in [0, 1]
+            combined = level[touched] + incoming[touched]
+            level[touched] = combined / (1 + np.abs(combined))
+            present |= touched
+        
+        return self._as_dict(csr, level, present)
\ No newline at end of file
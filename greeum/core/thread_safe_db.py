@@ -18,7 +18,9 @@ import sqlite3
 import json
 import threading
 import queue
+import time
 import datetime
+from collections import deque
 import numpy as np
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple, Callable, TypeVar
@@ -26,6 +28,15 @@ import logging
 
 from .branch_schema import BranchSchemaSQL
 from .stm_anchor_store import STMAnchorStore
+from .embedding_store import EmbeddingMatrixStore
+from .graph_cache import BlockGraphCache
+from .branch_centroids import BranchCentroidStore, ensure_branch_centroid_schema
+from .activation_history import ActivationHistorySink
+from .query_cache import QueryResultCache
+from .change_log import ensure_change_log_schema, store_version
+from .fts_index import ensure_fts_schema, search_fts
+from .block_fetch import fetch_blocks
+from .block_write import insert_blocks
 from .db_integrity import (
     backup_database_files,
     is_corruption_error,
@@ -41,7 +52,31 @@ WriteTask = Tuple[
     Optional[List[WriteResult]],
     Optional[List[BaseException]],
     threading.Event,
+    float,
 ]
+
+_GROUP_SAVEPOINT = "greeum_write"
+
+
+class _GroupCommitConnection(sqlite3.Connection):
+    """Connection that defers to the write worker's group transaction (v5.4).
+
+    While the worker runs an operation inside a batch, ``commit()`` is a no-op
+    (the batch commits once) and ``rollback()`` only undoes the operation's own
+    savepoint. Outside a batch both behave as usual.
+    """
+
+    group_savepoint: Optional[str] = None
+
+    def commit(self) -> None:
+        if self.group_savepoint is None:
+            super().commit()
+
+    def rollback(self) -> None:
+        if self.group_savepoint is None:
+            super().rollback()
+        elif self.in_transaction:
+            self.execute(f"ROLLBACK TO {self.group_savepoint}")
 
 
 class ThreadSafeDatabaseManager:
@@ -76,13 +111,42 @@ class ThreadSafeDatabaseManager:
         # Legacy 호환 매니저 (지연 생성)
         self._legacy_manager = None
 
+        # v5.4: 벡터 검색용 정규화 임베딩 행렬 (첫 검색 시 로드, 이후 증분 갱신)
+        self.embedding_store = EmbeddingMatrixStore.for_database(self.connection_string)
+
+        # v5.4: 그래프 탐색용 해시 키 노드/인접 캐시 (LRU, 쓰기 경로에서 무효화)
+        self.graph_cache = BlockGraphCache(self)
+
+        # v5.4: 브랜치별 임베딩 누적합/개수 (라우팅용 중심 벡터, 쓰기 경로에서 O(dim) 갱신)
+        self.branch_centroids = BranchCentroidStore(self)
+
+        # v5.4: activation_history 행 버퍼 (배치 flush, close 시 기록)
+        self.activation_history = ActivationHistorySink(self)
+
+        # v5.4: 검색 결과 캐시 (LRU+TTL, 쓰기 세대가 바뀌면 항목 무효)
+        # 다른 프로세스의 쓰기는 변경 로그 위치로 감지
+        self.query_cache = QueryResultCache(store_version=lambda: store_version(self.conn))
+
         # 초기 연결에서 무결성 확인 및 스키마 생성
         conn = self._get_connection()
         conn = self._ensure_integrity(conn)
         self._create_schemas(conn)
 
         # Sequential write queue ensures SQLite writes are serialized
-        self._write_queue: queue.Queue[Tuple[Optional[Callable[[sqlite3.Connection], WriteResult]], Optional[List[WriteResult]], Optional[List[BaseException]], threading.Event]] = queue.Queue()
+        # v5.4: 워커가 대기 중인 작업을 묶어 한 트랜잭션으로 group commit
+        self._write_queue: queue.Queue[WriteTask] = queue.Queue()
+        self._write_batch_max = max(1, int(os.getenv('GREEUM_WRITE_BATCH_MAX', '64')))
+        self._write_batch_wait = max(0.0, float(os.getenv('GREEUM_WRITE_BATCH_WAIT_MS', '2')) / 1000)
+        self._write_stats_lock = threading.Lock()
+        self._write_stats = {
+            'batches': 0,
+            'operations': 0,
+            'failed_operations': 0,
+            'commit_failures': 0,
+            'last_batch_size': 0,
+            'max_batch_size': 0,
+        }
+        self._write_waits_ms: deque = deque(maxlen=1024)
         self._write_thread = threading.Thread(
             target=self._write_worker,
             name="GreeumWriteWorker",
@@ -183,6 +247,7 @@ class ThreadSafeDatabaseManager:
                     self.connection_string,
                     check_same_thread=False,  # 스레드 체크 비활성화
                     timeout=timeout,
+                    factory=_GroupCommitConnection,
                 )
                 self.local.conn.row_factory = sqlite3.Row
                 
@@ -277,6 +342,7 @@ class ThreadSafeDatabaseManager:
             self.connection_string,
             check_same_thread=False,
             timeout=timeout,
+            factory=_GroupCommitConnection,
         )
         new_conn.row_factory = sqlite3.Row
         try:
@@ -295,35 +361,156 @@ class ThreadSafeDatabaseManager:
         return new_conn
 
     def _write_worker(self) -> None:
-        """Background worker that serializes SQLite write operations."""
+        """Background worker that group-commits SQLite write operations (v5.4).
+
+        Each round drains up to ``GREEUM_WRITE_BATCH_MAX`` queued operations and
+        runs them in one transaction, every operation under its own savepoint so
+        a failure rolls back only that operation. The batch commits once, then
+        all waiters wake. While writers contend (the previous batch held more
+        than one operation) the worker lingers up to ``GREEUM_WRITE_BATCH_WAIT_MS``
+        for stragglers; a lone writer is never delayed.
+        """
         conn = self._get_connection()
+        linger = False
         while True:
-            operation, result_container, error_container, event = self._write_queue.get()
+            batch = self._next_write_batch(linger)
+            tasks = [task for task in batch if task[0] is not None]
             try:
-                if operation is None:
-                    if event:
+                if tasks:
+                    self._run_write_batch(conn, tasks)
+            finally:
+                for operation, _, _, event, _ in batch:
+                    if operation is None and event:
                         event.set()
-                    return
-
+                    self._write_queue.task_done()
+            if len(tasks) < len(batch):
+                return
+            linger = len(tasks) > 1
+
+    def _next_write_batch(self, linger: bool) -> List[WriteTask]:
+        """Block for one task, then drain more up to the batch size (and linger window)."""
+        batch = [self._write_queue.get()]
+        deadline = time.perf_counter() + self._write_batch_wait if linger else 0.0
+        while batch[-1][0] is not None and len(batch) < self._write_batch_max:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._write_queue.get(timeout=remaining))
+                else:
+                    batch.append(self._write_queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_write_batch(self, conn: sqlite3.Connection, tasks: List[WriteTask]) -> None:
+        """Run tasks in one transaction with per-task savepoints, commit once, wake waiters."""
+        outcomes: List[Tuple[bool, Any]] = []
+        waits_ms: List[float] = []
+        commit_error: Optional[BaseException] = None
+        try:
+            for operation, _, _, _, enqueued_at in tasks:
+                waits_ms.append((time.perf_counter() - enqueued_at) * 1000)
                 try:
-                    result = operation(conn)
-                    if result_container is not None:
-                        result_container.append(result)
+                    # 작업이 직접 COMMIT을 실행했을 수 있으므로 매번 확인
+                    if not conn.in_transaction:
+                        conn.execute("BEGIN")
+                    conn.execute(f"SAVEPOINT {_GROUP_SAVEPOINT}")
+                    conn.group_savepoint = _GROUP_SAVEPOINT
+                    try:
+                        result = operation(conn)
+                    finally:
+                        conn.group_savepoint = None
+                    if conn.in_transaction:
+                        conn.execute(f"RELEASE {_GROUP_SAVEPOINT}")
+                    outcomes.append((True, result))
                 except Exception as exc:  # pragma: no cover - propagated to caller
-                    if error_container is not None:
-                        error_container.append(exc)
-                finally:
-                    if event:
-                        event.set()
-            finally:
-                self._write_queue.task_done()
+                    try:
+                        if conn.in_transaction:
+                            conn.execute(f"ROLLBACK TO {_GROUP_SAVEPOINT}")
+                            conn.execute(f"RELEASE {_GROUP_SAVEPOINT}")
+                    except sqlite3.Error as rollback_error:
+                        logger.warning(f"Write savepoint rollback failed: {rollback_error}")
+                    outcomes.append((False, exc))
+
+            if conn.in_transaction:
+                try:
+                    conn.commit()
+                    # 배치 안의 쓰기는 여기서야 보이므로 커밋 후 세대를 올림
+                    self.query_cache.bump()
+                except Exception as exc:  # pragma: no cover - disk/lock failures
+                    commit_error = exc
+                    logger.error(f"Group commit of {len(tasks)} writes failed: {exc}")
+                    try:
+                        conn.rollback()
+                    except sqlite3.Error:
+                        pass
+                    # 메모리 캐시에 반영된 쓰기를 되돌릴 수 없으므로 재적재
+                    self.embedding_store.invalidate()
+                    self.graph_cache.clear()
+                    self.branch_centroids.invalidate()
+                    self.query_cache.bump()
+            if commit_error is not None:
+                outcomes = [(False, commit_error) if ok else (ok, value) for ok, value in outcomes]
+        finally:
+            self._record_write_batch(len(tasks), waits_ms, outcomes, commit_error is not None)
+            for index, (_, result_container, error_container, event, _) in enumerate(tasks):
+                if index < len(outcomes):
+                    ok, value = outcomes[index]
+                    target = result_container if ok else error_container
+                    if target is not None:
+                        target.append(value)
+                if event:
+                    event.set()
+
+    def _record_write_batch(
+        self,
+        size: int,
+        waits_ms: List[float],
+        outcomes: List[Tuple[bool, Any]],
+        commit_failed: bool,
+    ) -> None:
+        with self._write_stats_lock:
+            stats = self._write_stats
+            stats['batches'] += 1
+            stats['operations'] += size
+            stats['failed_operations'] += sum(1 for ok, _ in outcomes if not ok)
+            stats['commit_failures'] += int(commit_failed)
+            stats['last_batch_size'] = size
+            stats['max_batch_size'] = max(stats['max_batch_size'], size)
+            self._write_waits_ms.extend(waits_ms)
+
+    def write_queue_stats(self) -> Dict[str, Any]:
+        """Queue depth, batch sizes and queue wait times of the group-commit writer (v5.4)."""
+        with self._write_stats_lock:
+            stats = dict(self._write_stats)
+            waits = sorted(self._write_waits_ms)
+        write_queue = getattr(self, '_write_queue', None)
+        stats['queue_depth'] = write_queue.qsize() if write_queue is not None else 0
+        stats['batch_max'] = self._write_batch_max
+        stats['batch_wait_ms'] = self._write_batch_wait * 1000
+        stats['avg_batch_size'] = round(stats['operations'] / stats['batches'], 2) if stats['batches'] else 0.0
+
+        def percentile(q: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))], 3)
+
+        stats['wait_ms'] = {
+            'samples': len(waits),
+            'avg': round(sum(waits) / len(waits), 3) if waits else None,
+            'p50': percentile(0.5),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': round(waits[-1], 3) if waits else None,
+        }
+        return stats
 
     def _execute_write(self, operation: Callable[[sqlite3.Connection], WriteResult]) -> WriteResult:
         """Submit a write operation to the queue and wait for the result."""
         result_container: List[WriteResult] = []
         error_container: List[BaseException] = []
         event = threading.Event()
-        self._write_queue.put((operation, result_container, error_container, event))
+        self._write_queue.put((operation, result_container, error_container, event, time.perf_counter()))
         event.wait()
         if error_container:
             raise error_container[0]
@@ -351,6 +538,16 @@ class ThreadSafeDatabaseManager:
             return []
 
         cursor = self._get_connection().cursor()
+
+        # v5.4: FTS5 + bm25 랭킹, LIMIT은 SQL에서 적용
+        if getattr(self, "_fts_enabled", False):
+            scored = search_fts(cursor, keywords, limit)
+            scores = dict(scored)
+            results = self.get_blocks_by_indices([index for index, _ in scored])
+            for block in results:
+                block["keyword_score"] = scores[block["block_index"]]
+            return results
+
         block_indices: set[int] = set()
 
         for keyword in keywords:
@@ -370,13 +567,7 @@ class ThreadSafeDatabaseManager:
             )
             block_indices.update(row[0] for row in cursor.fetchall())
 
-        results: List[Dict[str, Any]] = []
-        for index in block_indices:
-            block = self.get_block(index)
-            if block:
-                results.append(block)
-
-        return results[:limit]
+        return self.get_blocks_by_indices(list(block_indices)[:limit])
 
     def search_blocks_by_embedding(
         self,
@@ -389,47 +580,18 @@ class ThreadSafeDatabaseManager:
         if not query_embedding:
             return []
 
-        query_vector = np.asarray(query_embedding, dtype=np.float32)
-        if query_vector.ndim > 1:
-            query_vector = query_vector.reshape(-1)
-
-        query_norm = float(np.linalg.norm(query_vector))
-        if query_norm == 0.0:
-            return []
-
-        cursor = self._get_connection().cursor()
-        cursor.execute("SELECT block_index, embedding, embedding_dim FROM block_embeddings")
-
-        scored: List[Tuple[int, float]] = []
-        for block_index, embedding_blob, embedding_dim in cursor.fetchall():
-            if not embedding_blob:
-                continue
-
-            block_vector = np.frombuffer(embedding_blob, dtype=np.float32)
-            if embedding_dim:
-                block_vector = block_vector[:embedding_dim]
-
-            if block_vector.shape != query_vector.shape:
-                continue
-
-            block_norm = float(np.linalg.norm(block_vector))
-            if block_norm == 0.0:
-                continue
-
-            similarity = float(np.dot(query_vector, block_vector) / (query_norm * block_norm))
-            if similarity < min_similarity:
-                continue
-
-            scored.append((block_index, similarity))
-
-        scored.sort(key=lambda item: item[1], reverse=True)
+        # v5.4: 행렬-벡터 곱 + argpartition으로 상위 k개 선택
+        scored = self.embedding_store.search(
+            self._get_connection(),
+            query_embedding,
+            top_k=top_k,
+            min_similarity=min_similarity,
+        )
 
-        results: List[Dict[str, Any]] = []
-        for block_index, similarity in scored[:top_k]:
-            block = self.get_block(block_index)
-            if block:
-                block["similarity"] = similarity
-                results.append(block)
+        similarities = dict(scored)
+        results = self.get_blocks_by_indices([block_index for block_index, _ in scored])
+        for block in results:
+            block["similarity"] = similarities[block["block_index"]]
 
         return results
 
@@ -450,13 +612,7 @@ class ThreadSafeDatabaseManager:
             (since_timestamp, limit),
         )
 
-        results: List[Dict[str, Any]] = []
-        for (block_index,) in cursor.fetchall():
-            block = self.get_block(block_index)
-            if block:
-                results.append(block)
-
-        return results
+        return self.get_blocks_by_indices([block_index for (block_index,) in cursor.fetchall()])
 
     def _create_schemas(self, conn):
         """
@@ -533,6 +689,7 @@ class ThreadSafeDatabaseManager:
 
         # 인덱스 생성 (성능 최적화)
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_blocks_timestamp ON blocks(timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_blocks_hash ON blocks(hash)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_block_keywords ON block_keywords(keyword)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_block_tags ON block_tags(tag)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_stm_timestamp ON short_term_memories(timestamp)')
@@ -548,6 +705,12 @@ class ThreadSafeDatabaseManager:
         self._create_v3_tables(cursor)
         self._initialize_branch_structures(cursor)
 
+        # v5.4: FTS5 키워드 인덱스 (최초 생성 시 기존 블록 backfill)
+        self._fts_enabled = ensure_fts_schema(cursor)
+        ensure_branch_centroid_schema(cursor)
+        # v5.4: 제자리 갱신(재임베딩·키워드 교체)을 파생 인덱스에 알리는 변경 로그
+        ensure_change_log_schema(cursor)
+
         conn.commit()
         logger.debug("Thread-safe 데이터베이스 스키마 생성 완료")
 
@@ -742,17 +905,37 @@ class ThreadSafeDatabaseManager:
         모든 스레드의 연결을 정리하는 것은 복잡하므로, 현재 스레드의 연결만 정리합니다.
         일반적으로 프로그램 종료 시 자동으로 정리됩니다.
         """
+        self._save_embedding_snapshot()
+        self._flush_activation_history()
         if hasattr(self.local, 'conn') and self.local.conn:
             self.local.conn.close()
             self.local.conn = None
             logger.debug(f"스레드별 데이터베이스 연결 종료: {threading.current_thread().name}")
 
+    def _flush_activation_history(self) -> None:
+        """Write buffered activation_history rows before the connection goes away."""
+        history = getattr(self, "activation_history", None)
+        if history is not None:
+            history.flush()
+
+    def _save_embedding_snapshot(self) -> None:
+        """Persist the embedding matrix/ANN snapshot next to the database."""
+        store = getattr(self, "embedding_store", None)
+        if store is None:
+            return
+        try:
+            store.save()
+        except Exception as e:  # noqa: BLE001
+            logger.debug(f"Embedding snapshot save skipped: {e}")
+
     def shutdown(self):
         """Gracefully stop the background write worker."""
+        self._save_embedding_snapshot()
+        self._flush_activation_history()
         if not hasattr(self, '_write_queue') or self._write_queue is None:
             return
         event = threading.Event()
-        self._write_queue.put((None, None, None, event))
+        self._write_queue.put((None, None, None, event, time.perf_counter()))
         event.wait()
         try:
             self._write_thread.join(timeout=1.0)
@@ -960,9 +1143,11 @@ class ThreadSafeDatabaseManager:
                         len(embedding_array),
                     )
                 )
+                self.embedding_store.upsert(block_index, embedding_array)
 
             if started_transaction:
                 conn.commit()
+            self.query_cache.bump()
 
             verification_cursor = conn.cursor()
             verification_cursor.execute(
@@ -995,6 +1180,36 @@ class ThreadSafeDatabaseManager:
         except Exception as exc:  # pragma: no cover - error already logged upstream
             logger.error(f"Failed to add block via serialized queue: {exc}")
             return None
+
+    def _add_blocks_direct(self, blocks: List[Dict[str, Any]]) -> List[int]:
+        conn = self._get_connection()
+        started_transaction = False
+        try:
+            if not conn.in_transaction:
+                conn.execute("BEGIN TRANSACTION")
+                started_transaction = True
+            embeddings = insert_blocks(conn.cursor(), blocks)
+            if started_transaction:
+                conn.commit()
+        except Exception as exc:
+            if started_transaction and conn.in_transaction:
+                conn.rollback()
+            logger.error(f"Failed to add {len(blocks)} blocks: {exc}")
+            raise
+        self.embedding_store.upsert_many(embeddings)
+        self.query_cache.bump()
+        return [block['block_index'] for block in blocks]
+
+    def add_blocks(self, blocks: List[Dict[str, Any]], connection: Optional[Any] = None) -> List[int]:
+        """Insert many blocks in one transaction on the writer thread (v5.4).
+
+        Raises on failure; the whole batch is rolled back.
+        """
+        if not blocks:
+            return []
+        if threading.current_thread() is getattr(self, "_write_thread", None):
+            return self._add_blocks_direct(blocks)
+        return self.run_serialized(lambda: self._add_blocks_direct(blocks))
     
     def get_last_block_info(self) -> Optional[Dict[str, Any]]:
         """Return metadata for the most recently added block."""
@@ -1057,12 +1272,7 @@ class ThreadSafeDatabaseManager:
         cursor.execute(query, tuple(params))
         block_indices = [row[0] for row in cursor.fetchall()]
 
-        blocks: List[Dict[str, Any]] = []
-        for block_index in block_indices:
-            block = self.get_block(block_index)
-            if block:
-                blocks.append(block)
-        return blocks
+        return self.get_blocks_by_indices(block_indices)
 
     # ------------------------------------------------------------------
     # Short-term memory helpers (avoid legacy fallback)
@@ -1216,6 +1426,19 @@ class ThreadSafeDatabaseManager:
 
         return block
 
+    def get_blocks_by_indices(
+        self,
+        indices: List[int],
+        fields: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Fetch many blocks with a fixed number of ``IN (...)`` queries.
+
+        Results follow ``indices`` order and skip missing blocks. ``fields``
+        optionally projects ``blocks`` columns and the related ``keywords``,
+        ``tags``, ``metadata`` and ``embedding`` fields (None = full block).
+        """
+        return fetch_blocks(self._get_connection().cursor(), indices, fields)
+
     def get_block_by_index(self, block_index: int) -> Optional[Dict[str, Any]]:
         return self.get_block(block_index)
 
@@ -0,0 +1,338 @@
+"""Persistent second-tier embedding cache (v5.4).
+
+``LRUEmbeddingCache`` only lives as long as the process, so every restart of
+the CLI, MCP server or worker re-embeds texts it has already seen (duplicate
+detection, knowledge-update checks, InsightJudge similarity, re-imports).
+This module keeps those vectors in a small SQLite file next to the other
+per-data-dir stores:
+
+- rows are keyed by (model name, query prefix, SHA-1 of the text) and hold
+  the final (padded, L2-normalized) vector as a float32 blob
+- WAL mode, so the CLI, MCP server and worker share one file safely
+- ``GREEUM_EMBED_CACHE_MAX_ENTRIES`` (default 50000, ~150MB at 768 dims)
+  caps the table; the least recently used rows are evicted in batches
+- ``get_many`` / ``put_many`` serve ``batch_encode`` in one statement and
+  one transaction per chunk
+- reads never write: hits are queued and their ``last_used`` is updated in
+  one batch every ``_TOUCH_BATCH`` hits or ``_TOUCH_INTERVAL`` seconds (and
+  before a trim or close), so lookups do not take the file's write lock
+
+Location: ``GREEUM_EMBED_CACHE_DB``, else ``$GREEUM_DATA_DIR/embedding_cache.db``,
+else ``~/.greeum/embedding_cache.db``. ``GREEUM_EMBED_CACHE=0`` disables it.
+A busy/locked database (another process writing) skips that one operation;
+any other SQLite error disables the cache for the process instead of
+failing the encode call.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 50000
+_CHUNK = 500  # SQLite 바인딩 변수 한도(999) 아래로 유지
+# Queued last_used updates are written after this many hits or seconds
+_TOUCH_BATCH = 256
+_TOUCH_INTERVAL = 60.0
+
+
+def _default_cache_path() -> Path:
+    base = os.environ.get("GREEUM_EMBED_CACHE_DB")
+    if base:
+        return Path(base).expanduser()
+
+    data_dir = os.environ.get("GREEUM_DATA_DIR")
+    if data_dir:
+        return Path(data_dir).expanduser() / "embedding_cache.db"
+
+    return Path.home() / ".greeum" / "embedding_cache.db"
+
+
+def persistent_cache_enabled() -> bool:
+    value = os.getenv("GREEUM_EMBED_CACHE", "1")
+    return value.lower() not in {"0", "false", "no", "off"}
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha1(text.encode("utf-8", "surrogatepass")).digest()
+
+
+def _is_busy(exc: Exception) -> bool:
+    """SQLITE_BUSY / SQLITE_LOCKED: another connection holds the lock."""
+    code = getattr(exc, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+class PersistentEmbeddingCache:
+    """SQLite table of float32 embedding blobs shared through the data directory."""
+
+    def __init__(self, path: Optional[Path] = None, max_entries: Optional[int] = None):
+        if path is None:
+            path = _default_cache_path()
+        if max_entries is None:
+            try:
+                max_entries = int(os.getenv("GREEUM_EMBED_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+            except ValueError:
+                max_entries = DEFAULT_MAX_ENTRIES
+        self.path = Path(path)
+        self.max_entries = max(1, max_entries)
+        # 매 put마다 COUNT(*)를 하지 않도록 일정 쓰기마다 용량 검사
+        self._trim_every = max(1, min(256, self.max_entries // 10))
+        self._writes_since_trim = 0
+        # (model, prefix, text_hash) -> last hit time, not yet written
+        self._pending_touches: Dict[Tuple[str, str, bytes], float] = {}
+        self._last_touch_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0, "busy": 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        timeout = float(os.getenv("GREEUM_SQLITE_TIMEOUT", "3"))
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            str(self.path), timeout=timeout, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model TEXT NOT NULL,
+                prefix TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, prefix, text_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used ON embedding_cache(last_used)"
+        )
+        self._conn.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def _handle_error(self, exc: sqlite3.Error) -> None:
+        """Skip the operation on a busy database; disable the cache otherwise."""
+        if not _is_busy(exc):
+            self._disable(exc)
+            return
+        self.stats["busy"] += 1
+        logger.debug("Persistent embedding cache busy (%s): %s", self.path, exc)
+        try:
+            if self._conn is not None and self._conn.in_transaction:
+                self._conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _disable(self, exc: Exception) -> None:
+        self.stats["errors"] += 1
+        logger.warning("Persistent embedding cache disabled (%s): %s", self.path, exc)
+        try:
+            if self._conn is not None:
+                self._conn.close()
+        except sqlite3.Error:
+            pass
+        self._conn = None
+
+    def get(self, model: str, prefix: str, text: str) -> Optional[np.ndarray]:
+        return self.get_many(model, prefix, [text])[0]
+
+    def get_many(self, model: str, prefix: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Vectors for ``texts`` in input order; ``None`` where not cached."""
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        if not texts:
+            return results
+        positions: Dict[bytes, List[int]] = {}
+        for i, text in enumerate(texts):
+            positions.setdefault(text_hash(text), []).append(i)
+
+        with self._lock:
+            if self._conn is None:
+                return results
+            try:
+                found: List[bytes] = []
+                hashes = list(positions)
+                for start in range(0, len(hashes), _CHUNK):
+                    chunk = hashes[start : start + _CHUNK]
+                    rows = self._conn.execute(
+                        "SELECT text_hash, dim, vector FROM embedding_cache "
+                        f"WHERE model = ? AND prefix = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                        (model, prefix, *chunk),
+                    ).fetchall()
+                    for digest, dim, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        if vector.shape[0] != dim:
+                            continue
+                        found.append(digest)
+                        for i in positions[digest]:
+                            results[i] = vector
+            except sqlite3.Error as exc:
+                self._handle_error(exc)
+                return [None] * len(texts)
+
+            if found:
+                now = time.time()
+                for digest in found:
+                    self._pending_touches[(model, prefix, digest)] = now
+                if (
+                    len(self._pending_touches) >= _TOUCH_BATCH
+                    or time.monotonic() - self._last_touch_flush >= _TOUCH_INTERVAL
+                ):
+                    self._flush_touches_locked()
+
+            hits = sum(1 for vector in results if vector is not None)
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(texts) - hits
+        return results
+
+    def put(self, model: str, prefix: str, text: str, vector) -> None:
+        self.put_many(model, prefix, [(text, vector)])
+
+    def put_many(self, model: str, prefix: str, items: Iterable[Tuple[str, object]]) -> None:
+        now = time.time()
+        rows = []
+        for text, vector in items:
+            array = np.ascontiguousarray(np.asarray(vector, dtype=np.float32).reshape(-1))
+            rows.append((model, prefix, text_hash(text), int(array.shape[0]), array.tobytes(), now))
+        if not rows:
+            return
+
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache "
+                    "(model, prefix, text_hash, dim, vector, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+                self.stats["writes"] += len(rows)
+                self._writes_since_trim += len(rows)
+                if self._writes_since_trim >= self._trim_every:
+                    self._trim_locked()
+            except sqlite3.Error as exc:
+                self._handle_error(exc)
+
+    def _flush_touches_locked(self) -> None:
+        """Write queued ``last_used`` updates in one transaction (kept if busy)."""
+        self._last_touch_flush = time.monotonic()
+        if not self._pending_touches or self._conn is None:
+            return
+        try:
+            self._conn.executemany(
+                "UPDATE embedding_cache SET last_used = MAX(last_used, ?) "
+                "WHERE model = ? AND prefix = ? AND text_hash = ?",
+                [(used, *key) for key, used in self._pending_touches.items()],
+            )
+            self._conn.commit()
+            self._pending_touches.clear()
+        except sqlite3.Error as exc:
+            self._handle_error(exc)
+
+    def flush(self) -> None:
+        """Write queued ``last_used`` updates now."""
+        with self._lock:
+            self._flush_touches_locked()
+
+    def _trim_locked(self) -> None:
+        self._writes_since_trim = 0
+        # Recent hits must count before picking the least recently used rows
+        self._flush_touches_locked()
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embedding_cache WHERE rowid IN "
+            "(SELECT rowid FROM embedding_cache ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self._conn.commit()
+        self.stats["evictions"] += excess
+
+    def trim(self) -> None:
+        """Evict least recently used rows beyond ``max_entries`` now."""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._trim_locked()
+            except sqlite3.Error as exc:
+                self._handle_error(exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            self._pending_touches.clear()
+            try:
+                self._conn.execute("DELETE FROM embedding_cache")
+                self._conn.commit()
+            except sqlite3.Error as exc:
+                self._handle_error(exc)
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._conn is None:
+                return 0
+            try:
+                return int(self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0])
+            except sqlite3.Error:
+                return 0
+
+    def get_stats(self) -> Dict[str, object]:
+        stats: Dict[str, object] = dict(self.stats)
+        lookups = self.stats["hits"] + self.stats["misses"]
+        stats["hit_rate"] = self.stats["hits"] / lookups if lookups else 0.0
+        stats["size"] = len(self)
+        stats["max_entries"] = self.max_entries
+        stats["path"] = str(self.path)
+        stats["enabled"] = self.enabled
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touches_locked()
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+
+_caches: Dict[str, PersistentEmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_persistent_embedding_cache(path: Optional[str] = None) -> Optional[PersistentEmbeddingCache]:
+    """Process-wide cache for ``path`` (default location if omitted); ``None`` if disabled."""
+    if not persistent_cache_enabled():
+        return None
+    resolved = Path(path).expanduser() if path else _default_cache_path()
+    key = str(resolved)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            try:
+                cache = PersistentEmbeddingCache(resolved)
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning("Persistent embedding cache unavailable at %s: %s", resolved, exc)
+                return None
+            _caches[key] = cache
+    return cache
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 import hashlib
 import logging
 import os
@@ -65,6 +66,9 @@ class EmbeddingConfig:
     enable_caching: bool = True
     batch_size: int = 32
     performance_monitoring: bool = True
+    # v5.4: 재시작 후에도 유지되는 2차 캐시 (greeum/embedding_cache.py)
+    persistent_cache: bool = True
+    persistent_cache_path: Optional[str] = None
 
 
 class EmbeddingQuality(Enum):
@@ -120,49 +124,56 @@ class PerformanceMonitor:
 
 
 class LRUEmbeddingCache:
-    """간단한 LRU 캐시 구현 (thread-safe)"""
+    """간단한 LRU 캐시 구현 (thread-safe)
+
+    v5.4: 값은 읽기 전용 float32 배열로 보관 (파이썬 float 리스트 대비 1/6 메모리).
+    """
 
     def __init__(self, max_size: int = 1000) -> None:
         self.max_size = max(0, max_size)
-        self._entries: Dict[str, List[float]] = {}
-        self._order: List[str] = []
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
         self.lock = threading.RLock()
 
-    def get(self, key: str) -> Optional[List[float]]:
+    def get(self, key: str) -> Optional[np.ndarray]:
         if self.max_size == 0:
             return None
         with self.lock:
-            if key not in self._entries:
+            vector = self._entries.get(key)
+            if vector is None:
                 return None
             # 최근 사용 갱신
-            self._order.remove(key)
-            self._order.append(key)
-            return self._entries[key][:]
+            self._entries.move_to_end(key)
+            return vector
 
-    def put(self, key: str, value: List[float]) -> None:
+    def put(self, key: str, value: Union[List[float], np.ndarray]) -> None:
         if self.max_size == 0:
             return
+        vector = np.array(value, dtype=np.float32).reshape(-1)
+        vector.flags.writeable = False
         with self.lock:
-            if key in self._entries:
-                self._order.remove(key)
-            elif len(self._order) >= self.max_size:
-                oldest = self._order.pop(0)
-                self._entries.pop(oldest, None)
-            self._entries[key] = value[:]
-            self._order.append(key)
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
 
     def clear(self) -> None:
         with self.lock:
             self._entries.clear()
-            self._order.clear()
 
     def stats(self) -> Dict[str, int]:
         with self.lock:
             return {
-                "size": len(self._order),
+                "size": len(self._entries),
                 "max_size": self.max_size,
             }
 
+def _as_float32_matrix(vectors: List[List[float]], dimension: int) -> np.ndarray:
+    """벡터 목록을 (N, dim) float32 행렬로 변환 (빈 배치도 2차원 유지)"""
+    if not vectors:
+        return np.zeros((0, dimension), dtype=np.float32)
+    return np.asarray(vectors, dtype=np.float32)
+
+
 class EmbeddingModel(ABC):
     """임베딩 모델 추상 클래스"""
     
@@ -199,17 +210,19 @@ class EmbeddingModel(ABC):
         """
         pass
     
-    def batch_encode(self, texts: List[str]) -> List[List[float]]:
+    def batch_encode(self, texts: List[str], as_numpy: bool = False) -> Union[List[List[float]], np.ndarray]:
         """
         텍스트 배치를 벡터로 인코딩
         
         Args:
             texts: 인코딩할 텍스트 목록
+            as_numpy: True면 (N, dim) float32 ndarray로 반환
             
         Returns:
             임베딩 벡터 목록
         """
-        return [self.encode(text) for text in texts]
+        vectors = [self.encode(text) for text in texts]
+        return _as_float32_matrix(vectors, self.get_dimension()) if as_numpy else vectors
     
     def similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
@@ -273,7 +286,7 @@ class SimpleEmbeddingModel(EmbeddingModel):
             if cached is not None:
                 self._monitor.record_cache(True)
                 self._monitor.record_encoding(time.perf_counter() - start)
-                return cached
+                return cached.tolist()
         self._monitor.record_cache(False)
         vector = self._encode_without_cache(text)
         if self._cache:
@@ -281,7 +294,7 @@ class SimpleEmbeddingModel(EmbeddingModel):
         self._monitor.record_encoding(time.perf_counter() - start)
         return vector
 
-    def batch_encode(self, texts: List[str]) -> List[List[float]]:
+    def batch_encode(self, texts: List[str], as_numpy: bool = False) -> Union[List[List[float]], np.ndarray]:
         embeddings: List[List[float]] = []
         batch_start = 0
         batch_size = max(1, self.config.batch_size)
@@ -290,7 +303,7 @@ class SimpleEmbeddingModel(EmbeddingModel):
             for text in batch:
                 embeddings.append(self.encode(text))
             batch_start += batch_size
-        return embeddings
+        return _as_float32_matrix(embeddings, self.dimension) if as_numpy else embeddings
 
     def clear_cache(self) -> None:
         if self._cache:
@@ -340,6 +353,9 @@ def _determine_query_prefix(model_name: str) -> str:
     return ''
 
 
+_DISK_CACHE_UNSET = object()
+
+
 class SentenceTransformerModel(EmbeddingModel):
     """Sentence-Transformers 기반 의미적 임베딩 모델 (Lazy Loading)"""
 
@@ -361,6 +377,7 @@ class SentenceTransformerModel(EmbeddingModel):
         self.query_prefix = _determine_query_prefix(model_name)
         self.config = config or EmbeddingConfig()
         self._cache = LRUEmbeddingCache(self.config.cache_size) if self.config.enable_caching else None
+        self._disk_cache = _DISK_CACHE_UNSET
         self._monitor = PerformanceMonitor(self.config.performance_monitoring)
         logger.debug(
             "SentenceTransformerModel initialized with lazy loading for: %s (query_prefix=%r)",
@@ -430,6 +447,16 @@ class SentenceTransformerModel(EmbeddingModel):
 
             logger.info("Model ready: %s (dim: %s)", self.model_name, self._dimension)
 
+    def _persistent_cache(self):
+        """2차 디스크 캐시 (v5.4). 데이터 디렉토리가 정해진 뒤인 첫 인코딩 시점에 연다."""
+        if self._disk_cache is _DISK_CACHE_UNSET:
+            self._disk_cache = None
+            if self.config.enable_caching and self.config.persistent_cache:
+                from .embedding_cache import get_persistent_embedding_cache
+
+                self._disk_cache = get_persistent_embedding_cache(self.config.persistent_cache_path)
+        return self._disk_cache
+
     @property
     def dimension(self):
         """차원 정보 (lazy loading)"""
@@ -464,7 +491,17 @@ class SentenceTransformerModel(EmbeddingModel):
             if cached is not None:
                 self._monitor.record_cache(True)
                 self._monitor.record_encoding(time.perf_counter() - start)
-                return cached
+                return cached.tolist()
+
+        disk = self._persistent_cache()
+        if disk is not None:
+            stored = disk.get(self.model_name, self.query_prefix, text)
+            if stored is not None:
+                if self._cache:
+                    self._cache.put(cache_key, stored)
+                self._monitor.record_cache(True)
+                self._monitor.record_encoding(time.perf_counter() - start)
+                return stored.tolist()
 
         self._monitor.record_cache(False)
 
@@ -482,27 +519,108 @@ class SentenceTransformerModel(EmbeddingModel):
         norm = np.linalg.norm(embedding)
         if norm > 0:
             embedding = embedding / norm
-        embedding_list = embedding.tolist()
+        # 캐시 적중과 같은 값이 되도록 float32로 반올림해 반환
+        vector = embedding.astype(np.float32)
 
         if self._cache:
-            self._cache.put(cache_key, embedding_list)
+            self._cache.put(cache_key, vector)
+        if disk is not None:
+            disk.put(self.model_name, self.query_prefix, text, vector)
         self._monitor.record_encoding(time.perf_counter() - start)
-        return embedding_list
+        return vector.tolist()
 
-    def batch_encode(self, texts: List[str]) -> List[List[float]]:
-        """배치 인코딩은 encode를 반복 호출하여 캐시/통계와 일관성을 유지한다."""
+    def batch_encode(self, texts: List[str], as_numpy: bool = False) -> Union[List[List[float]], np.ndarray]:
+        """
+        캐시 미스만 모아 한 번의 배치 forward pass로 인코딩 (v5.4)
 
-        embeddings: List[List[float]] = []
-        batch_start = 0
-        batch_size = max(1, self.config.batch_size)
+        Args:
+            texts: 인코딩할 텍스트 목록
+            as_numpy: True면 리스트 변환 없이 (N, 768) float32 ndarray 반환
 
-        while batch_start < len(texts):
-            batch = texts[batch_start : batch_start + batch_size]
-            for text in batch:
-                embeddings.append(self.encode(text))
-            batch_start += batch_size
+        Returns:
+            encode()와 같은 값의 임베딩 목록 (입력 순서 유지)
+        """
+        if not texts:
+            return _as_float32_matrix([], self.target_dimension) if as_numpy else []
+
+        input_texts = [(self.query_prefix + t) if self.query_prefix else t for t in texts]
+        cached: Dict[int, np.ndarray] = {}
+        pending: List[int] = []
+        for i, key in enumerate(input_texts):
+            if self._cache:
+                hit = self._cache.get(key)
+                if hit is not None:
+                    cached[i] = hit
+                    self._monitor.record_cache(True)
+                    continue
+            pending.append(i)
+
+        # L1 미스는 디스크 캐시에서 한 번에 조회
+        disk = self._persistent_cache()
+        if disk is not None and pending:
+            stored = disk.get_many(self.model_name, self.query_prefix, [texts[i] for i in pending])
+            remaining = []
+            for i, vector in zip(pending, stored):
+                if vector is None:
+                    remaining.append(i)
+                    continue
+                cached[i] = vector
+                self._monitor.record_cache(True)
+                if self._cache:
+                    self._cache.put(input_texts[i], vector)
+            pending = remaining
+
+        miss_positions: Dict[str, List[int]] = {}  # 중복 텍스트는 한 번만 인코딩
+        for i in pending:
+            self._monitor.record_cache(False)
+            miss_positions.setdefault(input_texts[i], []).append(i)
 
-        return embeddings
+        encoded = np.zeros((0, self.target_dimension), dtype=np.float32)
+        miss_texts = list(miss_positions)
+        if miss_texts:
+            start = time.perf_counter()
+            self._ensure_model_loaded()
+            raw = np.asarray(
+                self.model.encode(
+                    miss_texts,
+                    batch_size=max(1, self.config.batch_size),
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                ),
+                dtype=float,
+            ).reshape(len(miss_texts), -1)
+
+            # 패딩/절단과 L2 정규화를 행렬 단위로 처리
+            width = min(raw.shape[1], self.target_dimension)
+            padded = np.zeros((len(miss_texts), self.target_dimension), dtype=float)
+            padded[:, :width] = raw[:, :width]
+            norms = np.linalg.norm(padded, axis=1, keepdims=True)
+            np.divide(padded, norms, out=padded, where=norms > 0)
+            encoded = padded.astype(np.float32)
+
+            if self._cache:
+                for key, vector in zip(miss_texts, encoded):
+                    self._cache.put(key, vector)
+            if disk is not None:
+                disk.put_many(
+                    self.model_name,
+                    self.query_prefix,
+                    [(texts[miss_positions[key][0]], vector) for key, vector in zip(miss_texts, encoded)],
+                )
+            elapsed = time.perf_counter() - start
+            for _ in miss_texts:
+                self._monitor.record_encoding(elapsed / len(miss_texts))
+
+        row_of = {key: row for row, key in enumerate(miss_texts)}
+        if as_numpy:
+            out = np.empty((len(texts), self.target_dimension), dtype=np.float32)
+            for i, key in enumerate(input_texts):
+                out[i] = cached[i] if i in cached else encoded[row_of[key]]
+            return out
+
+        encoded_lists = encoded.tolist()
+        return [cached[i].tolist() if i in cached else list(encoded_lists[row_of[key]])
+                for i, key in enumerate(input_texts)]
 
     def clear_cache(self) -> None:
         if self._cache:
@@ -512,6 +630,8 @@ class SentenceTransformerModel(EmbeddingModel):
         stats = self._monitor.as_dict()
         if self._cache:
             stats["cache"] = self._cache.stats()
+        if self._disk_cache is not None and self._disk_cache is not _DISK_CACHE_UNSET:
+            stats["disk_cache"] = self._disk_cache.get_stats()
         stats["dimension"] = self.target_dimension
         stats["model"] = self.get_model_name()
         return stats
@@ -634,7 +754,7 @@ class Model2VecEmbedding(EmbeddingModel):
             if cached is not None:
                 self._monitor.record_cache(True)
                 self._monitor.record_encoding(time.perf_counter() - start)
-                return cached
+                return cached.tolist()
         self._monitor.record_cache(False)
 
         self._ensure_model_loaded()
@@ -643,16 +763,16 @@ class Model2VecEmbedding(EmbeddingModel):
         norm = np.linalg.norm(vec)
         if norm > 0:
             vec = vec / norm
-        out = vec.tolist()
+        vec = vec.astype(np.float32)
 
         if self._cache:
-            self._cache.put(text, out)
+            self._cache.put(text, vec)
         self._monitor.record_encoding(time.perf_counter() - start)
-        return out
+        return vec.tolist()
 
-    def batch_encode(self, texts: List[str]) -> List[List[float]]:
+    def batch_encode(self, texts: List[str], as_numpy: bool = False) -> Union[List[List[float]], np.ndarray]:
         if not texts:
-            return []
+            return _as_float32_matrix([], self.target_dimension) if as_numpy else []
         # Use cache first for any cached items
         results: List[Optional[List[float]]] = [None] * len(texts)
         to_encode_idx: List[int] = []
@@ -661,7 +781,7 @@ class Model2VecEmbedding(EmbeddingModel):
             if self._cache:
                 cached = self._cache.get(t)
                 if cached is not None:
-                    results[i] = cached
+                    results[i] = cached.tolist()
                     self._monitor.record_cache(True)
                     continue
             self._monitor.record_cache(False)
@@ -677,13 +797,14 @@ class Model2VecEmbedding(EmbeddingModel):
                 norm = np.linalg.norm(vec)
                 if norm > 0:
                     vec = vec / norm
-                out = vec.tolist()
-                results[idx] = out
+                vec = vec.astype(np.float32)
+                results[idx] = vec.tolist()
                 if self._cache:
-                    self._cache.put(texts[idx], out)
+                    self._cache.put(texts[idx], vec)
             self._monitor.record_encoding((time.perf_counter() - start) / max(1, len(to_encode_texts)))
 
-        return [r for r in results if r is not None]  # all should be filled
+        vectors = [r for r in results if r is not None]  # all should be filled
+        return _as_float32_matrix(vectors, self.target_dimension) if as_numpy else vectors
 
     def get_dimension(self) -> int:
         return self.target_dimension
@@ -821,6 +942,22 @@ class EmbeddingRegistry:
         model = self.get_model(model_name)
         return model.encode(text)
 
+    def batch_encode(self, texts: List[str], model_name: Optional[str] = None,
+                     as_numpy: bool = False):
+        """
+        지정한 모델로 여러 텍스트를 한 번에 인코딩 (v5.4)
+
+        Args:
+            texts: 인코딩할 텍스트 목록
+            model_name: 사용할 모델 이름 (없으면 기본 모델)
+            as_numpy: True면 (len(texts), dim) float32 행렬 반환
+
+        Returns:
+            임베딩 벡터 목록 또는 행렬
+        """
+        model = self.get_model(model_name)
+        return model.batch_encode(texts, as_numpy=as_numpy)
+
     def clear_caches(self) -> None:
         for model in self.models.values():
             if hasattr(model, "clear_cache"):
@@ -850,6 +987,19 @@ def get_embedding(text: str, model_name: Optional[str] = None) -> List[float]:
     """
     return embedding_registry.encode(text, model_name)
 
+def get_embeddings(texts: List[str], model_name: Optional[str] = None) -> List[List[float]]:
+    """
+    여러 텍스트의 임베딩 벡터를 한 번의 배치 인코딩으로 반환 (v5.4)
+
+    Args:
+        texts: 인코딩할 텍스트 목록
+        model_name: 사용할 모델 이름 (없으면 기본 모델)
+
+    Returns:
+        텍스트 순서대로의 임베딩 벡터 목록
+    """
+    return embedding_registry.batch_encode(texts, model_name)
+
 def register_embedding_model(name: str, model: EmbeddingModel, set_as_default: bool = False) -> None:
     """
     임베딩 모델 등록
@@ -0,0 +1,143 @@
+"""
+Read-only CSR view of a version-2 graph snapshot.
+
+``GraphCSR`` wraps the memory-mapped arrays of a snapshot file:
+
+- ``ids``: sorted, fixed-width UTF-8 node ids (the string table)
+- ``row_mask``: 1 for ids that are adjacency keys, 0 for target-only ids
+- ``indptr`` / ``indices`` / ``weights``: outgoing edges per id, each row
+  already sorted by weight descending
+
+Node lookups are a binary search over ``ids``; nothing is decoded until a row
+is requested. ``CSRAdjacency`` exposes the snapshot as the mutable
+``GraphIndex.adj`` mapping: rows are materialized into an overlay dict on
+first access and writes only ever touch the overlay.
+"""
+
+from __future__ import annotations
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+Row = List[Tuple[str, float]]
+
+
+class GraphCSR:
+    """Memory-mapped adjacency arrays of one snapshot file."""
+
+    def __init__(self, header: Dict[str, Any], ids: np.ndarray, row_mask: np.ndarray,
+                 indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray):
+        self.header = header
+        self.ids = ids
+        self.row_mask = row_mask
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.id_width = ids.dtype.itemsize
+
+    @property
+    def key_count(self) -> int:
+        return int(self.header["key_count"])
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.header["edge_count"])
+
+    def position(self, node_id: str) -> int:
+        """Index of ``node_id`` in the string table, or -1."""
+        key = node_id.encode("utf-8")
+        if len(self.ids) == 0 or len(key) > self.id_width:
+            return -1
+        pos = int(np.searchsorted(self.ids, key))
+        if pos < len(self.ids) and self.ids[pos] == key:
+            return pos
+        return -1
+
+    def has_row(self, node_id: str) -> bool:
+        pos = self.position(node_id)
+        return pos >= 0 and bool(self.row_mask[pos])
+
+    def row(self, node_id: str) -> Optional[Row]:
+        pos = self.position(node_id)
+        if pos < 0 or not self.row_mask[pos]:
+            return None
+        start, end = int(self.indptr[pos]), int(self.indptr[pos + 1])
+        targets = self.ids[self.indices[start:end]].tolist()
+        return [
+            (target.decode("utf-8"), weight)
+            for target, weight in zip(targets, self.weights[start:end].tolist())
+        ]
+
+    def keys(self) -> Iterator[str]:
+        for pos in np.flatnonzero(self.row_mask).tolist():
+            yield self.ids[pos].decode("utf-8")
+
+    def sources_of(self, node_id: str) -> List[str]:
+        """Ids with an edge to ``node_id`` (one vectorized pass over ``indices``)."""
+        pos = self.position(node_id)
+        if pos < 0:
+            return []
+        edge_positions = np.flatnonzero(self.indices == pos)
+        rows = np.searchsorted(self.indptr, edge_positions, side="right") - 1
+        return [self.ids[row].decode("utf-8") for row in np.unique(rows).tolist()]
+
+
+class CSRAdjacency(MutableMapping):
+    """``node_id -> [(neighbor, weight), ...]`` over a ``GraphCSR`` base.
+
+    Rows read from the base are cached in the overlay, so callers may mutate
+    the returned lists just like rows of a plain dict.
+    """
+
+    def __init__(self, base: GraphCSR):
+        self.base = base
+        self._rows: Dict[str, Row] = {}
+        self._hidden: Set[str] = set()  # base keys overridden or deleted
+
+    def __getitem__(self, node_id: str) -> Row:
+        row = self._rows.get(node_id)
+        if row is not None:
+            return row
+        if node_id in self._hidden:
+            raise KeyError(node_id)
+        row = self.base.row(node_id)
+        if row is None:
+            raise KeyError(node_id)
+        self._rows[node_id] = row
+        self._hidden.add(node_id)
+        return row
+
+    def __setitem__(self, node_id: str, row: Row) -> None:
+        if node_id not in self._rows and self.base.has_row(node_id):
+            self._hidden.add(node_id)
+        self._rows[node_id] = row
+
+    def __delitem__(self, node_id: str) -> None:
+        if node_id in self._rows:
+            del self._rows[node_id]
+        elif node_id in self._hidden or not self.base.has_row(node_id):
+            raise KeyError(node_id)
+        else:
+            self._hidden.add(node_id)
+
+    def __contains__(self, node_id: object) -> bool:
+        if node_id in self._rows:
+            return True
+        if not isinstance(node_id, str) or node_id in self._hidden:
+            return False
+        return self.base.has_row(node_id)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._rows)
+        for node_id in self.base.keys():
+            if node_id not in self._hidden:
+                yield node_id
+
+    def __len__(self) -> int:
+        return self.base.key_count - len(self._hidden) + len(self._rows)
+
+    def clear(self) -> None:
+        self._rows.clear()
+        self._hidden = set(self.base.keys())
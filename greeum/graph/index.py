@@ -6,12 +6,23 @@ for anchor-based localized memory exploration.
 """
 
 import heapq
-from typing import Dict, List, Tuple, Set, Callable, Optional
+import logging
+import os
+from typing import Dict, List, Tuple, Set, Callable, Optional, MutableMapping
 from pathlib import Path
 
-from .snapshot import save_graph_snapshot, load_graph_snapshot
+from .csr import CSRAdjacency
+from .snapshot import (
+    save_graph_snapshot,
+    load_graph_snapshot,
+    open_graph_snapshot,
+    append_graph_delta,
+    read_graph_delta,
+)
 from ..core.metrics import update_edge_count
 
+logger = logging.getLogger(__name__)
+
 
 class GraphIndex:
     """
@@ -19,6 +30,10 @@ class GraphIndex:
     
     Optimized for small-to-medium graphs with fast neighbor lookups
     and bounded traversal for memory exploration.
+
+    v5.4: version-2 snapshots are memory-mapped on load (rows are decoded on
+    first access) and ``save_snapshot`` appends changed rows to the delta log
+    until ``GREEUM_GRAPH_DELTA_COMPACT`` rows (default 1024) accumulate.
     """
     
     def __init__(self, theta: float = 0.35, kmax: int = 32):
@@ -31,8 +46,15 @@ class GraphIndex:
         """
         self.theta = theta
         self.kmax = kmax
-        self.adj: Dict[str, List[Tuple[str, float]]] = {}
+        self.adj: MutableMapping[str, List[Tuple[str, float]]] = {}
         self._edge_count = 0
+        # Reverse edges written since load (edges of a mapped base are looked up there)
+        self._incoming: Dict[str, Set[str]] = {}
+        # Rows changed since the last save, and the snapshot their delta log belongs to
+        self._dirty: Set[str] = set()
+        self._snapshot_path: Optional[Path] = None
+        self._delta_rows = 0
+        self.compact_threshold = int(os.getenv("GREEUM_GRAPH_DELTA_COMPACT", "1024"))
     
     def neighbors(self, u: str, k: Optional[int] = None, min_w: Optional[float] = None) -> List[Tuple[str, float]]:
         """
@@ -112,11 +134,8 @@ class GraphIndex:
         
         Merges with existing neighbors and prunes by theta/kmax constraints.
         """
-        if u not in self.adj:
-            self.adj[u] = []
-        
         # Merge new neighbors with existing ones
-        existing_dict = {v: w for v, w in self.adj[u]}
+        existing_dict = {v: w for v, w in self.adj.get(u, [])}
         
         for v, weight in neighs:
             # Update weight (take maximum for multiple edges)
@@ -133,27 +152,46 @@ class GraphIndex:
         
         # Sort by weight descending and apply kmax limit
         merged_neighbors.sort(key=lambda x: -x[1])
-        self.adj[u] = merged_neighbors[:self.kmax]
+        self._set_row(u, merged_neighbors[:self.kmax])
         
-        # Update edge count estimate
-        self._edge_count = sum(len(neighbors) for neighbors in self.adj.values())
         update_edge_count(self._edge_count)  # Record for metrics
+
+    def set_neighbors(self, u: str, neighs: List[Tuple[str, float]]) -> None:
+        """
+        Replace the neighbors of node u (no theta pruning).
+
+        Duplicate neighbors keep their first weight; the row is sorted by
+        weight descending and limited to kmax.
+        """
+        seen: Set[str] = set()
+        row = []
+        for v, w in neighs:
+            if v not in seen:
+                seen.add(v)
+                row.append((v, w))
+        row.sort(key=lambda x: -x[1])
+        self._set_row(u, row[:self.kmax])
     
     def add_node(self, node_id: str) -> None:
         """Add node to graph (creates empty adjacency list if not exists)."""
         if node_id not in self.adj:
-            self.adj[node_id] = []
+            self._set_row(node_id, [])
     
     def remove_node(self, node_id: str) -> None:
         """Remove node and all edges involving it."""
         if node_id in self.adj:
-            del self.adj[node_id]
-        
-        # Remove incoming edges
-        for u in list(self.adj.keys()):
-            self.adj[u] = [(v, w) for v, w in self.adj[u] if v != node_id]
+            self._drop_row(node_id)
+            self._dirty.add(node_id)
         
-        self._update_edge_count()
+        # Remove incoming edges (only rows that point at the node)
+        for u in self._sources_of(node_id):
+            row = self.adj.get(u)
+            if row is None:
+                continue
+            kept = [(v, w) for v, w in row if v != node_id]
+            if len(kept) != len(row):
+                self._set_row(u, kept)
+        self._incoming.pop(node_id, None)
     
     def get_stats(self) -> Dict[str, int]:
         """Get graph statistics."""
@@ -163,31 +201,135 @@ class GraphIndex:
             "avg_degree": self._edge_count / len(self.adj) if self.adj else 0
         }
     
+    def _set_row(self, u: str, row: List[Tuple[str, float]], track: bool = True) -> None:
+        """Replace a row, keeping the edge count and reverse edges in step."""
+        old = self.adj.get(u)
+        if old:
+            for v, _ in old:
+                sources = self._incoming.get(v)
+                if sources:
+                    sources.discard(u)
+        for v, _ in row:
+            self._incoming.setdefault(v, set()).add(u)
+
+        self.adj[u] = row
+        self._edge_count += len(row) - (len(old) if old else 0)
+        if track:
+            self._dirty.add(u)
+
+    def _drop_row(self, u: str) -> None:
+        row = self.adj.get(u)
+        if row is None:
+            return
+        for v, _ in row:
+            sources = self._incoming.get(v)
+            if sources:
+                sources.discard(u)
+        del self.adj[u]
+        self._edge_count -= len(row)
+
+    def _sources_of(self, v: str) -> Set[str]:
+        sources = set(self._incoming.get(v, ()))
+        if isinstance(self.adj, CSRAdjacency):
+            sources.update(self.adj.base.sources_of(v))
+        return sources
+
+    def _reset(self, adjacency: Optional[Dict[str, List[Tuple[str, float]]]] = None) -> None:
+        """Replace all state with a plain adjacency dict."""
+        self.adj = adjacency if adjacency is not None else {}
+        self._incoming = {}
+        for u, row in self.adj.items():
+            for v, _ in row:
+                self._incoming.setdefault(v, set()).add(u)
+        self._update_edge_count()
+        self._dirty = set()
+
     def _update_edge_count(self) -> None:
         """Recalculate edge count after modifications."""
         self._edge_count = sum(len(neighbors) for neighbors in self.adj.values())
     
-    def save_snapshot(self, store_path: Path) -> None:
-        """Save current graph state to snapshot file."""
-        params = {
+    def _params(self) -> Dict[str, float]:
+        return {
             "theta": self.theta,
             "kmax": self.kmax,
             "alpha": 0.7,  # Default bootstrap params
             "beta": 0.2,
             "gamma": 0.1
         }
-        save_graph_snapshot(self.adj, params, store_path)
+
+    @property
+    def needs_compaction(self) -> bool:
+        """The delta log has grown past ``compact_threshold`` rows."""
+        return self._delta_rows > self.compact_threshold
+
+    def save_snapshot(self, store_path: Path, compact: bool = False, delta_only: bool = False) -> None:
+        """
+        Save current graph state to snapshot file.
+
+        If the file is the snapshot this index was loaded from (or last saved
+        to), only rows changed since then are appended to its delta log; a
+        full version-2 snapshot is written otherwise, when the log grows past
+        ``compact_threshold`` rows, or when ``compact`` is set.
+
+        With ``delta_only`` the full write is never done: the rows are
+        appended regardless of the log size (see ``needs_compaction``), and
+        nothing is written if the file is not this index's snapshot.
+        """
+        path = Path(store_path)
+        appendable = self._snapshot_path == path and path.exists()
+        if delta_only and not appendable:
+            return
+        if (
+            not compact
+            and appendable
+            and (delta_only or self._delta_rows + len(self._dirty) <= self.compact_threshold)
+        ):
+            changes = [(u, self.adj.get(u)) for u in sorted(self._dirty)]
+            self._delta_rows += append_graph_delta(path, changes)
+            self._dirty.clear()
+            return
+
+        # Materialize rows first so a mapped base file can be replaced
+        adjacency = {u: list(row) for u, row in self.adj.items()}
+        self._reset(adjacency)
+        save_graph_snapshot(adjacency, self._params(), path)
+        self._snapshot_path = path
+        self._delta_rows = 0
     
     def load_snapshot(self, store_path) -> bool:
         """Load graph state from snapshot file. Returns True if successful."""
-        adj = load_graph_snapshot(store_path)
-        if adj is not None:
-            self.adj = adj
-            self._update_edge_count()
+        path = Path(store_path)
+        try:
+            base = open_graph_snapshot(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to open graph snapshot {path}: {e}")
+            return False
+
+        if base is None:
+            # Version 1 JSON: loaded eagerly, migrated to version 2 on next save
+            adj = load_graph_snapshot(path)
+            if adj is None:
+                return False
+            self._reset(adj)
+            self._snapshot_path = None
+            self._delta_rows = 0
             return True
-        return False
+
+        self._reset(None)
+        self.adj = CSRAdjacency(base)
+        self._edge_count = base.edge_count
+        changes = read_graph_delta(path)
+        for u, row in changes:
+            if row is None:
+                self._drop_row(u)
+            else:
+                self._set_row(u, row, track=False)
+        self._snapshot_path = path
+        self._delta_rows = len(changes)
+        return True
     
     def clear(self) -> None:
         """Clear all nodes and edges."""
-        self.adj.clear()
-        self._edge_count = 0
\ No newline at end of file
+        self._reset(None)
+        self._edge_count = 0
+        self._snapshot_path = None
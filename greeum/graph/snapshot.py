@@ -1,15 +1,44 @@
 """
 Graph snapshot I/O for persistent graph index storage.
+
+Version 2 (default) is a single binary file::
+
+    magic (8 bytes) | header length (uint64 LE) | JSON header | arrays
+
+The arrays (sorted string table, row mask, CSR ``indptr`` / ``indices`` /
+``weights``) start on 64-byte boundaries and are described in the header, so
+``open_graph_snapshot`` maps them with ``np.memmap`` without parsing any edge.
+Rows changed after the snapshot was written go to an append-only delta log
+next to it (``<snapshot>.delta``, one JSON object per line) and are folded
+back in by the next full save. Each full save stamps a fresh ``snapshot_id``
+in the header and every delta line carries the id it was written against, so
+a delta left behind by a crash between replacing the snapshot and removing
+the log is ignored instead of replayed over the newer snapshot.
+
+Version 1 (JSON edge list) is still readable for migration.
 """
 
 import json
+import os
+import struct
+import uuid
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, TypedDict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, TypedDict
 from datetime import datetime
 
+import numpy as np
+
+from .csr import GraphCSR
+
+_MAGIC = b"GRMGRPH2"
+_ALIGN = 64
+_ARRAY_NAMES = ("ids", "row_mask", "indptr", "indices", "weights")
+
+Row = List[Tuple[str, float]]
+
 
 class GraphSnapshot(TypedDict):
-    """Graph index snapshot format."""
+    """Graph index snapshot format (version 1)."""
     version: int
     nodes: List[str]
     edges: List[Dict[str, any]]  # [{"u": "blk_a", "v": "blk_b", "w": 0.62, "src": ["sim", "time"]}]
@@ -17,14 +46,45 @@ class GraphSnapshot(TypedDict):
     params: Dict[str, float]  # {"theta": 0.35, "kmax": 32, "alpha": 0.7, "beta": 0.2, "gamma": 0.1}
 
 
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def delta_path(store_path) -> Path:
+    """Delta log that belongs to a version-2 snapshot."""
+    path = Path(store_path)
+    return path.with_name(path.name + ".delta")
+
+
 def save_graph_snapshot(
-    adjacency: Dict[str, List[Tuple[str, float]]],
+    adjacency: Mapping[str, List[Tuple[str, float]]],
     params: Dict[str, float],
-    store_path: Path
+    store_path: Path,
+    version: int = 2
 ) -> None:
-    """Save graph adjacency to JSONL snapshot."""
+    """Save graph adjacency as a full snapshot (discards any delta log).
+
+    The delta is removed only after the new file is in place; until then its
+    lines still belong to the old snapshot, and afterwards their
+    ``snapshot_id`` no longer matches.
+    """
+    store_path = Path(store_path)
     store_path.parent.mkdir(parents=True, exist_ok=True)
     
+    if version == 1:
+        _save_json_snapshot(adjacency, params, store_path)
+    elif version == 2:
+        _save_binary_snapshot(adjacency, params, store_path)
+    else:
+        raise ValueError(f"Unsupported graph snapshot version: {version}")
+
+    try:
+        os.remove(delta_path(store_path))
+    except FileNotFoundError:
+        pass
+
+
+def _save_json_snapshot(adjacency, params, store_path: Path) -> None:
     # Extract all nodes
     nodes = set(adjacency.keys())
     for neighbors in adjacency.values():
@@ -50,19 +110,175 @@ def save_graph_snapshot(
         "params": params
     }
     
-    # Save as JSONL for potential streaming processing
     with open(store_path, 'w', encoding='utf-8') as f:
         json.dump(snapshot, f, indent=2, ensure_ascii=False)
 
 
+def _save_binary_snapshot(adjacency, params, store_path: Path) -> None:
+    # Rows are stored sorted by weight so loading never re-sorts
+    rows = {u: sorted(neighbors, key=lambda x: -x[1]) for u, neighbors in adjacency.items()}
+
+    nodes = set(rows)
+    for neighbors in rows.values():
+        nodes.update(v for v, _ in neighbors)
+    encoded = sorted(node.encode('utf-8') for node in nodes)
+    width = max([len(b) for b in encoded] + [1])
+    ids = np.array(encoded, dtype=f"S{width}")
+    position = {b.decode('utf-8'): i for i, b in enumerate(encoded)}
+
+    row_mask = np.zeros(len(encoded), dtype=np.uint8)
+    counts = np.zeros(len(encoded), dtype=np.int64)
+    for u, neighbors in rows.items():
+        row_mask[position[u]] = 1
+        counts[position[u]] = len(neighbors)
+    indptr = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    edge_count = int(indptr[-1])
+    index_dtype = np.int32 if len(encoded) < 2 ** 31 else np.int64
+    indices = np.empty(edge_count, dtype=index_dtype)
+    weights = np.empty(edge_count, dtype=np.float64)
+    for u, neighbors in rows.items():
+        start = int(indptr[position[u]])
+        end = start + len(neighbors)
+        indices[start:end] = [position[v] for v, _ in neighbors]
+        weights[start:end] = [w for _, w in neighbors]
+
+    arrays = dict(zip(_ARRAY_NAMES, (ids, row_mask, indptr, indices, weights)))
+    layout = {}
+    cursor = 0
+    for name, array in arrays.items():
+        layout[name] = {"offset": cursor, "dtype": array.dtype.str, "shape": list(array.shape)}
+        cursor = _aligned(cursor + array.nbytes)
+
+    header = json.dumps({
+        "version": 2,
+        "snapshot_id": uuid.uuid4().hex,
+        "built_at": int(datetime.now().timestamp()),
+        "params": params,
+        "key_count": len(rows),
+        "node_count": len(encoded),
+        "edge_count": edge_count,
+        "arrays": layout,
+    }).encode('utf-8')
+    data_start = _aligned(len(_MAGIC) + 8 + len(header))
+
+    tmp_path = store_path.with_name(store_path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.write(b"\0" * (data_start + layout[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp_path, store_path)
+
+
+def _read_header(store_path: Path) -> Optional[Tuple[dict, int]]:
+    """Header and data offset of a version-2 file, or None for other formats."""
+    with open(store_path, 'rb') as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            return None
+        (length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(length).decode('utf-8'))
+    if header.get("version") != 2:
+        raise ValueError(f"Unsupported graph snapshot version: {header.get('version')}")
+    return header, _aligned(len(_MAGIC) + 8 + length)
+
+
+def open_graph_snapshot(store_path) -> Optional[GraphCSR]:
+    """Memory-map a version-2 snapshot; None if missing or not version 2."""
+    path_obj = Path(store_path)
+    if not path_obj.exists():
+        return None
+
+    found = _read_header(path_obj)
+    if found is None:
+        return None
+    header, data_start = found
+
+    arrays = {}
+    for name in _ARRAY_NAMES:
+        spec = header["arrays"][name]
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        if 0 in shape:
+            arrays[name] = np.zeros(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(
+                path_obj, dtype=dtype, mode='r', offset=data_start + spec["offset"], shape=shape
+            )
+    return GraphCSR(header, **arrays)
+
+
+def _snapshot_id(store_path) -> Optional[str]:
+    """``snapshot_id`` of a version-2 file (None for files written before it existed)."""
+    try:
+        found = _read_header(Path(store_path))
+    except (OSError, ValueError):
+        return None
+    return found[0].get("snapshot_id") if found else None
+
+
+def append_graph_delta(store_path, changes: Iterable[Tuple[str, Optional[Row]]]) -> int:
+    """Append changed rows (``None`` = node removed) to the delta log."""
+    snapshot_id = _snapshot_id(store_path)
+    lines = [
+        json.dumps(
+            {"s": snapshot_id, "u": u, "n": None if row is None else [[v, w] for v, w in row]},
+            ensure_ascii=False,
+        )
+        for u, row in changes
+    ]
+    if lines:
+        with open(delta_path(store_path), 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def read_graph_delta(store_path) -> List[Tuple[str, Optional[Row]]]:
+    """Rows recorded in the delta log, in write order.
+
+    A torn last line is ignored, and so are lines written against a different
+    snapshot (a stale delta that outlived a crashed full save).
+    """
+    path_obj = delta_path(store_path)
+    if not path_obj.exists():
+        return []
+
+    snapshot_id = _snapshot_id(store_path)
+    changes: List[Tuple[str, Optional[Row]]] = []
+    with open(path_obj, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if record.get("s") != snapshot_id:
+                continue
+            neighbors = record["n"]
+            changes.append((record["u"], None if neighbors is None else [(v, w) for v, w in neighbors]))
+    return changes
+
+
 def load_graph_snapshot(store_path) -> Optional[Dict[str, List[Tuple[str, float]]]]:
-    """Load graph adjacency from snapshot file."""
-    from pathlib import Path
+    """Load graph adjacency from snapshot file (version 1 or 2 + delta log)."""
     path_obj = Path(store_path)
     if not path_obj.exists():
         return None
     
     try:
+        base = open_graph_snapshot(path_obj)
+        if base is not None:
+            adjacency = {u: base.row(u) for u in base.keys()}
+            for u, row in read_graph_delta(path_obj):
+                if row is None:
+                    adjacency.pop(u, None)
+                else:
+                    adjacency[u] = row
+            return adjacency
+
         with open(store_path, 'r', encoding='utf-8') as f:
             snapshot = json.load(f)
         
@@ -87,17 +303,30 @@ def load_graph_snapshot(store_path) -> Optional[Dict[str, List[Tuple[str, float]
         
         return adjacency
     
-    except (json.JSONDecodeError, KeyError, ValueError) as e:
+    except (json.JSONDecodeError, UnicodeDecodeError, KeyError, ValueError) as e:
         print(f"Warning: Failed to load graph snapshot: {e}")
         return None
 
 
 def get_snapshot_info(store_path: Path) -> Optional[Dict]:
     """Get metadata about graph snapshot without loading full adjacency."""
+    store_path = Path(store_path)
     if not store_path.exists():
         return None
     
     try:
+        found = _read_header(store_path)
+        if found is not None:
+            header, _ = found
+            return {
+                "version": 2,
+                "node_count": header.get("node_count", 0),
+                "edge_count": header.get("edge_count", 0),
+                "built_at": header.get("built_at", 0),
+                "params": header.get("params", {}),
+                "delta_rows": len(read_graph_delta(store_path)),
+            }
+
         with open(store_path, 'r', encoding='utf-8') as f:
             snapshot = json.load(f)
         
@@ -109,5 +338,5 @@ def get_snapshot_info(store_path: Path) -> Optional[Dict]:
             "params": snapshot.get("params", {})
         }
     
-    except (json.JSONDecodeError, KeyError) as e:
+    except (json.JSONDecodeError, UnicodeDecodeError, KeyError, ValueError) as e:
         return {"error": str(e)}
\ No newline at end of file
@@ -372,8 +372,12 @@ Please search existing memories first or provide more specific content."""
 
         # DFS 검색을 통한 스마트 라우팅
         try:
-            from greeum.core.dfs_search import DFSSearchEngine
-            dfs_search = DFSSearchEngine(self.components['block_manager'].db_manager)
+            block_manager = self.components['block_manager']
+            if hasattr(block_manager, 'get_search_engine'):
+                dfs_search = block_manager.get_search_engine()
+            else:
+                from greeum.core.dfs_search import DFSSearchEngine
+                dfs_search = DFSSearchEngine(block_manager.db_manager)
 
             # 현재 활성 슬롯들의 헤드 블록에서 시작하여 가장 유사한 경로 탐색
             best_similarity = 0.0
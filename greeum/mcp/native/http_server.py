@@ -167,7 +167,11 @@ def create_http_app(
 
     @app.get("/healthz")
     async def healthcheck():
-        return {"status": "ok", "initialized": mcp_server.initialized}
+        payload = {"status": "ok", "initialized": mcp_server.initialized}
+        # v5.4: staged startup - index phases warm up after the server is reachable
+        if hasattr(mcp_server, "startup_report"):
+            payload["startup"] = mcp_server.startup_report()
+        return payload
 
     @app.post("/mcp")
     async def handle_mcp(request: _Request):
@@ -204,6 +204,7 @@ class JSONRPCProcessor:
 
         Returns Greeum MCP tool list:
         - add_memory: Add memory
+        - add_memory_batch: Add many memories in one transaction
         - search_memory: Search memories
         - get_memory_stats: Memory statistics
         - usage_analytics: Usage analysis
@@ -232,6 +233,43 @@ class JSONRPCProcessor:
                     "required": ["content"]
                 }
             },
+            {
+                "name": "add_memory_batch",
+                "description": "Add many memories in one transaction (bulk import, e.g. a chat export). Embeddings are computed in one batch, near-duplicates of stored or earlier items become knowledge updates of that block, and the new blocks are chained in order. Returns per-item results (inserted or updated block).",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "items": {
+                            "type": "array",
+                            "description": "Memories to store, in order",
+                            "minItems": 1,
+                            "maxItems": 5000,
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "content": {
+                                        "type": "string",
+                                        "description": "Content to store in memory"
+                                    },
+                                    "importance": {
+                                        "type": "number",
+                                        "description": "Importance score (0.0-1.0)",
+                                        "minimum": 0.0,
+                                        "maximum": 1.0,
+                                        "default": 0.5
+                                    },
+                                    "timestamp": {
+                                        "type": "string",
+                                        "description": "Original ISO timestamp (optional)"
+                                    }
+                                },
+                                "required": ["content"]
+                            }
+                        }
+                    },
+                    "required": ["items"]
+                }
+            },
             {
                 "name": "search_memory",
                 "description": "Search memories using semantic similarity and DFS-based branch traversal. Prioritizes contextually related memories through slot-aware search, falls back to global search when needed. Returns relevance-ranked results with metadata including timestamps, importance scores, and branch relationships.",
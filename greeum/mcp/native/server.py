@@ -46,6 +46,7 @@ from .transport import STDIOServer
 from .protocol import JSONRPCProcessor
 from .tools import GreeumMCPTools
 from .types import SessionMessage
+from .startup import StartupState
 
 # Check GREEUM_QUIET environment variable
 QUIET_MODE = os.getenv('GREEUM_QUIET', '').lower() in ('true', '1', 'yes')
@@ -79,6 +80,9 @@ class GreeumNativeMCPServer:
         self._write_send_stream = None
         self._write_receive_stream = None
         self._write_worker_running = False
+        # v5.4: 단계별 초기화 상태/소요 시간 (인덱스 빌드는 핸드셰이크 이후 백그라운드)
+        self.startup = StartupState()
+        self._background_tasks: List[asyncio.Task] = []
         
         logger.info("Greeum Native MCP Server created")
     
@@ -88,9 +92,11 @@ class GreeumNativeMCPServer:
 
         초기화 순서:
         1. 기존 좀비 프로세스 정리 (v3.1.1rc2.dev8)
-        2. Greeum 컴포넌트 초기화
+        2. core 단계: DB/STM/검증기 등 가벼운 컴포넌트
         3. MCP 도구 핸들러 생성
         4. JSON-RPC 프로토콜 프로세서 생성
+        5. v5.4: BlockManager와 검색 인덱스는 백그라운드에서 빌드
+           (GREEUM_MCP_EAGER_INIT=1 이면 반환 전에 빌드)
         """
         if self.initialized:
             return
@@ -102,31 +108,28 @@ class GreeumNativeMCPServer:
         self._cleanup_orphaned_processes()
         
         try:
-            # Greeum 컴포넌트 초기화 (기존 패턴과 동일)
+            # Greeum 컴포넌트 초기화 - 핸드셰이크에 필요한 가벼운 것만 먼저
             logger.info("Initializing Greeum components...")
-            
-            db_manager = DatabaseManager()
-            block_manager = BlockManager(db_manager)
-            stm_manager = STMManager(db_manager)
-            duplicate_detector = DuplicateDetector(db_manager)
-            quality_validator = QualityValidator()
-            usage_analytics = UsageAnalytics(db_manager)
 
-            # v3.1.1rc2.dev9: Initialize DFS search for smart routing
-            from greeum.core.dfs_search import DFSSearchEngine
-            dfs_search = DFSSearchEngine(db_manager)
+            with self.startup.phase("core"):
+                db_manager = DatabaseManager()
+                stm_manager = STMManager(db_manager)
+                duplicate_detector = DuplicateDetector(db_manager)
+                quality_validator = QualityValidator()
+                usage_analytics = UsageAnalytics(db_manager)
 
             self.greeum_components = {
                 'db_manager': db_manager,
-                'block_manager': block_manager,
+                'block_manager': None,  # v5.4: block_manager 단계에서 채움
                 'stm_manager': stm_manager,
                 'duplicate_detector': duplicate_detector,
                 'quality_validator': quality_validator,
                 'usage_analytics': usage_analytics,
-                'dfs_search': dfs_search  # v3.1.1rc2.dev9: Add for smart routing
+                'dfs_search': None,  # v3.1.1rc2.dev9: smart routing (search_indexes 단계에서 채움)
+                'startup': self.startup,
             }
             
-            logger.info("Greeum components initialized successfully")
+            logger.info("Greeum core components initialized")
             
             # MCP 도구 핸들러 초기화
             self.tools_handler = GreeumMCPTools(self.greeum_components)
@@ -136,6 +139,10 @@ class GreeumNativeMCPServer:
 
             self.initialized = True
             self.model_ready = False  # v3.1.1rc2.dev9: Track model loading status
+
+            if os.getenv('GREEUM_MCP_EAGER_INIT', '').lower() in ('true', '1', 'yes'):
+                self._build_block_manager()
+                self._build_search_indexes()
             logger.info("Native MCP server initialization completed")
 
             # Initialize write queue (FIFO) for serializing add_memory requests
@@ -150,13 +157,19 @@ class GreeumNativeMCPServer:
 
             # v3.1.1rc2.dev9: Start model loading AFTER connection established
             # This prevents connection timeout while still pre-loading the model
+            # v5.4: BlockManager/검색 인덱스 빌드도 같은 방식으로 백그라운드 실행
             try:
                 # Check if event loop is running
                 loop = asyncio.get_running_loop()
-                loop.create_task(self._async_model_loading())
+                self._background_tasks = [
+                    loop.create_task(self._warm_components()),
+                    loop.create_task(self._async_model_loading()),
+                ]
             except RuntimeError:
-                # No running event loop, skip background loading
-                logger.debug("No event loop available for background model loading")
+                # No running event loop: build indexes inline, skip model pre-loading
+                logger.debug("No event loop available for background warm-up")
+                self._build_block_manager()
+                self._build_search_indexes()
 
         except Exception as e:
             logger.error(f"Failed to initialize server: {e}")
@@ -217,6 +230,52 @@ class GreeumNativeMCPServer:
         except Exception as e:
             logger.warning(f"Failed to cleanup orphaned processes: {e}")
 
+    def _build_block_manager(self) -> None:
+        """v5.4: block_manager 단계 - GraphIndex/AssociationNetwork/브랜치 인덱스 구성"""
+        components = self.greeum_components
+        if components.get('block_manager') is not None:
+            return
+        try:
+            with self.startup.phase("block_manager"):
+                # 서버의 STMManager를 공유 (BlockManager가 별도 인스턴스를 만들지 않도록)
+                components['block_manager'] = BlockManager(
+                    components['db_manager'],
+                    stm_manager=components['stm_manager'],
+                )
+        except Exception:
+            pass  # 실패는 startup 상태에 기록됨; 도구는 DB 직접 경로로 동작
+
+    def _build_search_indexes(self) -> None:
+        """v5.4: search_indexes 단계 - BlockManager의 공유 DFSSearchEngine 빌드"""
+        components = self.greeum_components
+        if components.get('dfs_search') is not None:
+            return
+        try:
+            with self.startup.phase("search_indexes"):
+                block_manager = components.get('block_manager')
+                if block_manager is None:
+                    raise RuntimeError("BlockManager is not available")
+                # v5.4: Share BlockManager's engine so indexes are built once and kept current
+                components['dfs_search'] = block_manager.get_search_engine()
+        except Exception:
+            pass
+
+    async def _warm_components(self) -> None:
+        """
+        v5.4: 핸드셰이크 이후 무거운 컴포넌트를 순서대로 워커 스레드에서 빌드
+
+        빌드 중에도 이벤트 루프는 요청을 처리하며, 도구는 준비되지 않은
+        단계에 대해 대기하거나 축소 모드로 응답합니다.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._build_block_manager)
+        await loop.run_in_executor(None, self._build_search_indexes)
+        logger.info(f"Startup phases: {self.startup.summary()}")
+
+    def startup_report(self) -> Dict[str, Any]:
+        """v5.4: 단계별 초기화 상태와 소요 시간"""
+        return self.startup.report()
+
     async def _async_model_loading(self):
         """
         v3.1.1rc2.dev9: 비동기 모델 로딩
@@ -224,6 +283,7 @@ class GreeumNativeMCPServer:
         연결이 완료된 후 백그라운드에서 모델을 로드합니다.
         이렇게 하면 초기 연결은 즉시 성공하고, 모델은 천천히 로드됩니다.
         """
+        self.startup.start("embedding_model")
         try:
             logger.info("Starting async model loading in background...")
 
@@ -239,9 +299,11 @@ class GreeumNativeMCPServer:
             )
 
             self.model_ready = True
+            self.startup.finish("embedding_model")
             logger.info("✅ Model loading completed successfully")
 
         except Exception as e:
+            self.startup.finish("embedding_model", e)
             logger.error(f"Model loading failed: {e}")
             # Model loading failure is not critical for basic operations
             # Some features may be degraded but server continues
@@ -365,6 +427,9 @@ class GreeumNativeMCPServer:
     async def shutdown(self) -> None:
         """서버 종료 처리"""
         try:
+            for task in self._background_tasks:
+                task.cancel()
+
             if self.greeum_components:
                 # Close database connections
                 if 'db_manager' in self.greeum_components:
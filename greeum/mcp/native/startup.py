@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Greeum Native MCP Server - staged startup (v5.4)
+
+The handshake must not wait for index builds, so component construction is
+split into phases that run in order:
+
+- ``core``: DatabaseManager, STMManager, duplicate/quality/analytics helpers
+  (cheap, finished before the server answers ``initialize``)
+- ``block_manager``: BlockManager with GraphIndex, AssociationNetwork,
+  MergeEngine, BranchIndexManager and BranchAwareStorage (background thread)
+- ``search_indexes``: the BlockManager's shared DFSSearchEngine with its
+  GlobalIndex (background thread)
+- ``embedding_model``: first embedding call (background, independent)
+
+Tools check ``is_ready`` and either wait briefly or answer in degraded mode
+while a phase is still warming up. ``report()`` gives per-phase timings.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger("greeum_native_startup")
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+PHASES = ("core", "block_manager", "search_indexes", "embedding_model")
+
+
+class StartupState:
+    """Status and wall-clock timing of each startup phase."""
+
+    def __init__(self, phases=PHASES):
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._phases: Dict[str, Dict[str, Any]] = {
+            name: {"status": PENDING, "started_ms": None, "duration_ms": None, "error": None}
+            for name in phases
+        }
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+
+    def start(self, name: str) -> None:
+        with self._lock:
+            phase = self._phases.setdefault(name, {"error": None})
+            phase.update(status=RUNNING, started_ms=self._now_ms(), duration_ms=None, error=None)
+
+    def finish(self, name: str, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            phase = self._phases[name]
+            phase["duration_ms"] = self._now_ms() - (phase["started_ms"] or 0.0)
+            phase["status"] = FAILED if error is not None else READY
+            phase["error"] = str(error) if error is not None else None
+        if error is not None:
+            logger.error(f"Startup phase {name} failed after {phase['duration_ms']:.0f}ms: {error}")
+        else:
+            logger.info(f"Startup phase {name} ready in {phase['duration_ms']:.0f}ms")
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.start(name)
+        try:
+            yield
+        except BaseException as exc:
+            self.finish(name, exc)
+            raise
+        self.finish(name)
+
+    def status(self, name: str) -> str:
+        phase = self._phases.get(name)
+        return phase["status"] if phase else READY
+
+    def is_ready(self, name: str) -> bool:
+        return self.status(name) == READY
+
+    def is_settled(self, name: str) -> bool:
+        return self.status(name) in (READY, FAILED)
+
+    async def wait_for(self, name: str, timeout: float) -> bool:
+        """Wait until ``name`` is ready or failed; True only if it became ready."""
+        deadline = time.perf_counter() + max(0.0, timeout)
+        while not self.is_settled(name) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        return self.is_ready(name)
+
+    def describe(self, name: str) -> str:
+        """One-line state of a phase for tool responses, e.g. ``block_manager: running 2.4s``."""
+        with self._lock:
+            phase = dict(self._phases.get(name) or {"status": READY})
+        status = phase["status"]
+        if status == RUNNING:
+            return f"{name}: {status} {(self._now_ms() - phase['started_ms']) / 1000:.1f}s"
+        if status in (READY, FAILED) and phase.get("duration_ms") is not None:
+            return f"{name}: {status} in {phase['duration_ms'] / 1000:.1f}s"
+        return f"{name}: {status}"
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = {name: dict(phase) for name, phase in self._phases.items()}
+        return {
+            "ready": all(phase["status"] == READY for phase in phases.values()),
+            "elapsed_ms": self._now_ms(),
+            "phases": phases,
+        }
+
+    def summary(self) -> str:
+        return ", ".join(self.describe(name) for name in list(self._phases))
@@ -69,6 +69,11 @@ class GreeumMCPTools:
         self.components = greeum_components
         self._add_lock = anyio.Lock() if anyio else None
         self._write_queue_send = write_queue_send
+        # v5.4: 쓰기 도구가 백그라운드 인덱스 빌드를 기다리는 최대 시간 (초)
+        try:
+            self._warmup_wait = float(os.getenv("GREEUM_MCP_WARMUP_WAIT", "20"))
+        except ValueError:
+            self._warmup_wait = 20.0
         logger.info("Greeum MCP tools initialized with direct v3 implementation")
 
     def enable_write_queue(self, write_queue_send: Optional[Any]) -> None:
@@ -76,6 +81,28 @@ class GreeumMCPTools:
 
         self._write_queue_send = write_queue_send
 
+    # ---- v5.4: staged startup readiness ---------------------------------
+    def _phase_ready(self, name: str) -> bool:
+        """True once a startup phase is warm (always True without a startup state)."""
+        startup = self.components.get('startup')
+        return startup is None or startup.is_ready(name)
+
+    async def _await_phase(self, name: str) -> bool:
+        startup = self.components.get('startup')
+        if startup is None:
+            return True
+        return await startup.wait_for(name, self._warmup_wait)
+
+    def _degraded_notice(self, *names: str) -> str:
+        """Trailing note for responses served while startup phases are still warming up."""
+        startup = self.components.get('startup')
+        if startup is None:
+            return ""
+        pending = [startup.describe(name) for name in names if not startup.is_ready(name)]
+        if not pending:
+            return ""
+        return f"\n\n**Startup**: degraded mode ({', '.join(pending)})"
+
     def _get_version(self) -> str:
         """Centralized version reference"""
         try:
@@ -96,7 +123,7 @@ class GreeumMCPTools:
             str: MCP format response text
         """
         try:
-            if tool_name == "add_memory" and self._write_queue_send is not None and anyio is not None:
+            if tool_name in ("add_memory", "add_memory_batch") and self._write_queue_send is not None and anyio is not None:
                 reply_send, reply_receive = anyio.create_memory_object_stream(1)
                 await self._write_queue_send.send(
                     {
@@ -121,6 +148,8 @@ class GreeumMCPTools:
 
         if tool_name == "add_memory":
             return await self._handle_add_memory(arguments)
+        elif tool_name == "add_memory_batch":
+            return await self._handle_add_memory_batch(arguments)
         elif tool_name == "search_memory":
             return await self._handle_search_memory(arguments)
         elif tool_name == "get_memory_stats":
@@ -185,6 +214,13 @@ class GreeumMCPTools:
             if not self._check_components():
                 return "ERROR: Greeum components not available. Please check installation."
 
+            # v5.4: BlockManager는 필수, 검색 인덱스(스마트 라우팅)는 제한 시간까지만 대기
+            await self._await_phase("search_indexes")
+            if not self._phase_ready("block_manager"):
+                return ("ERROR: Memory store is still starting up. Please retry shortly."
+                        + self._degraded_notice("block_manager"))
+            startup_notice = self._degraded_notice("search_indexes")
+
             # Check for duplicates
             duplicate_check = self.components['duplicate_detector'].check_duplicate(content)
             if duplicate_check["is_duplicate"]:
@@ -311,7 +347,7 @@ This may indicate a transaction rollback or database issue."""
 
 **Block Index**: #{block_index if block_index is not None else 'unknown'}
 **Storage**: Branch-based (v3 System){slot_info}
-**Duplicate Check**: Passed{quality_feedback}{suggestions_text}{routing_info}"""
+**Duplicate Check**: Passed{quality_feedback}{suggestions_text}{routing_info}{startup_notice}"""
 
         except Exception as e:
             import traceback
@@ -319,6 +355,77 @@ This may indicate a transaction rollback or database issue."""
             logger.error(f"[DEBUG] Full traceback: {traceback.format_exc()}")
             return f"ERROR: Failed to add memory: {str(e)}"
 
+    async def _handle_add_memory_batch(self, arguments: Dict[str, Any]) -> str:
+        if self._add_lock is not None:
+            async with self._add_lock:
+                return await self._add_memory_batch_impl(arguments)
+        return await self._add_memory_batch_impl(arguments)
+
+    async def _add_memory_batch_impl(self, arguments: Dict[str, Any]) -> str:
+        """
+        Handle add_memory_batch tool - bulk import through BlockManager.add_blocks
+
+        One embedding batch and one transaction for the whole list; duplicate
+        checks run as knowledge updates inside BlockManager instead of the
+        per-item duplicate detector.
+        """
+        try:
+            items = arguments.get("items")
+            if not items or not isinstance(items, list):
+                raise ValueError("items parameter is required")
+
+            batch = []
+            for position, item in enumerate(items):
+                content = item.get("content") if isinstance(item, dict) else None
+                if not content:
+                    raise ValueError(f"items[{position}].content is required")
+                importance = item.get("importance", 0.5)
+                if not (0.0 <= importance <= 1.0):
+                    raise ValueError(f"items[{position}].importance must be between 0.0 and 1.0")
+                batch.append({
+                    "context": content,
+                    "importance": importance,
+                    "timestamp": item.get("timestamp"),
+                    "metadata": {"source": "mcp_batch"},
+                })
+
+            if not self._check_components():
+                return "ERROR: Greeum components not available. Please check installation."
+
+            if not await self._await_phase("block_manager"):
+                return ("ERROR: Memory store is still starting up. Please retry shortly."
+                        + self._degraded_notice("block_manager"))
+
+            results = self.components['block_manager'].add_blocks(batch)
+
+            inserted = [r for r in results if r["status"] == "insert"]
+            updated = [r for r in results if r["status"] == "knowledge_update"]
+            failed = len(results) - len(inserted) - len(updated)
+
+            lines = []
+            for position, result in enumerate(results):
+                if result["status"] == "insert":
+                    lines.append(f"{position}: inserted #{result['block_index']}")
+                elif result["status"] == "knowledge_update":
+                    lines.append(
+                        f"{position}: updated #{result['block_index']} "
+                        f"(similarity {result.get('similarity', 0.0):.2f})"
+                    )
+                else:
+                    lines.append(f"{position}: failed ({result.get('error', 'unknown error')})")
+
+            return f"""**SUCCESS: Memory Batch Processed**
+
+**Inserted**: {len(inserted)}
+**Knowledge Updates**: {len(updated)}
+**Failed**: {failed}
+
+""" + "\n".join(lines)
+
+        except Exception as e:
+            logger.error(f"add_memory_batch failed: {e}")
+            return f"ERROR: Failed to add memory batch: {str(e)}"
+
     def _add_memory_via_v3_core(self, content: str, importance: float = 0.5) -> Dict[str, Any]:
         """Save memory through v3 core path"""
         from greeum.text_utils import process_user_input
@@ -616,8 +723,12 @@ This may indicate a transaction rollback or database issue."""
             if not self._check_components():
                 return "ERROR: Greeum components not available"
 
-            # 검색 실행
-            results = self._search_memory_v3(query, limit, entry, depth)
+            # 검색 실행 (v5.4: 인덱스 빌드 중에는 DB 직접 검색으로 축소 응답)
+            startup_notice = self._degraded_notice("block_manager", "search_indexes")
+            if startup_notice:
+                results = self._search_memory_fallback(query, limit)
+            else:
+                results = self._search_memory_v3(query, limit, entry, depth)
 
             # Log usage statistics
             self.components['usage_analytics'].log_event(
@@ -645,9 +756,9 @@ This may indicate a transaction rollback or database issue."""
                         line += f" {assoc_info}"
                     search_info += line + "\n"
 
-                return search_info
+                return search_info + startup_notice
             else:
-                return f"No memories found for query: '{query}'"
+                return f"No memories found for query: '{query}'" + startup_notice
 
         except Exception as e:
             logger.error(f"search_memory failed: {e}")
@@ -895,12 +1006,18 @@ This may indicate a transaction rollback or database issue."""
             except sqlite3.OperationalError:
                 pass  # Tables may not exist yet
 
+            # v5.4: 단계별 초기화 상태
+            startup_section = ""
+            startup = self.components.get('startup')
+            if startup is not None:
+                startup_section = f"\n**Startup**: {startup.summary()}"
+
             return f"""**Memory System Statistics**
 
 **Total Blocks**: {total_blocks}
 **Database**: SQLite (ThreadSafe)
 **Version**: {self._get_version()}
-**Status**: Active{assoc_section}{consolidation_section}"""
+**Status**: Active{assoc_section}{consolidation_section}{startup_section}"""
 
         except Exception as e:
             logger.error(f"get_memory_stats failed: {e}")
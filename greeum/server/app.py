@@ -38,6 +38,10 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting Greeum API Server on {config.host}:{config.port}")
     yield
     logger.info("Shutting down Greeum API Server")
+    from .services import memory_service
+    if memory_service._service_instance is not None:
+        memory_service._service_instance.shutdown()
+        memory_service._service_instance = None
 
 
 def create_app() -> FastAPI:
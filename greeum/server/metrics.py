@@ -0,0 +1,95 @@
+"""
+Request latency histograms (v5.4).
+
+``RequestLoggingMiddleware`` records every request into ``request_metrics``
+under ``"<METHOD> <route template>"`` (``/memory/{block_id}``, not the
+concrete path, so the key set stays bounded); ``GET /health/metrics``
+returns the snapshot.
+"""
+
+import bisect
+import threading
+from typing import Dict, Any, Optional, Sequence
+
+# Upper bounds in milliseconds; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (cumulative counts, Prometheus style)."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, elapsed_ms)] += 1
+        self.count += 1
+        self.sum_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (``max_ms`` past the last bound)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(min(bound, self.max_ms))
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = {}
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            cumulative[f"le_{bound}"] = seen
+        cumulative["le_inf"] = self.count
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": cumulative,
+        }
+
+
+class RequestMetrics:
+    """Thread-safe map of route key -> ``LatencyHistogram``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._status: Dict[str, Dict[str, int]] = {}
+
+    def observe(self, key: str, elapsed_ms: float, status_code: int) -> None:
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+                self._status[key] = {}
+            histogram.observe(elapsed_ms)
+            status = f"{status_code // 100}xx"
+            self._status[key][status] = self._status[key].get(status, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                key: {**histogram.snapshot(), "status": dict(self._status[key])}
+                for key, histogram in sorted(self._histograms.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._status.clear()
+
+
+request_metrics = RequestMetrics()
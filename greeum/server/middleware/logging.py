@@ -7,11 +7,22 @@ import logging
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 
+from ..metrics import request_metrics
+
 logger = logging.getLogger("greeum.server")
 
 
+def route_key(request: Request) -> str:
+    """``"<METHOD> <route template>"`` for the matched route."""
+    route = request.scope.get("route")
+    return f"{request.method} {getattr(route, 'path', None) or '<unmatched>'}"
+
+
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging HTTP requests."""
+    """Middleware for logging HTTP requests.
+
+    v5.4: also records the latency histogram per route (``greeum.server.metrics``).
+    """
 
     async def dispatch(self, request: Request, call_next):
         start_time = time.time()
@@ -21,6 +32,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
 
         # Calculate duration
         duration_ms = (time.time() - start_time) * 1000
+        request_metrics.observe(route_key(request), duration_ms, response.status_code)
 
         # Log request
         logger.info(
@@ -2,6 +2,9 @@
 Backup upload/export endpoints for remote memory sync.
 
 v5.2.0: Enables `greeum backup push` and `greeum backup pull`.
+v5.4: `/backup/stream` exchanges the streaming NDJSON format
+(greeum.core.backup_stream) in both directions; `/upload` and `/export`
+remain for older clients.
 """
 
 import logging
@@ -10,14 +13,77 @@ import json
 from pathlib import Path
 from typing import Dict, Any
 
-from fastapi import APIRouter, HTTPException, Depends, Body
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Body, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from ...core.backup_stream import COMPRESSIONS, iter_backup_chunks, restore_backup
 from ..services.memory_service import MemoryService, get_memory_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/backup", tags=["backup"])
 
+# Uploads larger than this are spooled to a temporary file
+UPLOAD_SPOOL_BYTES = 16 * 1024 * 1024
+
+_MEDIA_TYPES = {
+    "gzip": "application/gzip",
+    "zstd": "application/zstd",
+    "none": "application/x-ndjson",
+}
+
+
+@router.get("/stream")
+async def stream_backup(
+    since: int = -1,
+    compression: str = "gzip",
+    service: MemoryService = Depends(get_memory_service),
+):
+    """
+    Stream blocks with ``block_index > since`` in the NDJSON backup format.
+
+    The body is produced page by page; clients detect a cut-off transfer
+    from the missing end record.
+    """
+    service._ensure_initialized()
+    if compression not in COMPRESSIONS:
+        raise HTTPException(status_code=400, detail=f"compression must be one of {', '.join(COMPRESSIONS)}")
+
+    return StreamingResponse(
+        iter_backup_chunks(service._db_manager, since=since, compression=compression),
+        media_type=_MEDIA_TYPES[compression],
+    )
+
+
+@router.post("/stream")
+async def upload_backup_stream(
+    request: Request,
+    service: MemoryService = Depends(get_memory_service),
+):
+    """
+    Bulk-restore an NDJSON backup sent as the raw request body.
+
+    Blocks are inserted with their stored embeddings (no re-embedding or
+    InsightJudge pass); already present blocks are skipped.
+    """
+    service._ensure_initialized()
+
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    try:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        stats = await run_in_threadpool(restore_backup, service._db_manager, spool)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Backup stream upload failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        spool.close()
+
+    return {"success": True, "errors": 0, **stats}
+
 
 @router.post("/upload")
 async def upload_backup(
@@ -3,8 +3,11 @@ Health check endpoints.
 """
 
 import time
+from typing import Any, Dict
+
 from fastapi import APIRouter
 
+from ..metrics import request_metrics
 from ..schemas.common import HealthResponse
 
 router = APIRouter(tags=["health"])
@@ -40,3 +43,20 @@ async def health_check():
         version=get_version(),
         uptime_seconds=time.time() - _start_time,
     )
+
+
+@router.get("/health/metrics")
+async def health_metrics() -> Dict[str, Any]:
+    """Per-route request latency histograms, executor load, write-queue batching and query cache (v5.4)."""
+    from ..services import memory_service
+
+    service = memory_service._service_instance
+    db_manager = getattr(service, "_db_manager", None)
+    query_cache = getattr(db_manager, "query_cache", None)
+    return {
+        "uptime_seconds": time.time() - _start_time,
+        "requests": request_metrics.snapshot(),
+        "executor": service.executor_stats() if service is not None else None,
+        "write_queue": db_manager.write_queue_stats() if hasattr(db_manager, "write_queue_stats") else None,
+        "query_cache": query_cache.get_stats() if hasattr(query_cache, "get_stats") else None,
+    }
@@ -8,6 +8,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from ..schemas.memory import (
     MemoryAddRequest,
     MemoryAddResponse,
+    MemoryBatchRequest,
+    MemoryBatchResponse,
     MemoryGetResponse,
 )
 from ..services.memory_service import MemoryService, get_memory_service
@@ -38,6 +40,29 @@ async def add_memory(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/batch", response_model=MemoryBatchResponse)
+async def add_memory_batch(
+    request: MemoryBatchRequest,
+    service: MemoryService = Depends(get_memory_service),
+):
+    """
+    Add many memories in one transaction (bulk import).
+
+    Near-duplicates of stored or earlier batch items become knowledge
+    updates; the per-item results report which.
+    """
+    try:
+        return await service.add_memories(
+            items=[item.model_dump() for item in request.items],
+            slot=request.slot,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to add memory batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{block_id}", response_model=MemoryGetResponse)
 async def get_memory(
     block_id: int,
@@ -5,6 +5,8 @@ Pydantic schemas for API request/response models.
 from .memory import (
     MemoryAddRequest,
     MemoryAddResponse,
+    MemoryBatchRequest,
+    MemoryBatchResponse,
     MemoryGetResponse,
 )
 from .search import (
@@ -21,6 +23,8 @@ from .common import (
 __all__ = [
     "MemoryAddRequest",
     "MemoryAddResponse",
+    "MemoryBatchRequest",
+    "MemoryBatchResponse",
     "MemoryGetResponse",
     "SearchRequest",
     "SearchResponse",
@@ -45,6 +45,56 @@ class MemoryAddResponse(BaseModel):
     suggestions: Optional[List[str]] = Field(default=None, description="Quality suggestions")
 
 
+class MemoryBatchItem(BaseModel):
+    """One memory in a batch add request (v5.4)."""
+    content: str = Field(
+        description="Memory content to store",
+        min_length=1,
+        max_length=10000,
+    )
+    importance: float = Field(
+        default=0.5,
+        ge=0.0,
+        le=1.0,
+        description="Importance score (0.0-1.0)"
+    )
+    tags: Optional[List[str]] = Field(
+        default=None,
+        description="Optional tags for categorization"
+    )
+    timestamp: Optional[str] = Field(
+        default=None,
+        description="Original ISO timestamp (e.g. from a chat export); defaults to now"
+    )
+
+
+class MemoryBatchRequest(BaseModel):
+    """Request to add many memories in one transaction (v5.4)."""
+    items: List[MemoryBatchItem] = Field(
+        description="Memories to store, in order",
+        min_length=1,
+        max_length=5000,
+    )
+    slot: Optional[str] = Field(default=None, description="STM slot (A, B, C)")
+
+
+class MemoryBatchItemResult(BaseModel):
+    """Per-item outcome of a batch add (v5.4)."""
+    status: str = Field(description="'insert' | 'knowledge_update' | 'failed'")
+    block_index: int = Field(default=-1, description="New block, or the block that was updated")
+    similarity: Optional[float] = Field(default=None, description="Similarity to the updated block")
+    error: Optional[str] = Field(default=None, description="Failure reason")
+
+
+class MemoryBatchResponse(BaseModel):
+    """Response after a batch add (v5.4)."""
+    success: bool = Field(description="Operation success status")
+    inserted: int = Field(description="Number of new blocks")
+    updated: int = Field(description="Number of knowledge updates")
+    failed: int = Field(description="Number of failed items")
+    results: List[MemoryBatchItemResult] = Field(description="Per-item results, in request order")
+
+
 class MemoryGetResponse(BaseModel):
     """Response for memory retrieval."""
     block_index: int = Field(description="Block index")
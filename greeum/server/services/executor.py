@@ -0,0 +1,93 @@
+"""
+Bounded executors for blocking service work (v5.4).
+
+SQLite, embedding and LLM calls are synchronous; running them inside
+``async def`` handlers stalls the event loop. ``ServiceExecutor`` moves them
+to two pools:
+
+- reads: ``GREEUM_SERVER_READ_WORKERS`` threads (default ``min(8, cpu + 4)``).
+  With ``ThreadSafeDatabaseManager`` every worker keeps its own thread-local
+  WAL connection, switched to ``PRAGMA query_only`` on first use, so
+  concurrent searches run in parallel.
+- writes: one thread, so inserts (and the duplicate check before them) are
+  serialized in arrival order.
+
+A database manager without per-thread connections (the legacy
+``DatabaseManager`` shares one connection) sends reads to the writer thread
+as well.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _default_read_workers() -> int:
+    return int(os.getenv("GREEUM_SERVER_READ_WORKERS", str(min(8, (os.cpu_count() or 1) + 4))))
+
+
+class ServiceExecutor:
+    """Read pool plus a single writer thread for ``MemoryService``."""
+
+    def __init__(self, read_workers: Optional[int] = None):
+        self.read_workers = max(1, read_workers if read_workers is not None else _default_read_workers())
+        self._reads: Optional[ThreadPoolExecutor] = None
+        self._writes = ThreadPoolExecutor(max_workers=1, thread_name_prefix="greeum-write")
+        self._db_manager = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {"read": 0, "write": 0}
+
+    def bind(self, db_manager) -> None:
+        """Attach the database manager; decides whether reads can use the pool."""
+        self._db_manager = db_manager
+        if hasattr(db_manager, "_get_connection") and self._reads is None:
+            self._reads = ThreadPoolExecutor(max_workers=self.read_workers, thread_name_prefix="greeum-read")
+
+    async def read(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        if self._reads is None:
+            return await self._submit("write", self._writes, func, *args, **kwargs)
+        return await self._submit("read", self._reads, self._read_only, func, *args, **kwargs)
+
+    async def write(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return await self._submit("write", self._writes, func, *args, **kwargs)
+
+    async def _submit(self, kind: str, pool: ThreadPoolExecutor, func, *args, **kwargs) -> Any:
+        with self._lock:
+            self._pending[kind] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._pending[kind] -= 1
+
+    def _read_only(self, func, *args, **kwargs) -> Any:
+        if not getattr(self._local, "query_only", False):
+            try:
+                self._db_manager._get_connection().execute("PRAGMA query_only=ON")
+            except Exception as e:  # noqa: BLE001
+                logger.debug(f"Read worker connection left writable: {e}")
+            self._local.query_only = True
+        return func(*args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = dict(self._pending)
+        return {
+            "read_workers": self.read_workers if self._reads is not None else 0,
+            "write_workers": 1,
+            "pending_reads": pending["read"],
+            "pending_writes": pending["write"],
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._reads is not None:
+            self._reads.shutdown(wait=wait)
+        self._writes.shutdown(wait=wait)
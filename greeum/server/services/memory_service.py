@@ -2,6 +2,8 @@
 Memory service - wraps core Greeum functionality for the API.
 
 v5.0.0: InsightJudge integration for LLM-based filtering.
+v5.4: blocking work runs on ServiceExecutor (read pool + single writer)
+instead of the event loop.
 """
 
 import os
@@ -11,6 +13,8 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 from pathlib import Path
 
+from .executor import ServiceExecutor
+
 logger = logging.getLogger(__name__)
 
 # InsightJudge 사용 여부 (환경변수로 제어)
@@ -42,6 +46,18 @@ class MemoryService:
         self._quality_validator = None
         self._insight_judge = None
         self.use_insight_filter = use_insight_filter
+        self._executor = ServiceExecutor()
+
+    async def _ready(self):
+        """Initialize on the writer thread (model loading must not block the loop)."""
+        if not self._initialized:
+            await self._executor.write(self._ensure_initialized)
+
+    def executor_stats(self) -> Dict[str, Any]:
+        return self._executor.stats()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown()
 
     def _ensure_initialized(self):
         """Lazy initialization of Greeum components."""
@@ -56,6 +72,7 @@ class MemoryService:
             from greeum.core.quality_validator import QualityValidator
 
             self._db_manager = DatabaseManager()
+            self._executor.bind(self._db_manager)
             self._block_manager = BlockManager(self._db_manager)
             self._stm_manager = STMManager(self._db_manager)
             self._duplicate_detector = DuplicateDetector(self._db_manager)
@@ -91,9 +108,17 @@ class MemoryService:
         """Add a new memory block.
 
         v5.0.0: InsightJudge LLM-based filtering (명시적 실패 정책).
+        v5.4: 판정·임베딩은 읽기 풀에서 병렬로, 중복 검사와 저장은 writer 스레드에서 순서대로.
         """
-        self._ensure_initialized()
+        await self._ready()
 
+        prepared = await self._executor.read(self._prepare_memory, content, importance)
+        if prepared.get("rejected"):
+            return prepared["rejected"]
+        return await self._executor.write(self._store_memory, content, importance, tags, prepared)
+
+    def _prepare_memory(self, content: str, importance: float) -> Dict[str, Any]:
+        """InsightJudge, quality validation and embedding (no writes)."""
         # Step 1: InsightJudge LLM 필터링 (v5.0.0)
         # judge_status: "passed" | "rejected" | "unavailable" | "skipped"
         judge_status = "skipped"
@@ -102,7 +127,7 @@ class MemoryService:
             try:
                 judgment = self._insight_judge.judge(content)
                 if not judgment.is_insight:
-                    return {
+                    return {"rejected": {
                         "success": False,
                         "block_index": -1,
                         "storage": "LTM",
@@ -111,7 +136,7 @@ class MemoryService:
                         "is_insight": False,
                         "insight_reason": judgment.insight_reason,
                         "suggestions": [],
-                    }
+                    }}
                 judge_status = "passed"
             except RuntimeError as e:
                 # LLM 서버 미사용/타임아웃 처리
@@ -127,18 +152,6 @@ class MemoryService:
                 judge_status = "unavailable"
                 judge_reason = f"judge_llm_unavailable: {type(e).__name__}"
 
-        # Step 2: Duplicate check
-        dup_result = self._duplicate_detector.check_duplicate(content)
-        if dup_result.get("is_duplicate"):
-            return {
-                "success": False,
-                "block_index": -1,
-                "storage": "LTM",
-                "quality_score": 0.0,
-                "duplicate_check": "failed",
-                "suggestions": [f"Similar to block #{dup_result.get('similar_memories', [{}])[0].get('block_index', 'unknown')}"],
-            }
-
         # Quality validation
         quality_result = self._quality_validator.validate_memory_quality(content, importance)
 
@@ -153,12 +166,43 @@ class MemoryService:
             keywords = []
             embedding = []
 
+        return {
+            "judge_status": judge_status,
+            "judge_reason": judge_reason,
+            "quality_result": quality_result,
+            "keywords": keywords,
+            "embedding": embedding,
+        }
+
+    def _store_memory(
+        self,
+        content: str,
+        importance: float,
+        tags: Optional[List[str]],
+        prepared: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Duplicate check and insert; runs on the writer thread."""
+        judge_status = prepared["judge_status"]
+        quality_result = prepared["quality_result"]
+
+        # Step 2: Duplicate check
+        dup_result = self._duplicate_detector.check_duplicate(content)
+        if dup_result.get("is_duplicate"):
+            return {
+                "success": False,
+                "block_index": -1,
+                "storage": "LTM",
+                "quality_score": 0.0,
+                "duplicate_check": "failed",
+                "suggestions": [f"Similar to block #{dup_result.get('similar_memories', [{}])[0].get('block_index', 'unknown')}"],
+            }
+
         # Add to block manager
         block_data = self._block_manager.add_block(
             context=content,
-            keywords=keywords,
+            keywords=prepared["keywords"],
             tags=tags or [],
-            embedding=embedding,
+            embedding=prepared["embedding"],
             importance=importance,
         )
 
@@ -182,16 +226,62 @@ class MemoryService:
             "quality_score": quality_result.get("quality_score", 0.0),
             "duplicate_check": "passed",
             "is_insight": is_insight_value,
-            "insight_reason": judge_reason,
+            "insight_reason": prepared["judge_reason"],
             "judge_status": judge_status,
             "suggestions": quality_result.get("suggestions", []),
         }
 
+    async def add_memories(
+        self,
+        items: List[Dict[str, Any]],
+        slot: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Add many memory blocks in one transaction (v5.4).
+
+        Bulk import path: InsightJudge and the duplicate detector are not run
+        per item; near-duplicates become knowledge updates in BlockManager.
+        """
+        await self._ready()
+
+        results = await self._executor.write(
+            self._block_manager.add_blocks,
+            [
+                {
+                    "context": item["content"],
+                    "importance": item.get("importance", 0.5),
+                    "tags": item.get("tags") or [],
+                    "timestamp": item.get("timestamp"),
+                }
+                for item in items
+            ],
+            slot=slot,
+        )
+
+        counts = {"insert": 0, "knowledge_update": 0, "failed": 0}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+        return {
+            "success": counts["failed"] == 0,
+            "inserted": counts["insert"],
+            "updated": counts["knowledge_update"],
+            "failed": counts["failed"],
+            "results": [
+                {
+                    "status": result["status"],
+                    "block_index": result.get("block_index", -1),
+                    "similarity": result.get("similarity"),
+                    "error": result.get("error"),
+                }
+                for result in results
+            ],
+        }
+
     async def get_memory(self, block_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific memory block."""
-        self._ensure_initialized()
+        await self._ready()
 
-        block = self._db_manager.get_block_by_index(block_id)
+        block = await self._executor.read(self._db_manager.get_block_by_index, block_id)
         if block is None:
             return None
 
@@ -212,12 +302,12 @@ class MemoryService:
         slot: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Search memories."""
-        self._ensure_initialized()
+        await self._ready()
 
         start_time = time.time()
 
-        # Use block manager search
-        results = self._block_manager.search(query, limit=limit)
+        # Use block manager search (cached there, on the manager's query cache)
+        results = await self._executor.read(self._block_manager.search, query, limit=limit)
 
         elapsed_ms = (time.time() - start_time) * 1000
 
@@ -235,7 +325,7 @@ class MemoryService:
                 "importance": r.get("importance", 0.5),
             })
 
-        return {
+        response = {
             "results": formatted_results,
             "search_stats": {
                 "branches_searched": 1,
@@ -243,11 +333,14 @@ class MemoryService:
                 "elapsed_ms": elapsed_ms,
             },
         }
+        return response
 
     async def get_stats(self) -> Dict[str, Any]:
         """Get memory statistics."""
-        self._ensure_initialized()
+        await self._ready()
+        return await self._executor.read(self._collect_stats)
 
+    def _collect_stats(self) -> Dict[str, Any]:
         # Get block count - handle different DB manager types
         try:
             if hasattr(self._db_manager, 'count_blocks'):
@@ -290,11 +383,11 @@ class MemoryService:
 
     async def run_doctor(self, auto_fix: bool = True) -> Dict[str, Any]:
         """Run system diagnostics."""
-        self._ensure_initialized()
+        await self._ready()
 
         # Basic health check
         try:
-            block_count = self._db_manager.count_blocks()
+            block_count = await self._executor.read(self._db_manager.count_blocks)
             return {
                 "status": "healthy",
                 "checks": {
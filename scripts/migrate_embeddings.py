@@ -62,7 +62,8 @@ def _load_target_model(name_hint: str):
     """Load the target embedding model. ``name_hint`` ∈ {auto, st, model2vec, simple}.
 
     Returns the same EmbeddingModel interface Greeum uses: ``.encode(text) ->
-    list[float]``, ``.get_model_name()``, ``.get_dimension()``.
+    list[float]``, ``.batch_encode(texts, as_numpy=True)``, ``.get_model_name()``,
+    ``.get_dimension()``.
     """
     from greeum.embedding_models import (
         SentenceTransformerModel,
@@ -269,9 +270,10 @@ def migrate(
         done = 0
         for i in range(0, len(todo), batch_size):
             batch = todo[i:i + batch_size]
+            # One batched forward pass per chunk; float32 rows skip the list round-trip.
+            vecs = model.batch_encode([ctx for _, ctx in batch], as_numpy=True)
             with write_conn:  # transactional
-                for idx, ctx in batch:
-                    vec = np.asarray(model.encode(ctx), dtype=np.float32)
+                for (idx, _), vec in zip(batch, vecs):
                     _write_embedding_safe(write_conn, idx, vec, target_name, has_pk)
             done += len(batch)
             if done % (batch_size * 4) == 0 or done == len(todo):
@@ -294,6 +296,12 @@ def migrate(
     finally:
         write_conn.close()
 
+    # Snapshots next to the DB still hold the old vectors; drop them so the
+    # next process rebuilds (running ones re-read rows via the change log).
+    from greeum.core.change_log import discard_index_snapshots
+
+    summary["discarded_snapshots"] = discard_index_snapshots(db_path)
+
     summary["finished_at"] = datetime.now().isoformat(timespec="seconds")
     return summary
 
@@ -0,0 +1,99 @@
+"""Tests for the buffered activation history sink (v5.4)."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from greeum.core.activation_history import ActivationHistorySink
+from greeum.core.association_network import AssociationNetwork
+from greeum.core.spreading_activation import SpreadingActivation
+
+
+class TestActivationHistorySink(unittest.TestCase):
+    def setUp(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_activation_history_")
+        self.db_path = os.path.join(self._tmpdir, "memory.db")
+        self.db = DatabaseManager(connection_string=self.db_path)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _history_rows(self):
+        return self.db.conn.execute("SELECT COUNT(*) FROM activation_history").fetchone()[0]
+
+    def test_activate_buffers_history_and_commits_once(self):
+        network = AssociationNetwork(self.db)
+        nodes = [network.create_node(f"memory {i}", memory_id=i).node_id for i in range(4)]
+        for source, target in zip(nodes, nodes[1:]):
+            network.create_association(source, target, strength=0.9)
+
+        spreading = SpreadingActivation(network, self.db)
+        self.assertIs(spreading.history, self.db.activation_history)
+
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        try:
+            activation = spreading.activate(nodes[:1])
+        finally:
+            self.db.conn.set_trace_callback(None)
+
+        self.assertEqual(set(activation), set(nodes))
+        self.assertEqual(sum(1 for s in statements if s.strip().upper() == "COMMIT"), 1)
+        self.assertEqual(self._history_rows(), 0)
+        # one direct row, then one row per reached node per iteration: 1 + 1 + 2 + 3 + 3 + 3
+        self.assertEqual(spreading.history.get_stats()["buffered"], 13)
+
+        session = self.db.conn.execute(
+            "SELECT active_nodes FROM context_sessions WHERE session_id = ?", (spreading.session_id,)
+        ).fetchone()
+        self.assertIsNotNone(session)
+
+        # Reads see buffered rows, and close() writes whatever is left
+        self.assertEqual(len(spreading.get_activation_history(nodes[0])), 1)
+        self.assertEqual(self._history_rows(), 13)
+        spreading.history.record(nodes[0], 0.5, "spreading", "direct", None)
+        self.db.close()
+        self.db = type(self.db)(connection_string=self.db_path)
+        self.assertEqual(self._history_rows(), 14)
+
+    def test_size_threshold_and_sampling(self):
+        sink = ActivationHistorySink(self.db, batch_size=3, flush_interval=3600)
+        sink.record_many(("n", 0.5, "spreading", "spread", "s") for _ in range(2))
+        self.assertEqual(self._history_rows(), 0)
+        sink.record("n", 0.5, "spreading", "spread", "s")
+        self.assertEqual(self._history_rows(), 3)
+        self.assertEqual(sink.get_stats()["flushes"], 1)
+
+        disabled = ActivationHistorySink(self.db, sample_rate=0.0)
+        disabled.record("n", 0.5, "spreading", "spread", "s")
+        self.assertFalse(disabled.enabled)
+        self.assertEqual(len(disabled), 0)
+
+    def test_failed_flush_keeps_rows_and_counts_drops(self):
+        class BrokenManager:
+            @property
+            def conn(self):
+                raise sqlite3.OperationalError("database is locked")
+
+        sink = ActivationHistorySink(BrokenManager(), batch_size=2, buffer_size=3, flush_interval=3600)
+        sink.record_many((f"n{i}", 0.5, "spreading", "spread", "s") for i in range(5))
+        stats = sink.get_stats()
+        self.assertEqual(stats["buffered"], 3)
+        self.assertEqual(stats["dropped"], 2)
+        self.assertEqual(stats["failed_flushes"], 1)
+
+        sink.db_manager = self.db
+        self.assertEqual(sink.flush(), 3)
+        self.assertEqual(
+            [row[0] for row in self.db.conn.execute("SELECT node_id FROM activation_history ORDER BY history_id")],
+            ["n2", "n3", "n4"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
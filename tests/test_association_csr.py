@@ -0,0 +1,122 @@
+"""Tests for the indexed association graph and vectorized spreading activation (v5.4)."""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from greeum.core.association_network import AssociationNetwork
+from greeum.core.spreading_activation import SpreadingActivation
+
+
+def _reference_spread(network, seeds, threshold, decay, iterations, weights=None):
+    """Dict-based propagation the vectorized path must reproduce."""
+    activation = {n: 1.0 for n in seeds if n in network.nodes}
+    for _ in range(iterations):
+        incoming = {}
+        for node_id, level in activation.items():
+            if level < threshold:
+                continue
+            for neighbor in network.adjacency_list.get(node_id, ()):
+                assoc = network.get_association(node_id, neighbor)
+                weight = weights.get(assoc.association_type, 0.5) if weights else 1.0
+                incoming[neighbor] = incoming.get(neighbor, 0) + level * assoc.strength * weight * decay
+        for node_id, spread in incoming.items():
+            combined = activation.get(node_id, 0) + spread
+            activation[node_id] = combined / (1 + abs(combined)) if weights else min(1.0, combined)
+    return activation
+
+
+class TestAssociationCSR(unittest.TestCase):
+    def setUp(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_association_csr_")
+        self.db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "memory.db"))
+        self.network = AssociationNetwork(self.db)
+
+        rng = random.Random(7)
+        self.node_ids = [
+            self.network.create_node(f"memory {i}", memory_id=i).node_id for i in range(30)
+        ]
+        for _ in range(90):
+            source, target = rng.sample(self.node_ids, 2)
+            self.network.create_association(
+                source, target,
+                association_type=rng.choice(["semantic", "temporal", "causal"]),
+                strength=rng.uniform(0.1, 0.9),
+            )
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def test_lookups(self):
+        node = self.network.get_node_by_memory_id(4)
+        self.assertEqual(node.node_id, self.node_ids[4])
+        self.assertIsNone(self.network.get_node_by_memory_id(999))
+
+        assoc = next(iter(self.network.associations.values()))
+        self.assertIs(
+            self.network.get_association(assoc.source_node_id, assoc.target_node_id), assoc
+        )
+        incident = self.network.get_node_associations(assoc.source_node_id)
+        self.assertIn(assoc, incident)
+        self.assertEqual(
+            {a.association_id for a in incident},
+            {
+                a.association_id for a in self.network.associations.values()
+                if assoc.source_node_id in (a.source_node_id, a.target_node_id)
+            },
+        )
+
+    def test_csr_matches_adjacency(self):
+        csr = self.network.csr_snapshot()
+        self.assertIs(self.network.csr_snapshot(), csr)
+        for node_id, targets in self.network.adjacency_list.items():
+            row = csr.node_pos[node_id]
+            columns = csr.indices[csr.indptr[row]:csr.indptr[row + 1]]
+            self.assertEqual({csr.node_ids[c] for c in columns}, targets)
+
+        # Strength changes are written through; new edges rebuild the snapshot
+        assoc = self.network.get_association(csr.node_ids[csr.sources[0]], csr.node_ids[csr.indices[0]])
+        self.network.strengthen_association(assoc.association_id, 0.05)
+        self.assertAlmostEqual(csr.strength[csr.edge_slots[assoc.association_id]], assoc.strength)
+        self.network.decay_associations(0.5)
+        self.assertAlmostEqual(csr.strength[csr.edge_slots[assoc.association_id]], assoc.strength)
+
+        self.network.create_association(self.node_ids[0], self.node_ids[1])
+        self.assertIsNot(self.network.csr_snapshot(), csr)
+
+    def test_activation_matches_reference(self):
+        spreading = SpreadingActivation(self.network, self.db)
+        seeds = self.node_ids[:3]
+
+        expected = _reference_spread(self.network, seeds, 0.1, 0.8, 5)
+        activation = spreading.activate(seeds)
+        self.assertEqual(set(activation), set(expected))
+        for node_id, level in expected.items():
+            self.assertAlmostEqual(activation[node_id], level, places=9)
+
+        weights = {"semantic": 1.0, "temporal": 0.8, "causal": 0.9}
+        expected = _reference_spread(self.network, seeds, 0.1, 0.8, 5, weights)
+        adaptive = spreading.adaptive_spread(seeds, weights)
+        self.assertEqual(set(adaptive), set(expected))
+        for node_id, level in expected.items():
+            self.assertAlmostEqual(adaptive[node_id], level, places=9)
+
+    def test_empty_network(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "empty.db"))
+        try:
+            network = AssociationNetwork(db)
+            self.assertEqual(network.csr_snapshot().num_edges, 0)
+            self.assertEqual(SpreadingActivation(network, db).adaptive_spread(["missing"]), {})
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Tests for online, chunked AtomicBackupSystem snapshots (v5.4)."""
+from __future__ import annotations
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from greeum.core.migration.backup_system import AtomicBackupSystem
+
+
+class TestAtomicBackupSystem(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_atomic_backup_")
+        self.db_path = os.path.join(self._tmpdir, "memory.db")
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE blocks (block_index INTEGER PRIMARY KEY, context TEXT)")
+        self._insert(0, 400)
+        self.backups = AtomicBackupSystem(self._tmpdir, page_step=4, step_sleep=0, chunk_pages=4, workers=2)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _insert(self, start: int, count: int):
+        self.conn.executemany(
+            "INSERT INTO blocks VALUES (?, ?)",
+            [(i, f"block {i} " + "x" * 200) for i in range(start, start + count)],
+        )
+        self.conn.commit()
+
+    def _count(self, path: str) -> int:
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_backup_includes_uncheckpointed_wal_and_restores(self):
+        # Rows still in the WAL are part of the snapshot
+        self.assertGreater(os.path.getsize(self.db_path + "-wal"), 0)
+        backup_id = self.backups.create_backup(self.db_path, "first")
+        metadata = self.backups.active_backups[backup_id]
+        self.assertTrue(metadata.backup_verified)
+        self.assertEqual(metadata.reused_chunks, 0)
+
+        target = os.path.join(self._tmpdir, "restored.db")
+        self.assertTrue(self.backups.restore_backup(backup_id, target))
+        self.assertEqual(self._count(target), 400)
+
+    def test_second_snapshot_reuses_unchanged_chunks(self):
+        self.backups.create_backup(self.db_path, "first")
+        chunk_count = len(os.listdir(self.backups.chunk_dir))
+
+        self._insert(400, 5)
+        second = self.backups.active_backups[self.backups.create_backup(self.db_path, "second")]
+
+        self.assertGreater(second.reused_chunks, second.new_chunks)
+        self.assertEqual(len(os.listdir(self.backups.chunk_dir)), chunk_count + second.new_chunks)
+
+        reloaded = AtomicBackupSystem(self._tmpdir)
+        target = os.path.join(self._tmpdir, "restored.db")
+        self.assertTrue(reloaded.restore_backup("second", target))
+        self.assertEqual(self._count(target), 405)
+
+    def test_corrupt_chunk_fails_verification(self):
+        backup_id = self.backups.create_backup(self.db_path, "first")
+        metadata = self.backups.active_backups[backup_id]
+        chunk = next(iter(self.backups.chunk_dir.iterdir()))
+        chunk.write_bytes(b"not gzip")
+
+        self.assertFalse(self.backups._verify_backup_integrity(metadata))
+        target = os.path.join(self._tmpdir, "restored.db")
+        self.assertFalse(self.backups.restore_backup(backup_id, target))
+        self.assertFalse(os.path.exists(target))
+
+    def test_cleanup_drops_unreferenced_chunks(self):
+        self.backups.create_backup(self.db_path, "a_first")
+        self.conn.execute("UPDATE blocks SET context = 'changed'")
+        self.conn.commit()
+        self.backups.create_backup(self.db_path, "b_second")
+        self.backups.active_backups["a_first"].created_at = "2000-01-01T00:00:00"
+
+        self.backups.cleanup_old_backups(keep_count=1)
+
+        self.assertEqual(list(self.backups.active_backups), ["b_second"])
+        manifest = self.backups._read_manifest(self.backups.active_backups["b_second"])
+        self.assertEqual(
+            {p.name[:-3] for p in self.backups.chunk_dir.iterdir()},
+            set(manifest["chunks"]),
+        )
+        self.assertEqual(self.backups.validate_backup_health()["failed_backups"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
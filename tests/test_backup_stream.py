@@ -0,0 +1,201 @@
+"""Tests for the streaming NDJSON backup format (v5.4)."""
+from __future__ import annotations
+
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+
+def _have_fastapi_testclient() -> bool:
+    try:
+        import httpx  # noqa: F401
+        from fastapi.testclient import TestClient  # noqa: F401
+        return True
+    except Exception:  # noqa: BLE001
+        return False
+
+
+class TestBackupStream(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_backup_stream_")
+        os.environ["GREEUM_SILENT_HASH_FALLBACK"] = "1"
+
+        from greeum.core import DatabaseManager
+
+        self.source = DatabaseManager(connection_string=os.path.join(self._tmpdir, "source.db"))
+        self._dbs = [self.source]
+        self._fill(self.source, 0, 6)
+
+    def tearDown(self):
+        for db in self._dbs:
+            try:
+                db.close()
+                if hasattr(db, "shutdown"):
+                    db.shutdown()
+            except Exception:
+                pass
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _db(self, name: str):
+        from greeum.core import DatabaseManager
+
+        db = DatabaseManager(connection_string=os.path.join(self._tmpdir, name))
+        self._dbs.append(db)
+        return db
+
+    def _fill(self, db, start: int, count: int, prefix: str = "memory"):
+        from greeum.core.backup_stream import block_hash
+
+        last = db.get_last_block_info()
+        prev_hash = last["hash"] if last else ""
+        for i in range(start, start + count):
+            block = {
+                "block_index": i,
+                "timestamp": f"2026-01-01T00:00:{i:02d}",
+                "context": f"{prefix} {i}",
+                "importance": 0.5,
+                "prev_hash": prev_hash,
+            }
+            block["hash"] = prev_hash = block_hash(block)
+            db.add_block({
+                **block,
+                "keywords": [f"k{i}"],
+                "tags": ["backup"],
+                "embedding": np.full(8, i + 1, dtype=np.float32).tolist(),
+                "metadata": {"n": i},
+            })
+
+    def _backup(self, db, since: int = -1, compression: str = "gzip") -> io.BytesIO:
+        from greeum.core.backup_stream import iter_backup_chunks
+
+        return io.BytesIO(b"".join(iter_backup_chunks(db, since=since, compression=compression)))
+
+    def _chain_is_valid(self, db) -> bool:
+        from greeum.core.backup_stream import block_hash
+
+        blocks = sorted(db.get_blocks(limit=1000), key=lambda b: b["block_index"])
+        for previous, block in zip([None] + blocks, blocks):
+            if previous is not None and block["prev_hash"] != previous["hash"]:
+                return False
+            if block_hash(block) != block["hash"]:
+                return False
+        return True
+
+    def test_roundtrip_preserves_blocks_and_embeddings(self):
+        from greeum.core.backup_stream import read_backup, restore_backup
+
+        backup = self._backup(self.source)
+        self.assertTrue(backup.getvalue().startswith(b"\x1f\x8b"))
+        header, records = read_backup(io.BytesIO(backup.getvalue()))
+        self.assertEqual((header["count"], header["first_block_index"], header["last_block_index"]), (6, 0, 5))
+        self.assertEqual(len(list(records)), 6)
+
+        target = self._db("target.db")
+        stats = restore_backup(target, backup, batch_size=4)
+
+        self.assertEqual((stats["mode"], stats["restored"], stats["skipped"]), ("preserve", 6, 0))
+        original, restored = self.source.get_block(3), target.get_block(3)
+        for field in ("hash", "prev_hash", "context", "timestamp", "keywords", "tags", "metadata"):
+            self.assertEqual(restored[field], original[field])
+        np.testing.assert_allclose(restored["embedding"], np.full(8, 4.0))
+        self.assertTrue(self._chain_is_valid(target))
+
+    def test_incremental_export_since(self):
+        from greeum.core.backup_stream import read_backup, restore_backup
+
+        target = self._db("target.db")
+        restore_backup(target, self._backup(self.source, compression="none"))
+        self._fill(self.source, 6, 3)
+
+        delta = self._backup(self.source, since=5, compression="none")
+        header, records = read_backup(io.BytesIO(delta.getvalue()))
+        self.assertEqual([r["block_index"] for r in records], [6, 7, 8])
+
+        stats = restore_backup(target, delta)
+        self.assertEqual((stats["mode"], stats["restored"], stats["last_block_index"]), ("preserve", 3, 8))
+        self.assertTrue(self._chain_is_valid(target))
+
+    def test_append_mode_rechains_and_skips_duplicates(self):
+        from greeum.core.backup_stream import restore_backup
+
+        target = self._db("target.db")
+        self._fill(target, 0, 2, prefix="local")
+        backup = self._backup(self.source)
+
+        stats = restore_backup(target, backup)
+        self.assertEqual((stats["mode"], stats["restored"]), ("append", 6))
+        self.assertEqual(target.get_block(2)["context"], "memory 0")
+        np.testing.assert_allclose(target.get_block(2)["embedding"], np.full(8, 1.0))
+        self.assertTrue(self._chain_is_valid(target))
+
+        backup.seek(0)
+        again = restore_backup(target, backup)
+        self.assertEqual((again["restored"], again["skipped"]), (0, 6))
+
+    def test_replace_flag_is_rejected_not_ignored(self):
+        from click.testing import CliRunner
+        from greeum.cli import main
+
+        path = os.path.join(self._tmpdir, "backup.ndjson.gz")
+        with open(path, "wb") as f:
+            f.write(self._backup(self.source).getvalue())
+
+        runner = CliRunner()
+        for args in (["backup", "push", "--replace"], ["restore", "from-file", path, "--replace"]):
+            result = runner.invoke(main, args)
+            self.assertEqual(result.exit_code, 2, args)
+            self.assertIn("--replace is not supported", result.output)
+
+    def test_truncated_stream_is_rejected(self):
+        from greeum.core.backup_stream import restore_backup
+
+        lines = gzip.decompress(self._backup(self.source).getvalue()).splitlines(keepends=True)
+        truncated = io.BytesIO(b"".join(lines[:-1]))
+
+        with self.assertRaises(ValueError):
+            restore_backup(self._db("target.db"), truncated)
+        with self.assertRaises(ValueError):
+            restore_backup(self._db("other.db"), io.BytesIO(b'{"metadata": {}}'))
+
+    @unittest.skipUnless(_have_fastapi_testclient(), "fastapi[test] not installed")
+    def test_http_stream_routes(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from greeum.server.routes.backup import router
+        from greeum.server.services.memory_service import get_memory_service
+
+        class _Service:
+            def __init__(self, db):
+                self._db_manager = db
+
+            def _ensure_initialized(self):
+                pass
+
+        target = self._db("target.db")
+        services = {"source": _Service(self.source), "target": _Service(target)}
+        app = FastAPI()
+        app.include_router(router)
+
+        app.dependency_overrides[get_memory_service] = lambda: services["source"]
+        with TestClient(app) as client:
+            pulled = client.get("/backup/stream", params={"since": 1})
+            self.assertEqual(pulled.status_code, 200)
+            self.assertEqual(client.get("/backup/stream", params={"compression": "lz4"}).status_code, 400)
+
+        app.dependency_overrides[get_memory_service] = lambda: services["target"]
+        with TestClient(app) as client:
+            pushed = client.post("/backup/stream", content=pulled.content)
+            self.assertEqual(pushed.status_code, 200)
+            self.assertEqual(pushed.json()["restored"], 4)
+            self.assertEqual(client.post("/backup/stream", content=b"not a backup").status_code, 400)
+
+        self.assertEqual(target.get_block(2)["context"], "memory 2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests for batched SentenceTransformerModel.batch_encode (v5.4).
+
+sentence-transformers is optional; the encoder is replaced by a deterministic
+in-process stand-in so the batching, caching, padding and normalization logic
+runs without downloading a model.
+"""
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from greeum.embedding_models import (
+    EmbeddingConfig,
+    SentenceTransformerModel,
+    SimpleEmbeddingModel,
+)
+
+
+class _RecordingEncoder:
+    """Minimal ``SentenceTransformer.encode`` stand-in (384-dim)."""
+
+    dim = 384
+
+    def __init__(self):
+        self.calls = []
+
+    def _vector(self, text):
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return rng.standard_normal(self.dim).astype(np.float32)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, show_progress_bar=None):
+        self.calls.append((sentences, batch_size))
+        if isinstance(sentences, str):
+            return self._vector(sentences)
+        return np.stack([self._vector(s) for s in sentences])
+
+
+def _model(cache_size=1000):
+    # The persistent tier is covered by test_embedding_cache; keep these runs in-process
+    config = EmbeddingConfig(cache_size=cache_size, batch_size=8, persistent_cache=False)
+    model = SentenceTransformerModel("intfloat/multilingual-e5-small", config)
+    model.model = _RecordingEncoder()
+    model._dimension = _RecordingEncoder.dim
+    model._needs_padding = True
+    return model
+
+
+class TestSentenceTransformerBatchEncode(unittest.TestCase):
+    def test_single_forward_pass_matches_encode(self):
+        model = _model()
+        texts = ["alpha", "beta", "alpha", "gamma"]
+        batch = model.batch_encode(texts)
+
+        # One batched call, duplicates encoded once, query prefix applied
+        self.assertEqual(len(model.model.calls), 1)
+        sent, batch_size = model.model.calls[0]
+        self.assertEqual(sent, ["query: alpha", "query: beta", "query: gamma"])
+        self.assertEqual(batch_size, 8)
+
+        reference = _model(cache_size=0)
+        for text, vector in zip(texts, batch):
+            self.assertEqual(len(vector), 768)
+            np.testing.assert_allclose(vector, reference.encode(text), rtol=1e-6, atol=1e-9)
+            self.assertAlmostEqual(float(np.linalg.norm(vector)), 1.0, places=6)
+
+    def test_cache_hits_skip_the_model(self):
+        model = _model()
+        model.encode("alpha")
+        model.batch_encode(["alpha", "delta"])
+        self.assertEqual(model.model.calls[-1][0], ["query: delta"])
+
+        model.batch_encode(["alpha", "delta"])
+        self.assertEqual(len(model.model.calls), 2)
+
+    def test_numpy_output(self):
+        model = _model()
+        matrix = model.batch_encode(["alpha", "beta"], as_numpy=True)
+        self.assertEqual(matrix.dtype, np.float32)
+        self.assertEqual(matrix.shape, (2, 768))
+        np.testing.assert_allclose(matrix[0], model.encode("alpha"), rtol=1e-6, atol=1e-7)
+
+        empty = model.batch_encode([], as_numpy=True)
+        self.assertEqual(empty.shape, (0, 768))
+
+    def test_simple_model_numpy_output(self):
+        model = SimpleEmbeddingModel(dimension=16)
+        matrix = model.batch_encode(["a", "b", "c"], as_numpy=True)
+        self.assertEqual(matrix.shape, (3, 16))
+        self.assertEqual(matrix.dtype, np.float32)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+"""Tests for bulk ingestion through BlockManager.add_blocks (v5.4)."""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+
+def _unit(seed: int, dim: int = 16):
+    rng = np.random.default_rng(seed)
+    vec = rng.standard_normal(dim).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+class TestBatchIngest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_batch_")
+        os.environ["GREEUM_SILENT_HASH_FALLBACK"] = "1"
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _check(self, db):
+        from greeum.core.block_manager import BlockManager
+
+        bm = BlockManager(db)
+        existing = bm.add_block(
+            context="release checklist for the api gateway",
+            keywords=["release"],
+            tags=[],
+            embedding=_unit(0).tolist(),
+            importance=0.5,
+        )
+
+        items = [
+            {"context": "gateway release checklist, revised", "embedding": (_unit(0) * 2).tolist()},
+            {"context": "postgres vacuum schedule", "embedding": _unit(1).tolist(), "tags": ["db"]},
+            {"context": "oncall rotation for march", "embedding": _unit(2).tolist(),
+             "timestamp": "2026-03-01T09:00:00"},
+            {"context": "postgres vacuum schedule again", "embedding": _unit(1).tolist()},
+        ]
+        results = bm.add_blocks(items)
+
+        self.assertEqual(
+            [r["status"] for r in results],
+            ["knowledge_update", "insert", "insert", "knowledge_update"],
+        )
+        self.assertEqual(results[0]["block_index"], existing["block_index"])
+        self.assertEqual(results[0]["source"], "existing")
+        self.assertEqual(results[3]["block_index"], results[1]["block_index"])
+        self.assertEqual(results[3]["source"], "batch")
+        # Knowledge updates report the target's hash, as single add_block does
+        self.assertEqual(results[0]["hash"], existing["hash"])
+        self.assertEqual(results[3]["hash"], results[1]["hash"])
+
+        # Sequential indices and hash chain, new blocks linked in order
+        first, second = db.get_blocks_by_indices([results[1]["block_index"], results[2]["block_index"]])
+        self.assertEqual(first["block_index"], existing["block_index"] + 1)
+        self.assertEqual(second["block_index"], first["block_index"] + 1)
+        self.assertEqual(first["prev_hash"], existing["hash"])
+        self.assertEqual(second["prev_hash"], first["hash"])
+        self.assertEqual(second["before"], first["hash"])
+        self.assertIn(second["hash"], first["after"])
+        self.assertEqual(second["timestamp"], "2026-03-01T09:00:00")
+        self.assertEqual(first["tags"], ["db"])
+
+        merged = db.get_block(existing["block_index"])
+        self.assertGreater(merged["metadata"]["knowledge_updates"], 0)
+
+        # New rows are visible to vector search without a reload
+        hits = db.search_blocks_by_embedding(_unit(2).tolist(), top_k=1)
+        self.assertEqual(hits[0]["block_index"], second["block_index"])
+        self.assertEqual(bm.add_blocks([]), [])
+
+    def test_legacy_manager(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "legacy.db"))
+        try:
+            self._check(db)
+        finally:
+            db.close()
+
+    def test_thread_safe_manager(self):
+        from greeum.core.thread_safe_db import ThreadSafeDatabaseManager
+
+        db = ThreadSafeDatabaseManager(connection_string=os.path.join(self._tmpdir, "ts.db"))
+        try:
+            self._check(db)
+        finally:
+            db.close()
+
+    def test_failed_batch_rolls_back(self):
+        from greeum.core.database_manager import DatabaseManager
+        from greeum.core.block_manager import BlockManager
+
+        db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "rollback.db"))
+        try:
+            bm = BlockManager(db)
+            bm.add_block("seed memory", ["seed"], [], _unit(5).tolist(), 0.5)
+            original = db.add_blocks
+
+            def failing_add_blocks(blocks, connection=None):
+                original(blocks[:1], connection=connection)
+                raise RuntimeError("disk full")
+
+            db.add_blocks = failing_add_blocks
+            with self.assertRaises(RuntimeError):
+                bm.add_blocks([
+                    {"context": "first", "embedding": _unit(6).tolist()},
+                    {"context": "second", "embedding": _unit(7).tolist()},
+                ])
+            db.add_blocks = original
+
+            count = db.conn.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+            self.assertEqual(count, 1)
+        finally:
+            db.close()
+
+    def test_knowledge_updates_notify_after_commit(self):
+        from greeum.core.block_manager import BlockManager
+        from greeum.core.database_manager import DatabaseManager
+
+        db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "notify.db"))
+        try:
+            bm = BlockManager(db)
+            existing = bm.add_block("seed memory about gateways", ["seed"], [], _unit(8).tolist(), 0.5)
+            notified = []
+            original = bm._notify_search_index
+
+            def recording_notify(block=None, block_index=None, **kwargs):
+                notified.append((block_index, db.conn.in_transaction))
+                return original(block=block, block_index=block_index, **kwargs)
+
+            bm._notify_search_index = recording_notify
+            results = bm.add_blocks([
+                {"context": "seed memory about gateways, again", "embedding": _unit(8).tolist()},
+            ])
+
+            self.assertEqual(results[0]["status"], "knowledge_update")
+            self.assertEqual(notified, [(existing["block_index"], False)])
+        finally:
+            db.close()
+
+    def test_batch_updates_centroids_in_one_transaction(self):
+        from greeum.core.block_manager import BlockManager
+        from greeum.core.branch_centroids import CENTROID_STATE_TABLE
+        from greeum.core.database_manager import DatabaseManager
+
+        db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "centroids.db"))
+        try:
+            bm = BlockManager(db)
+            bm.add_block("seed memory", ["seed"], [], _unit(100).tolist(), 0.5)
+            centroids = db.branch_centroids
+            updates = centroids.get_stats()["updates"]
+
+            statements = []
+            db.conn.set_trace_callback(statements.append)
+            try:
+                results = bm.add_blocks([
+                    {"context": f"batch memory {i}", "embedding": _unit(200 + i).tolist()}
+                    for i in range(50)
+                ])
+            finally:
+                db.conn.set_trace_callback(None)
+
+            self.assertTrue(all(r["status"] == "insert" for r in results))
+            self.assertEqual(centroids.get_stats()["updates"] - updates, 1)
+            self.assertEqual(sum("BEGIN" in s for s in statements), 1)
+            self.assertEqual(sum(s.startswith("INSERT") and CENTROID_STATE_TABLE in s for s in statements), 3)
+
+            # The folded sums match a rebuild from the stored embeddings
+            folded = centroids.centroids()
+            centroids.invalidate()
+            centroids._rebuild(db.conn, centroids._current_mark(db.conn))
+            for root, vector in centroids.centroids().items():
+                np.testing.assert_allclose(folded[root], vector, rtol=1e-5, atol=1e-6)
+        finally:
+            db.close()
+
+    def test_missing_embeddings_are_batch_encoded(self):
+        from greeum.core.database_manager import DatabaseManager
+        from greeum.core.block_manager import BlockManager
+        from greeum.embedding_models import embedding_registry
+
+        calls = []
+        model = embedding_registry.get_model()
+        original = model.batch_encode
+
+        def recording_batch_encode(texts, as_numpy=False):
+            calls.append(list(texts))
+            return original(texts, as_numpy=as_numpy)
+
+        db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "encode.db"))
+        model.batch_encode = recording_batch_encode
+        try:
+            bm = BlockManager(db)
+            results = bm.add_blocks([
+                {"context": "alpha"},
+                {"context": "beta", "embedding": _unit(3, model.get_dimension()).tolist()},
+                {"context": "gamma"},
+            ])
+            self.assertEqual(calls, [["alpha", "gamma"]])
+            self.assertTrue(all(r["status"] == "insert" for r in results))
+            self.assertTrue(db.get_block(results[0]["block_index"])["keywords"])
+            with self.assertRaises(ValueError):
+                bm.add_blocks([{"context": "  "}])
+        finally:
+            del model.batch_encode
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
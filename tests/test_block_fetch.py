@@ -0,0 +1,97 @@
+"""Tests for batched block materialization (get_blocks_by_indices, v5.4)."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from greeum.core.block_fetch import fetch_blocks
+
+
+def _block(block_index):
+    return {
+        "block_index": block_index,
+        "timestamp": f"2026-01-01T00:{block_index // 60:02d}:{block_index % 60:02d}",
+        "context": f"memory number {block_index}",
+        "keywords": [f"kw{block_index}", "shared"],
+        "tags": [f"tag{block_index % 3}"],
+        "metadata": {"n": block_index} if block_index % 2 else {},
+        "embedding": [float(block_index), 1.0, 0.5, 0.25],
+        "importance": 0.5,
+        "hash": f"h{block_index}",
+        "prev_hash": "",
+    }
+
+
+class TestGetBlocksByIndices(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_fetch_")
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _check(self, manager):
+        for i in range(12):
+            manager.add_block(_block(i))
+
+        requested = [7, 3, 99, 7, 0, 11]
+        blocks = manager.get_blocks_by_indices(requested)
+
+        # Request order, duplicates collapsed, missing skipped
+        self.assertEqual([b["block_index"] for b in blocks], [7, 3, 0, 11])
+        for block in blocks:
+            self.assertEqual(block, manager.get_block(block["block_index"]))
+
+        projected = manager.get_blocks_by_indices([5, 2], fields=["context", "keywords"])
+        self.assertEqual(set(projected[0]), {"block_index", "context", "keywords"})
+        self.assertEqual(projected[0]["keywords"], ["kw5", "shared"])
+
+        self.assertEqual(manager.get_blocks_by_indices([]), [])
+
+        # Search paths return the same blocks as before, with scores attached
+        hits = manager.search_blocks_by_embedding([11.0, 1.0, 0.5, 0.25], top_k=3)
+        self.assertEqual(len(hits), 3)
+        self.assertTrue(all("similarity" in b and b["tags"] for b in hits))
+
+    def test_legacy_manager(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        manager = DatabaseManager(connection_string=os.path.join(self._tmpdir, "legacy.db"))
+        try:
+            self._check(manager)
+        finally:
+            manager.close()
+
+    def test_thread_safe_manager(self):
+        from greeum.core.thread_safe_db import ThreadSafeDatabaseManager
+
+        manager = ThreadSafeDatabaseManager(connection_string=os.path.join(self._tmpdir, "ts.db"))
+        try:
+            self._check(manager)
+        finally:
+            manager.close()
+
+    def test_query_count_is_independent_of_result_size(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        manager = DatabaseManager(connection_string=os.path.join(self._tmpdir, "count.db"))
+        try:
+            for i in range(60):
+                manager.add_block(_block(i))
+
+            statements = []
+            manager.conn.set_trace_callback(statements.append)
+            try:
+                blocks = fetch_blocks(manager.conn.cursor(), range(60))
+            finally:
+                manager.conn.set_trace_callback(None)
+
+            self.assertEqual(len(blocks), 60)
+            # blocks + keywords + tags + metadata + embeddings
+            self.assertEqual(len(statements), 5)
+        finally:
+            manager.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
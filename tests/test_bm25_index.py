@@ -0,0 +1,164 @@
+"""Tests for the inverted-index BM25 engine (v5.4)."""
+
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from greeum.core.bm25_index import BM25Index, HybridScorer
+
+
+class _ConnHolder:
+    """Minimal db_manager stand-in exposing ``conn``."""
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:")
+
+
+def _corpus(seed=3, docs=300):
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(60)]
+    return {
+        str(i): [rng.choice(vocab[: rng.randint(5, 60)]) for _ in range(rng.randint(3, 15))]
+        for i in range(docs)
+    }
+
+
+def _brute_force(index, query, top_k):
+    scored = [(doc_id, index.score(query, doc_id)) for doc_id in index.doc_lens]
+    scored = [item for item in scored if item[1] > 0]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:top_k]
+
+
+class TestBM25InvertedIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = BM25Index()
+        for doc_id, keywords in _corpus().items():
+            self.index.add_document(doc_id, keywords)
+
+    def test_search_matches_exhaustive_scoring(self):
+        for query in (["term1"], ["term0", "term5", "term40"], ["term2", "term2", "term59"]):
+            got = self.index.search(query, top_k=10)
+            expected = _brute_force(self.index, query, 10)
+            self.assertEqual(
+                [round(score, 9) for _, score in got],
+                [round(score, 9) for _, score in expected],
+            )
+            self.assertEqual({d for d, _ in got}, {d for d, _ in expected})
+
+    def test_maxscore_prunes_rare_terms(self):
+        # A very common term followed by rare ones lets the top-k settle early
+        self.index.search(["term0", "term1", "term2", "term3", "term55", "term58"], top_k=3)
+        self.assertGreater(self.index.get_stats()["terms_pruned"], 0)
+
+    def test_remove_touches_postings(self):
+        doc_id, keywords = "7", list(self.index.doc_keywords["7"])
+        self.index.remove_document(doc_id)
+        for term in set(keywords):
+            self.assertNotIn(doc_id, self.index.postings.get(term, {}))
+        self.assertNotIn(doc_id, [d for d, _ in self.index.search(keywords, top_k=500)])
+
+    def test_incremental_persistence(self):
+        db = _ConnHolder()
+        self.index.save_to_db(db)
+
+        self.index.add_document("9999", ["fresh", "term1"])
+        self.index.remove_document("3")
+        self.assertEqual(self.index.get_stats()["pending_writes"], 2)
+        self.index.save_to_db(db)
+        self.assertEqual(self.index.get_stats()["pending_writes"], 0)
+
+        loaded = BM25Index()
+        self.assertTrue(loaded.load_from_db(db))
+        self.assertEqual(loaded.doc_count, self.index.doc_count)
+        self.assertEqual(loaded.postings["fresh"], {"9999": 1})
+        self.assertNotIn("3", loaded.doc_lens)
+        self.assertEqual(
+            [score for _, score in loaded.search(["term1"], top_k=5)],
+            [score for _, score in self.index.search(["term1"], top_k=5)],
+        )
+
+    def test_legacy_blob_is_migrated(self):
+        db = _ConnHolder()
+        db.conn.execute("CREATE TABLE bm25_index (key TEXT PRIMARY KEY, value TEXT)")
+        db.conn.execute(
+            "INSERT INTO bm25_index VALUES ('index_data', ?)",
+            (json.dumps({"k1": 1.2, "b": 0.7, "doc_keywords": {"1": ["alpha", "beta"], "2": ["beta"]}}),),
+        )
+
+        legacy = BM25Index()
+        self.assertTrue(legacy.load_from_db(db))
+        self.assertEqual(legacy.postings["beta"], {"1": 1, "2": 1})
+        legacy.save_to_db(db)
+        self.assertIsNone(db.conn.execute("SELECT value FROM bm25_index").fetchone())
+
+        reloaded = BM25Index()
+        self.assertTrue(reloaded.load_from_db(db))
+        self.assertEqual(reloaded.k1, 1.2)
+        self.assertEqual(reloaded.doc_count, 2)
+
+
+class TestHybridGraphSearchPersistence(unittest.TestCase):
+    def setUp(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_bm25_")
+        self.db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "memory.db"))
+        self._add_block(0, "deployment checklist")
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _add_block(self, i, context):
+        self.db.add_block({
+            "block_index": i,
+            "timestamp": f"2026-01-01T00:00:{i:02d}",
+            "context": context,
+            "keywords": context.split(),
+            "tags": [],
+            "embedding": [],
+            "importance": 0.5,
+            "hash": f"h{i}",
+            "prev_hash": f"h{i - 1}" if i else "",
+        })
+
+    def test_search_does_not_write_the_index(self):
+        from greeum.core.hybrid_graph_search import HybridGraphSearch
+
+        search = HybridGraphSearch(self.db)
+        self._add_block(1, "rollback plan")
+
+        changes = self.db.conn.total_changes
+        search.search("rollback", threshold=0.0)
+        self.assertEqual(self.db.conn.total_changes, changes)
+        self.assertFalse(self.db.conn.in_transaction)
+        self.assertEqual(search.bm25_index.search(["rollback"])[0][0], "1")
+        self.assertEqual(search.bm25_index.pending_writes, 1)
+
+        self.assertTrue(search.persist_bm25_index())
+        self.assertFalse(search.persist_bm25_index())
+        reloaded = BM25Index()
+        self.assertTrue(reloaded.load_from_db(self.db))
+        self.assertEqual(reloaded.doc_count, 2)
+
+
+class TestHybridScorerRank(unittest.TestCase):
+    def test_rank_fuses_vector_hits_and_bm25_candidates(self):
+        index = BM25Index()
+        index.add_document("1", ["apple", "pie"])
+        index.add_document("2", ["banana"])
+        index.add_document("3", ["apple"])
+        scorer = HybridScorer(index, vector_weight=0.5, bm25_weight=0.5)
+
+        ranked = scorer.rank(["apple"], vector_results=[("2", 0.9)], top_k=3)
+        self.assertEqual({doc_id for doc_id, _ in ranked}, {"1", "2", "3"})
+        self.assertEqual(ranked[0][0], "2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+"""Tests for the running-sum branch centroid store (v5.4)."""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from itertools import combinations
+from unittest.mock import patch
+
+import numpy as np
+
+from greeum.core.branch_centroids import BranchCentroidStore, _pairwise_distance_range
+from greeum.core.thread_safe_db import ThreadSafeDatabaseManager
+
+DIM = 16
+
+
+class TestBranchCentroidStore(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_branch_centroids_")
+        os.environ["GREEUM_SILENT_HASH_FALLBACK"] = "1"
+        self.db = ThreadSafeDatabaseManager(os.path.join(self._tmpdir, "memory.db"))
+        self.rng = np.random.default_rng(7)
+        self.axes = {"alpha": 0, "beta": 1, "gamma": 2}
+        self.vectors = {}
+        self.next_index = 0
+
+    def tearDown(self):
+        self.db.shutdown()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _insert(self, root: str, notify: bool = True) -> int:
+        index = self.next_index
+        self.next_index += 1
+        vector = self.rng.normal(0, 0.1, DIM).astype(np.float32)
+        vector[self.axes[root]] += 1.0
+        self.vectors[index] = (root, vector)
+        self.db.add_block({
+            "block_index": index,
+            "timestamp": "2026-01-01T00:00:00",
+            "context": f"{root} {index}",
+            "importance": 0.5,
+            "hash": hashlib.sha256(str(index).encode()).hexdigest(),
+            "prev_hash": "",
+            "root": root,
+            "embedding": vector.tolist(),
+        })
+        if notify:
+            self.db.branch_centroids.add(root, index, vector)
+        return index
+
+    def _expected(self):
+        by_root = {}
+        for root, vector in self.vectors.values():
+            by_root.setdefault(root, []).append(vector)
+        return {root: np.mean(vectors, axis=0) for root, vectors in by_root.items()}
+
+    def _assert_centroids(self, store):
+        actual = store.centroids()
+        expected = self._expected()
+        self.assertEqual(set(actual), set(expected))
+        for root, centroid in expected.items():
+            np.testing.assert_allclose(actual[root], centroid, rtol=1e-5, atol=1e-6)
+
+    def test_initial_scan_covers_every_block_and_is_persisted(self):
+        for i in range(150):
+            self._insert(("alpha", "beta")[i % 2], notify=False)
+
+        store = self.db.branch_centroids
+        self._assert_centroids(store)
+        self.assertEqual(store.stats["scanned_blocks"], 150)
+
+        # The next local write persists the scanned sums along with its own
+        self._insert("gamma")
+        reloaded = BranchCentroidStore(self.db)
+        self._assert_centroids(reloaded)
+        self.assertEqual(reloaded.stats["scanned_blocks"], 0)
+
+    def test_incremental_add_replace_and_external_writes(self):
+        for i in range(9):
+            self._insert(("alpha", "beta", "gamma")[i % 3])
+        store = self.db.branch_centroids
+        self._assert_centroids(store)
+
+        # Knowledge update: swap one block's embedding in place
+        root, old = self.vectors[4]
+        new = old.copy()
+        new[self.axes["alpha"]] += 0.5
+        self.vectors[4] = (root, new)
+        store.replace(root, 4, old, new)
+        self._assert_centroids(store)
+
+        # A block written by another writer is folded in through the gap check
+        self._insert("alpha", notify=False)
+        self._insert("beta")
+        self._assert_centroids(store)
+        self.assertEqual(store.get_stats()["pending_rows"], 0)
+
+        reloaded = BranchCentroidStore(self.db)
+        self._assert_centroids(reloaded)
+
+    def test_concurrent_writers_keep_each_others_deltas(self):
+        for i in range(6):
+            self._insert(("alpha", "beta")[i % 2])
+        first = self.db.branch_centroids
+        second = BranchCentroidStore(self.db)  # another process on the same file
+        self._assert_centroids(second)
+
+        # Knowledge update through the first store, on the write transaction
+        root, old = self.vectors[2]
+        new = old.copy()
+        new[self.axes["beta"]] += 0.8
+        self.vectors[2] = (root, new)
+        self.db.conn.execute(
+            "UPDATE block_embeddings SET embedding = ? WHERE block_index = 2", (new.tobytes(),)
+        )
+        first.replace(root, 2, old, new, conn=self.db.conn)
+        self.db.conn.commit()
+
+        # The second store's next write must not persist its stale "alpha" sum
+        index = self._insert("alpha", notify=False)
+        second.add("alpha", index, self.vectors[index][1])
+        self._assert_centroids(second)
+        self._assert_centroids(BranchCentroidStore(self.db))
+        self.assertEqual(second.stats["rebuilds"], 0)
+
+    def test_in_place_reembed_triggers_rebuild(self):
+        for i in range(6):
+            self._insert(("alpha", "gamma")[i % 2])
+        store = self.db.branch_centroids
+        self._assert_centroids(store)
+
+        # Migration / doctor style rewrite that bypasses the store
+        conn = sqlite3.connect(os.path.join(self._tmpdir, "memory.db"))
+        with conn:
+            for index in (1, 4):
+                root, vector = self.vectors[index]
+                vector = -vector
+                self.vectors[index] = (root, vector)
+                conn.execute(
+                    "UPDATE block_embeddings SET embedding = ? WHERE block_index = ?",
+                    (vector.tobytes(), index),
+                )
+        conn.close()
+
+        # A fresh process validates the persisted rows against the change log
+        self._assert_centroids(BranchCentroidStore(self.db))
+        store.sync()
+        self._assert_centroids(store)
+        self.assertEqual(store.stats["rebuilds"], 1)
+
+        # The rebuilt sums are written back on the next local write
+        self._insert("gamma")
+        reloaded = BranchCentroidStore(self.db)
+        self._assert_centroids(reloaded)
+        self.assertEqual(reloaded.stats["rebuilds"], 0)
+
+    def test_routing_matches_pairwise_loop(self):
+        for i in range(12):
+            self._insert(("alpha", "beta", "gamma")[i % 3])
+        store = self.db.branch_centroids
+
+        query = np.zeros(DIM, dtype=np.float32)
+        query[self.axes["beta"]] = 1.0
+        root, score = store.best_match(query)
+        self.assertEqual(root, "beta")
+        self.assertGreater(score, 0.9)
+        self.assertEqual(store.best_match(np.ones(DIM + 1)), (None, 0.0))
+
+        centroids = self._expected()
+        distances = [
+            1 - np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+            for a, b in combinations(centroids.values(), 2)
+        ]
+        max_distance, min_distance = store.spread()
+        self.assertAlmostEqual(max_distance, max(distances), places=5)
+        self.assertAlmostEqual(min_distance, min(distances), places=5)
+
+    def test_blocked_pairwise_range(self):
+        unit = self.rng.normal(size=(37, DIM))
+        unit /= np.linalg.norm(unit, axis=1, keepdims=True)
+        full = 1 - unit @ unit.T
+        upper = full[np.triu_indices(len(unit), k=1)]
+        max_distance, min_distance = _pairwise_distance_range(unit, block=5)
+        self.assertAlmostEqual(max_distance, upper.max())
+        self.assertAlmostEqual(min_distance, upper.min())
+        self.assertIsNone(_pairwise_distance_range(unit[:1]))
+
+    def test_branch_aware_storage_routes_by_centroid(self):
+        from greeum.core.branch_aware_storage import BranchAwareStorage
+
+        for i in range(6):
+            self._insert(("alpha", "gamma")[i % 2])
+        storage = BranchAwareStorage(self.db, branch_index_manager=None)
+        query = np.zeros(DIM, dtype=np.float32)
+        query[self.axes["gamma"]] = 1.0
+
+        with patch.dict(os.environ, {"GREEUM_USE_LLM_CLASSIFIER": "false"}):
+            branch, score, _, create_new = storage.find_best_branch_for_memory("gamma note", query)
+
+        self.assertEqual(branch, "gamma")
+        self.assertFalse(create_new)
+        self.assertGreaterEqual(score, storage.dynamic_threshold)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,16 +4,22 @@ import json
 import os
 import sqlite3
 import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import numpy as np
 
 from greeum.consolidator.config import ConsolidatorConfig
 from greeum.consolidator.db import ConsolidatorDB
 from greeum.consolidator.state import StateManager, ComparisonRecord
-from greeum.consolidator.candidates import select_candidates, CandidatePair
+from greeum.consolidator.candidates import (
+    select_candidates, select_queue_candidates, CandidatePair, EmbeddingMatrix,
+)
 from greeum.consolidator.context_gatherer import ContextGatherer, BlockContext
 from greeum.consolidator.judge import ConsolidationJudge, Verdict
+from greeum.consolidator.loop import ConsolidationLoop
 from greeum.consolidator.llm_client import LLMResponse
 from greeum.consolidator.prompts import build_deliberation_prompt
 from greeum.consolidator.writer import AssociationWriter
@@ -377,6 +383,102 @@ class TestCandidateSelection(unittest.TestCase):
         candidates = select_candidates(self.db, self.state, min_cosine_similarity=0.3, max_pairs=10)
         self.assertEqual(len(candidates), 0)
 
+    def _brute_force(self, embeddings, exclude, min_sim, max_pairs, pending=None):
+        ids = sorted(embeddings)
+        pairs = []
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:]:
+                if pending is not None and a not in pending and b not in pending:
+                    continue
+                ea, eb = embeddings[a], embeddings[b]
+                if ea.shape != eb.shape:
+                    continue
+                sim = float(ea @ eb / (np.linalg.norm(ea) * np.linalg.norm(eb)))
+                if sim >= min_sim and (a, b) not in exclude:
+                    pairs.append((round(sim, 5), a, b))
+        pairs.sort(key=lambda p: (-p[0], p[1], p[2]))
+        return [(a, b) for _, a, b in pairs[:max_pairs]]
+
+    def test_blocked_selection_matches_full_matrix(self):
+        rng = np.random.default_rng(7)
+        embeddings = {idx: rng.standard_normal(8).astype(np.float32) for idx in range(1, 61)}
+        embeddings.update({idx: rng.standard_normal(4).astype(np.float32) for idx in range(100, 110)})
+        for idx, emb in embeddings.items():
+            self._insert_embedding(idx, emb)
+        exclude = {(1, 2), (3, 40), (5, 6), (100, 101)}
+        for a, b in exclude:
+            self.state.record_comparison(ComparisonRecord(
+                block_a=a, block_b=b, cosine_similarity=0.5,
+                verdict="rejected", connection_type=None,
+                strength=None, justification="Test", association_id=None,
+                llm_model="test", prompt_tokens=0, completion_tokens=0,
+                latency_ms=0, compared_at="2026-01-01",
+            ))
+
+        candidates = select_candidates(self.db, self.state, min_cosine_similarity=0.2, max_pairs=25, block_size=7)
+        self.assertEqual(
+            {(c.block_a, c.block_b) for c in candidates},
+            set(self._brute_force(embeddings, exclude, 0.2, 25)),
+        )
+        sims = [c.cosine_similarity for c in candidates]
+        self.assertEqual(sims, sorted(sims, reverse=True))
+
+        pending = {4, 17, 103}
+        queued = select_queue_candidates(
+            self.db, self.state, sorted(pending), min_cosine_similarity=0.2, max_pairs=15, block_size=2,
+        )
+        self.assertEqual(
+            {(c.block_a, c.block_b) for c in queued},
+            set(self._brute_force(embeddings, exclude, 0.2, 15, pending=pending)),
+        )
+        sims = [c.cosine_similarity for c in queued]
+        self.assertEqual(sims, sorted(sims, reverse=True))
+
+    def test_embedding_matrix_is_reused(self):
+        self._insert_embedding(1, [1.0, 0.0, 0.0])
+        self._insert_embedding(2, [0.9, 0.1, 0.0])
+        matrix = EmbeddingMatrix()
+
+        select_candidates(self.db, self.state, max_pairs=10, matrix=matrix)
+        select_candidates(self.db, self.state, max_pairs=10, matrix=matrix)
+        self.assertEqual(matrix.stats, {"full_loads": 1, "incremental_loads": 0, "cache_hits": 1})
+
+        self._insert_embedding(3, [0.8, 0.2, 0.0])
+        candidates = select_candidates(self.db, self.state, max_pairs=10, matrix=matrix)
+        self.assertEqual(matrix.stats["incremental_loads"], 1)
+        self.assertEqual(len(matrix), 3)
+        self.assertEqual(len(candidates), 3)
+
+        self.db.conn.execute("DELETE FROM block_embeddings WHERE block_index = 1")
+        self.db.conn.commit()
+        candidates = select_candidates(self.db, self.state, max_pairs=10, matrix=matrix)
+        self.assertEqual(matrix.stats["full_loads"], 2)
+        self.assertEqual([(c.block_a, c.block_b) for c in candidates], [(2, 3)])
+
+    def test_embedding_matrix_sees_in_place_reembed(self):
+        from greeum.core.change_log import ensure_change_log_schema
+
+        ensure_change_log_schema(self.db.conn.cursor())
+        self.db.conn.commit()
+        self._insert_embedding(0, [1.0, 0.0, 0.0])
+        self._insert_embedding(1, [0.0, 1.0, 0.0])
+        self._insert_embedding(2, [0.0, 0.0, 1.0])
+        matrix = EmbeddingMatrix()
+        self.assertEqual(select_candidates(self.db, self.state, min_cosine_similarity=0.5, matrix=matrix), [])
+
+        # Knowledge update rewrites the vector; count, max index and models stay the same
+        self.db.conn.execute(
+            "UPDATE block_embeddings SET embedding = ? WHERE block_index = 2",
+            (np.array([1.0, 0.0, 0.0], dtype=np.float32).tobytes(),),
+        )
+        self.db.conn.commit()
+
+        candidates = select_candidates(self.db, self.state, min_cosine_similarity=0.5, matrix=matrix)
+        self.assertEqual([(c.block_a, c.block_b) for c in candidates], [(0, 2)])
+        self.assertAlmostEqual(candidates[0].cosine_similarity, 1.0, places=5)
+        self.assertEqual(matrix.stats["full_loads"], 1)
+        self.assertEqual(matrix.stats["incremental_loads"], 1)
+
 
 class TestPromptBuilder(unittest.TestCase):
     """Test the deliberation prompt builder."""
@@ -501,6 +603,111 @@ class TestConfig(unittest.TestCase):
             del os.environ["GREEUM_CONSOLIDATOR_MODEL"]
 
 
+class _StubLLMHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat endpoint that tracks concurrent requests."""
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.05)
+        with cls.lock:
+            cls.active -= 1
+
+        if "unreachable" in body["messages"][1]["content"]:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        payload = json.dumps({
+            "model": "stub",
+            "choices": [{"message": {"content": "VERDICT: CONNECT\nTYPE: semantic\nSTRENGTH: 0.8\nREASONING: Stub."}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class TestConcurrentDeliberation(unittest.TestCase):
+    """run_once against a local stub LLM server."""
+
+    def setUp(self):
+        _StubLLMHandler.active = _StubLLMHandler.peak = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubLLMHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        self.tmp.close()
+        self.db = db = ConsolidatorDB(self.tmp.name)
+        TestCandidateSelection._create_schema(self)
+        rng = np.random.default_rng(3)
+        for idx in range(1, 6):
+            content = "unreachable block" if idx == 5 else f"Block {idx} content"
+            db.conn.execute(
+                "INSERT INTO blocks VALUES (?, '2026-01-01', ?, 0.5, '', '', NULL)", (idx, content)
+            )
+            emb = (rng.random(4) + 0.5).astype(np.float32)
+            db.conn.execute(
+                "INSERT INTO block_embeddings VALUES (?, ?, 'test', 4)", (idx, emb.tobytes())
+            )
+        db.conn.commit()
+        db.close()
+
+        self.config = ConsolidatorConfig(
+            db_path=self.tmp.name,
+            ollama_url=f"http://127.0.0.1:{self.server.server_port}",
+            concurrency=4,
+            write_batch_size=3,
+        )
+        self.loop = ConsolidationLoop(self.config)
+
+    def tearDown(self):
+        self.loop.close()
+        self.server.shutdown()
+        self.server.server_close()
+        os.unlink(self.tmp.name)
+
+    def test_run_once_judges_pairs_concurrently(self):
+        report = self.loop.run_once(max_pairs=10)
+
+        self.assertEqual(report.total_candidates, 10)
+        self.assertEqual(report.processed, 10)
+        # Every pair with block 5 fails at the LLM and is deferred
+        self.assertEqual(report.deferred, 4)
+        self.assertEqual(report.connected, 6)
+        self.assertGreater(_StubLLMHandler.peak, 1)
+        self.assertLessEqual(_StubLLMHandler.peak, 4)
+
+        self.assertEqual(sum(batch["pairs"] for batch in report.batches), 10)
+        self.assertGreaterEqual(len(report.batches), 2)
+        self.assertEqual(len(report.latencies_ms), 6)
+        self.assertGreaterEqual(report.latency_percentile(95), report.latency_percentile(50))
+        self.assertGreater(report.latency_percentile(50), 0)
+
+        stats = self.loop.state.get_stats()
+        self.assertEqual(stats["total"], 10)
+        self.assertEqual(stats["deferred"], 4)
+        self.assertEqual(len(self.loop.db.get_existing_association_pairs()), 6)
+
+
 class TestConsolidationQueueTable(unittest.TestCase):
     """Test the consolidation_queue table creation via StateManager."""
 
@@ -0,0 +1,180 @@
+"""Tests for the float32 L1 embedding cache and the persistent SQLite tier (v5.4)."""
+from __future__ import annotations
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from greeum.embedding_cache import PersistentEmbeddingCache, get_persistent_embedding_cache
+from greeum.embedding_models import EmbeddingConfig, LRUEmbeddingCache, SentenceTransformerModel
+
+
+class _CountingEncoder:
+    """Deterministic ``SentenceTransformer.encode`` stand-in (384-dim)."""
+
+    dim = 384
+
+    def __init__(self):
+        self.encoded = []
+
+    def _vector(self, text):
+        seed = int.from_bytes(text.encode("utf-8")[:8].ljust(8, b"\0"), "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, show_progress_bar=None):
+        if isinstance(sentences, str):
+            self.encoded.append(sentences)
+            return self._vector(sentences)
+        self.encoded.extend(sentences)
+        return np.stack([self._vector(s) for s in sentences])
+
+
+class TestLRUEmbeddingCache(unittest.TestCase):
+    def test_stores_read_only_float32_and_evicts_lru(self):
+        cache = LRUEmbeddingCache(max_size=2)
+        cache.put("a", [0.5, 0.25])
+        cache.put("b", [1.0, 0.0])
+        self.assertIsNotNone(cache.get("a"))
+        cache.put("c", [0.0, 1.0])  # evicts "b"
+
+        vector = cache.get("a")
+        self.assertEqual(vector.dtype, np.float32)
+        self.assertFalse(vector.flags.writeable)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats(), {"size": 2, "max_size": 2})
+
+
+class TestPersistentEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_embedding_cache_")
+        self.path = Path(self._tmpdir) / "embedding_cache.db"
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def test_bulk_round_trip_keyed_by_model_and_prefix(self):
+        writer = PersistentEmbeddingCache(self.path)
+        writer.put_many("e5", "query: ", [("alpha", [0.6, 0.8]), ("beta", np.array([1.0, 0.0]))])
+
+        # A second handle on the same file stands in for another process
+        reader = PersistentEmbeddingCache(self.path)
+        alpha, missing, beta = reader.get_many("e5", "query: ", ["alpha", "gamma", "beta"])
+        self.assertEqual(alpha.dtype, np.float32)
+        np.testing.assert_array_equal(alpha, np.array([0.6, 0.8], dtype=np.float32))
+        self.assertIsNone(missing)
+        np.testing.assert_array_equal(beta, [1.0, 0.0])
+        self.assertIsNone(reader.get("e5", "", "alpha"))
+        self.assertIsNone(reader.get("minilm", "query: ", "alpha"))
+
+        stats = reader.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 3))
+        self.assertEqual(stats["size"], 2)
+        writer.close()
+        reader.close()
+
+    def test_size_cap_evicts_least_recently_used(self):
+        cache = PersistentEmbeddingCache(self.path, max_entries=3)
+        with patch("greeum.embedding_cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0, 5.0]):
+            for name in ("a", "b", "c"):
+                cache.put("m", "", name, [1.0])
+            cache.get("m", "", "a")  # "b" is now the oldest
+            cache.put("m", "", "d", [1.0])
+
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get("m", "", "b"))
+        self.assertIsNotNone(cache.get("m", "", "a"))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+        cache.close()
+
+    def test_hits_update_last_used_in_batches(self):
+        cache = PersistentEmbeddingCache(self.path)
+        cache.put("m", "", "a", [1.0])
+        statements = []
+        cache._conn.set_trace_callback(statements.append)
+        for _ in range(3):
+            self.assertIsNotNone(cache.get("m", "", "a"))
+        self.assertFalse([s for s in statements if s.startswith("UPDATE")])
+
+        with patch("greeum.embedding_cache.time.time", return_value=1e10):
+            cache.get("m", "", "a")
+        cache.flush()
+        self.assertEqual(len([s for s in statements if s.startswith("UPDATE")]), 1)
+        (last_used,) = cache._conn.execute("SELECT last_used FROM embedding_cache").fetchone()
+        self.assertEqual(last_used, 1e10)
+        cache.close()
+
+    def test_busy_database_skips_instead_of_disabling(self):
+        with patch.dict(os.environ, {"GREEUM_SQLITE_TIMEOUT": "0.05"}):
+            cache = PersistentEmbeddingCache(self.path)
+        cache.put("m", "", "a", [1.0])
+
+        other = sqlite3.connect(str(self.path), isolation_level=None)
+        other.execute("BEGIN EXCLUSIVE")  # another process mid-write
+        try:
+            cache.put("m", "", "b", [2.0])
+            self.assertIsNotNone(cache.get("m", "", "a"))  # WAL readers are not blocked
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+
+        self.assertTrue(cache.enabled)
+        self.assertEqual(cache.get_stats()["busy"], 1)
+        cache.put("m", "", "b", [2.0])
+        self.assertIsNotNone(cache.get("m", "", "b"))
+        cache.close()
+
+    def test_registry_follows_data_dir_and_env_switch(self):
+        with patch.dict(os.environ, {"GREEUM_DATA_DIR": self._tmpdir}):
+            os.environ.pop("GREEUM_EMBED_CACHE_DB", None)
+            cache = get_persistent_embedding_cache()
+            self.assertEqual(cache.path, self.path)
+            self.assertIs(get_persistent_embedding_cache(str(self.path)), cache)
+        with patch.dict(os.environ, {"GREEUM_EMBED_CACHE": "0"}):
+            self.assertIsNone(get_persistent_embedding_cache(str(self.path)))
+
+
+class TestSentenceTransformerDiskTier(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_embedding_cache_st_")
+        self.path = os.path.join(self._tmpdir, "embedding_cache.db")
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _model(self):
+        config = EmbeddingConfig(batch_size=8, persistent_cache_path=self.path)
+        model = SentenceTransformerModel("intfloat/multilingual-e5-small", config)
+        model.model = _CountingEncoder()
+        model._dimension = _CountingEncoder.dim
+        model._needs_padding = True
+        return model
+
+    def test_vectors_survive_a_restart(self):
+        first = self._model()
+        batch = first.batch_encode(["alpha", "beta", "alpha"])
+        single = first.encode("gamma")
+        self.assertEqual(first.model.encoded, ["query: alpha", "query: beta", "query: gamma"])
+
+        # A fresh model (new process) reads the vectors back without encoding
+        restarted = self._model()
+        matrix = restarted.batch_encode(["beta", "alpha", "delta"], as_numpy=True)
+        self.assertEqual(restarted.encode("gamma"), single)
+        self.assertEqual(restarted.model.encoded, ["query: delta"])
+
+        np.testing.assert_array_equal(matrix[0], np.asarray(batch[1], dtype=np.float32))
+        np.testing.assert_array_equal(matrix[1], np.asarray(batch[0], dtype=np.float32))
+        self.assertAlmostEqual(float(np.linalg.norm(matrix[2])), 1.0, places=5)
+
+        stats = restarted.get_performance_stats()
+        self.assertEqual(stats["cache_hits"], 3)
+        self.assertEqual(stats["disk_cache"]["size"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
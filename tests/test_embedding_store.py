@@ -0,0 +1,305 @@
+"""Tests for the in-memory embedding matrix used by search_blocks_by_embedding (v5.4)."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+
+from greeum.core.embedding_store import EmbeddingMatrixStore
+
+
+def _brute_force(rows, query, top_k):
+    query = query / np.linalg.norm(query)
+    scored = []
+    for block_index, vector in rows.items():
+        if vector.shape != query.shape:
+            continue
+        scored.append((block_index, float(np.dot(vector / np.linalg.norm(vector), query))))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:top_k]
+
+
+class TestEmbeddingMatrixStore(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("""
+            CREATE TABLE block_embeddings (
+                block_index INTEGER PRIMARY KEY,
+                embedding BLOB,
+                embedding_model TEXT,
+                embedding_dim INTEGER
+            )
+        """)
+        self.rng = np.random.default_rng(7)
+        self.rows = {}
+        for block_index in range(200):
+            dim = 8 if block_index % 10 else 4  # a few rows from a different model
+            self._insert(block_index, self.rng.standard_normal(dim).astype(np.float32))
+        self.store = EmbeddingMatrixStore()
+
+    def _insert(self, block_index, vector):
+        self.rows[block_index] = vector
+        self.conn.execute(
+            "INSERT OR REPLACE INTO block_embeddings VALUES (?, ?, 'test', ?)",
+            (block_index, vector.tobytes(), len(vector)),
+        )
+
+    def test_matches_brute_force(self):
+        query = self.rng.standard_normal(8).astype(np.float32)
+        got = self.store.search(self.conn, query, top_k=10)
+        expected = _brute_force(self.rows, query, 10)
+        self.assertEqual([b for b, _ in got], [b for b, _ in expected])
+        for (_, a), (_, b) in zip(got, expected):
+            self.assertAlmostEqual(a, b, places=5)
+
+    def test_dimension_mismatch_rows_are_skipped(self):
+        query = self.rng.standard_normal(4).astype(np.float32)
+        got = self.store.search(self.conn, query, top_k=50)
+        self.assertEqual(len(got), 20)
+        self.assertTrue(all(block_index % 10 == 0 for block_index, _ in got))
+
+    def test_upsert_and_remove(self):
+        query = self.rng.standard_normal(8).astype(np.float32)
+        self.store.search(self.conn, query, top_k=1)
+
+        self.store.upsert(5, query * 3.0)
+        self.assertEqual(self.store.search(self.conn, query, top_k=1)[0][0], 5)
+
+        self.store.remove(5)
+        self.assertNotIn(5, [b for b, _ in self.store.search(self.conn, query, top_k=200)])
+
+    def test_external_rows_caught_up(self):
+        query = self.rng.standard_normal(8).astype(np.float32)
+        self.store.search(self.conn, query, top_k=1)
+
+        self._insert(500, query.copy())
+        got = self.store.search(self.conn, query, top_k=1)
+        self.assertEqual(got[0][0], 500)
+        self.assertEqual(self.store.get_stats()["catch_up_rows"], 1)
+
+    def test_min_similarity(self):
+        query = self.rng.standard_normal(8).astype(np.float32)
+        got = self.store.search(self.conn, query, top_k=200, min_similarity=0.5)
+        self.assertTrue(all(score >= 0.5 for _, score in got))
+
+
+class TestANNAndSnapshot(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_ann_")
+        self.conn = sqlite3.connect(os.path.join(self._tmpdir, "memory.db"))
+        self.conn.execute("""
+            CREATE TABLE block_embeddings (
+                block_index INTEGER PRIMARY KEY,
+                embedding BLOB,
+                embedding_model TEXT,
+                embedding_dim INTEGER
+            )
+        """)
+        rng = np.random.default_rng(11)
+        centers = rng.standard_normal((20, 16)).astype(np.float32)
+        self.vectors = (
+            centers[rng.integers(0, 20, 2000)] + 0.3 * rng.standard_normal((2000, 16))
+        ).astype(np.float32)
+        self.conn.executemany(
+            "INSERT INTO block_embeddings VALUES (?, ?, 'test', 16)",
+            [(i, v.tobytes()) for i, v in enumerate(self.vectors)],
+        )
+        self.conn.commit()
+        self.queries = self.vectors[:20] + 0.05 * rng.standard_normal((20, 16)).astype(np.float32)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _store(self, **settings):
+        store = EmbeddingMatrixStore(snapshot_path=os.path.join(self._tmpdir, "memory.db.embeddings.npz"))
+        store.ann_settings.update({"backend": "numpy", "min_rows": 500, "nlist": 32, "nprobe": 8})
+        store.ann_settings.update(settings)
+        store.save_delay = 60.0  # tests save explicitly, as close() does
+        return store
+
+    def test_ivf_recall(self):
+        store = self._store()
+        exact = self._store(backend="off")
+        hits = 0
+        for query in self.queries:
+            approx = {b for b, _ in store.search(self.conn, query, top_k=10)}
+            truth = {b for b, _ in exact.search(self.conn, query, top_k=10)}
+            hits += len(approx & truth)
+        self.assertEqual(store.get_stats()["ann_groups"], {16: "numpy-ivf"})
+        self.assertGreaterEqual(hits / (10 * len(self.queries)), 0.9)
+
+    def test_snapshot_roundtrip(self):
+        store = self._store()
+        expected = store.search(self.conn, self.queries[0], top_k=5)
+        # Training schedules the save instead of writing inside the search
+        self.assertFalse(os.path.exists(store.snapshot_path))
+        self.assertTrue(store.save())
+        self.assertTrue(os.path.exists(store.snapshot_path))
+
+        # New row after the snapshot must be caught up on reload
+        self.conn.execute(
+            "INSERT INTO block_embeddings VALUES (?, ?, 'test', 16)",
+            (5000, self.queries[0].tobytes()),
+        )
+        self.conn.commit()
+
+        reloaded = self._store()
+        got = reloaded.search(self.conn, self.queries[0], top_k=6)
+        self.assertEqual(reloaded.get_stats()["load_source"], "snapshot")
+        self.assertEqual(reloaded.get_stats()["ann_trainings"], 0)
+        self.assertEqual(got[0][0], 5000)
+        self.assertEqual([b for b, _ in got[1:]], [b for b, _ in expected])
+
+    def test_snapshot_ignored_when_database_reset(self):
+        store = self._store()
+        store.search(self.conn, self.queries[0], top_k=5)
+        store.save()
+        self.conn.execute("DELETE FROM block_embeddings WHERE block_index > 100")
+        self.conn.commit()
+
+        reloaded = self._store()
+        reloaded.search(self.conn, self.queries[0], top_k=5)
+        self.assertEqual(reloaded.get_stats()["load_source"], "database")
+        self.assertEqual(reloaded.get_stats()["rows"], 101)
+
+    def test_background_save_after_training(self):
+        store = self._store()
+        store.save_delay = 0.0
+        store.search(self.conn, self.queries[0], top_k=5)
+        timer = store._save_timer
+        self.assertIsNotNone(timer)
+        timer.join(5)
+        self.assertTrue(os.path.exists(store.snapshot_path))
+        self.assertEqual(store.get_stats()["snapshot_saves"], 1)
+        self.assertFalse(store.save())  # nothing new since the background save
+
+
+class TestManagersUseEmbeddingStore(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_embstore_")
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _check_manager(self, manager):
+        vectors = np.eye(4, dtype=np.float32)
+        for block_index, vector in enumerate(vectors):
+            manager.add_block({
+                "block_index": block_index,
+                "timestamp": "2026-01-01T00:00:00",
+                "context": f"block {block_index}",
+                "keywords": [],
+                "tags": [],
+                "embedding": vector.tolist(),
+                "importance": 0.5,
+                "hash": f"h{block_index}",
+                "prev_hash": "",
+            })
+            # First search loads the matrix; later inserts go through upsert
+            results = manager.search_blocks_by_embedding(vector.tolist(), top_k=1)
+            self.assertEqual(results[0]["block_index"], block_index)
+            self.assertAlmostEqual(results[0]["similarity"], 1.0, places=5)
+
+        self.assertEqual(manager.embedding_store.get_stats()["rows"], 4)
+
+    def test_legacy_manager(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        manager = DatabaseManager(connection_string=os.path.join(self._tmpdir, "legacy.db"))
+        try:
+            self._check_manager(manager)
+        finally:
+            manager.close()
+
+    def test_thread_safe_manager(self):
+        from greeum.core.thread_safe_db import ThreadSafeDatabaseManager
+
+        manager = ThreadSafeDatabaseManager(connection_string=os.path.join(self._tmpdir, "ts.db"))
+        try:
+            self._check_manager(manager)
+        finally:
+            manager.close()
+
+    def _add_blocks(self, manager, vectors):
+        for block_index, vector in enumerate(vectors):
+            manager.add_block({
+                "block_index": block_index,
+                "timestamp": "2026-01-01T00:00:00",
+                "context": f"block {block_index}",
+                "keywords": [],
+                "tags": [],
+                "embedding": vector.tolist(),
+                "importance": 0.5,
+                "hash": f"h{block_index}",
+                "prev_hash": "",
+            })
+
+    @staticmethod
+    def _rewrite_embeddings(db_path, vectors):
+        """Re-embed every block in place, as another process or a migration would."""
+        conn = sqlite3.connect(db_path)
+        with conn:
+            for block_index, vector in enumerate(vectors):
+                conn.execute(
+                    "UPDATE block_embeddings SET embedding = ?, embedding_dim = ? WHERE block_index = ?",
+                    (vector.tobytes(), len(vector), block_index),
+                )
+        conn.close()
+
+    def test_in_place_reembed_detected_after_reopen(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        db_path = os.path.join(self._tmpdir, "reembed.db")
+        old = np.eye(5, dtype=np.float32)
+        new = np.roll(old, 2, axis=0)  # new[3] == old[1]
+
+        manager = DatabaseManager(connection_string=db_path)
+        self._add_blocks(manager, old)
+        self.assertEqual(manager.search_blocks_by_embedding(old[1].tolist(), top_k=1)[0]["block_index"], 1)
+        manager.close()
+        self.assertTrue(os.path.exists(f"{db_path}.embeddings.npz"))
+
+        self._rewrite_embeddings(db_path, new)
+
+        manager = DatabaseManager(connection_string=db_path)
+        try:
+            results = manager.search_blocks_by_embedding(new[3].tolist(), top_k=1)
+            self.assertEqual(results[0]["block_index"], 3)
+            stats = manager.embedding_store.get_stats()
+            self.assertEqual(stats["load_source"], "snapshot")
+            self.assertEqual(stats["rewritten_rows"], 5)
+        finally:
+            manager.close()
+
+    def test_in_place_reembed_seen_by_running_manager(self):
+        from greeum.core.thread_safe_db import ThreadSafeDatabaseManager
+
+        db_path = os.path.join(self._tmpdir, "running.db")
+        old = np.eye(5, dtype=np.float32)
+        new = np.roll(old, 2, axis=0)
+
+        manager = ThreadSafeDatabaseManager(connection_string=db_path)
+        try:
+            self._add_blocks(manager, old)
+            manager.search_blocks_by_embedding(old[0].tolist(), top_k=1)
+
+            self._rewrite_embeddings(db_path, new)
+            # Deleted rows disappear from the matrix as well
+            conn = sqlite3.connect(db_path)
+            with conn:
+                conn.execute("DELETE FROM block_embeddings WHERE block_index = 4")
+            conn.close()
+
+            results = manager.search_blocks_by_embedding(new[3].tolist(), top_k=5)
+            self.assertEqual(results[0]["block_index"], 3)
+            self.assertNotIn(4, [r["block_index"] for r in results])
+        finally:
+            manager.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Tests for FTS5-backed search_blocks_by_keyword (v5.4)."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from greeum.core.fts_index import FTS_TABLE, ensure_fts_schema, search_fts
+
+
+def _block(block_index, context, keywords):
+    return {
+        "block_index": block_index,
+        "timestamp": f"2026-01-01T00:00:{block_index:02d}",
+        "context": context,
+        "keywords": keywords,
+        "tags": [],
+        "embedding": [],
+        "importance": 0.5,
+        "hash": f"h{block_index}",
+        "prev_hash": "",
+    }
+
+
+class TestKeywordSearchFTS(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_fts_")
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _populate(self, manager):
+        manager.add_block(_block(0, "데이터베이스 마이그레이션 계획을 세웠다", ["마이그레이션"]))
+        manager.add_block(_block(1, "Refactored the Database layer", ["refactor"]))
+        manager.add_block(_block(2, "database database database tuning notes", ["database"]))
+        manager.add_block(_block(3, "점심 메뉴 고민", ["점심"]))
+
+    def _check(self, manager):
+        self.assertTrue(manager._fts_enabled)
+        self._populate(manager)
+
+        # Case-insensitive substring match, ranked by bm25 (keyword column weighted)
+        results = manager.search_blocks_by_keyword(["database"], limit=10)
+        self.assertEqual([b["block_index"] for b in results][0], 2)
+        self.assertEqual({b["block_index"] for b in results}, {1, 2})
+
+        # Korean substring inside a longer word
+        results = manager.search_blocks_by_keyword(["마이그레이션"], limit=10)
+        self.assertEqual([b["block_index"] for b in results], [0])
+
+        # Two-character Korean term falls back to LIKE on the FTS table
+        results = manager.search_blocks_by_keyword(["점심"], limit=10)
+        self.assertEqual([b["block_index"] for b in results], [3])
+
+        # LIMIT applied in SQL
+        self.assertEqual(len(manager.search_blocks_by_keyword(["database", "마이그레이션"], limit=1)), 1)
+
+    def test_legacy_manager(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        manager = DatabaseManager(connection_string=os.path.join(self._tmpdir, "legacy.db"))
+        try:
+            self._check(manager)
+        finally:
+            manager.close()
+
+    def test_thread_safe_manager(self):
+        from greeum.core.thread_safe_db import ThreadSafeDatabaseManager
+
+        manager = ThreadSafeDatabaseManager(connection_string=os.path.join(self._tmpdir, "ts.db"))
+        try:
+            self._check(manager)
+        finally:
+            manager.close()
+
+    def test_triggers_follow_direct_updates(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        manager = DatabaseManager(connection_string=os.path.join(self._tmpdir, "trig.db"))
+        try:
+            self._populate(manager)
+            manager.conn.execute("UPDATE blocks SET context = 'completely rewritten' WHERE block_index = 3")
+            manager.conn.execute("INSERT INTO block_keywords (block_index, keyword) VALUES (3, 'lunchbox')")
+            manager.conn.commit()
+
+            self.assertEqual([b["block_index"] for b in manager.search_blocks_by_keyword(["rewritten"])], [3])
+            self.assertEqual([b["block_index"] for b in manager.search_blocks_by_keyword(["lunchbox"])], [3])
+            self.assertEqual(manager.search_blocks_by_keyword(["점심 메뉴"]), [])
+        finally:
+            manager.close()
+
+
+class TestFTSBackfill(unittest.TestCase):
+    def test_existing_rows_backfilled(self):
+        conn = sqlite3.connect(":memory:")
+        conn.executescript("""
+            CREATE TABLE blocks (block_index INTEGER PRIMARY KEY, context TEXT NOT NULL);
+            CREATE TABLE block_keywords (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                         block_index INTEGER NOT NULL, keyword TEXT NOT NULL);
+            INSERT INTO blocks VALUES (1, 'pre-existing memory about gardening');
+            INSERT INTO block_keywords (block_index, keyword) VALUES (1, 'tomatoes');
+        """)
+        self.assertTrue(ensure_fts_schema(conn.cursor()))
+        self.assertEqual(conn.execute(f"SELECT count(*) FROM {FTS_TABLE}").fetchone()[0], 1)
+        self.assertEqual([b for b, _ in search_fts(conn.cursor(), ["tomatoes"])], [1])
+        self.assertEqual([b for b, _ in search_fts(conn.cursor(), ["gardening"])], [1])
+
+        # Re-running is idempotent (no duplicate rows)
+        self.assertTrue(ensure_fts_schema(conn.cursor()))
+        self.assertEqual(conn.execute(f"SELECT count(*) FROM {FTS_TABLE}").fetchone()[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""Tests for the snapshot-backed GlobalIndex (v5.4)."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+
+from greeum.core.global_index import GlobalIndex
+
+
+def _block(i):
+    rng = np.random.default_rng(i)
+    return {
+        "block_index": i,
+        "timestamp": f"2026-01-01T00:00:{i:02d}",
+        "context": f"deployment notes number {i}" if i % 2 else f"kubernetes rollout {i}",
+        "keywords": [f"kw{i}", "shared"],
+        "tags": [],
+        "embedding": rng.standard_normal(8).astype(np.float32).tolist(),
+        "importance": 0.5,
+        "hash": f"h{i}",
+        "prev_hash": "",
+    }
+
+
+class TestGlobalIndex(unittest.TestCase):
+    def setUp(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_global_index_")
+        self.db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "memory.db"))
+        for i in range(10):
+            self.db.add_block(_block(i))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def test_single_scan_build(self):
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        try:
+            index = GlobalIndex(self.db)
+        finally:
+            self.db.conn.set_trace_callback(None)
+
+        self.assertEqual(index.stats["total_documents"], 10)
+        self.assertEqual(index.inverted_index["shared"], set(range(10)))
+        self.assertEqual(index.inverted_index["kubernetes"], {0, 2, 4, 6, 8})
+        self.assertFalse([s for s in statements if "FROM block_keywords" in s and "WHERE block_index = " in s])
+        self.assertTrue(os.path.exists(index.snapshot_path))
+
+    def test_snapshot_restart_scans_only_new_blocks(self):
+        GlobalIndex(self.db)
+        self.db.add_block(_block(10))
+
+        index = GlobalIndex(self.db)
+        self.assertEqual(index.stats["load_source"], "snapshot")
+        self.assertEqual(index.stats["scanned_blocks"], 1)
+        self.assertEqual(index.stats["total_documents"], 11)
+        self.assertEqual(index.search_keywords(["kw10"]), [(10, index._idf("kw10"))])
+
+    def _rewrite_keywords(self, block_index, keywords):
+        """Replace a block's keywords from another connection (knowledge update elsewhere)."""
+        conn = sqlite3.connect(self.db.connection_string)
+        with conn:
+            conn.execute("DELETE FROM block_keywords WHERE block_index = ?", (block_index,))
+            conn.executemany(
+                "INSERT INTO block_keywords (block_index, keyword) VALUES (?, ?)",
+                [(block_index, keyword) for keyword in keywords],
+            )
+        conn.close()
+
+    def test_snapshot_reload_sees_in_place_keyword_rewrite(self):
+        GlobalIndex(self.db)
+        self._rewrite_keywords(3, ["replaced"])
+
+        index = GlobalIndex(self.db)
+        self.assertEqual(index.stats["load_source"], "snapshot")
+        self.assertEqual(index.stats["reindexed_blocks"], 1)
+        self.assertEqual(index.inverted_index["replaced"], {3})
+        self.assertNotIn("kw3", index.inverted_index)
+        self.assertNotIn(3, index.inverted_index["shared"])
+
+        # The refreshed snapshot no longer needs the re-read
+        self.assertEqual(GlobalIndex(self.db).stats["reindexed_blocks"], 0)
+
+    def test_sync_changes_rereads_rewritten_and_deleted_blocks(self):
+        index = GlobalIndex(self.db)
+        self._rewrite_keywords(5, ["moved"])
+        conn = sqlite3.connect(self.db.connection_string)
+        with conn:
+            conn.execute("DELETE FROM blocks WHERE block_index = 7")
+            conn.execute("DELETE FROM block_keywords WHERE block_index = 7")
+        conn.close()
+
+        self.assertEqual(index.sync_changes(), [5, 7])
+        self.assertEqual(index.inverted_index["moved"], {5})
+        self.assertNotIn(7, index.inverted_index["shared"])
+        self.assertEqual(index.stats["total_documents"], 9)
+        self.assertEqual(index.sync_changes(), [])
+
+    def test_update_block_replaces_postings(self):
+        index = GlobalIndex(self.db)
+        before = index.stats["index_size"]
+        index.update_block(3, ["renamed"])
+        self.assertNotIn(3, index.inverted_index["shared"])
+        self.assertNotIn("kw3", index.inverted_index)
+        self.assertEqual(index.inverted_index["renamed"], {3})
+        self.assertEqual(index.stats["total_documents"], 10)
+        self.assertLess(index.stats["index_size"], before)
+
+        index.update_block(42, ["fresh"])
+        self.assertEqual(index.stats["total_documents"], 11)
+
+        # Embedding rewrites go straight into the loaded matrix
+        index.search_vector(np.ones(8), limit=1)
+        index.update_block(5, ["rewritten"], np.ones(8, dtype=np.float32))
+        self.assertEqual(index.search_vector(np.ones(8), limit=1)[0][0], 5)
+
+    def test_save_interval_defers_snapshot_to_background(self):
+        index = GlobalIndex(self.db)
+        saves = index.stats["snapshot_saves"]
+        index.save_interval = 2
+        index.save_delay = 60.0
+        index.update_block(3, ["renamed"])
+        index.update_block(4, ["renamed"])
+
+        # The write that crossed the interval only scheduled the save
+        timer = index._save_timer
+        self.assertIsNotNone(timer)
+        self.assertEqual(index.stats["snapshot_saves"], saves)
+
+        self.assertTrue(index.save())
+        self.assertIsNone(index._save_timer)
+        timer.join(5)
+        self.assertEqual(index.stats["snapshot_saves"], saves + 1)  # the cancelled timer did not save again
+        self.assertEqual(GlobalIndex(self.db).inverted_index["renamed"], {3, 4})
+
+        index.save_delay = 0.0
+        index.update_block(5, ["later"])
+        index.update_block(6, ["later"])
+        index._save_timer.join(5)
+        self.assertEqual(index.stats["snapshot_saves"], saves + 2)
+        self.assertEqual(GlobalIndex(self.db).inverted_index["later"], {5, 6})
+
+    def test_vector_search_with_exclude(self):
+        index = GlobalIndex(self.db)
+        query = np.asarray(_block(4)["embedding"], dtype=np.float32)
+        self.assertEqual(index.search_vector(query, limit=1)[0][0], 4)
+
+        results = index.search_vector(query, limit=3, exclude={4})
+        self.assertEqual(len(results), 3)
+        self.assertNotIn(4, [idx for idx, _ in results])
+
+        stats = index.get_stats()
+        self.assertEqual(stats["vector_index_size"], 10)
+        self.assertGreater(stats["keyword_memory_bytes"], 0)
+        self.assertGreaterEqual(stats["vector_memory_bytes"], 10 * 8 * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+"""Tests for the paged, resumable GraphIndex bootstrap (v5.4)."""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+
+class TestGraphIndexBootstrap(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_graph_bootstrap_")
+        os.environ["GREEUM_SILENT_HASH_FALLBACK"] = "1"
+        self._mode = os.environ.get("GREEUM_GRAPH_BOOTSTRAP")
+
+        from greeum.core import DatabaseManager
+
+        self.db_path = os.path.join(self._tmpdir, "memory.db")
+        self.db = DatabaseManager(connection_string=self.db_path)
+
+    def tearDown(self):
+        if self._mode is None:
+            os.environ.pop("GREEUM_GRAPH_BOOTSTRAP", None)
+        else:
+            os.environ["GREEUM_GRAPH_BOOTSTRAP"] = self._mode
+        try:
+            self.db.close()
+        except Exception:
+            pass
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _add_blocks(self, start: int, count: int):
+        for i in range(start, start + count):
+            neighbors = [{"id": i - 1, "weight": 0.8}] if i > 0 else []
+            self.db.add_block({
+                "block_index": i,
+                "timestamp": "2026-01-01T00:00:00",
+                "context": f"block {i}",
+                "keywords": [],
+                "tags": [],
+                "embedding": [],
+                "importance": 0.5,
+                "hash": f"h{i}",
+                "prev_hash": "",
+                "metadata": {"links": {"neighbors": neighbors}},
+            })
+
+    def _bootstrap(self, page_size: int = 4):
+        from greeum.core.graph_index_bootstrap import GraphIndexBootstrap
+        from greeum.graph.index import GraphIndex
+
+        return GraphIndexBootstrap(self.db, GraphIndex(), page_size=page_size)
+
+    def test_pages_cover_whole_store(self):
+        self._add_blocks(0, 10)
+        bootstrap = self._bootstrap()
+        pages = []
+
+        progress = bootstrap.run(progress_callback=pages.append)
+
+        self.assertEqual(progress["state"], "done")
+        self.assertEqual([p["processed"] for p in pages], [4, 8, 10])
+        self.assertTrue(bootstrap.ready.is_set())
+        graph = bootstrap.graph_index
+        self.assertEqual(len(graph.adj), 10)
+        self.assertEqual(graph.neighbors("9"), [("8", 0.8)])
+        self.assertEqual(graph.get_stats()["edge_count"], 9)
+        self.assertTrue(bootstrap.snapshot_path.exists())
+        self.assertTrue(bootstrap.checkpoint_path.exists())
+
+    def test_resume_scans_only_new_blocks(self):
+        self._add_blocks(0, 6)
+        self._bootstrap().run()
+
+        self._add_blocks(6, 3)
+        resumed = self._bootstrap()
+        progress = resumed.run()
+
+        self.assertEqual(progress["resumed_from"], 5)
+        self.assertEqual(progress["processed"], 3)
+        self.assertEqual(len(resumed.graph_index.adj), 9)
+        self.assertEqual(resumed.graph_index.neighbors("3"), [("2", 0.8)])
+        self.assertEqual(resumed.graph_index.neighbors("8"), [("7", 0.8)])
+
+    def test_restarts_when_store_no_longer_reaches_checkpoint(self):
+        self._add_blocks(0, 3)
+        first = self._bootstrap()
+        first.run()
+        # Checkpoint left behind by a larger store that has since been rebuilt
+        with open(first.checkpoint_path, "w", encoding="utf-8") as f:
+            json.dump({"last_block_index": 50}, f)
+
+        bootstrap = self._bootstrap()
+        progress = bootstrap.run()
+
+        self.assertIsNone(progress["resumed_from"])
+        self.assertEqual(progress["processed"], 3)
+        self.assertEqual(set(bootstrap.graph_index.adj), {"0", "1", "2"})
+
+    def test_block_manager_background_bootstrap(self):
+        from greeum.core.block_manager import BlockManager
+
+        self._add_blocks(0, 5)
+        os.environ["GREEUM_GRAPH_BOOTSTRAP"] = "off"
+        idle = BlockManager(self.db)
+        self.assertFalse(idle.graph_ready)
+
+        os.environ["GREEUM_GRAPH_BOOTSTRAP"] = "background"
+        bm = BlockManager(self.db)
+        self.assertTrue(bm.graph_bootstrap.wait(timeout=10))
+        self.assertTrue(bm.graph_ready)
+        self.assertEqual(bm.graph_index.neighbors("4"), [("3", 0.8)])
+
+        # Link updates after the bootstrap land in the snapshot's delta log
+        bm._update_graph_index_links(0, [4])
+        reloaded = self._bootstrap()
+        reloaded.run()
+        self.assertEqual(reloaded.progress["processed"], 0)
+        self.assertIn(("4", 1.0), reloaded.graph_index.neighbors("0"))
+
+    def test_persist_leaves_compaction_to_background_thread(self):
+        from unittest import mock
+
+        from greeum.graph.snapshot import delta_path, read_graph_delta
+
+        self._add_blocks(0, 5)
+        bootstrap = self._bootstrap()
+        bootstrap.run()
+        graph = bootstrap.graph_index
+        graph.compact_threshold = 1
+
+        writer = threading.current_thread()
+        full_saves = []
+        original = graph.save_snapshot
+
+        def save_snapshot(path, compact=False, delta_only=False):
+            if not delta_only:
+                full_saves.append(threading.current_thread())
+            return original(path, compact=compact, delta_only=delta_only)
+
+        with mock.patch.object(graph, "save_snapshot", side_effect=save_snapshot):
+            graph.upsert_edges("0", [("2", 0.5), ("3", 0.5)])
+            graph.upsert_edges("1", [("4", 0.5)])
+            bootstrap.persist()
+            bootstrap._compact_thread.join(timeout=10)
+
+        self.assertTrue(full_saves)
+        self.assertNotIn(writer, full_saves)
+        self.assertFalse(graph.needs_compaction)
+        self.assertEqual(read_graph_delta(bootstrap.snapshot_path), [])
+        self.assertFalse(delta_path(bootstrap.snapshot_path).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
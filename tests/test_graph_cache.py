@@ -0,0 +1,138 @@
+"""Tests for the hash-keyed graph traversal cache (v5.4)."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from greeum.core.graph_cache import BlockGraphCache
+
+
+def _chain_block(i, length):
+    return {
+        "block_index": i,
+        "timestamp": f"2026-01-01T00:00:{i:02d}",
+        "context": f"step {i} of the deployment checklist" if i != length - 1 else "rollback plan for the database",
+        "keywords": [f"step{i}"],
+        "tags": [],
+        "embedding": [1.0, float(i), 0.0],
+        "importance": 0.5,
+        "hash": f"h{i}",
+        "prev_hash": f"h{i - 1}" if i else "",
+        "root": "h0",
+        "before": f"h{i - 1}" if i else None,
+        "after": [f"h{i + 1}"] if i < length - 1 else [],
+        "xref": [],
+    }
+
+
+class TestBlockGraphCache(unittest.TestCase):
+    LENGTH = 8
+
+    def setUp(self):
+        from greeum.core.database_manager import DatabaseManager
+
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_graph_cache_")
+        self.db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "graph.db"))
+        for i in range(self.LENGTH):
+            self.db.add_block(_chain_block(i, self.LENGTH))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def test_batched_load_and_hits(self):
+        cache = BlockGraphCache(self.db)
+        nodes = cache.get_nodes(["h1", "h2", "h3", "missing"])
+        self.assertEqual(set(nodes), {"h1", "h2", "h3"})
+        self.assertEqual(cache.stats["load_queries"], 1)
+
+        node = nodes["h2"]
+        self.assertEqual(node.parent, "h1")
+        self.assertEqual(node.children, ["h3"])
+        self.assertEqual(node.keywords, ["step2"])
+        self.assertEqual(node.embedding.tolist(), [1.0, 2.0, 0.0])
+        self.assertFalse(node.embedding.flags.writeable)
+
+        cache.get_nodes(["h1", "h2"])
+        self.assertEqual(cache.stats["load_queries"], 1)
+        self.assertEqual(cache.stats["hits"], 2)
+
+    def test_lru_bound(self):
+        cache = BlockGraphCache(self.db, capacity=2)
+        cache.get_nodes(["h1", "h2"])
+        cache.get_node("h1")  # h2 becomes least recently used
+        cache.get_node("h3")
+        self.assertEqual(cache.get_stats()["size"], 2)
+        self.assertEqual(cache.stats["evictions"], 1)
+        self.assertIn("h1", cache._nodes)
+        self.assertNotIn("h2", cache._nodes)
+
+    def test_invalidation_and_external_appends(self):
+        cache = BlockGraphCache(self.db)
+        cache.sync()
+        cache.get_nodes(["h6", "h7"])
+
+        # A child appended by another writer changes h7's adjacency
+        self.db.conn.execute("UPDATE blocks SET after = '[\"h8\"]' WHERE hash = 'h7'")
+        self.db.conn.commit()
+        self.db.add_block(_chain_block(8, 9))
+        cache.sync()
+        self.assertEqual(cache.get_node("h7").children, ["h8"])
+
+        cache.invalidate_block({"hash": "h6", "before": "h5", "block_index": 6})
+        self.assertNotIn("h6", cache._nodes)
+        cache.invalidate(block_index=7)
+        self.assertNotIn("h7", cache._nodes)
+
+    def test_in_place_rewrites_dropped_on_sync(self):
+        cache = BlockGraphCache(self.db)
+        cache.sync()
+        cache.get_nodes(["h2", "h3", "h4"])
+
+        # Another process rewrites links and an embedding without appending
+        self.db.conn.execute("UPDATE blocks SET xref = '[\"h6\"]' WHERE hash = 'h2'")
+        self.db.conn.execute(
+            "UPDATE block_embeddings SET embedding = ? WHERE block_index = 3",
+            (np.array([0.0, 0.0, 1.0], dtype=np.float32).tobytes(),),
+        )
+        self.db.conn.commit()
+        cache.sync()
+
+        self.assertNotIn("h2", cache._nodes)
+        self.assertNotIn("h3", cache._nodes)
+        self.assertIn("h4", cache._nodes)
+        self.assertEqual(cache.stats["rewritten_blocks"], 2)
+        self.assertEqual(cache.get_node("h2").xrefs, ["h6"])
+        self.assertEqual(cache.get_node("h3").embedding.tolist(), [0.0, 0.0, 1.0])
+
+    def test_hybrid_search_issues_one_lookup_per_depth(self):
+        from greeum.core.hybrid_graph_search import HybridGraphSearch
+
+        search = HybridGraphSearch(self.db)
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        try:
+            results, meta = search.search(
+                "rollback database", anchor_hash="h0", depth=self.LENGTH,
+                min_depth=self.LENGTH, threshold=0.0, limit=20, use_bm25_candidates=False,
+            )
+        finally:
+            self.db.conn.set_trace_callback(None)
+
+        self.assertEqual(meta.nodes_visited, self.LENGTH)
+        self.assertEqual(results[0].block_hash, f"h{self.LENGTH - 1}")
+        self.assertEqual(results[0].depth, self.LENGTH - 1)
+        graph_loads = [s for s in statements if "b.hash IN" in s]
+        self.assertLessEqual(len(graph_loads), self.LENGTH)
+        self.assertFalse([s for s in statements if "FROM block_keywords WHERE block_index" in s])
+
+        # A repeated search is served from the cache
+        search.search("rollback", anchor_hash="h0", depth=self.LENGTH, use_bm25_candidates=False)
+        self.assertGreater(self.db.graph_cache.stats["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
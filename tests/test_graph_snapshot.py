@@ -0,0 +1,126 @@
+"""Tests for version-2 GraphIndex snapshots and the delta log (v5.4)."""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from greeum.graph import GraphIndex, load_graph_snapshot, save_graph_snapshot
+from greeum.graph.csr import CSRAdjacency
+from greeum.graph.snapshot import delta_path, get_snapshot_info, read_graph_delta
+
+
+def _graph():
+    graph = GraphIndex(theta=0.1, kmax=8)
+    graph.upsert_edges("1", [("2", 0.9), ("3", 0.4)])
+    graph.upsert_edges("2", [("3", 0.8), ("1", 0.7)])
+    graph.upsert_edges("노드", [("1", 0.5)])
+    graph.add_node("isolated")
+    return graph
+
+
+class TestGraphSnapshotV2(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_graph_snapshot_")
+        self.path = Path(self._tmpdir) / "graph.jsonl"
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def test_roundtrip_is_memory_mapped(self):
+        graph = _graph()
+        graph.save_snapshot(self.path)
+        self.assertEqual(get_snapshot_info(self.path)["version"], 2)
+
+        loaded = GraphIndex(theta=0.1, kmax=8)
+        self.assertTrue(loaded.load_snapshot(self.path))
+        self.assertIsInstance(loaded.adj, CSRAdjacency)
+        self.assertIsInstance(loaded.adj.base.indices, np.memmap)
+
+        self.assertEqual(loaded.get_stats(), graph.get_stats())
+        self.assertEqual(set(loaded.adj), {"1", "2", "노드", "isolated"})
+        self.assertNotIn("3", loaded.adj)
+        self.assertEqual(loaded.neighbors("1"), [("2", 0.9), ("3", 0.4)])
+        self.assertEqual(loaded.neighbors("노드"), [("1", 0.5)])
+        self.assertEqual(loaded.beam_search("노드", lambda n: n == "3", max_hop=2), ["3"])
+        self.assertEqual(load_graph_snapshot(self.path), {u: list(r) for u, r in graph.adj.items()})
+
+    def test_writes_go_to_delta_log_until_compaction(self):
+        _graph().save_snapshot(self.path)
+        size = self.path.stat().st_size
+
+        graph = GraphIndex(theta=0.1, kmax=8)
+        graph.load_snapshot(self.path)
+        graph.upsert_edges("4", [("1", 0.6)])
+        graph.remove_node("1")
+        graph.save_snapshot(self.path)
+
+        self.assertEqual(self.path.stat().st_size, size)
+        # "1" removed, plus the rows that pointed at it and the new row
+        self.assertEqual({u for u, _ in read_graph_delta(self.path)}, {"1", "2", "4", "노드"})
+
+        reloaded = GraphIndex(theta=0.1, kmax=8)
+        reloaded.load_snapshot(self.path)
+        self.assertNotIn("1", reloaded.adj)
+        self.assertEqual(reloaded.neighbors("2"), [("3", 0.8)])
+        self.assertEqual(reloaded.neighbors("4"), [])
+        self.assertEqual(reloaded.get_stats(), graph.get_stats())
+        self.assertEqual(reloaded.get_stats()["edge_count"], 1)
+
+        reloaded.compact_threshold = 0
+        reloaded.upsert_edges("5", [("2", 0.9)])
+        reloaded.save_snapshot(self.path)
+        self.assertFalse(delta_path(self.path).exists())
+        self.assertEqual(get_snapshot_info(self.path)["edge_count"], 2)
+
+    def test_stale_delta_after_crashed_full_save_is_ignored(self):
+        _graph().save_snapshot(self.path)
+        graph = GraphIndex(theta=0.1, kmax=8)
+        graph.load_snapshot(self.path)
+        graph.remove_node("1")
+        graph.save_snapshot(self.path)
+        stale_delta = delta_path(self.path).read_bytes()
+
+        # Full save that "crashes" before the old delta log is removed
+        graph.upsert_edges("1", [("노드", 0.3)])
+        graph.save_snapshot(self.path, compact=True)
+        delta_path(self.path).write_bytes(stale_delta)
+
+        reloaded = GraphIndex(theta=0.1, kmax=8)
+        self.assertTrue(reloaded.load_snapshot(self.path))
+        self.assertEqual(read_graph_delta(self.path), [])
+        self.assertEqual(reloaded.neighbors("1"), [("노드", 0.3)])
+        self.assertEqual(reloaded.get_stats(), graph.get_stats())
+
+    def test_version1_json_is_migrated(self):
+        save_graph_snapshot(_graph().adj, {"theta": 0.1}, self.path, version=1)
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["version"], 1)
+
+        graph = GraphIndex(theta=0.1, kmax=8)
+        self.assertTrue(graph.load_snapshot(self.path))
+        self.assertEqual(graph.neighbors("2"), [("3", 0.8), ("1", 0.7)])
+        self.assertEqual(graph.get_stats()["edge_count"], 5)
+
+        graph.save_snapshot(self.path)
+        self.assertEqual(get_snapshot_info(self.path)["version"], 2)
+
+    def test_edge_count_is_maintained(self):
+        graph = _graph()
+        self.assertEqual(graph.get_stats()["edge_count"], 5)
+        graph.upsert_edges("1", [("4", 0.3), ("2", 0.95)])
+        self.assertEqual(graph.get_stats()["edge_count"], 6)
+        graph.set_neighbors("2", [("4", 0.2), ("4", 0.9)])
+        self.assertEqual(graph.neighbors("2"), [("4", 0.2)])
+        self.assertEqual(graph.get_stats()["edge_count"], 5)
+        graph.remove_node("4")
+        self.assertEqual(graph.get_stats()["edge_count"], 3)
+        graph._update_edge_count()
+        self.assertEqual(graph.get_stats()["edge_count"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""Tests for group commit in the ThreadSafeDatabaseManager write worker (v5.4)."""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from greeum.core.thread_safe_db import ThreadSafeDatabaseManager
+
+
+def _block(index: int) -> dict:
+    return {
+        "block_index": index,
+        "timestamp": "2026-01-01T00:00:00",
+        "context": f"memory {index}",
+        "importance": 0.5,
+        "hash": hashlib.sha256(str(index).encode()).hexdigest(),
+        "prev_hash": "",
+        "keywords": ["group", "commit"],
+    }
+
+
+class TestGroupCommit(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_group_commit_")
+        os.environ["GREEUM_SILENT_HASH_FALLBACK"] = "1"
+        self.db = ThreadSafeDatabaseManager(os.path.join(self._tmpdir, "memory.db"))
+
+    def tearDown(self):
+        self.db.shutdown()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _count(self, table: str = "blocks") -> int:
+        return self.db._get_connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _hold_worker(self) -> threading.Event:
+        """Park the worker on a gate so the next submissions queue up as one batch."""
+        gate = threading.Event()
+        started = threading.Event()
+
+        def hold(conn):
+            started.set()
+            gate.wait(5)
+
+        threading.Thread(target=self.db._execute_write, args=(hold,)).start()
+        started.wait(5)
+        return gate
+
+    def _submit(self, operation, outcomes: dict, key: str) -> threading.Thread:
+        def run():
+            try:
+                outcomes[key] = self.db._execute_write(operation)
+            except Exception as exc:  # noqa: BLE001
+                outcomes[key] = exc
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def _wait_for_queue(self, depth: int) -> None:
+        for _ in range(500):
+            if self.db._write_queue.qsize() >= depth:
+                return
+            time.sleep(0.01)
+
+    def test_concurrent_writers_are_batched(self):
+        per_thread = 20
+
+        def writer(offset):
+            for i in range(per_thread):
+                self.assertEqual(self.db.add_block(_block(offset + i)), offset + i)
+
+        threads = [threading.Thread(target=writer, args=(t * per_thread,)) for t in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = self.db.write_queue_stats()
+        self.assertEqual(self._count(), 50 * per_thread)
+        self.assertEqual(stats["failed_operations"], 0)
+        self.assertGreater(stats["max_batch_size"], 1)
+        self.assertLess(stats["batches"], stats["operations"])
+        self.assertEqual(stats["wait_ms"]["samples"], stats["operations"])
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_failing_operation_is_isolated_within_batch(self):
+        def insert(index, fail=False):
+            def operation(conn):
+                self.db._add_block_direct(_block(index))
+                if fail:
+                    raise RuntimeError("boom")
+                return index
+            return operation
+
+        gate = self._hold_worker()
+        outcomes: dict = {}
+        threads = [
+            self._submit(insert(0), outcomes, "a"),
+            self._submit(insert(1, fail=True), outcomes, "b"),
+            self._submit(insert(2), outcomes, "c"),
+        ]
+        self._wait_for_queue(3)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(outcomes["a"], 0)
+        self.assertIsInstance(outcomes["b"], RuntimeError)
+        self.assertEqual(outcomes["c"], 2)
+        rows = self.db._get_connection().execute("SELECT block_index FROM blocks ORDER BY block_index").fetchall()
+        self.assertEqual([row[0] for row in rows], [0, 2])
+        self.assertEqual(self._count("block_keywords"), 4)
+        self.assertEqual(self.db.write_queue_stats()["last_batch_size"], 3)
+
+    def test_commit_and_rollback_inside_operation_stay_within_batch(self):
+        conn_main = self.db._get_connection()
+        conn_main.execute("CREATE TABLE scratch (x INTEGER)")
+        conn_main.commit()
+
+        def committing(conn):
+            conn.execute("INSERT INTO scratch VALUES (1)")
+            conn.commit()
+            return conn.in_transaction
+
+        def rolling_back(conn):
+            conn.execute("INSERT INTO scratch VALUES (2)")
+            conn.rollback()
+
+        gate = self._hold_worker()
+        outcomes: dict = {}
+        threads = [
+            self._submit(committing, outcomes, "commit"),
+            self._submit(rolling_back, outcomes, "rollback"),
+        ]
+        self._wait_for_queue(2)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        # commit() was deferred to the batch commit; rollback() only undid its own row
+        self.assertTrue(outcomes["commit"])
+        self.assertIsNone(outcomes["rollback"])
+        rows = conn_main.execute("SELECT x FROM scratch").fetchall()
+        self.assertEqual([row[0] for row in rows], [1])
+        self.assertFalse(self.db._get_connection().in_transaction)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Cold-start import budget for ``import greeum`` and ``greeum --help`` (v5.4).
+
+Each check runs in a fresh interpreter with ``-X importtime`` and compares the
+cumulative import time of the top module against a budget. The budgets are
+generous on purpose (CI machines are noisy); the module checks catch the
+actual regressions: an eager import that drags numpy, requests, rich or an
+embedding backend back into a cold start.
+
+Override with ``GREEUM_IMPORT_BUDGET_MS`` / ``GREEUM_CLI_IMPORT_BUDGET_MS``.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_BUDGET_MS = float(os.getenv("GREEUM_IMPORT_BUDGET_MS", "50"))
+CLI_IMPORT_BUDGET_MS = float(os.getenv("GREEUM_CLI_IMPORT_BUDGET_MS", "150"))
+
+HEAVY_MODULES = ("numpy", "requests", "rich", "torch", "sentence_transformers", "faiss")
+
+_REPORT = (
+    "import sys\n"
+    "print('LOADED=' + ','.join(m for m in {heavy!r} if m in sys.modules))\n"
+)
+
+
+def _cold_import(code: str, module: str):
+    """Run ``code`` in a new interpreter; return (cumulative_ms of ``module``, heavy modules loaded, stdout)."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT), GREEUM_SILENT_HASH_FALLBACK="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code + "\n" + _REPORT.format(heavy=HEAVY_MODULES)],
+        cwd=str(ROOT), env=env, capture_output=True, text=True, timeout=60,
+    )
+    if proc.returncode != 0:
+        raise AssertionError(f"cold import failed:\n{proc.stderr[-2000:]}")
+
+    cumulative_ms = None
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_ms = int(parts[1]) / 1000.0
+    loaded = []
+    for line in proc.stdout.splitlines():
+        if line.startswith("LOADED="):
+            loaded = [name for name in line[len("LOADED="):].split(",") if name]
+    return cumulative_ms, loaded, proc.stdout
+
+
+class TestColdStartImportBudget(unittest.TestCase):
+    def test_import_greeum(self):
+        elapsed_ms, loaded, _ = _cold_import("import greeum", "greeum")
+
+        self.assertEqual(loaded, [])
+        self.assertIsNotNone(elapsed_ms)
+        self.assertLess(elapsed_ms, IMPORT_BUDGET_MS)
+
+    def test_cli_help(self):
+        code = (
+            "from greeum.cli import main\n"
+            "try:\n"
+            "    main(['--help'], prog_name='greeum')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+        )
+        elapsed_ms, loaded, stdout = _cold_import(code, "greeum.cli")
+
+        self.assertIn("memory", stdout)
+        self.assertIn("graph", stdout)
+        self.assertEqual(loaded, [])
+        self.assertIsNotNone(elapsed_ms)
+        self.assertLess(elapsed_ms, CLI_IMPORT_BUDGET_MS)
+
+    def test_public_api_resolves_lazily(self):
+        import greeum
+        import greeum.core
+
+        self.assertIn("BlockManager", dir(greeum))
+        self.assertIs(greeum.process_text, greeum.process_user_input)
+        self.assertIs(greeum.core.BlockManager, greeum.BlockManager)
+        self.assertTrue(hasattr(greeum.core.DatabaseManager, "add_block"))
+        with self.assertRaises(AttributeError):
+            greeum.NoSuchThing  # noqa: B018
+
+
+if __name__ == "__main__":
+    unittest.main()
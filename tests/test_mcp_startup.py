@@ -0,0 +1,121 @@
+"""Tests for staged lazy startup of the native MCP server (v5.4)."""
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+
+def _run(coro):
+    # Private loop: asyncio.run() would clear the loop other test modules reuse
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class TestStagedStartup(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_mcp_startup_")
+        self._env = patch.dict(os.environ, {
+            "GREEUM_DATA_DIR": self._tmpdir,
+            "GREEUM_SILENT_HASH_FALLBACK": "1",
+            "GREEUM_MCP_WARMUP_WAIT": "10",
+        })
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def test_handshake_before_indexes_and_degraded_tools(self):
+        from greeum.mcp.native import server as server_module
+        from greeum.mcp.native.startup import READY
+
+        gate = threading.Event()
+        real_block_manager = server_module.BlockManager
+
+        def slow_block_manager(*args, **kwargs):
+            gate.wait(10)
+            return real_block_manager(*args, **kwargs)
+
+        server = server_module.GreeumNativeMCPServer()
+
+        async def scenario():
+            started = time.perf_counter()
+            await server.initialize()
+            init_seconds = time.perf_counter() - started
+            report_during = server.startup_report()
+
+            tools = server.tools_handler
+            search_during = await tools.execute_tool("search_memory", {"query": "release"})
+            stats_during = await tools.execute_tool("get_memory_stats", {})
+
+            # A write waits for the block manager instead of failing
+            add_task = asyncio.ensure_future(
+                tools.execute_tool("add_memory", {"content": "release checklist for the api gateway"})
+            )
+            await asyncio.sleep(0.1)
+            self.assertFalse(add_task.done())
+            gate.set()
+            add_result = await add_task
+
+            self.assertTrue(await server.startup.wait_for("search_indexes", 10))
+            search_after = await tools.execute_tool("search_memory", {"query": "release"})
+            await server.shutdown()
+            return init_seconds, report_during, search_during, stats_during, add_result, search_after
+
+        with patch.object(server_module, "BlockManager", side_effect=slow_block_manager), \
+                patch.object(server_module.GreeumNativeMCPServer, "_cleanup_orphaned_processes"):
+            init_seconds, report_during, search_during, stats_during, add_result, search_after = \
+                _run(scenario())
+
+        self.assertLess(init_seconds, 5)
+        self.assertEqual(report_during["phases"]["core"]["status"], READY)
+        self.assertNotEqual(report_during["phases"]["block_manager"]["status"], READY)
+        self.assertFalse(report_during["ready"])
+        self.assertIn("degraded mode", search_during)
+        self.assertIn("**Startup**: core: ready", stats_during)
+
+        self.assertIn("SUCCESS", add_result)
+        self.assertNotIn("degraded mode", search_after)
+        self.assertIn("release checklist", search_after)
+
+        report = server.startup_report()
+        for phase in ("core", "block_manager", "search_indexes"):
+            self.assertEqual(report["phases"][phase]["status"], READY)
+            self.assertIsNotNone(report["phases"][phase]["duration_ms"])
+        # The server's STM manager and the engine are shared, not rebuilt
+        components = server.greeum_components
+        self.assertIs(components["block_manager"].stm_manager, components["stm_manager"])
+        self.assertIs(components["dfs_search"], components["block_manager"].get_search_engine())
+
+
+class TestStartupState(unittest.TestCase):
+    def test_failed_phase_is_reported(self):
+        from greeum.mcp.native.startup import FAILED, StartupState
+
+        state = StartupState(phases=("core", "block_manager"))
+        with state.phase("core"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with state.phase("block_manager"):
+                raise RuntimeError("disk full")
+
+        self.assertTrue(state.is_ready("core"))
+        self.assertEqual(state.status("block_manager"), FAILED)
+        self.assertFalse(_run(state.wait_for("block_manager", 1)))
+        report = state.report()
+        self.assertFalse(report["ready"])
+        self.assertEqual(report["phases"]["block_manager"]["error"], "disk full")
+        self.assertIn("block_manager: failed", state.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
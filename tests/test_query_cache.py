@@ -0,0 +1,177 @@
+"""Tests for the write-generation-aware query result cache (v5.4)."""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from greeum.core.query_cache import QueryResultCache, embedding_key, query_key
+
+
+def _unit(seed: int, dim: int = 16):
+    rng = np.random.default_rng(seed)
+    vec = rng.standard_normal(dim).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+class TestQueryResultCache(unittest.TestCase):
+    def test_generation_lru_and_ttl(self):
+        cache = QueryResultCache(capacity=2, ttl=10)
+        cache.put("a", [1])
+        cache.put("b", [2])
+        self.assertEqual(cache.get("a"), [1])
+        cache.put("c", [3])  # evicts "b", the least recently used
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), [3])
+
+        # A write makes every older entry stale
+        generation = cache.generation
+        cache.bump()
+        self.assertIsNone(cache.get("a"))
+        # A value computed across a write is never stored
+        cache.put("d", [4], generation)
+        self.assertIsNone(cache.get("d"))
+
+        cache.put("e", [5])
+        with patch("greeum.core.query_cache.time.monotonic", return_value=1e12):
+            self.assertIsNone(cache.get("e"))
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["stale"], 1)
+        self.assertEqual(stats["expired"], 1)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 4)
+        self.assertEqual(stats["size"], 1)  # "c" is dropped when next looked up
+
+    def test_values_are_copied_and_keys_normalized(self):
+        cache = QueryResultCache(capacity=4, ttl=10)
+        calls = []
+        key = query_key("ns", "  release   checklist ", limit=5)
+        self.assertEqual(key, query_key("ns", "release checklist", limit=5))
+        self.assertNotEqual(key, query_key("ns", "release checklist", limit=6))
+
+        first = cache.get_or_compute(key, lambda: calls.append(1) or [{"score": 1}])
+        first[0]["score"] = 99
+        self.assertEqual(cache.get_or_compute(key, lambda: calls.append(1) or []), [{"score": 1}])
+        self.assertEqual(len(calls), 1)
+
+        # Embeddings sharing a prefix no longer collide
+        a, b = _unit(0), _unit(0).copy()
+        b[-1] += 0.5
+        self.assertNotEqual(embedding_key(a), embedding_key(b))
+        self.assertEqual(embedding_key(a), embedding_key(a.tolist()))
+
+    def test_disabled_cache_always_computes(self):
+        cache = QueryResultCache(capacity=0)
+        calls = []
+        for _ in range(2):
+            cache.get_or_compute("k", lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(cache), 0)
+
+
+class TestSearchPathCaching(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_query_cache_")
+        os.environ["GREEUM_SILENT_HASH_FALLBACK"] = "1"
+
+        from greeum.core.block_manager import BlockManager
+        from greeum.core.thread_safe_db import ThreadSafeDatabaseManager
+
+        self.db = ThreadSafeDatabaseManager(os.path.join(self._tmpdir, "memory.db"))
+        self.bm = BlockManager(self.db)
+        self.cache = self.db.query_cache
+
+    def tearDown(self):
+        self.db.shutdown()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _add(self, context: str, seed: int):
+        return self.bm.add_block(
+            context=context,
+            keywords=context.split(),
+            tags=[],
+            embedding=_unit(seed).tolist(),
+            importance=0.5,
+        )
+
+    def test_block_manager_search_invalidated_by_writes(self):
+        self._add("gateway release checklist", 0)
+        first = self.bm.search("release", limit=5)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(self.bm.search("release", limit=5), first)
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+
+        self._add("release notes for the cli", 1)
+        self.assertEqual(len(self.bm.search("release", limit=5)), 2)
+        self.assertEqual(self.cache.get_stats()["stale"], 1)
+
+    def test_writes_from_another_process_invalidate(self):
+        import sqlite3
+
+        self._add("gateway release checklist", 0)
+        self.assertEqual(len(self.bm.search("release", limit=5)), 1)
+        self.assertEqual(len(self.bm.search("release", limit=5)), 1)
+
+        # Another process rewrites the block; this process never calls bump()
+        other = sqlite3.connect(os.path.join(self._tmpdir, "memory.db"))
+        with other:
+            other.execute("DELETE FROM block_keywords WHERE keyword = 'release'")
+            other.execute("UPDATE blocks SET context = 'gateway checklist' WHERE block_index = 0")
+        other.close()
+
+        self.assertEqual(self.bm.search("release", limit=5), [])
+        stats = self.cache.get_stats()
+        self.assertEqual(stats["external_bumps"], 1)
+        self.assertEqual(stats["stale"], 1)
+
+    def test_search_with_slots_marks_cache_hits(self):
+        self._add("postgres vacuum schedule", 2)
+        first = self.bm.search_with_slots("postgres vacuum", limit=3)
+        second = self.bm.search_with_slots("postgres vacuum", limit=3)
+        self.assertFalse(first["meta"]["cache_hit"])
+        self.assertTrue(second["meta"]["cache_hit"])
+        self.assertEqual(
+            [item["block_index"] for item in second["items"]],
+            [item["block_index"] for item in first["items"]],
+        )
+
+        self._add("postgres replica lag", 3)
+        self.assertFalse(self.bm.search_with_slots("postgres vacuum", limit=3)["meta"]["cache_hit"])
+
+    def test_cache_manager_uses_shared_cache_and_debounces_saves(self):
+        from greeum.core.cache_manager import CacheManager
+
+        block = self._add("oncall rotation for march", 4)
+        data_path = os.path.join(self._tmpdir, "context_cache.json")
+        manager = CacheManager(data_path=data_path, block_manager=self.bm,
+                               stm_manager=object(), flush_delay=60)
+        self.assertIs(manager.query_cache, self.cache)
+
+        query = _unit(4).tolist()
+        results = manager.update_cache("oncall?", query, ["oncall"], top_k=1)
+        self.assertEqual(results[0]["block_index"], block["block_index"])
+        self.assertEqual(manager.update_cache("oncall again?", query, ["oncall"], top_k=1), results)
+        self.assertEqual(manager.get_cache_stats()["cache_hits"], 1)
+
+        # Two update_cache calls, four context/waypoint updates, no file write yet
+        self.assertEqual(manager.save_count, 0)
+        self.assertTrue(manager.flush())
+        self.assertFalse(manager.flush())
+        with open(data_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        self.assertEqual(saved["current_context"], "oncall again?")
+        self.assertEqual(saved["waypoints"][0]["block_index"], block["block_index"])
+
+        self._add("oncall handover notes", 5)
+        self.assertIsNone(manager.get_cached_results(query, ["oncall"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+"""Tests for the persistent, incrementally updated DFSSearchEngine (v5.4).
+
+Verifies that BlockManager hands out a single engine, that blocks written
+through the manager become searchable without a rebuild, and that blocks
+written behind the engine's back are picked up via the high-water mark, or
+via the change log when they are rewritten in place.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+
+
+class TestPersistentSearchEngine(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_engine_")
+        os.environ["GREEUM_SILENT_HASH_FALLBACK"] = "1"
+
+        from greeum.core import DatabaseManager
+        from greeum.core.block_manager import BlockManager
+
+        self.db = DatabaseManager(connection_string=os.path.join(self._tmpdir, "memory.db"))
+        self.bm = BlockManager(self.db)
+
+    def tearDown(self):
+        try:
+            self.db.close()
+        except Exception:
+            pass
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _embedding(self, seed: int):
+        rng = np.random.default_rng(seed)
+        vec = rng.standard_normal(16).astype(np.float32)
+        return (vec / np.linalg.norm(vec)).tolist()
+
+    def test_engine_is_shared(self):
+        engine = self.bm.get_search_engine()
+        self.assertIs(engine, self.bm.get_search_engine())
+        self.assertIs(engine.branch_index_manager, self.bm.branch_index_manager)
+
+    def test_new_block_indexed_incrementally(self):
+        engine = self.bm.get_search_engine()
+        before_updates = engine.index_stats["incremental_updates"]
+
+        block = self.bm.add_block(
+            context="zebrafish regeneration experiment notes",
+            keywords=["zebrafish"],
+            tags=[],
+            embedding=self._embedding(1),
+            importance=0.5,
+        )
+        self.assertIsNotNone(block)
+
+        self.assertGreater(engine.index_stats["incremental_updates"], before_updates)
+        self.assertEqual(engine.index_stats["high_water_mark"], block["block_index"])
+        self.assertIn(block["block_index"], engine.global_index.inverted_index["zebrafish"])
+
+        metrics = self.bm.get_metrics()
+        self.assertEqual(metrics["search_index"]["stale_blocks"], 0)
+
+    def test_external_write_caught_up_on_search(self):
+        engine = self.bm.get_search_engine()
+
+        # Write directly through the DB manager, bypassing BlockManager hooks
+        self.db.add_block({
+            "block_index": 0,
+            "timestamp": "2026-01-01T00:00:00",
+            "context": "platypus habitat survey",
+            "keywords": ["platypus"],
+            "tags": [],
+            "embedding": self._embedding(2),
+            "importance": 0.5,
+            "hash": "h0",
+            "prev_hash": "",
+        })
+        self.assertEqual(engine.get_metrics()["index"]["stale_blocks"], 1)
+
+        engine.search_with_dfs("platypus", limit=5)
+        self.assertEqual(engine.index_stats["catch_up_blocks"], 1)
+        self.assertIn(0, engine.global_index.inverted_index["platypus"])
+        self.assertEqual(engine.get_metrics()["index"]["stale_blocks"], 0)
+
+    def test_in_place_rewrite_caught_up_on_sync(self):
+        engine = self.bm.get_search_engine()
+        block = self.bm.add_block(
+            context="okapi sighting log",
+            keywords=["wildlife"],
+            tags=[],
+            embedding=self._embedding(3),
+            importance=0.5,
+        )
+        block_index = block["block_index"]
+        engine.sync()
+        rewritten = engine.index_stats["rewritten_blocks"]
+
+        # Another process replaces the keywords of an already indexed block
+        conn = sqlite3.connect(self.db.connection_string)
+        with conn:
+            conn.execute("DELETE FROM block_keywords WHERE block_index = ?", (block_index,))
+            conn.execute(
+                "INSERT INTO block_keywords (block_index, keyword) VALUES (?, 'echidna')", (block_index,)
+            )
+        conn.close()
+
+        self.assertEqual(engine.sync(), 1)
+        self.assertEqual(engine.index_stats["rewritten_blocks"], rewritten + 1)
+        self.assertIn(block_index, engine.global_index.inverted_index["echidna"])
+        self.assertNotIn(block_index, engine.global_index.inverted_index.get("wildlife", set()))
+        self.assertEqual(engine.sync(), 0)
+
+    def test_writers_not_blocked_while_search_scores(self):
+        from greeum.core.branch_index import BranchIndex
+
+        engine = self.bm.get_search_engine()
+        block = self.bm.add_block(
+            context="quokka population census",
+            keywords=["quokka"],
+            tags=[],
+            embedding=self._embedding(4),
+            importance=0.5,
+        )
+        new_block = {
+            "block_index": block["block_index"] + 1,
+            "hash": "written-during-search",
+            "context": "quokka burrow map",
+            "keywords": ["quokka"],
+            "root": block["root"],
+            "before": block["hash"],
+        }
+        writer_finished = []
+        original_rank = BranchIndex.rank
+
+        def rank(index, collected, limit=10):
+            # A block written while the search is scoring must not wait for it
+            writer = threading.Thread(target=engine.index_block, args=(new_block,))
+            writer.start()
+            writer.join(timeout=5)
+            writer_finished.append(not writer.is_alive())
+            return original_rank(index, collected, limit)
+
+        with mock.patch.object(BranchIndex, "rank", rank):
+            results, _ = engine.search_with_dfs("quokka census", limit=5)
+
+        self.assertTrue(writer_finished)
+        self.assertTrue(all(writer_finished))
+        # The search scored the postings it snapshotted before the write
+        self.assertEqual([r["block_index"] for r in results][:1], [block["block_index"]])
+        self.assertIn(new_block["block_index"], engine.global_index.inverted_index["quokka"])
+
+
+if __name__ == "__main__":
+    unittest.main()
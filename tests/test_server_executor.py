@@ -0,0 +1,186 @@
+"""Tests for MemoryService executor offload and request latency metrics (v5.4)."""
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+
+def _have_fastapi_testclient() -> bool:
+    try:
+        import httpx  # noqa: F401
+        from fastapi.testclient import TestClient  # noqa: F401
+        return True
+    except Exception:  # noqa: BLE001
+        return False
+
+
+class _SlowBlockManager:
+    """Records how many calls overlap; each call takes ``delay`` seconds."""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.active = {"search": 0, "add_block": 0}
+        self.peak = {"search": 0, "add_block": 0}
+        self._lock = threading.Lock()
+        self.next_index = 0
+
+    def _enter(self, kind):
+        with self._lock:
+            self.active[kind] += 1
+            self.peak[kind] = max(self.peak[kind], self.active[kind])
+
+    def _exit(self, kind):
+        with self._lock:
+            self.active[kind] -= 1
+
+    def search(self, query, limit=5):
+        self._enter("search")
+        time.sleep(self.delay)
+        self._exit("search")
+        return []
+
+    def add_block(self, **kwargs):
+        self._enter("add_block")
+        time.sleep(self.delay / 4)
+        index = self.next_index
+        self.next_index += 1
+        self._exit("add_block")
+        return {"block_index": index}
+
+
+class _NoDuplicates:
+    def check_duplicate(self, content):
+        return {"is_duplicate": False}
+
+
+class TestMemoryServiceExecutor(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp(prefix="greeum_test_server_executor_")
+        os.environ["GREEUM_SILENT_HASH_FALLBACK"] = "1"
+
+        from greeum.core.quality_validator import QualityValidator
+        from greeum.core.thread_safe_db import ThreadSafeDatabaseManager
+        from greeum.server.services.executor import ServiceExecutor
+        from greeum.server.services.memory_service import MemoryService
+
+        self.db = ThreadSafeDatabaseManager(os.path.join(self._tmpdir, "memory.db"))
+        self.service = MemoryService(use_insight_filter=False)
+        self.service._executor = ServiceExecutor(read_workers=4)
+        self.service._executor.bind(self.db)
+        self.service._db_manager = self.db
+        self.service._block_manager = _SlowBlockManager()
+        self.service._duplicate_detector = _NoDuplicates()
+        self.service._quality_validator = QualityValidator()
+        self.service._initialized = True
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.db.shutdown()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def test_searches_run_in_parallel_without_blocking_the_loop(self):
+        ticks = []
+
+        async def ticker():
+            for _ in range(20):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            started = time.perf_counter()
+            tick_task = asyncio.ensure_future(ticker())
+            await asyncio.gather(*(self.service.search(f"q{i}") for i in range(4)))
+            elapsed = time.perf_counter() - started
+            await tick_task
+            return elapsed
+
+        elapsed = asyncio.run(scenario())
+
+        self.assertEqual(self.service._block_manager.peak["search"], 4)
+        self.assertLess(elapsed, 0.6)
+        # The loop kept ticking while the searches slept in worker threads
+        self.assertGreaterEqual(len([t for t in ticks if t - ticks[0] < 0.2]), 5)
+
+    def test_writes_are_serialized(self):
+        async def scenario():
+            return await asyncio.gather(*(self.service.add_memory(f"memory {i}") for i in range(5)))
+
+        results = asyncio.run(scenario())
+
+        self.assertEqual(sorted(r["block_index"] for r in results), [0, 1, 2, 3, 4])
+        self.assertEqual(self.service._block_manager.peak["add_block"], 1)
+        self.assertEqual(self.service.executor_stats()["pending_writes"], 0)
+
+    def test_search_has_no_second_cache_layer(self):
+        calls = []
+        search = self.service._block_manager.search
+        self.service._block_manager.search = lambda query, limit=5: calls.append(query) or search(query, limit)
+        self.service._block_manager.delay = 0
+
+        async def scenario():
+            await self.service.search("release checklist")
+            await self.service.search("release checklist")
+
+        asyncio.run(scenario())
+
+        # BlockManager.search owns the query cache; the service always delegates
+        self.assertEqual(calls, ["release checklist", "release checklist"])
+        self.assertEqual(len(self.db.query_cache), 0)
+
+    def test_read_workers_use_query_only_connections(self):
+        def write_from_reader():
+            self.db._get_connection().execute("CREATE TABLE scratch (x INTEGER)")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            asyncio.run(self.service._executor.read(write_from_reader))
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_and_quantiles(self):
+        from greeum.server.metrics import LatencyHistogram
+
+        histogram = LatencyHistogram(buckets=(10, 100))
+        for ms in (1, 2, 50, 70, 400):
+            histogram.observe(ms)
+        snapshot = histogram.snapshot()
+
+        self.assertEqual(snapshot["buckets"], {"le_10": 2, "le_100": 4, "le_inf": 5})
+        self.assertEqual(snapshot["p50_ms"], 100.0)
+        self.assertEqual(snapshot["p99_ms"], 400)
+        self.assertIsNone(LatencyHistogram().quantile(0.5))
+
+    @unittest.skipUnless(_have_fastapi_testclient(), "fastapi[test] not installed")
+    def test_metrics_endpoint_groups_by_route_template(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from greeum.server.metrics import request_metrics
+        from greeum.server.middleware.logging import RequestLoggingMiddleware
+        from greeum.server.routes.health import router
+
+        app = FastAPI()
+        app.add_middleware(RequestLoggingMiddleware)
+        app.include_router(router)
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int):
+            return {"id": item_id}
+
+        request_metrics.reset()
+        with TestClient(app) as client:
+            client.get("/items/1")
+            client.get("/items/2")
+            client.get("/missing")
+            metrics = client.get("/health/metrics").json()["requests"]
+
+        self.assertEqual(metrics["GET /items/{item_id}"]["count"], 2)
+        self.assertEqual(metrics["GET <unmatched>"]["status"], {"4xx": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()